@@ -15,9 +15,10 @@ from .extraction_strategy import (
     JsonXPathExtractionStrategy
 )
 from .chunking_strategy import ChunkingStrategy, RegexChunking
-from .markdown_generation_strategy import DefaultMarkdownGenerator
+from .markdown_generation_strategy import DefaultMarkdownGenerator, LXMLMarkdownGenerator
 from .content_filter_strategy import PruningContentFilter, BM25ContentFilter, LLMContentFilter, RelevantContentFilter
 from .models import CrawlResult, MarkdownGenerationResult
+from .parsed_document import ParsedDocument
 from .async_dispatcher import (
     MemoryAdaptiveDispatcher,
     SemaphoreDispatcher,
@@ -26,6 +27,9 @@ from .async_dispatcher import (
     DisplayMode,
     BaseDispatcher
 )
+from .recrawl_scheduler import RecrawlScheduler
+from .cache_backend import CacheBackend, CacheEntry, SQLiteCacheBackend, LMDBCacheBackend
+from .cache_export import CacheExporter
 
 __all__ = [
     "AsyncWebCrawler",
@@ -44,6 +48,7 @@ __all__ = [
     "ChunkingStrategy",
     "RegexChunking",
     "DefaultMarkdownGenerator",
+    "LXMLMarkdownGenerator",
     "RelevantContentFilter",
     "PruningContentFilter",
     "BM25ContentFilter",
@@ -55,6 +60,13 @@ __all__ = [
     "CrawlerMonitor",
     "DisplayMode",
     "MarkdownGenerationResult",
+    "ParsedDocument",
+    "RecrawlScheduler",
+    "CacheBackend",
+    "CacheEntry",
+    "SQLiteCacheBackend",
+    "LMDBCacheBackend",
+    "CacheExporter",
 ]
 
 
@@ -15,6 +15,8 @@ from .content_filter_strategy import RelevantContentFilter, BM25ContentFilter, L
 from .content_scraping_strategy import ContentScrapingStrategy, WebScrapingStrategy
 from typing import Optional, Union, List
 from .cache_context import CacheMode
+from .cache_backend import CacheBackend
+from .utils import generate_config_fingerprint
 
 
 class BrowserConfig:
@@ -74,6 +76,8 @@ class BrowserConfig:
         light_mode (bool): Disables certain background features for performance gains. Default: False.
         extra_args (list): Additional command-line arguments passed to the browser.
                            Default: [].
+        cache_backend (str or CacheBackend or None): Page store of the cache: "sqlite", "lmdb" or a
+                                                     CacheBackend instance. Default: None (sqlite).
     """
 
     def __init__(
@@ -112,6 +116,7 @@ class BrowserConfig:
         extra_args: list = None,
         debugging_port: int = 9222,
         host: str = "localhost",
+        cache_backend: Union[str, CacheBackend, None] = None,
     ):
         self.browser_type = browser_type
         self.headless = headless
@@ -144,6 +149,7 @@ class BrowserConfig:
         self.sleep_on_close = sleep_on_close
         self.verbose = verbose
         self.debugging_port = debugging_port
+        self.cache_backend = cache_backend
 
         fa_user_agenr_generator = ValidUAGenerator()
         if self.user_agent_mode == "random":
@@ -192,6 +198,7 @@ class BrowserConfig:
             text_mode=kwargs.get("text_mode", False),
             light_mode=kwargs.get("light_mode", False),
             extra_args=kwargs.get("extra_args", []),
+            cache_backend=kwargs.get("cache_backend"),
         )
 
     def to_dict(self):
@@ -224,6 +231,7 @@ class BrowserConfig:
             "sleep_on_close": self.sleep_on_close,
             "verbose": self.verbose,
             "debugging_port": self.debugging_port,
+            "cache_backend": self.cache_backend,
         }
 
     def clone(self, **kwargs):
@@ -281,6 +289,23 @@ class CrawlerRunConfig:
                            Default: WebScrapingStrategy.
         proxy_config (dict or None): Detailed proxy configuration, e.g. {"server": "...", "username": "..."}.
                                      If None, no additional proxy config. Default: None.
+        max_html_length (int or None): Hard cap on the characters of HTML processed. Longer pages are cut
+                                       after the last complete tag before the cap, and the result's
+                                       metadata["truncation"] records max_length, processed_length and
+                                       total_length. Default: None (no cap).
+        incremental_threshold (int or None): Pages with more characters of HTML are cleaned and converted
+                                             to markdown incrementally while they are parsed, in bounded
+                                             memory, if the configuration allows it (no css_selector,
+                                             excluded_selector, only_text, content filter or extraction
+                                             strategy, and a default markdown generator). Fit markdown is
+                                             not produced. Default: None (always process in full).
+        cleaned_html_sink (str or None): Write the cleaned HTML to this file instead of keeping it in the
+                                         result, whose cleaned_html is then None. Default: None.
+        markdown_sink (str or None): Write the raw markdown to this file instead of keeping it in the result,
+                                     whose markdown and markdown_v2 are then None. Default: None.
+        warc_path (str or None): Archive every response of the page, plus the rendered DOM, to this
+                                 WARC file (gzip compressed for *.gz). Replay it offline with
+                                 ReplayCrawlerStrategy. Default: None.
 
         # Caching Parameters
         cache_mode (CacheMode or None): Defines how caching is handled.
@@ -299,6 +324,26 @@ class CrawlerRunConfig:
                                Default: False.
         shared_data (dict or None): Shared data to be passed between hooks.
                                      Default: None.
+        cache_ttl (float or None): Seconds a newly cached entry stays fresh. Expired entries are
+                                   treated as cache misses and removed by cache maintenance.
+                                   Default: None (never expires).
+        cache_ttl_from_headers (bool): If True, derive the TTL from the response's `Cache-Control`
+                                       or `Expires` headers, falling back to cache_ttl.
+                                       Default: False.
+        reuse_unchanged_content (bool): If True, compare the hash of freshly fetched HTML with the
+                                        cached copy and reuse the cached markdown, extraction and
+                                        other derived fields when it is unchanged.
+                                        Default: False.
+        normalize_volatile_content (bool): If True, strip volatile tokens such as CSRF tokens, nonces
+                                           and timestamps before comparing HTML for
+                                           reuse_unchanged_content.
+                                           Default: False.
+        cache_versions (bool): If True, keep a delta-compressed history of every changed version of
+                               the page's html and markdown when writing it to the cache.
+                               Default: False.
+        retry_failed (bool): If True, crawl URLs whose recent failures are recorded in the negative
+                             cache instead of skipping them until their retry time.
+                             Default: False.
 
         # Page Navigation and Timing Parameters
         wait_until (str): The condition to wait for when navigating, e.g. "domcontentloaded".
@@ -355,6 +400,8 @@ class CrawlerRunConfig:
                                                     Default: IMAGE_DESCRIPTION_MIN_WORD_THRESHOLD (e.g., 50).
         image_score_threshold (int): Minimum score threshold for processing an image.
                                      Default: IMAGE_SCORE_THRESHOLD (e.g., 3).
+        expand_image_srcset (bool): If True, list every srcset candidate of a kept image as a variant.
+                                    Default: True.
         exclude_external_images (bool): If True, exclude all external images from processing.
                                          Default: False.
 
@@ -407,8 +454,13 @@ class CrawlerRunConfig:
         parser_type: str = "lxml",
         scraping_strategy: ContentScrapingStrategy = None,
         proxy_config: dict = None,
+        max_html_length: int = None,
+        incremental_threshold: int = None,
+        cleaned_html_sink: str = None,
+        markdown_sink: str = None,
         # SSL Parameters
         fetch_ssl_certificate: bool = False,
+        warc_path: str = None,
         # Caching Parameters
         cache_mode: CacheMode =None,
         session_id: str = None,
@@ -417,6 +469,12 @@ class CrawlerRunConfig:
         no_cache_read: bool = False,
         no_cache_write: bool = False,
         shared_data: dict = None,
+        cache_ttl: float = None,
+        cache_ttl_from_headers: bool = False,
+        reuse_unchanged_content: bool = False,
+        normalize_volatile_content: bool = False,
+        cache_versions: bool = False,
+        retry_failed: bool = False,
         # Page Navigation and Timing Parameters
         wait_until: str = "domcontentloaded",
         page_timeout: int = PAGE_TIMEOUT,
@@ -445,6 +503,7 @@ class CrawlerRunConfig:
         pdf: bool = False,
         image_description_min_word_threshold: int = IMAGE_DESCRIPTION_MIN_WORD_THRESHOLD,
         image_score_threshold: int = IMAGE_SCORE_THRESHOLD,
+        expand_image_srcset: bool = True,
         exclude_external_images: bool = False,
         # Link and Domain Handling Parameters
         exclude_social_media_domains: list = None,
@@ -480,9 +539,14 @@ class CrawlerRunConfig:
         self.parser_type = parser_type
         self.scraping_strategy = scraping_strategy or WebScrapingStrategy()
         self.proxy_config = proxy_config
+        self.max_html_length = max_html_length
+        self.incremental_threshold = incremental_threshold
+        self.cleaned_html_sink = cleaned_html_sink
+        self.markdown_sink = markdown_sink
 
         # SSL Parameters
         self.fetch_ssl_certificate = fetch_ssl_certificate
+        self.warc_path = warc_path
 
         # Caching Parameters
         self.cache_mode = cache_mode
@@ -492,6 +556,12 @@ class CrawlerRunConfig:
         self.no_cache_read = no_cache_read
         self.no_cache_write = no_cache_write
         self.shared_data = shared_data
+        self.cache_ttl = cache_ttl
+        self.cache_ttl_from_headers = cache_ttl_from_headers
+        self.reuse_unchanged_content = reuse_unchanged_content
+        self.normalize_volatile_content = normalize_volatile_content
+        self.cache_versions = cache_versions
+        self.retry_failed = retry_failed
 
         # Page Navigation and Timing Parameters
         self.wait_until = wait_until
@@ -523,6 +593,7 @@ class CrawlerRunConfig:
         self.pdf = pdf
         self.image_description_min_word_threshold = image_description_min_word_threshold
         self.image_score_threshold = image_score_threshold
+        self.expand_image_srcset = expand_image_srcset
         self.exclude_external_images = exclude_external_images
 
         # Link and Domain Handling Parameters
@@ -585,8 +656,13 @@ class CrawlerRunConfig:
             parser_type=kwargs.get("parser_type", "lxml"),
             scraping_strategy=kwargs.get("scraping_strategy"),
             proxy_config=kwargs.get("proxy_config"),
+            max_html_length=kwargs.get("max_html_length"),
+            incremental_threshold=kwargs.get("incremental_threshold"),
+            cleaned_html_sink=kwargs.get("cleaned_html_sink"),
+            markdown_sink=kwargs.get("markdown_sink"),
             # SSL Parameters
             fetch_ssl_certificate=kwargs.get("fetch_ssl_certificate", False),
+            warc_path=kwargs.get("warc_path"),
             # Caching Parameters
             cache_mode=kwargs.get("cache_mode"),
             session_id=kwargs.get("session_id"),
@@ -595,6 +671,12 @@ class CrawlerRunConfig:
             no_cache_read=kwargs.get("no_cache_read", False),
             no_cache_write=kwargs.get("no_cache_write", False),
             shared_data=kwargs.get("shared_data", None),
+            cache_ttl=kwargs.get("cache_ttl"),
+            cache_ttl_from_headers=kwargs.get("cache_ttl_from_headers", False),
+            reuse_unchanged_content=kwargs.get("reuse_unchanged_content", False),
+            normalize_volatile_content=kwargs.get("normalize_volatile_content", False),
+            cache_versions=kwargs.get("cache_versions", False),
+            retry_failed=kwargs.get("retry_failed", False),
             # Page Navigation and Timing Parameters
             wait_until=kwargs.get("wait_until", "domcontentloaded"),
             page_timeout=kwargs.get("page_timeout", 60000),
@@ -630,6 +712,7 @@ class CrawlerRunConfig:
             image_score_threshold=kwargs.get(
                 "image_score_threshold", IMAGE_SCORE_THRESHOLD
             ),
+            expand_image_srcset=kwargs.get("expand_image_srcset", True),
             exclude_external_images=kwargs.get("exclude_external_images", False),
             # Link and Domain Handling Parameters
             exclude_social_media_domains=kwargs.get(
@@ -650,6 +733,47 @@ class CrawlerRunConfig:
             user_agent_generator_config=kwargs.get("user_agent_generator_config", {}),
         )
 
+    # Parameters that change derived artifacts (cleaned html, markdown, extracted content)
+    PROCESSING_PARAMS = [
+        "word_count_threshold",
+        "extraction_strategy",
+        "chunking_strategy",
+        "markdown_generator",
+        "content_filter",
+        "only_text",
+        "css_selector",
+        "excluded_tags",
+        "excluded_selector",
+        "keep_data_attributes",
+        "remove_forms",
+        "prettiify",
+        "parser_type",
+        "scraping_strategy",
+        "max_html_length",
+        "incremental_threshold",
+        "cleaned_html_sink",
+        "markdown_sink",
+        "image_description_min_word_threshold",
+        "image_score_threshold",
+        "expand_image_srcset",
+        "exclude_external_images",
+        "exclude_social_media_domains",
+        "exclude_external_links",
+        "exclude_social_media_links",
+        "exclude_domains",
+    ]
+
+    def processing_hash(self) -> str:
+        """
+        Hash of the parameters that affect processing of fetched HTML.
+
+        Cached derived artifacts are keyed by this hash, so changing e.g. the
+        extraction strategy reuses the cached page and only reprocesses it.
+        """
+        return generate_config_fingerprint(
+            {name: getattr(self, name) for name in self.PROCESSING_PARAMS}
+        )
+
     # Create a funciton returns dict of the object
     def to_dict(self):
         return {
@@ -668,7 +792,12 @@ class CrawlerRunConfig:
             "parser_type": self.parser_type,
             "scraping_strategy": self.scraping_strategy,
             "proxy_config": self.proxy_config,
+            "max_html_length": self.max_html_length,
+            "incremental_threshold": self.incremental_threshold,
+            "cleaned_html_sink": self.cleaned_html_sink,
+            "markdown_sink": self.markdown_sink,
             "fetch_ssl_certificate": self.fetch_ssl_certificate,
+            "warc_path": self.warc_path,
             "cache_mode": self.cache_mode,
             "session_id": self.session_id,
             "bypass_cache": self.bypass_cache,
@@ -676,6 +805,12 @@ class CrawlerRunConfig:
             "no_cache_read": self.no_cache_read,
             "no_cache_write": self.no_cache_write,
             "shared_data": self.shared_data,
+            "cache_ttl": self.cache_ttl,
+            "cache_ttl_from_headers": self.cache_ttl_from_headers,
+            "reuse_unchanged_content": self.reuse_unchanged_content,
+            "normalize_volatile_content": self.normalize_volatile_content,
+            "cache_versions": self.cache_versions,
+            "retry_failed": self.retry_failed,
             "wait_until": self.wait_until,
             "page_timeout": self.page_timeout,
             "wait_for": self.wait_for,
@@ -701,6 +836,7 @@ class CrawlerRunConfig:
             "pdf": self.pdf,
             "image_description_min_word_threshold": self.image_description_min_word_threshold,
             "image_score_threshold": self.image_score_threshold,
+            "expand_image_srcset": self.expand_image_srcset,
             "exclude_external_images": self.exclude_external_images,
             "exclude_social_media_domains": self.exclude_social_media_domains,
             "exclude_external_links": self.exclude_external_links,
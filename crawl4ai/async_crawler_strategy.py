@@ -11,6 +11,7 @@ import subprocess
 from playwright.async_api import Page, Error, BrowserContext
 from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 from io import BytesIO
+from urllib.parse import urljoin
 from PIL import Image, ImageDraw, ImageFont
 import hashlib
 import uuid
@@ -23,6 +24,7 @@ from .async_logger import AsyncLogger
 from playwright_stealth import StealthConfig
 from .ssl_certificate import SSLCertificate
 from .utils import get_home_folder, get_chromium_path
+from .warc import WARCWriter, load_archive
 from .user_agent_generator import ValidUAGenerator, OnlineUAGenerator
 
 stealth_config = StealthConfig(
@@ -883,6 +885,9 @@ class AsyncPlaywrightCrawlerStrategy(AsyncCrawlerStrategy):
             browser_config=self.browser_config, logger=self.logger
         )
 
+        # Open WARC archives by path, see CrawlerRunConfig.warc_path
+        self._warc_writers: Dict[str, WARCWriter] = {}
+
     async def __aenter__(self):
         await self.start()
         return self
@@ -906,6 +911,40 @@ class AsyncPlaywrightCrawlerStrategy(AsyncCrawlerStrategy):
         Close the browser and clean up resources.
         """
         await self.browser_manager.close()
+        for writer in self._warc_writers.values():
+            writer.close()
+        self._warc_writers.clear()
+
+    def _get_warc_writer(self, path: str) -> WARCWriter:
+        writer = self._warc_writers.get(path)
+        if writer is None:
+            writer = self._warc_writers[path] = WARCWriter(path)
+        return writer
+
+    async def _archive_response(self, writer: WARCWriter, response) -> Optional[str]:
+        """Write a Playwright response and its request to a WARC archive"""
+        try:
+            try:
+                body = await response.body()
+            except Error:
+                # Redirects and aborted responses carry no body
+                body = b""
+            return writer.write_response(
+                url=response.url,
+                status_code=response.status,
+                reason=response.status_text,
+                headers=response.headers,
+                body=body,
+                method=response.request.method,
+                request_headers=response.request.headers,
+            )
+        except Exception as e:
+            self.logger.warning(
+                message="Failed to archive response {url}: {error}",
+                tag="WARC",
+                params={"url": response.url, "error": str(e)},
+            )
+            return None
 
     async def kill_session(self, session_id: str):
         """
@@ -1266,6 +1305,7 @@ class AsyncPlaywrightCrawlerStrategy(AsyncCrawlerStrategy):
         response_headers = {}
         status_code = None
         redirected_url = url 
+        redirect_chain = None
 
         # Reset downloaded files list for new crawl
         self._downloaded_files = []
@@ -1316,6 +1356,18 @@ class AsyncPlaywrightCrawlerStrategy(AsyncCrawlerStrategy):
             page.on("console", log_consol)
             page.on("pageerror", lambda e: log_consol(e, "error"))
 
+        # Archive every response of the page if requested
+        warc_writer = self._get_warc_writer(config.warc_path) if config.warc_path else None
+        archive_tasks = {}
+
+        def archive_response(response):
+            archive_tasks[response] = asyncio.create_task(
+                self._archive_response(warc_writer, response)
+            )
+
+        if warc_writer:
+            page.on("response", archive_response)
+
         try:
             # Get SSL certificate information if requested and URL is HTTPS
             ssl_cert = None
@@ -1363,6 +1415,7 @@ class AsyncPlaywrightCrawlerStrategy(AsyncCrawlerStrategy):
                 else:
                     status_code = response.status
                     response_headers = response.headers
+                    redirect_chain = self._redirect_chain(response)
 
             else:
                 status_code = 200
@@ -1617,6 +1670,15 @@ class AsyncPlaywrightCrawlerStrategy(AsyncCrawlerStrategy):
                 await asyncio.sleep(delay)
                 return await page.content()
 
+            if warc_writer:
+                await asyncio.gather(*archive_tasks.values())
+                main_record = (
+                    archive_tasks[response].result()
+                    if not config.js_only and response in archive_tasks
+                    else None
+                )
+                warc_writer.write_rendered(redirected_url, html, refers_to=main_record)
+
             # Return complete response
             return AsyncCrawlResponse(
                 html=html,
@@ -1630,12 +1692,15 @@ class AsyncPlaywrightCrawlerStrategy(AsyncCrawlerStrategy):
                     self._downloaded_files if self._downloaded_files else None
                 ),
                 redirected_url=redirected_url,
+                redirect_chain=redirect_chain,
             )
 
         except Exception as e:
             raise e
 
         finally:
+            if warc_writer:
+                page.remove_listener("response", archive_response)
             # If no session_id is given we should close the page
             if not config.session_id:
                 await page.close()
@@ -1698,6 +1763,16 @@ class AsyncPlaywrightCrawlerStrategy(AsyncCrawlerStrategy):
             # await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
             await self.safe_scroll(page, 0, total_height)
 
+    @staticmethod
+    def _redirect_chain(response) -> Optional[List[str]]:
+        """URLs requested from the navigation start to the response, None without redirects"""
+        chain = []
+        request = response.request
+        while request is not None:
+            chain.append(request.url)
+            request = request.redirected_from
+        return chain[::-1] if len(chain) > 1 else None
+
     async def _handle_download(self, download):
         """
         Handle file downloads.
@@ -2364,3 +2439,113 @@ class AsyncPlaywrightCrawlerStrategy(AsyncCrawlerStrategy):
                 params={"error": str(e)},
             )
             return True  # Default to scrolling if check fails
+
+
+class ReplayCrawlerStrategy(AsyncCrawlerStrategy):
+    """
+    Crawler strategy that serves pages from WARC or HAR archives, without network or browser.
+
+    Pages archived with CrawlerRunConfig.warc_path are served with the DOM the browser
+    rendered at capture time, so reprocessing them gives the same results as the original
+    crawl. Redirects recorded in the archive are followed.
+
+    Usage:
+        strategy = ReplayCrawlerStrategy("crawl.warc.gz")
+        async with AsyncWebCrawler(crawler_strategy=strategy) as crawler:
+            result = await crawler.arun("https://example.com")
+    """
+
+    MAX_REDIRECTS = 10
+
+    def __init__(
+        self,
+        archive_paths: Union[str, List[str]],
+        logger: AsyncLogger = None,
+        **kwargs,
+    ):
+        """
+        Initialize the replay strategy.
+
+        Args:
+            archive_paths: Path or list of paths of .warc, .warc.gz or .har files.
+                Later archives take precedence for URLs present in several.
+            logger: Logger instance for recording events and errors.
+        """
+        if isinstance(archive_paths, str):
+            archive_paths = [archive_paths]
+        self.archive_paths = list(archive_paths)
+        self.logger = logger
+        self._responses = None
+        self._load_lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    def update_user_agent(self, user_agent: str):
+        pass
+
+    def set_hook(self, hook_type: str, hook: Callable):
+        pass
+
+    async def _get_responses(self):
+        async with self._load_lock:
+            if self._responses is None:
+                self._responses = await asyncio.to_thread(
+                    load_archive, self.archive_paths
+                )
+        return self._responses
+
+    @staticmethod
+    def _candidates(url: str) -> List[str]:
+        url = url.split("#", 1)[0]
+        alternative = url[:-1] if url.endswith("/") else url + "/"
+        return [url, alternative]
+
+    async def crawl(
+        self, url: str, config: CrawlerRunConfig = None, **kwargs
+    ) -> AsyncCrawlResponse:
+        """
+        Serve a URL from the archives.
+
+        Args:
+            url (str): The URL to replay. raw: URLs are returned as-is.
+
+        Returns:
+            AsyncCrawlResponse: The archived response.
+
+        Raises:
+            ValueError: If the URL is not in the archives.
+        """
+        if url.startswith("raw:"):
+            html = url[7:] if url.startswith("raw://") else url[4:]
+            return AsyncCrawlResponse(html=html, response_headers={}, status_code=200)
+
+        responses = await self._get_responses()
+        current = url
+        chain = [url]
+        for _ in range(self.MAX_REDIRECTS + 1):
+            archived = next(
+                (responses[c] for c in self._candidates(current) if c in responses),
+                None,
+            )
+            if archived is None:
+                raise ValueError(f"URL not found in archive: {current}")
+            location = next(
+                (v for k, v in archived.headers.items() if k.lower() == "location"),
+                None,
+            )
+            if 300 <= archived.status_code < 400 and location:
+                current = urljoin(current, location)
+                chain.append(current)
+                continue
+            return AsyncCrawlResponse(
+                html=archived.html,
+                response_headers=archived.headers,
+                status_code=archived.status_code,
+                redirected_url=archived.url,
+                redirect_chain=chain if len(chain) > 1 else None,
+            )
+        raise ValueError(f"Too many redirects replaying {url}")
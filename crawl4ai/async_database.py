@@ -2,16 +2,42 @@ import os
 from pathlib import Path
 import aiosqlite
 import asyncio
-from typing import Optional, Dict
+import time
+from typing import Optional, Dict, List, Tuple, AsyncGenerator
 from contextlib import asynccontextmanager
 import logging
 import json  # Added for serialization/deserialization
-from .utils import ensure_content_dirs, generate_content_hash
+import zlib
+import fnmatch
+import difflib
+from .utils import (
+    ensure_content_dirs,
+    generate_content_hash,
+    estimate_change_rate,
+    compute_line_delta,
+    apply_line_delta,
+)
 from .models import CrawlResult, MarkdownGenerationResult
+from .cache_backend import CacheBackend, CacheEntry, entry_size
 import aiofiles
 from .version_manager import VersionManager
 from .async_logger import AsyncLogger
 from .utils import get_error_context, create_box_message
+from .config import (
+    CACHE_ACCESS_FLUSH_INTERVAL,
+    CACHE_ACCESS_FLUSH_SIZE,
+    CACHE_GC_BATCH_SIZE,
+    CACHE_GC_GRACE_PERIOD,
+    CACHE_PREFETCH_CHUNK_SIZE,
+    CHANGE_RATE_PRIOR,
+    CHANGE_RATE_PRIOR_WEIGHT,
+    CACHE_VERSION_KEYFRAME_INTERVAL,
+    CACHE_REPROCESS_BATCH_SIZE,
+    CACHE_EXPORT_CHUNK_SIZE,
+    NEGATIVE_CACHE_BASE_TTL,
+    NEGATIVE_CACHE_MAX_TTL,
+    REDIRECT_CACHE_TTL,
+)
 
 # Set up logging
 # logging.basicConfig(level=logging.INFO)
@@ -26,9 +52,71 @@ DB_PATH = os.path.join(base_directory, "crawl4ai.db")
 
 
 class AsyncDatabaseManager:
-    def __init__(self, pool_size: int = 10, max_retries: int = 3):
-        self.db_path = DB_PATH
-        self.content_paths = ensure_content_dirs(os.path.dirname(DB_PATH))
+    # (table, column, content_type) triples referencing files in the content store.
+    # Used by the garbage collector to mark live content hashes.
+    CONTENT_REFS = [
+        ("crawled_data", "html", "html"),
+        ("crawled_data", "cleaned_html", "cleaned"),
+        ("crawled_data", "markdown", "markdown"),
+        ("crawled_data", "extracted_content", "extracted"),
+        ("crawled_data", "screenshot", "screenshots"),
+        ("crawled_variants", "cleaned_html", "cleaned"),
+        ("crawled_variants", "markdown", "markdown"),
+        ("crawled_variants", "extracted_content", "extracted"),
+        ("page_versions", "html_keyframe", "html"),
+        ("page_versions", "markdown_keyframe", "markdown"),
+    ]
+
+    # Text fields kept in the version history of a page
+    VERSIONED_FIELDS = ["html", "markdown"]
+
+    # Fields derived from the raw HTML by the processing pipeline
+    DERIVED_FIELDS = [
+        "cleaned_html",
+        "markdown",
+        "extracted_content",
+        "media",
+        "links",
+        "metadata",
+    ]
+
+    # Columns of aiter_export_rows. Content columns are loaded from the content store
+    # (markdown and fit_markdown both from the markdown file), JSON columns stay JSON text.
+    EXPORT_SCALAR_COLUMNS = ["url", "success", "created_at", "last_accessed", "expires_at", "content_size"]
+    EXPORT_CONTENT_COLUMNS = {
+        "html": ("html", "html"),
+        "cleaned_html": ("cleaned_html", "cleaned"),
+        "markdown": ("markdown", "markdown"),
+        "fit_markdown": ("markdown", "markdown"),
+        "extracted_content": ("extracted_content", "extracted"),
+        "screenshot": ("screenshot", "screenshots"),
+    }
+    EXPORT_JSON_COLUMNS = ["media", "links", "metadata", "response_headers", "downloaded_files"]
+
+    def __init__(
+        self,
+        pool_size: int = 10,
+        max_retries: int = 3,
+        db_directory: Optional[str] = None,
+        max_cache_size: Optional[int] = None,
+        stale_retention: float = 0,
+        keyframe_interval: int = CACHE_VERSION_KEYFRAME_INTERVAL,
+        backend: Optional[CacheBackend] = None,
+    ):
+        self.db_path = (
+            os.path.join(db_directory, "crawl4ai.db") if db_directory else DB_PATH
+        )
+        self.content_paths = ensure_content_dirs(os.path.dirname(self.db_path))
+        self.max_cache_size = max_cache_size
+        self.stale_retention = stale_retention
+        self.keyframe_interval = max(1, keyframe_interval)
+        # Page store replacing crawled_data and crawled_variants, None for the built-in
+        # SQLite store. Change history, versions and job progress stay in SQLite.
+        self.backend = backend
+        self._maintenance_task: Optional[asyncio.Task] = None
+        # Access times of cache hits not written yet, see aflush_access_times
+        self._access_times: Dict[str, float] = {}
+        self._access_flushed_at = time.time()
         self.pool_size = pool_size
         self.max_retries = max_retries
         self.connection_pool: Dict[int, aiosqlite.Connection] = {}
@@ -53,8 +141,9 @@ class AsyncDatabaseManager:
             # Check if version update is needed
             needs_update = self.version_manager.needs_update()
 
-            # Always ensure base table exists
+            # Always ensure base table exists and has all current columns
             await self.ainit_db()
+            await self.update_db_schema()
 
             # Verify the table exists
             async with aiosqlite.connect(self.db_path, timeout=30.0) as db:
@@ -68,12 +157,11 @@ class AsyncDatabaseManager:
             # If version changed or fresh install, run updates
             if needs_update:
                 self.logger.info("New version detected, running updates", tag="INIT")
-                await self.update_db_schema()
                 from .migrations import (
                     run_migration,
                 )  # Import here to avoid circular imports
 
-                await run_migration()
+                await run_migration(self.db_path)
                 self.version_manager.update_version()  # Update stored version after successful migration
                 self.logger.success(
                     "Version update completed successfully", tag="COMPLETE"
@@ -97,11 +185,16 @@ class AsyncDatabaseManager:
 
     async def cleanup(self):
         """Cleanup connections when shutting down"""
+        await self.aflush_access_times()
         async with self.pool_lock:
             for conn in self.connection_pool.values():
                 await conn.close()
             self.connection_pool.clear()
 
+    def set_backend(self, backend: Optional[CacheBackend]):
+        """Switch the page store, None for the built-in SQLite store"""
+        self.backend = backend
+
     @asynccontextmanager
     async def get_connection(self):
         """Connection pool manager with enhanced error handling"""
@@ -157,6 +250,10 @@ class AsyncDatabaseManager:
                                 "screenshot",
                                 "response_headers",
                                 "downloaded_files",
+                                "created_at",
+                                "last_accessed",
+                                "expires_at",
+                                "content_size",
                             }
                             missing_columns = expected_columns - set(column_names)
                             if missing_columns:
@@ -240,7 +337,94 @@ class AsyncDatabaseManager:
                     metadata TEXT DEFAULT "{}",
                     screenshot TEXT DEFAULT "",
                     response_headers TEXT DEFAULT "{}",
-                    downloaded_files TEXT DEFAULT "{}"  -- New column added
+                    downloaded_files TEXT DEFAULT "{}",  -- New column added
+                    created_at REAL DEFAULT 0,
+                    last_accessed REAL DEFAULT 0,
+                    expires_at REAL DEFAULT NULL,
+                    content_size INTEGER DEFAULT 0
+                )
+            """
+            )
+            await db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS crawled_variants (
+                    url TEXT NOT NULL,
+                    config_hash TEXT NOT NULL,
+                    cleaned_html TEXT,
+                    markdown TEXT,
+                    extracted_content TEXT,
+                    media TEXT DEFAULT "{}",
+                    links TEXT DEFAULT "{}",
+                    metadata TEXT DEFAULT "{}",
+                    created_at REAL DEFAULT 0,
+                    content_size INTEGER DEFAULT 0,
+                    PRIMARY KEY (url, config_hash)
+                )
+            """
+            )
+            await db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS url_change_history (
+                    url TEXT PRIMARY KEY,
+                    content_hash TEXT,
+                    first_seen REAL,
+                    last_checked REAL,
+                    last_changed REAL,
+                    checks INTEGER DEFAULT 0,
+                    changes INTEGER DEFAULT 0,
+                    observed_time REAL DEFAULT 0
+                )
+            """
+            )
+            # Version history: keyframes reference full copies in the content store,
+            # other versions hold a compressed line delta against their predecessor
+            await db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS page_versions (
+                    url TEXT NOT NULL,
+                    version INTEGER NOT NULL,
+                    created_at REAL,
+                    html_hash TEXT,
+                    html_keyframe TEXT,
+                    markdown_keyframe TEXT,
+                    delta BLOB,
+                    delta_size INTEGER DEFAULT 0,
+                    PRIMARY KEY (url, version)
+                )
+            """
+            )
+            await db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS failed_urls (
+                    url TEXT PRIMARY KEY,
+                    error_class TEXT,
+                    error_message TEXT,
+                    status_code INTEGER,
+                    failures INTEGER DEFAULT 0,
+                    first_failed_at REAL,
+                    last_failed_at REAL,
+                    retry_at REAL
+                )
+            """
+            )
+            await db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS url_redirects (
+                    url TEXT PRIMARY KEY,
+                    final_url TEXT NOT NULL,
+                    chain TEXT DEFAULT "[]",
+                    created_at REAL,
+                    expires_at REAL
+                )
+            """
+            )
+            await db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS reprocess_progress (
+                    job_id TEXT PRIMARY KEY,
+                    last_url TEXT,
+                    processed INTEGER DEFAULT 0,
+                    updated_at REAL
                 )
             """
             )
@@ -261,11 +445,21 @@ class AsyncDatabaseManager:
                 "screenshot",
                 "response_headers",
                 "downloaded_files",
+                "created_at",
+                "last_accessed",
+                "expires_at",
+                "content_size",
             ]
 
             for column in new_columns:
                 if column not in column_names:
                     await self.aalter_db_add_column(column, db)
+            await db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_crawled_data_last_accessed ON crawled_data(last_accessed)"
+            )
+            await db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_crawled_data_expires_at ON crawled_data(expires_at)"
+            )
             await db.commit()
 
     async def aalter_db_add_column(self, new_column: str, db):
@@ -274,6 +468,18 @@ class AsyncDatabaseManager:
             await db.execute(
                 f'ALTER TABLE crawled_data ADD COLUMN {new_column} TEXT DEFAULT "{{}}"'
             )
+        elif new_column in ("created_at", "last_accessed"):
+            await db.execute(
+                f"ALTER TABLE crawled_data ADD COLUMN {new_column} REAL DEFAULT 0"
+            )
+        elif new_column == "expires_at":
+            await db.execute(
+                f"ALTER TABLE crawled_data ADD COLUMN {new_column} REAL DEFAULT NULL"
+            )
+        elif new_column == "content_size":
+            await db.execute(
+                f"ALTER TABLE crawled_data ADD COLUMN {new_column} INTEGER DEFAULT 0"
+            )
         else:
             await db.execute(
                 f'ALTER TABLE crawled_data ADD COLUMN {new_column} TEXT DEFAULT ""'
@@ -284,85 +490,62 @@ class AsyncDatabaseManager:
             params={"column": new_column},
         )
 
-    async def aget_cached_url(self, url: str) -> Optional[CrawlResult]:
-        """Retrieve cached URL data as CrawlResult"""
+    async def aget_cached_url(
+        self,
+        url: str,
+        include_expired: bool = False,
+        config_hash: Optional[str] = None,
+    ) -> Optional[CrawlResult]:
+        """
+        Retrieve cached URL data as CrawlResult.
+
+        Entries whose TTL has passed are treated as misses unless include_expired
+        is True. A hit refreshes the entry's last access time used for LRU eviction;
+        access times are buffered and written in batches, so reads stay read-only.
+
+        If config_hash is given, derived fields (cleaned_html, markdown,
+        extracted_content, media, links, metadata) come from the variant
+        processed with that configuration. When no such variant exists the raw
+        fetch is still returned, with cleaned_html set to None and the other
+        derived fields empty, so the caller can reprocess the cached html.
+        """
+        if self.backend is not None:
+            entry = await self.backend.get(url)
+            if not entry or (entry.is_expired() and not include_expired):
+                return None
+            return self._entry_to_result(entry, config_hash)
 
         async def _get(db):
-            async with db.execute(
-                "SELECT * FROM crawled_data WHERE url = ?", (url,)
-            ) as cursor:
+            now = time.time()
+            query = "SELECT * FROM crawled_data WHERE url = ?"
+            params = (url,)
+            if not include_expired:
+                query += " AND (expires_at IS NULL OR expires_at > ?)"
+                params = (url, now)
+            async with db.execute(query, params) as cursor:
                 row = await cursor.fetchone()
                 if not row:
                     return None
+                self._access_times[url] = now
 
                 # Get column names
                 columns = [description[0] for description in cursor.description]
                 # Create dict from row data
                 row_dict = dict(zip(columns, row))
 
-                # Load content from files using stored hashes
-                content_fields = {
-                    "html": row_dict["html"],
-                    "cleaned_html": row_dict["cleaned_html"],
-                    "markdown": row_dict["markdown"],
-                    "extracted_content": row_dict["extracted_content"],
-                    "screenshot": row_dict["screenshot"],
-                    "screenshots": row_dict["screenshot"],
-                }
-
-                for field, hash_value in content_fields.items():
-                    if hash_value:
-                        content = await self._load_content(
-                            hash_value,
-                            field.split("_")[0],  # Get content type from field name
-                        )
-                        row_dict[field] = content or ""
-                    else:
-                        row_dict[field] = ""
-
-                # Parse JSON fields
-                json_fields = [
-                    "media",
-                    "links",
-                    "metadata",
-                    "response_headers",
-                    "markdown",
-                ]
-                for field in json_fields:
-                    try:
-                        row_dict[field] = (
-                            json.loads(row_dict[field]) if row_dict[field] else {}
-                        )
-                    except json.JSONDecodeError:
-                        # Very UGLY, never mention it to me please
-                        if field == "markdown" and isinstance(row_dict[field], str):
-                            row_dict[field] = row_dict[field]
-                        else:
-                            row_dict[field] = {}
-
-                if isinstance(row_dict["markdown"], Dict):
-                    row_dict["markdown_v2"] = row_dict["markdown"]
-                    if row_dict["markdown"].get("raw_markdown"):
-                        row_dict["markdown"] = row_dict["markdown"]["raw_markdown"]
-
-                # Parse downloaded_files
-                try:
-                    row_dict["downloaded_files"] = (
-                        json.loads(row_dict["downloaded_files"])
-                        if row_dict["downloaded_files"]
-                        else []
-                    )
-                except json.JSONDecodeError:
-                    row_dict["downloaded_files"] = []
-
-                # Remove any fields not in CrawlResult model
-                valid_fields = CrawlResult.__annotations__.keys()
-                filtered_dict = {k: v for k, v in row_dict.items() if k in valid_fields}
+                variant = None
+                if config_hash is not None:
+                    async with db.execute(
+                        f"SELECT {', '.join(self.DERIVED_FIELDS)} FROM crawled_variants "
+                        "WHERE url = ? AND config_hash = ?",
+                        (url, config_hash),
+                    ) as variant_cursor:
+                        variant = await variant_cursor.fetchone()
 
-                return CrawlResult(**filtered_dict)
+                return await self._row_to_result(row_dict, config_hash, variant)
 
         try:
-            return await self.execute_with_retry(_get)
+            result = await self.execute_with_retry(_get)
         except Exception as e:
             self.logger.error(
                 message="Error retrieving cached URL: {error}",
@@ -371,9 +554,308 @@ class AsyncDatabaseManager:
                 params={"error": str(e)},
             )
             return None
+        await self._amaybe_flush_access_times()
+        return result
+
+    async def _row_to_result(
+        self, row_dict: dict, config_hash: Optional[str], variant: Optional[tuple]
+    ) -> CrawlResult:
+        """Build a CrawlResult from a crawled_data row and its optional variant row"""
+        variant_missing = config_hash is not None and not variant
+        if variant:
+            row_dict.update(zip(self.DERIVED_FIELDS, variant))
+        elif variant_missing:
+            row_dict.update(dict.fromkeys(self.DERIVED_FIELDS, ""))
+
+        # Load content from files using stored hashes
+        content_fields = {
+            "html": row_dict["html"],
+            "cleaned_html": row_dict["cleaned_html"],
+            "markdown": row_dict["markdown"],
+            "extracted_content": row_dict["extracted_content"],
+            "screenshot": row_dict["screenshot"],
+            "screenshots": row_dict["screenshot"],
+        }
+
+        for field, hash_value in content_fields.items():
+            if hash_value:
+                content = await self._load_content(
+                    hash_value,
+                    field.split("_")[0],  # Get content type from field name
+                )
+                row_dict[field] = content or ""
+            else:
+                row_dict[field] = ""
+
+        # Parse JSON fields
+        json_fields = [
+            "media",
+            "links",
+            "metadata",
+            "response_headers",
+            "markdown",
+        ]
+        for field in json_fields:
+            try:
+                row_dict[field] = (
+                    json.loads(row_dict[field]) if row_dict[field] else {}
+                )
+            except json.JSONDecodeError:
+                # Very UGLY, never mention it to me please
+                if field == "markdown" and isinstance(row_dict[field], str):
+                    row_dict[field] = row_dict[field]
+                else:
+                    row_dict[field] = {}
+
+        if isinstance(row_dict["markdown"], Dict):
+            row_dict["markdown_v2"] = row_dict["markdown"]
+            if row_dict["markdown"].get("raw_markdown"):
+                row_dict["markdown"] = row_dict["markdown"]["raw_markdown"]
+
+        # Parse downloaded_files
+        try:
+            row_dict["downloaded_files"] = (
+                json.loads(row_dict["downloaded_files"])
+                if row_dict["downloaded_files"]
+                else []
+            )
+        except json.JSONDecodeError:
+            row_dict["downloaded_files"] = []
+
+        if variant_missing:
+            row_dict["cleaned_html"] = None
+            row_dict["markdown"] = None
+            row_dict["markdown_v2"] = None
+            row_dict["extracted_content"] = None
+
+        # Remove any fields not in CrawlResult model
+        valid_fields = CrawlResult.__annotations__.keys()
+        filtered_dict = {k: v for k, v in row_dict.items() if k in valid_fields}
+
+        return CrawlResult(**filtered_dict)
+
+    def _entry_to_result(
+        self, entry: CacheEntry, config_hash: Optional[str]
+    ) -> CrawlResult:
+        """CrawlResult of a backend entry, following the variant rules of aget_cached_url"""
+        result = entry.result.model_copy()
+        if config_hash is not None and entry.config_hash != config_hash:
+            # A backend keeps the derived fields of the last processing configuration only
+            result.cleaned_html = None
+            result.markdown = None
+            result.markdown_v2 = None
+            result.extracted_content = None
+            result.media = {}
+            result.links = {}
+            result.metadata = {}
+        return result
+
+    async def aget_cached_urls(
+        self,
+        urls: List[str],
+        config_hash: Optional[str] = None,
+        include_expired: bool = False,
+    ) -> Dict[str, CrawlResult]:
+        """
+        Retrieve many cached URLs with one query per chunk of CACHE_PREFETCH_CHUNK_SIZE URLs.
+
+        Expired entries are skipped unless include_expired is True. Derived fields
+        follow the same rules as aget_cached_url for the given config_hash.
+
+        Returns:
+            Dict[str, CrawlResult]: Cached results keyed by URL; misses are absent.
+        """
+        unique_urls = list(dict.fromkeys(urls))
+        results: Dict[str, CrawlResult] = {}
+
+        if self.backend is not None:
+            now = time.time()
+            for i in range(0, len(unique_urls), CACHE_PREFETCH_CHUNK_SIZE):
+                entries = await self.backend.bulk_get(
+                    unique_urls[i : i + CACHE_PREFETCH_CHUNK_SIZE]
+                )
+                results.update(
+                    (url, self._entry_to_result(entry, config_hash))
+                    for url, entry in entries.items()
+                    if include_expired or not entry.is_expired(now)
+                )
+            return results
+
+        async def _get_chunk(db, chunk):
+            now = time.time()
+            placeholders = ", ".join("?" * len(chunk))
+            query = f"SELECT * FROM crawled_data WHERE url IN ({placeholders})"
+            params = chunk
+            if not include_expired:
+                query += " AND (expires_at IS NULL OR expires_at > ?)"
+                params = (*chunk, now)
+            async with db.execute(query, params) as cursor:
+                columns = [description[0] for description in cursor.description]
+                rows = [dict(zip(columns, row)) for row in await cursor.fetchall()]
+            if not rows:
+                return {}
+
+            variants = {}
+            if config_hash is not None:
+                async with db.execute(
+                    f"SELECT url, {', '.join(self.DERIVED_FIELDS)} FROM crawled_variants "
+                    f"WHERE config_hash = ? AND url IN ({placeholders})",
+                    (config_hash, *chunk),
+                ) as cursor:
+                    async for row in cursor:
+                        variants[row[0]] = row[1:]
+
+            self._access_times.update((row["url"], now) for row in rows)
+            return {
+                row["url"]: await self._row_to_result(
+                    row, config_hash, variants.get(row["url"])
+                )
+                for row in rows
+            }
+
+        for i in range(0, len(unique_urls), CACHE_PREFETCH_CHUNK_SIZE):
+            chunk = unique_urls[i : i + CACHE_PREFETCH_CHUNK_SIZE]
+            try:
+                results.update(await self.execute_with_retry(_get_chunk, chunk))
+            except Exception as e:
+                self.logger.error(
+                    message="Error retrieving cached URLs: {error}",
+                    tag="ERROR",
+                    force_verbose=True,
+                    params={"error": str(e)},
+                )
+        await self._amaybe_flush_access_times()
+        return results
+
+    async def _amaybe_flush_access_times(self):
+        """Write the buffered access times once enough of them or enough time accumulated"""
+        if (
+            len(self._access_times) >= CACHE_ACCESS_FLUSH_SIZE
+            or time.time() - self._access_flushed_at >= CACHE_ACCESS_FLUSH_INTERVAL
+        ):
+            await self.aflush_access_times()
+
+    async def aflush_access_times(self):
+        """
+        Write the buffered access times of cache hits in one transaction.
+
+        Hits only record their access time in memory, so concurrent readers do not
+        queue on SQLite's single writer. Buffered times are written every
+        CACHE_ACCESS_FLUSH_INTERVAL seconds or CACHE_ACCESS_FLUSH_SIZE hits, and
+        before entries are evicted or exported.
+        """
+        self._access_flushed_at = time.time()
+        if not self._access_times:
+            return
+        access_times, self._access_times = self._access_times, {}
+
+        async def _flush(db):
+            # A newer write of the entry already set a later access time
+            await db.executemany(
+                "UPDATE crawled_data SET last_accessed = MAX(last_accessed, ?) WHERE url = ?",
+                [(accessed, url) for url, accessed in access_times.items()],
+            )
+
+        try:
+            await self.execute_with_retry(_flush)
+        except Exception as e:
+            self.logger.error(
+                message="Error writing cache access times: {error}",
+                tag="ERROR",
+                force_verbose=True,
+                params={"error": str(e)},
+            )
+
+    async def aget_entry_times(self, urls: List[str]) -> Dict[str, Tuple[float, Optional[float]]]:
+        """Get (created_at, expires_at) of cached URLs in the built-in SQLite store"""
+
+        async def _get(db):
+            placeholders = ", ".join("?" * len(urls))
+            async with db.execute(
+                f"SELECT url, created_at, expires_at FROM crawled_data WHERE url IN ({placeholders})",
+                urls,
+            ) as cursor:
+                return {row[0]: (row[1], row[2]) for row in await cursor.fetchall()}
+
+        if not urls:
+            return {}
+        return await self.execute_with_retry(_get)
+
+    async def aget_urls_after(self, after_url: str, limit: int) -> List[str]:
+        """Get up to limit cached URLs sorting after after_url in the built-in SQLite store"""
+
+        async def _get(db):
+            async with db.execute(
+                "SELECT url FROM crawled_data WHERE url > ? ORDER BY url LIMIT ?",
+                (after_url, limit),
+            ) as cursor:
+                return [row[0] for row in await cursor.fetchall()]
+
+        return await self.execute_with_retry(_get)
+
+    async def adelete_url(self, url: str) -> bool:
+        """Delete a cached URL and its processing variants, returning whether it was cached"""
+        if self.backend is not None:
+            return await self.backend.delete(url)
+
+        async def _delete(db):
+            cursor = await db.execute("DELETE FROM crawled_data WHERE url = ?", (url,))
+            await db.execute("DELETE FROM crawled_variants WHERE url = ?", (url,))
+            return cursor.rowcount > 0
+
+        try:
+            return await self.execute_with_retry(_delete)
+        except Exception as e:
+            self.logger.error(
+                message="Error deleting cached URL: {error}",
+                tag="ERROR",
+                force_verbose=True,
+                params={"error": str(e)},
+            )
+            return False
+
+    async def acache_url(
+        self,
+        result: CrawlResult,
+        ttl: Optional[float] = None,
+        config_hash: Optional[str] = None,
+        keep_version: bool = False,
+    ):
+        """
+        Cache CrawlResult data.
+
+        Args:
+            result: The crawl result to store.
+            ttl: Seconds until the entry expires. None keeps it until evicted.
+            config_hash: Processing configuration hash. If given, the derived
+                fields are also stored as the variant for this configuration.
+                Variants for other configurations are dropped when the html changed.
+            keep_version: Also add the page to its version history if its html changed.
+        """
+        if self.backend is not None:
+            now = time.time()
+            entry = CacheEntry(
+                result=result,
+                created_at=now,
+                expires_at=now + ttl if ttl is not None else None,
+                config_hash=config_hash,
+            )
+            try:
+                await self.backend.put(entry)
+            except Exception as e:
+                self.logger.error(
+                    message="Error caching URL: {error}",
+                    tag="ERROR",
+                    force_verbose=True,
+                    params={"error": str(e)},
+                )
+                return
+            if result.success:
+                await self._arecord_backend_check(result.url, result.html, now)
+            if keep_version and result.success:
+                await self.aadd_version(result)
+            return
 
-    async def acache_url(self, result: CrawlResult):
-        """Cache CrawlResult data"""
         # Store content files and get hashes
         content_map = {
             "html": (result.html, "html"),
@@ -416,18 +898,34 @@ class AsyncDatabaseManager:
             )
 
         content_hashes = {}
+        content_size = 0
         for field, (content, content_type) in content_map.items():
             content_hashes[field] = await self._store_content(content, content_type)
+            content_size += len(content.encode("utf-8")) if content else 0
+
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
 
         async def _cache(db):
+            async with db.execute(
+                "SELECT html FROM crawled_data WHERE url = ?", (result.url,)
+            ) as cursor:
+                previous = await cursor.fetchone()
+            if previous and previous[0] != content_hashes["html"]:
+                # The page changed, derived artifacts of other configurations are stale
+                await db.execute(
+                    "DELETE FROM crawled_variants WHERE url = ?", (result.url,)
+                )
+
             await db.execute(
                 """
                 INSERT INTO crawled_data (
                     url, html, cleaned_html, markdown,
                     extracted_content, success, media, links, metadata,
-                    screenshot, response_headers, downloaded_files
+                    screenshot, response_headers, downloaded_files,
+                    created_at, last_accessed, expires_at, content_size
                 )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 ON CONFLICT(url) DO UPDATE SET
                     html = excluded.html,
                     cleaned_html = excluded.cleaned_html,
@@ -439,7 +937,11 @@ class AsyncDatabaseManager:
                     metadata = excluded.metadata,
                     screenshot = excluded.screenshot,
                     response_headers = excluded.response_headers,
-                    downloaded_files = excluded.downloaded_files
+                    downloaded_files = excluded.downloaded_files,
+                    created_at = excluded.created_at,
+                    last_accessed = excluded.last_accessed,
+                    expires_at = excluded.expires_at,
+                    content_size = excluded.content_size
             """,
                 (
                     result.url,
@@ -454,8 +956,20 @@ class AsyncDatabaseManager:
                     content_hashes["screenshot"],
                     json.dumps(result.response_headers or {}),
                     json.dumps(result.downloaded_files or []),
+                    now,
+                    now,
+                    expires_at,
+                    content_size,
                 ),
             )
+            if config_hash is not None:
+                await self._upsert_variant(
+                    db, result, config_hash, content_hashes, content_size
+                )
+            if result.success and content_hashes["html"]:
+                await self._record_check(db, result.url, content_hashes["html"], now)
+            if result.success:
+                await db.execute("DELETE FROM failed_urls WHERE url = ?", (result.url,))
 
         try:
             await self.execute_with_retry(_cache)
@@ -466,70 +980,1524 @@ class AsyncDatabaseManager:
                 force_verbose=True,
                 params={"error": str(e)},
             )
+            return
 
-    async def aget_total_count(self) -> int:
-        """Get total number of cached URLs"""
+        if keep_version and result.success:
+            await self.aadd_version(result)
 
-        async def _count(db):
-            async with db.execute("SELECT COUNT(*) FROM crawled_data") as cursor:
-                result = await cursor.fetchone()
-                return result[0] if result else 0
+    async def ais_fresh(self, url: str) -> bool:
+        """Check whether url is cached and its TTL has not passed; entries without a TTL never expire"""
+        if self.backend is not None:
+            entry = await self.backend.get(url)
+            return bool(entry and not entry.is_expired())
+
+        async def _fresh(db):
+            async with db.execute(
+                "SELECT 1 FROM crawled_data WHERE url = ? "
+                "AND (expires_at IS NULL OR expires_at > ?)",
+                (url, time.time()),
+            ) as cursor:
+                return await cursor.fetchone() is not None
 
         try:
-            return await self.execute_with_retry(_count)
+            return await self.execute_with_retry(_fresh)
         except Exception as e:
             self.logger.error(
-                message="Error getting total count: {error}",
+                message="Error checking cache freshness: {error}",
                 tag="ERROR",
                 force_verbose=True,
                 params={"error": str(e)},
             )
-            return 0
+            return False
 
-    async def aclear_db(self):
-        """Clear all data from the database"""
+    async def aget_html_hash(self, url: str) -> Optional[str]:
+        """Return the content hash of the cached html for url, including expired entries"""
+        if self.backend is not None:
+            entry = await self.backend.get(url)
+            return generate_content_hash(entry.result.html) if entry and entry.result.html else None
 
-        async def _clear(db):
-            await db.execute("DELETE FROM crawled_data")
+        async def _get(db):
+            async with db.execute(
+                "SELECT html FROM crawled_data WHERE url = ?", (url,)
+            ) as cursor:
+                row = await cursor.fetchone()
+                return row[0] if row and row[0] else None
 
         try:
-            await self.execute_with_retry(_clear)
+            return await self.execute_with_retry(_get)
         except Exception as e:
             self.logger.error(
-                message="Error clearing database: {error}",
+                message="Error retrieving cached html hash: {error}",
                 tag="ERROR",
                 force_verbose=True,
                 params={"error": str(e)},
             )
+            return None
 
-    async def aflush_db(self):
-        """Drop the entire table"""
+    async def arefresh_url(
+        self,
+        url: str,
+        ttl: Optional[float] = None,
+        response_headers: Optional[dict] = None,
+    ):
+        """
+        Mark a cached entry as fresh again without touching its content.
 
-        async def _flush(db):
-            await db.execute("DROP TABLE IF EXISTS crawled_data")
+        Used after a successful revalidation (HTTP 304).
+
+        Args:
+            url: The cached URL.
+            ttl: New TTL in seconds. None keeps the entry until evicted.
+            response_headers: Headers to store, e.g. merged with new validators.
+        """
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+
+        if self.backend is not None:
+            entry = await self.backend.get(url)
+            if entry:
+                entry.expires_at = expires_at
+                if response_headers is not None:
+                    entry.result.response_headers = response_headers
+                await self.backend.put(entry)
+                await self._arecord_backend_check(
+                    url, entry.result.html, now, clear_failure=False
+                )
+            return
+
+        async def _refresh(db):
+            # A confirmed unchanged page is a check without a change
+            async with db.execute(
+                "SELECT html FROM crawled_data WHERE url = ?", (url,)
+            ) as cursor:
+                row = await cursor.fetchone()
+            if row and row[0]:
+                await self._record_check(db, url, row[0], now)
+            if response_headers is None:
+                await db.execute(
+                    "UPDATE crawled_data SET expires_at = ?, last_accessed = ? WHERE url = ?",
+                    (expires_at, now, url),
+                )
+            else:
+                await db.execute(
+                    "UPDATE crawled_data SET expires_at = ?, last_accessed = ?, "
+                    "response_headers = ? WHERE url = ?",
+                    (expires_at, now, json.dumps(response_headers), url),
+                )
 
         try:
-            await self.execute_with_retry(_flush)
+            await self.execute_with_retry(_refresh)
         except Exception as e:
             self.logger.error(
-                message="Error flushing database: {error}",
+                message="Error refreshing cached URL: {error}",
                 tag="ERROR",
                 force_verbose=True,
                 params={"error": str(e)},
             )
 
-    async def _store_content(self, content: str, content_type: str) -> str:
-        """Store content in filesystem and return hash"""
-        if not content:
-            return ""
+    async def _arecord_backend_check(
+        self, url: str, html: str, checked_at: float, clear_failure: bool = True
+    ):
+        """
+        Bookkeeping of a page stored in the backend, which stays in SQLite: its change
+        history, and its negative cache record, deleted only if there is one.
+        """
 
-        content_hash = generate_content_hash(content)
-        file_path = os.path.join(self.content_paths[content_type], content_hash)
+        async def _record(db):
+            if html:
+                await self._record_check(db, url, generate_content_hash(html), checked_at)
+            if clear_failure:
+                async with db.execute(
+                    "SELECT 1 FROM failed_urls WHERE url = ?", (url,)
+                ) as cursor:
+                    failed = await cursor.fetchone() is not None
+                if failed:
+                    await db.execute("DELETE FROM failed_urls WHERE url = ?", (url,))
 
-        # Only write if file doesn't exist
-        if not os.path.exists(file_path):
-            async with aiofiles.open(file_path, "w", encoding="utf-8") as f:
-                await f.write(content)
+        try:
+            await self.execute_with_retry(_record)
+        except Exception as e:
+            self.logger.error(
+                message="Error recording cache check: {error}",
+                tag="ERROR",
+                force_verbose=True,
+                params={"error": str(e)},
+            )
+
+    async def _record_check(
+        self, db, url: str, content_hash: str, checked_at: float
+    ) -> bool:
+        """Update the change history of url with an observed content hash. Returns True if it changed."""
+        async with db.execute(
+            "SELECT content_hash, last_checked FROM url_change_history WHERE url = ?",
+            (url,),
+        ) as cursor:
+            row = await cursor.fetchone()
+
+        if row is None:
+            await db.execute(
+                """
+                INSERT INTO url_change_history (
+                    url, content_hash, first_seen, last_checked, last_changed,
+                    checks, changes, observed_time
+                )
+                VALUES (?, ?, ?, ?, ?, 0, 0, 0)
+            """,
+                (url, content_hash, checked_at, checked_at, checked_at),
+            )
+            return False
+
+        previous_hash, last_checked = row
+        changed = previous_hash != content_hash
+        await db.execute(
+            """
+            UPDATE url_change_history SET
+                content_hash = ?,
+                last_checked = ?,
+                last_changed = CASE WHEN ? THEN ? ELSE last_changed END,
+                checks = checks + 1,
+                changes = changes + ?,
+                observed_time = observed_time + ?
+            WHERE url = ?
+        """,
+            (
+                content_hash,
+                checked_at,
+                changed,
+                checked_at,
+                int(changed),
+                max(0.0, checked_at - (last_checked or checked_at)),
+                url,
+            ),
+        )
+        return changed
+
+    async def arecord_check(
+        self, url: str, content_hash: str, checked_at: Optional[float] = None
+    ) -> bool:
+        """
+        Record an observation of url in its change history.
+
+        Cached crawls are recorded automatically; use this for checks that bypass the cache.
+
+        Args:
+            url: The checked URL.
+            content_hash: Hash of the observed html, see generate_content_hash.
+            checked_at: Time of the check, defaults to now.
+
+        Returns:
+            bool: True if the content changed since the previous check.
+        """
+        checked_at = time.time() if checked_at is None else checked_at
+
+        async def _record(db):
+            return await self._record_check(db, url, content_hash, checked_at)
+
+        try:
+            return await self.execute_with_retry(_record)
+        except Exception as e:
+            self.logger.error(
+                message="Error recording change check: {error}",
+                tag="ERROR",
+                force_verbose=True,
+                params={"error": str(e)},
+            )
+            return False
+
+    async def arecord_failure(
+        self,
+        url: str,
+        error_class: str,
+        error_message: str = "",
+        status_code: Optional[int] = None,
+        retry_after: Optional[float] = None,
+    ) -> float:
+        """
+        Record a failed crawl in the negative cache.
+
+        The URL is skipped until its retry time, which is NEGATIVE_CACHE_BASE_TTL after
+        the first failure and doubles with every consecutive failure up to
+        NEGATIVE_CACHE_MAX_TTL. A successful crawl of the URL clears the record.
+
+        Args:
+            url: The URL that failed.
+            error_class: Kind of failure, see utils.classify_crawl_error.
+            error_message: Error of the last failure.
+            status_code: HTTP status of the last failure, if any.
+            retry_after: Minimum delay in seconds requested by the server (Retry-After).
+
+        Returns:
+            float: Time after which the URL is crawled again.
+        """
+        now = time.time()
+
+        async def _record(db):
+            async with db.execute(
+                "SELECT failures, first_failed_at FROM failed_urls WHERE url = ?",
+                (url,),
+            ) as cursor:
+                row = await cursor.fetchone()
+            failures = (row[0] if row else 0) + 1
+            delay = NEGATIVE_CACHE_BASE_TTL * 2 ** min(failures - 1, 32)
+            delay = min(max(delay, retry_after or 0), NEGATIVE_CACHE_MAX_TTL)
+            await db.execute(
+                """
+                INSERT OR REPLACE INTO failed_urls (
+                    url, error_class, error_message, status_code, failures,
+                    first_failed_at, last_failed_at, retry_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+                (
+                    url,
+                    error_class,
+                    (error_message or "")[:1000],
+                    status_code,
+                    failures,
+                    row[1] if row else now,
+                    now,
+                    now + delay,
+                ),
+            )
+            return now + delay
+
+        try:
+            return await self.execute_with_retry(_record)
+        except Exception as e:
+            self.logger.error(
+                message="Error recording failed URL: {error}",
+                tag="ERROR",
+                force_verbose=True,
+                params={"error": str(e)},
+            )
+            return now
+
+    async def aget_failures(self, urls: List[str]) -> Dict[str, dict]:
+        """
+        Get the negative cache records of URLs that must not be retried yet.
+
+        Returns:
+            Dict[str, dict]: Records with error_class, error_message, status_code,
+            failures, first_failed_at, last_failed_at and retry_at, keyed by URL.
+        """
+        fields = [
+            "error_class",
+            "error_message",
+            "status_code",
+            "failures",
+            "first_failed_at",
+            "last_failed_at",
+            "retry_at",
+        ]
+        unique_urls = list(dict.fromkeys(urls))
+        failures: Dict[str, dict] = {}
+
+        async def _get_chunk(db, chunk):
+            placeholders = ", ".join("?" * len(chunk))
+            async with db.execute(
+                f"SELECT url, {', '.join(fields)} FROM failed_urls "
+                f"WHERE url IN ({placeholders}) AND retry_at > ?",
+                (*chunk, time.time()),
+            ) as cursor:
+                return {row[0]: dict(zip(fields, row[1:])) for row in await cursor.fetchall()}
+
+        for i in range(0, len(unique_urls), CACHE_PREFETCH_CHUNK_SIZE):
+            chunk = unique_urls[i : i + CACHE_PREFETCH_CHUNK_SIZE]
+            try:
+                failures.update(await self.execute_with_retry(_get_chunk, chunk))
+            except Exception as e:
+                self.logger.error(
+                    message="Error retrieving failed URLs: {error}",
+                    tag="ERROR",
+                    force_verbose=True,
+                    params={"error": str(e)},
+                )
+        return failures
+
+    async def aget_failure(self, url: str) -> Optional[dict]:
+        """Get the negative cache record of url if it must not be retried yet, see aget_failures"""
+        return (await self.aget_failures([url])).get(url)
+
+    async def aclear_failures(self, urls: Optional[List[str]] = None):
+        """Forget recorded failures of the given URLs, or of all URLs"""
+
+        async def _clear(db):
+            if urls is None:
+                await db.execute("DELETE FROM failed_urls")
+            else:
+                await db.executemany(
+                    "DELETE FROM failed_urls WHERE url = ?", [(url,) for url in urls]
+                )
+
+        await self.execute_with_retry(_clear)
+
+    async def arecord_redirect(
+        self,
+        url: str,
+        final_url: str,
+        chain: Optional[List[str]] = None,
+        ttl: Optional[float] = REDIRECT_CACHE_TTL,
+    ):
+        """
+        Record that url redirects to final_url.
+
+        Every hop of the chain is mapped to final_url as well, so later crawls of
+        any of them navigate straight to the final URL and share its cache entry.
+
+        Args:
+            url: The requested URL.
+            final_url: The URL the redirects ended at.
+            chain: URLs visited from url to final_url, both included.
+            ttl: Seconds the redirect is followed without requesting url. None never expires.
+        """
+        chain = chain or [url, final_url]
+        sources = [hop for hop in dict.fromkeys([url, *chain]) if hop != final_url]
+        if not sources:
+            return
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+
+        async def _record(db):
+            await db.executemany(
+                """
+                INSERT OR REPLACE INTO url_redirects (
+                    url, final_url, chain, created_at, expires_at
+                ) VALUES (?, ?, ?, ?, ?)
+            """,
+                [
+                    (source, final_url, json.dumps(chain), now, expires_at)
+                    for source in sources
+                ],
+            )
+
+        try:
+            await self.execute_with_retry(_record)
+        except Exception as e:
+            self.logger.error(
+                message="Error recording redirect: {error}",
+                tag="ERROR",
+                force_verbose=True,
+                params={"error": str(e)},
+            )
+
+    async def aget_redirects(self, urls: List[str]) -> Dict[str, str]:
+        """
+        Resolve URLs through the unexpired recorded redirects.
+
+        Returns:
+            Dict[str, str]: Final URL keyed by source URL, for URLs known to redirect.
+        """
+        unique_urls = list(dict.fromkeys(urls))
+        redirects: Dict[str, str] = {}
+
+        async def _get_chunk(db, chunk):
+            placeholders = ", ".join("?" * len(chunk))
+            async with db.execute(
+                f"SELECT url, final_url FROM url_redirects WHERE url IN ({placeholders}) "
+                "AND (expires_at IS NULL OR expires_at > ?)",
+                (*chunk, time.time()),
+            ) as cursor:
+                return dict(await cursor.fetchall())
+
+        for i in range(0, len(unique_urls), CACHE_PREFETCH_CHUNK_SIZE):
+            chunk = unique_urls[i : i + CACHE_PREFETCH_CHUNK_SIZE]
+            try:
+                redirects.update(await self.execute_with_retry(_get_chunk, chunk))
+            except Exception as e:
+                self.logger.error(
+                    message="Error retrieving redirects: {error}",
+                    tag="ERROR",
+                    force_verbose=True,
+                    params={"error": str(e)},
+                )
+        return redirects
+
+    async def aget_redirect(self, url: str) -> Optional[str]:
+        """Get the final URL url is known to redirect to, see aget_redirects"""
+        return (await self.aget_redirects([url])).get(url)
+
+    async def aget_redirect_chain(self, url: str) -> Optional[List[str]]:
+        """Get the recorded redirect chain of url, expired or not"""
+
+        async def _get(db):
+            async with db.execute(
+                "SELECT chain FROM url_redirects WHERE url = ?", (url,)
+            ) as cursor:
+                row = await cursor.fetchone()
+                return json.loads(row[0]) if row else None
+
+        try:
+            return await self.execute_with_retry(_get)
+        except Exception as e:
+            self.logger.error(
+                message="Error retrieving redirect chain: {error}",
+                tag="ERROR",
+                force_verbose=True,
+                params={"error": str(e)},
+            )
+            return None
+
+    async def aclear_redirects(self, urls: Optional[List[str]] = None):
+        """Forget the recorded redirects of the given source URLs, or of all URLs"""
+
+        async def _clear(db):
+            if urls is None:
+                await db.execute("DELETE FROM url_redirects")
+            else:
+                await db.executemany(
+                    "DELETE FROM url_redirects WHERE url = ?", [(url,) for url in urls]
+                )
+
+        await self.execute_with_retry(_clear)
+
+    async def aget_change_history(
+        self,
+        urls: Optional[List[str]] = None,
+        prior_rate: float = CHANGE_RATE_PRIOR,
+        prior_weight: float = CHANGE_RATE_PRIOR_WEIGHT,
+    ) -> Dict[str, dict]:
+        """
+        Get the change history of URLs, including their estimated change rate.
+
+        Args:
+            urls: URLs to look up. None returns the history of every known URL.
+            prior_rate: Change rate per second assumed for URLs with little history.
+            prior_weight: Seconds of observation the prior is worth.
+
+        Returns:
+            Dict[str, dict]: Per URL the last_checked and last_changed times, the number
+            of checks and changes, and change_rate in changes per second. URLs without
+            history are omitted.
+        """
+        columns = [
+            "url",
+            "last_checked",
+            "last_changed",
+            "checks",
+            "changes",
+            "observed_time",
+        ]
+        query = f"SELECT {', '.join(columns)} FROM url_change_history"
+
+        async def _get(db):
+            rows = []
+            if urls is None:
+                async with db.execute(query) as cursor:
+                    rows.extend(await cursor.fetchall())
+                return rows
+            unique_urls = list(dict.fromkeys(urls))
+            for start in range(0, len(unique_urls), CACHE_PREFETCH_CHUNK_SIZE):
+                chunk = unique_urls[start : start + CACHE_PREFETCH_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                async with db.execute(
+                    f"{query} WHERE url IN ({placeholders})", chunk
+                ) as cursor:
+                    rows.extend(await cursor.fetchall())
+            return rows
+
+        try:
+            rows = await self.execute_with_retry(_get)
+        except Exception as e:
+            self.logger.error(
+                message="Error retrieving change history: {error}",
+                tag="ERROR",
+                force_verbose=True,
+                params={"error": str(e)},
+            )
+            return {}
+
+        history = {}
+        for row in rows:
+            entry = dict(zip(columns, row))
+            entry["change_rate"] = estimate_change_rate(
+                entry["checks"],
+                entry["changes"],
+                entry["observed_time"],
+                prior_rate=prior_rate,
+                prior_weight=prior_weight,
+            )
+            history[entry.pop("url")] = entry
+        return history
+
+    @staticmethod
+    def _versioned_texts(result: CrawlResult) -> Dict[str, str]:
+        """Extract the versioned text fields of a crawl result"""
+        markdown = result.markdown_v2 or result.markdown
+        if isinstance(markdown, MarkdownGenerationResult):
+            markdown = markdown.raw_markdown
+        return {"html": result.html or "", "markdown": markdown or ""}
+
+    async def aadd_version(self, result: CrawlResult) -> Optional[int]:
+        """
+        Append a page to its version history unless its html equals the latest version.
+
+        Every keyframe_interval-th version is stored as a full copy in the content store,
+        the others as zlib compressed line deltas against their predecessor. Rebuilding
+        any version therefore applies at most keyframe_interval - 1 deltas.
+
+        Returns:
+            Optional[int]: The new version number, or None if nothing was added.
+        """
+        texts = self._versioned_texts(result)
+        html_hash = generate_content_hash(texts["html"])
+
+        async def _latest(db):
+            async with db.execute(
+                "SELECT version, html_hash FROM page_versions WHERE url = ? "
+                "ORDER BY version DESC LIMIT 1",
+                (result.url,),
+            ) as cursor:
+                return await cursor.fetchone()
+
+        async def _insert(db, latest, version, delta):
+            # Checked and inserted under the write lock: a writer that raced us since
+            # latest was read makes this attempt start over instead of being dropped
+            await db.execute("BEGIN IMMEDIATE")
+            if await _latest(db) != latest:
+                await db.rollback()
+                return False
+            keyframes = dict.fromkeys(self.VERSIONED_FIELDS)
+            if delta is None:
+                # Only the writer whose row is inserted stores keyframes, none are orphaned
+                for field in self.VERSIONED_FIELDS:
+                    keyframes[field] = await self._store_content(texts[field], field)
+            await db.execute(
+                """
+                INSERT INTO page_versions (
+                    url, version, created_at, html_hash,
+                    html_keyframe, markdown_keyframe, delta, delta_size
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+                (
+                    result.url,
+                    version,
+                    time.time(),
+                    html_hash,
+                    keyframes["html"],
+                    keyframes["markdown"],
+                    delta,
+                    len(delta) if delta else 0,
+                ),
+            )
+            return True
+
+        try:
+            # Every lost attempt means another writer added a version, so this ends
+            while True:
+                latest = await self.execute_with_retry(_latest)
+                if latest and latest[1] == html_hash:
+                    return None
+
+                version = latest[0] + 1 if latest else 1
+                delta = None
+                if (version - 1) % self.keyframe_interval:
+                    # Computed outside the transaction, it is only valid if latest still is
+                    previous = await self._aload_version(result.url, latest[0])
+                    if previous is not None:
+                        delta = zlib.compress(
+                            json.dumps(
+                                {
+                                    field: compute_line_delta(previous[field], texts[field])
+                                    for field in self.VERSIONED_FIELDS
+                                }
+                            ).encode("utf-8")
+                        )
+
+                if await self.execute_with_retry(_insert, latest, version, delta):
+                    return version
+        except Exception as e:
+            self.logger.error(
+                message="Error storing page version: {error}",
+                tag="ERROR",
+                force_verbose=True,
+                params={"error": str(e)},
+            )
+            return None
+
+    async def _aload_version(self, url: str, version: int) -> Optional[dict]:
+        """Rebuild a version from the nearest preceding keyframe and the deltas after it"""
+
+        async def _rows(db):
+            async with db.execute(
+                "SELECT MAX(version) FROM page_versions "
+                "WHERE url = ? AND version <= ? AND delta IS NULL",
+                (url, version),
+            ) as cursor:
+                row = await cursor.fetchone()
+            if not row or row[0] is None:
+                return []
+            async with db.execute(
+                "SELECT version, created_at, html_keyframe, markdown_keyframe, delta "
+                "FROM page_versions WHERE url = ? AND version BETWEEN ? AND ? "
+                "ORDER BY version",
+                (url, row[0], version),
+            ) as cursor:
+                return await cursor.fetchall()
+
+        rows = await self.execute_with_retry(_rows)
+        if not rows or rows[-1][0] != version:
+            return None
+
+        _, created_at, html_keyframe, markdown_keyframe, _ = rows[0]
+        texts = {
+            "html": await self._load_content(html_keyframe, "html") or "",
+            "markdown": await self._load_content(markdown_keyframe, "markdown") or "",
+        }
+        for _, created_at, _, _, delta in rows[1:]:
+            deltas = json.loads(zlib.decompress(delta).decode("utf-8"))
+            for field in self.VERSIONED_FIELDS:
+                texts[field] = apply_line_delta(texts[field], deltas[field])
+        return {"version": version, "created_at": created_at, **texts}
+
+    async def alist_versions(self, url: str) -> List[dict]:
+        """List the stored versions of a page, oldest first"""
+
+        async def _list(db):
+            async with db.execute(
+                "SELECT version, created_at, html_hash, delta IS NULL, delta_size "
+                "FROM page_versions WHERE url = ? ORDER BY version",
+                (url,),
+            ) as cursor:
+                return await cursor.fetchall()
+
+        try:
+            rows = await self.execute_with_retry(_list)
+        except Exception as e:
+            self.logger.error(
+                message="Error listing page versions: {error}",
+                tag="ERROR",
+                force_verbose=True,
+                params={"error": str(e)},
+            )
+            return []
+        return [
+            {
+                "version": version,
+                "created_at": created_at,
+                "html_hash": html_hash,
+                "keyframe": bool(keyframe),
+                "delta_size": delta_size,
+            }
+            for version, created_at, html_hash, keyframe, delta_size in rows
+        ]
+
+    async def aget_version(self, url: str, n: int = -1) -> Optional[dict]:
+        """
+        Get a stored version of a page.
+
+        Args:
+            url: The page URL.
+            n: Version number starting at 1. Negative numbers count back from the
+                latest version, -1 being the latest.
+
+        Returns:
+            Optional[dict]: version, created_at, html and markdown, or None if the
+            version does not exist.
+        """
+        try:
+            if n < 0:
+                versions = await self.alist_versions(url)
+                if len(versions) < -n:
+                    return None
+                n = versions[n]["version"]
+            return await self._aload_version(url, n)
+        except Exception as e:
+            self.logger.error(
+                message="Error loading page version: {error}",
+                tag="ERROR",
+                force_verbose=True,
+                params={"error": str(e)},
+            )
+            return None
+
+    async def adiff(
+        self, url: str, a: int, b: int, field: str = "html"
+    ) -> Optional[str]:
+        """
+        Unified diff between two versions of a page.
+
+        Args:
+            url: The page URL.
+            a: The older version, see aget_version.
+            b: The newer version, see aget_version.
+            field: "html" or "markdown".
+
+        Returns:
+            Optional[str]: The diff, or None if either version does not exist.
+        """
+        if field not in self.VERSIONED_FIELDS:
+            raise ValueError(f"field must be one of {self.VERSIONED_FIELDS}")
+        old = await self.aget_version(url, a)
+        new = await self.aget_version(url, b)
+        if old is None or new is None:
+            return None
+        return "".join(
+            difflib.unified_diff(
+                old[field].splitlines(keepends=True),
+                new[field].splitlines(keepends=True),
+                fromfile=f"{url}@{old['version']}",
+                tofile=f"{url}@{new['version']}",
+            )
+        )
+
+    async def acache_variant(self, result: CrawlResult, config_hash: str):
+        """
+        Store only the derived fields of a result for a processing configuration.
+
+        Used when a cached page is reprocessed with a different configuration,
+        leaving the raw fetch and its expiry untouched.
+        """
+        try:
+            await self.acache_variants([result], config_hash)
+        except Exception:
+            # Already logged; a missing variant only costs a reprocess later
+            pass
+
+    async def acache_variants(
+        self,
+        results: List[CrawlResult],
+        config_hash: str,
+        progress: Optional[Tuple[str, str, int]] = None,
+    ):
+        """
+        Store the derived fields of several results in one transaction.
+
+        Args:
+            results: Processed results of cached pages.
+            config_hash: Processing configuration hash the results were produced with.
+            progress: Optional (job_id, last_url, processed) of a reprocessing job,
+                saved in the same transaction so the job resumes after the last stored batch.
+        """
+        if self.backend is not None:
+            await self._backend_cache_variants(results, config_hash)
+            if progress is not None:
+                await self._save_reprocess_progress(*progress)
+            return
+
+        rows = []
+        for result in results:
+            markdown = result.markdown_v2 or (
+                result.markdown
+                if isinstance(result.markdown, MarkdownGenerationResult)
+                else None
+            )
+            if markdown is None:
+                markdown = MarkdownGenerationResult(
+                    raw_markdown=result.markdown or "",
+                    markdown_with_citations="",
+                    references_markdown="",
+                )
+            contents = {
+                "cleaned_html": (result.cleaned_html or "", "cleaned"),
+                "markdown": (markdown.model_dump_json(), "markdown"),
+                "extracted_content": (result.extracted_content or "", "extracted"),
+            }
+            content_hashes = {}
+            content_size = 0
+            for field, (content, content_type) in contents.items():
+                content_hashes[field] = await self._store_content(content, content_type)
+                content_size += len(content.encode("utf-8")) if content else 0
+            rows.append((result, content_hashes, content_size))
+
+        async def _cache(db):
+            for result, content_hashes, content_size in rows:
+                await self._upsert_variant(
+                    db, result, config_hash, content_hashes, content_size
+                )
+            if progress is not None:
+                await db.execute(
+                    "INSERT OR REPLACE INTO reprocess_progress "
+                    "(job_id, last_url, processed, updated_at) VALUES (?, ?, ?, ?)",
+                    (*progress, time.time()),
+                )
+
+        try:
+            await self.execute_with_retry(_cache)
+        except Exception as e:
+            self.logger.error(
+                message="Error caching processing variant: {error}",
+                tag="ERROR",
+                force_verbose=True,
+                params={"error": str(e)},
+            )
+            raise
+
+    async def _backend_cache_variants(self, results: List[CrawlResult], config_hash: str):
+        """Replace the derived fields of backend entries with those of results"""
+        entries = await self.backend.bulk_get([result.url for result in results])
+        for result in results:
+            entry = entries.get(result.url)
+            if not entry:
+                continue
+            for field in self.DERIVED_FIELDS:
+                setattr(entry.result, field, getattr(result, field))
+            entry.result.markdown_v2 = result.markdown_v2
+            entry.config_hash = config_hash
+            await self.backend.put(entry)
+
+    async def _save_reprocess_progress(self, job_id: str, last_url: str, processed: int):
+        async def _save(db):
+            await db.execute(
+                "INSERT OR REPLACE INTO reprocess_progress "
+                "(job_id, last_url, processed, updated_at) VALUES (?, ?, ?, ?)",
+                (job_id, last_url, processed, time.time()),
+            )
+
+        await self.execute_with_retry(_save)
+
+    async def aiter_export_rows(
+        self,
+        columns: List[str],
+        url_pattern: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        batch_size: int = CACHE_EXPORT_CHUNK_SIZE,
+    ) -> AsyncGenerator[List[dict], None]:
+        """
+        Stream cached entries as flat rows in URL order, batch by batch.
+
+        Only the requested columns are read, so content files that are not exported
+        are never loaded. Memory use is bounded by batch_size.
+
+        Args:
+            columns: Columns to include, from EXPORT_SCALAR_COLUMNS, EXPORT_CONTENT_COLUMNS
+                and EXPORT_JSON_COLUMNS.
+            url_pattern: Optional SQLite GLOB pattern URLs must match.
+            since: Only entries cached at or after this time.
+            until: Only entries cached before this time.
+            batch_size: Rows per batch.
+
+        Yields:
+            List[dict]: Rows keyed by column.
+        """
+        known = (
+            self.EXPORT_SCALAR_COLUMNS
+            + list(self.EXPORT_CONTENT_COLUMNS)
+            + self.EXPORT_JSON_COLUMNS
+        )
+        unknown = [column for column in columns if column not in known]
+        if unknown:
+            raise ValueError(f"Unknown export columns: {unknown}")
+
+        if self.backend is not None:
+            async for batch in self._aiter_backend_export_rows(
+                columns, url_pattern, since, until, batch_size
+            ):
+                yield batch
+            return
+        if "last_accessed" in columns:
+            await self.aflush_access_times()
+
+        sql_columns = {"url"}
+        for column in columns:
+            if column in self.EXPORT_CONTENT_COLUMNS:
+                sql_columns.add(self.EXPORT_CONTENT_COLUMNS[column][0])
+            else:
+                sql_columns.add(column)
+        sql_columns = sorted(sql_columns)
+
+        last_url = ""
+        while True:
+            query = f"SELECT {', '.join(sql_columns)} FROM crawled_data WHERE url > ?"
+            params = [last_url]
+            if url_pattern:
+                query += " AND url GLOB ?"
+                params.append(url_pattern)
+            if since is not None:
+                query += " AND created_at >= ?"
+                params.append(since)
+            if until is not None:
+                query += " AND created_at < ?"
+                params.append(until)
+            query += " ORDER BY url LIMIT ?"
+            params.append(batch_size)
+
+            async def _fetch(db):
+                async with db.execute(query, params) as cursor:
+                    return [dict(zip(sql_columns, row)) for row in await cursor.fetchall()]
+
+            stored = await self.execute_with_retry(_fetch)
+            if not stored:
+                return
+            yield await asyncio.gather(
+                *(self._export_row(row, columns) for row in stored)
+            )
+            last_url = stored[-1]["url"]
+            if len(stored) < batch_size:
+                return
+
+    async def _export_row(self, stored: dict, columns: List[str]) -> dict:
+        """Export row of a crawled_data row, loading the requested content files"""
+        row = {}
+        markdown = None
+        for column in columns:
+            if column == "success":
+                row[column] = bool(stored[column])
+                continue
+            if column not in self.EXPORT_CONTENT_COLUMNS:
+                row[column] = stored[column]
+                continue
+            sql_column, content_type = self.EXPORT_CONTENT_COLUMNS[column]
+            if sql_column != "markdown":
+                row[column] = await self._load_content(stored[sql_column], content_type)
+                continue
+            if markdown is None:
+                text = await self._load_content(stored["markdown"], "markdown")
+                try:
+                    markdown = json.loads(text) if text else {}
+                except json.JSONDecodeError:
+                    markdown = None
+                if not isinstance(markdown, dict):
+                    # Legacy rows store plain markdown
+                    markdown = {"raw_markdown": text}
+            row[column] = markdown.get(
+                "raw_markdown" if column == "markdown" else "fit_markdown"
+            )
+        return row
+
+    async def _aiter_backend_export_rows(
+        self,
+        columns: List[str],
+        url_pattern: Optional[str],
+        since: Optional[float],
+        until: Optional[float],
+        batch_size: int,
+    ) -> AsyncGenerator[List[dict], None]:
+        batch = []
+        async for entry in self.backend.iterate():
+            if url_pattern and not fnmatch.fnmatchcase(entry.url, url_pattern):
+                continue
+            if since is not None and entry.created_at < since:
+                continue
+            if until is not None and entry.created_at >= until:
+                continue
+            result = entry.result
+            values = {
+                "created_at": entry.created_at,
+                "expires_at": entry.expires_at,
+                "last_accessed": None,
+                "content_size": None,
+                "fit_markdown": result.markdown_v2.fit_markdown if result.markdown_v2 else None,
+            }
+            row = {}
+            for column in columns:
+                if column in values:
+                    row[column] = values[column]
+                elif column in self.EXPORT_JSON_COLUMNS:
+                    row[column] = json.dumps(getattr(result, column))
+                else:
+                    row[column] = getattr(result, column)
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    async def aiter_cached_pages(
+        self,
+        url_pattern: Optional[str] = None,
+        after_url: Optional[str] = None,
+        batch_size: int = CACHE_REPROCESS_BATCH_SIZE,
+    ) -> AsyncGenerator[List[Tuple[str, str]], None]:
+        """
+        Stream the html of successfully cached pages in URL order, batch by batch.
+
+        Args:
+            url_pattern: Optional SQLite GLOB pattern URLs must match, e.g. "https://example.com/*".
+            after_url: Only pages with a URL sorting after this one, to resume a scan.
+            batch_size: Pages per batch.
+
+        Yields:
+            List[Tuple[str, str]]: (url, html) pairs.
+        """
+        if self.backend is not None:
+            batch = []
+            async for entry in self.backend.iterate(start_after=after_url):
+                result = entry.result
+                if not result.success or not result.html:
+                    continue
+                if url_pattern and not fnmatch.fnmatchcase(entry.url, url_pattern):
+                    continue
+                batch.append((entry.url, result.html))
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+            return
+
+        last_url = after_url or ""
+        while True:
+            query = "SELECT url, html FROM crawled_data WHERE success AND url > ?"
+            params = [last_url]
+            if url_pattern:
+                query += " AND url GLOB ?"
+                params.append(url_pattern)
+            query += " ORDER BY url LIMIT ?"
+            params.append(batch_size)
+
+            async def _fetch(db):
+                async with db.execute(query, params) as cursor:
+                    return await cursor.fetchall()
+
+            rows = await self.execute_with_retry(_fetch)
+            if not rows:
+                return
+            batch = []
+            for url, html_hash in rows:
+                html = await self._load_content(html_hash, "html") if html_hash else None
+                if html:
+                    batch.append((url, html))
+            last_url = rows[-1][0]
+            if batch:
+                yield batch
+            if len(rows) < batch_size:
+                return
+
+    async def aget_reprocess_progress(self, job_id: str) -> Optional[dict]:
+        """Get the saved progress of a reprocessing job, see acache_variants"""
+
+        async def _get(db):
+            async with db.execute(
+                "SELECT last_url, processed, updated_at FROM reprocess_progress WHERE job_id = ?",
+                (job_id,),
+            ) as cursor:
+                return await cursor.fetchone()
+
+        row = await self.execute_with_retry(_get)
+        if not row:
+            return None
+        return {"last_url": row[0], "processed": row[1], "updated_at": row[2]}
+
+    async def aclear_reprocess_progress(self, job_id: str):
+        """Forget the progress of a finished reprocessing job"""
+
+        async def _clear(db):
+            await db.execute("DELETE FROM reprocess_progress WHERE job_id = ?", (job_id,))
+
+        await self.execute_with_retry(_clear)
+
+    async def _upsert_variant(
+        self,
+        db,
+        result: CrawlResult,
+        config_hash: str,
+        content_hashes: Dict[str, str],
+        content_size: int,
+    ):
+        await db.execute(
+            """
+            INSERT INTO crawled_variants (
+                url, config_hash, cleaned_html, markdown, extracted_content,
+                media, links, metadata, created_at, content_size
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(url, config_hash) DO UPDATE SET
+                cleaned_html = excluded.cleaned_html,
+                markdown = excluded.markdown,
+                extracted_content = excluded.extracted_content,
+                media = excluded.media,
+                links = excluded.links,
+                metadata = excluded.metadata,
+                created_at = excluded.created_at,
+                content_size = excluded.content_size
+        """,
+            (
+                result.url,
+                config_hash,
+                content_hashes["cleaned_html"],
+                content_hashes["markdown"],
+                content_hashes["extracted_content"],
+                json.dumps(result.media),
+                json.dumps(result.links),
+                json.dumps(result.metadata or {}),
+                time.time(),
+                content_size,
+            ),
+        )
+
+    async def aget_total_count(self) -> int:
+        """Get total number of cached URLs"""
+        if self.backend is not None:
+            return await self.backend.count()
+
+        async def _count(db):
+            async with db.execute("SELECT COUNT(*) FROM crawled_data") as cursor:
+                result = await cursor.fetchone()
+                return result[0] if result else 0
+
+        try:
+            return await self.execute_with_retry(_count)
+        except Exception as e:
+            self.logger.error(
+                message="Error getting total count: {error}",
+                tag="ERROR",
+                force_verbose=True,
+                params={"error": str(e)},
+            )
+            return 0
+
+    async def aclear_db(self):
+        """Clear all data from the database and remove the orphaned content files"""
+        if self.backend is not None:
+            await self.backend.clear()
+
+        async def _clear(db):
+            await db.execute("DELETE FROM crawled_data")
+            await db.execute("DELETE FROM crawled_variants")
+            await db.execute("DELETE FROM url_change_history")
+            await db.execute("DELETE FROM page_versions")
+            await db.execute("DELETE FROM reprocess_progress")
+            await db.execute("DELETE FROM failed_urls")
+            await db.execute("DELETE FROM url_redirects")
+
+        try:
+            await self.execute_with_retry(_clear)
+            await self.agc_content()
+        except Exception as e:
+            self.logger.error(
+                message="Error clearing database: {error}",
+                tag="ERROR",
+                force_verbose=True,
+                params={"error": str(e)},
+            )
+
+    async def aflush_db(self):
+        """Drop the entire table and remove the orphaned content files"""
+        if self.backend is not None:
+            await self.backend.clear()
+
+        async def _flush(db):
+            await db.execute("DROP TABLE IF EXISTS crawled_data")
+            await db.execute("DROP TABLE IF EXISTS crawled_variants")
+            await db.execute("DROP TABLE IF EXISTS url_change_history")
+            await db.execute("DROP TABLE IF EXISTS page_versions")
+            await db.execute("DROP TABLE IF EXISTS reprocess_progress")
+            await db.execute("DROP TABLE IF EXISTS failed_urls")
+            await db.execute("DROP TABLE IF EXISTS url_redirects")
+
+        try:
+            await self.execute_with_retry(_flush)
+            # The table is gone, so every stored file is unreferenced
+            await self._sweep_content(live_hashes={}, grace_period=0)
+        except Exception as e:
+            self.logger.error(
+                message="Error flushing database: {error}",
+                tag="ERROR",
+                force_verbose=True,
+                params={"error": str(e)},
+            )
+
+    async def aexpire_entries(self, stale_retention: Optional[float] = None) -> int:
+        """
+        Delete entries whose TTL has passed. Returns the number of rows removed.
+
+        Args:
+            stale_retention: Seconds expired entries are kept so they can still be
+                revalidated with conditional requests. Defaults to self.stale_retention.
+        """
+        if stale_retention is None:
+            stale_retention = self.stale_retention
+
+        if self.backend is not None:
+            cutoff = time.time() - stale_retention
+            expired = [
+                entry.url
+                async for entry in self.backend.iterate()
+                if entry.is_expired(cutoff)
+            ]
+            for url in expired:
+                await self.backend.delete(url)
+            return len(expired)
+
+        async def _expire(db):
+            cursor = await db.execute(
+                "DELETE FROM crawled_data WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (time.time() - stale_retention,),
+            )
+            await db.execute(
+                "DELETE FROM crawled_variants WHERE url NOT IN (SELECT url FROM crawled_data)"
+            )
+            return cursor.rowcount
+
+        try:
+            return await self.execute_with_retry(_expire)
+        except Exception as e:
+            self.logger.error(
+                message="Error expiring cache entries: {error}",
+                tag="ERROR",
+                force_verbose=True,
+                params={"error": str(e)},
+            )
+            return 0
+
+    async def _abackend_usage(self) -> List[Tuple[str, float, int]]:
+        """url, created_at and size of every backend entry"""
+        usage = getattr(self.backend, "usage", None)
+        if usage is not None:
+            return await usage()
+        return [
+            (entry.url, entry.created_at, entry_size(entry))
+            async for entry in self.backend.iterate()
+        ]
+
+    async def aget_total_size(self) -> int:
+        """Get the total size in bytes of content referenced by cached entries"""
+
+        async def _size(db):
+            async with db.execute(
+                "SELECT (SELECT COALESCE(SUM(content_size), 0) FROM crawled_data)"
+                " + (SELECT COALESCE(SUM(content_size), 0) FROM crawled_variants)"
+            ) as cursor:
+                result = await cursor.fetchone()
+                return result[0] if result else 0
+
+        try:
+            if self.backend is not None:
+                return sum(size for _, _, size in await self._abackend_usage())
+            return await self.execute_with_retry(_size)
+        except Exception as e:
+            self.logger.error(
+                message="Error getting cache size: {error}",
+                tag="ERROR",
+                force_verbose=True,
+                params={"error": str(e)},
+            )
+            return 0
+
+    async def aenforce_size_limit(self, max_size: Optional[int] = None) -> int:
+        """
+        Evict least recently used entries until the cache fits in max_size bytes.
+
+        Sizes are the per-entry totals recorded at write time. Content shared
+        between entries is counted once per entry, so this is an upper bound on
+        disk usage. Backends do not track access times, so their oldest entries
+        are evicted first. Returns the number of evicted rows.
+        """
+        max_size = max_size if max_size is not None else self.max_cache_size
+        if not max_size:
+            return 0
+        if self.backend is not None:
+            return await self._aenforce_backend_size_limit(max_size)
+        await self.aflush_access_times()
+
+        async def _evict(db):
+            async with db.execute(
+                "SELECT (SELECT COALESCE(SUM(content_size), 0) FROM crawled_data)"
+                " + (SELECT COALESCE(SUM(content_size), 0) FROM crawled_variants)"
+            ) as cursor:
+                total = (await cursor.fetchone())[0]
+
+            evicted = 0
+            while total > max_size:
+                async with db.execute(
+                    """
+                    SELECT c.url, c.content_size + COALESCE(
+                        (SELECT SUM(v.content_size) FROM crawled_variants v WHERE v.url = c.url), 0
+                    )
+                    FROM crawled_data c ORDER BY c.last_accessed ASC LIMIT ?
+                    """,
+                    (CACHE_GC_BATCH_SIZE,),
+                ) as cursor:
+                    rows = await cursor.fetchall()
+                if not rows:
+                    break
+
+                victims = []
+                for url, size in rows:
+                    if total <= max_size:
+                        break
+                    victims.append((url,))
+                    total -= size or 0
+
+                await db.executemany("DELETE FROM crawled_data WHERE url = ?", victims)
+                await db.executemany(
+                    "DELETE FROM crawled_variants WHERE url = ?", victims
+                )
+                evicted += len(victims)
+            return evicted
+
+        try:
+            return await self.execute_with_retry(_evict)
+        except Exception as e:
+            self.logger.error(
+                message="Error enforcing cache size limit: {error}",
+                tag="ERROR",
+                force_verbose=True,
+                params={"error": str(e)},
+            )
+            return 0
+
+    async def _aenforce_backend_size_limit(self, max_size: int) -> int:
+        """Delete the oldest backend entries until the backend fits in max_size bytes"""
+        try:
+            usage = sorted(await self._abackend_usage(), key=lambda row: row[1])
+            total = sum(size for _, _, size in usage)
+            evicted = 0
+            for url, _, size in usage:
+                if total <= max_size:
+                    break
+                if await self.backend.delete(url):
+                    evicted += 1
+                total -= size
+            return evicted
+        except Exception as e:
+            self.logger.error(
+                message="Error enforcing cache size limit: {error}",
+                tag="ERROR",
+                force_verbose=True,
+                params={"error": str(e)},
+            )
+            return 0
+
+    async def agc_content(self, grace_period: float = CACHE_GC_GRACE_PERIOD) -> int:
+        """
+        Mark-and-sweep garbage collection of the content store.
+
+        Marks every hash referenced from CONTENT_REFS, then deletes unreferenced
+        files in batches, yielding to the event loop between batches. Files
+        modified within grace_period seconds are kept so that content written
+        just before its row is committed is never collected. A backend keeps page
+        content with its entries and frees it when they are deleted, so with a
+        backend this only collects version keyframes.
+
+        Returns:
+            int: Number of files removed.
+        """
+        live_hashes: Dict[str, set] = {}
+
+        async def _mark(db):
+            for table, column, content_type in self.CONTENT_REFS:
+                async with db.execute(
+                    "SELECT name FROM sqlite_master WHERE type='table' AND name=?",
+                    (table,),
+                ) as cursor:
+                    if not await cursor.fetchone():
+                        continue
+                directory = self.content_paths[content_type]
+                hashes = live_hashes.setdefault(directory, set())
+                async with db.execute(
+                    f"SELECT {column} FROM {table} WHERE {column} IS NOT NULL AND {column} != ''"
+                ) as cursor:
+                    async for (content_hash,) in cursor:
+                        hashes.add(content_hash)
+
+        try:
+            await self.execute_with_retry(_mark)
+        except Exception as e:
+            self.logger.error(
+                message="Error marking live content: {error}",
+                tag="ERROR",
+                force_verbose=True,
+                params={"error": str(e)},
+            )
+            return 0
+
+        return await self._sweep_content(live_hashes, grace_period)
+
+    async def _sweep_content(
+        self, live_hashes: Dict[str, set], grace_period: float
+    ) -> int:
+        """Remove files in the content directories that are not in live_hashes"""
+        cutoff = time.time() - grace_period
+        removed = 0
+        for directory in set(self.content_paths.values()):
+            keep = live_hashes.get(directory, set())
+            try:
+                entries = os.scandir(directory)
+            except FileNotFoundError:
+                continue
+            with entries:
+                for i, entry in enumerate(entries, 1):
+                    if entry.name not in keep and entry.is_file():
+                        try:
+                            if entry.stat().st_mtime < cutoff:
+                                os.remove(entry.path)
+                                removed += 1
+                        except FileNotFoundError:
+                            pass
+                    if i % CACHE_GC_BATCH_SIZE == 0:
+                        await asyncio.sleep(0)
+        if removed:
+            self.logger.info(
+                message="Removed {count} unreferenced content files",
+                tag="GC",
+                params={"count": removed},
+            )
+        return removed
+
+    async def arun_maintenance(self):
+        """Run one expiry, size-limit and garbage collection pass"""
+        await self.aexpire_entries()
+        await self.aenforce_size_limit()
+        await self.agc_content()
+
+    def start_maintenance(
+        self,
+        interval: float = 3600,
+        max_cache_size: Optional[int] = None,
+        stale_retention: Optional[float] = None,
+    ):
+        """
+        Start periodic cache maintenance in the background of the running event loop.
+
+        Args:
+            interval: Seconds between maintenance passes.
+            max_cache_size: Optional size limit in bytes applied on each pass.
+            stale_retention: Seconds expired entries are kept for revalidation.
+        """
+        if max_cache_size is not None:
+            self.max_cache_size = max_cache_size
+        if stale_retention is not None:
+            self.stale_retention = stale_retention
+        if self._maintenance_task and not self._maintenance_task.done():
+            return
+
+        async def _loop():
+            while True:
+                try:
+                    await self.arun_maintenance()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.logger.error(
+                        message="Cache maintenance failed: {error}",
+                        tag="GC",
+                        params={"error": str(e)},
+                    )
+                await asyncio.sleep(interval)
+
+        self._maintenance_task = asyncio.create_task(_loop())
+
+    async def stop_maintenance(self):
+        """Stop the background maintenance task if it is running"""
+        if self._maintenance_task:
+            self._maintenance_task.cancel()
+            try:
+                await self._maintenance_task
+            except asyncio.CancelledError:
+                pass
+            self._maintenance_task = None
+
+    async def _store_content(self, content: str, content_type: str) -> str:
+        """Store content in filesystem and return hash"""
+        if not content:
+            return ""
+
+        content_hash = generate_content_hash(content)
+        file_path = os.path.join(self.content_paths[content_type], content_hash)
+
+        # Only write if file doesn't exist
+        if not os.path.exists(file_path):
+            async with aiofiles.open(file_path, "w", encoding="utf-8") as f:
+                await f.write(content)
+        else:
+            # Refresh mtime so a concurrent GC sweep keeps the reused file
+            try:
+                os.utime(file_path)
+            except OSError:
+                pass
 
         return content_hash
 
@@ -43,6 +43,12 @@ class RateLimiter:
     def get_domain(self, url: str) -> str:
         return urlparse(url).netloc
 
+    def set_crawl_delay(self, url: str, delay: Optional[float]) -> None:
+        """Apply a robots.txt Crawl-delay as the minimum delay for the URL's domain, capped at max_delay"""
+        domain = self.get_domain(url)
+        state = self.domains.setdefault(domain, DomainState())
+        state.crawl_delay = min(delay or 0, self.max_delay)
+
     async def wait_if_needed(self, url: str) -> None:
         domain = self.get_domain(url)
         state = self.domains.get(domain)
@@ -53,7 +59,8 @@ class RateLimiter:
 
         now = time.time()
         if state.last_request_time:
-            wait_time = max(0, state.current_delay - (now - state.last_request_time))
+            delay = max(state.current_delay, state.crawl_delay)
+            wait_time = max(0, delay - (now - state.last_request_time))
             if wait_time > 0:
                 await asyncio.sleep(wait_time)
 
@@ -294,6 +301,17 @@ class BaseDispatcher(ABC):
         self.rate_limiter = rate_limiter
         self.monitor = monitor
 
+    async def wait_for_rate_limit(self, url: str, config: CrawlerRunConfig) -> None:
+        """Wait for the rate limiter, honoring the robots.txt Crawl-delay if robots.txt is checked"""
+        if not self.rate_limiter:
+            return
+        if config.check_robots_txt and self.crawler is not None:
+            delay = await self.crawler.robots_parser.get_crawl_delay(
+                url, self.crawler.browser_config.user_agent
+            )
+            self.rate_limiter.set_crawl_delay(url, delay)
+        await self.rate_limiter.wait_if_needed(url)
+
     @abstractmethod
     async def crawl_url(
         self,
@@ -349,8 +367,7 @@ class MemoryAdaptiveDispatcher(BaseDispatcher):
                 )
             self.concurrent_sessions += 1
 
-            if self.rate_limiter:
-                await self.rate_limiter.wait_if_needed(url)
+            await self.wait_for_rate_limit(url, config)
 
             process = psutil.Process()
             start_memory = process.memory_info().rss / (1024 * 1024)
@@ -554,8 +571,7 @@ class SemaphoreDispatcher(BaseDispatcher):
                     task_id, status=CrawlStatus.IN_PROGRESS, start_time=start_time
                 )
 
-            if self.rate_limiter:
-                await self.rate_limiter.wait_if_needed(url)
+            await self.wait_for_rate_limit(url, config)
 
             async with semaphore:
                 process = psutil.Process()
@@ -4,9 +4,15 @@ import time
 import warnings
 from colorama import Fore
 from pathlib import Path
-from typing import Optional, List
+from typing import Optional, List, Callable
 import json
 import asyncio
+import uuid
+import pickle
+import multiprocessing
+import aiohttp
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
 
 # from contextlib import nullcontext, asynccontextmanager
 from contextlib import asynccontextmanager
@@ -22,18 +28,29 @@ from .async_crawler_strategy import (
     AsyncCrawlerStrategy,
     AsyncPlaywrightCrawlerStrategy,
     AsyncCrawlResponse,
+    ReplayCrawlerStrategy,
 )
 from .cache_context import CacheMode, CacheContext, _legacy_to_cache_mode
+from .cache_backend import CacheBackend, create_cache_backend
+from .cache_export import CacheExporter
 from .markdown_generation_strategy import (
     DefaultMarkdownGenerator,
+    LXMLMarkdownGenerator,
     MarkdownGenerationStrategy,
 )
+from .parsed_document import ParsedDocument
+from .incremental_processing import IncrementalPageProcessor, truncate_html
+from .content_scraping_strategy import LXMLWebScrapingStrategy
 from .async_logger import AsyncLogger
 from .async_configs import BrowserConfig, CrawlerRunConfig
 from .async_dispatcher import * # noqa: F403
 from .async_dispatcher import BaseDispatcher, MemoryAdaptiveDispatcher, RateLimiter
 
-from .config import MIN_WORD_THRESHOLD
+from .config import (
+    MIN_WORD_THRESHOLD,
+    CACHE_PREFETCH_CHUNK_SIZE,
+    CACHE_REPROCESS_BATCH_SIZE,
+)
 from .utils import (
     sanitize_input_encode,
     InvalidCSSSelectorError,
@@ -41,6 +58,11 @@ from .utils import (
     create_box_message,
     get_error_context,
     RobotsParser,
+    get_cache_ttl_from_headers,
+    get_retry_after_from_headers,
+    classify_crawl_error,
+    generate_content_hash,
+    normalize_volatile_html,
 )
 
 from typing import Union, AsyncGenerator, List, TypeVar
@@ -127,6 +149,10 @@ class AsyncWebCrawler:
         always_by_pass_cache: Optional[bool] = None,  # Deprecated parameter
         base_directory: str = str(os.getenv("CRAWL4_AI_BASE_DIRECTORY", Path.home())),
         thread_safe: bool = False,
+        cache_max_size: Optional[int] = None,
+        cache_maintenance_interval: Optional[float] = None,
+        cache_stale_retention: Optional[float] = None,
+        cache_backend: Optional[Union[str, CacheBackend]] = None,
         **kwargs,
     ):
         """
@@ -139,6 +165,14 @@ class AsyncWebCrawler:
             always_by_pass_cache: Deprecated, use always_bypass_cache instead
             base_directory: Base directory for storing cache
             thread_safe: Whether to use thread-safe operations
+            cache_max_size: Maximum cache size in bytes, enforced with LRU eviction
+            cache_maintenance_interval: If set, expire, evict and garbage collect the cache
+                in the background every this many seconds while the crawler is running
+            cache_stale_retention: Seconds expired entries are kept by cache maintenance so
+                they can still be revalidated with CacheMode.REVALIDATE
+            cache_backend: Page store of the cache: "sqlite", "lmdb" or a CacheBackend instance.
+                Overrides BrowserConfig.cache_backend. The cache is shared by all crawlers in
+                the process, so the backend applies to them as well.
             **kwargs: Additional arguments for backwards compatibility
         """
         # Handle browser configuration
@@ -204,6 +238,21 @@ class AsyncWebCrawler:
         os.makedirs(self.crawl4ai_folder, exist_ok=True)
         os.makedirs(f"{self.crawl4ai_folder}/cache", exist_ok=True)
 
+        # Cache maintenance settings
+        self.cache_max_size = cache_max_size
+        self.cache_maintenance_interval = cache_maintenance_interval
+        self.cache_stale_retention = cache_stale_retention
+
+        # Select the page store of the shared cache
+        cache_backend = cache_backend or self.browser_config.cache_backend
+        if cache_backend is not None:
+            async_db_manager.set_backend(
+                create_cache_backend(cache_backend, self.crawl4ai_folder)
+            )
+
+        # Shared HTTP session for conditional cache revalidation, created lazily
+        self._http_session = None
+
         # Initialize robots parser
         self.robots_parser = RobotsParser()
 
@@ -224,6 +273,16 @@ class AsyncWebCrawler:
         """
         await self.crawler_strategy.__aenter__()
         await self.awarmup()
+        if self.cache_maintenance_interval:
+            async_db_manager.start_maintenance(
+                interval=self.cache_maintenance_interval,
+                max_cache_size=self.cache_max_size,
+                stale_retention=self.cache_stale_retention,
+            )
+        elif self.cache_max_size:
+            async_db_manager.max_cache_size = self.cache_max_size
+        if self.cache_stale_retention is not None:
+            async_db_manager.stale_retention = self.cache_stale_retention
         return self
 
     async def close(self):
@@ -236,6 +295,12 @@ class AsyncWebCrawler:
         2. Close any open pages and contexts
         """
         await self.crawler_strategy.__aexit__(None, None, None)
+        if self.cache_maintenance_interval:
+            await async_db_manager.stop_maintenance()
+        if self._http_session is not None:
+            await self._http_session.close()
+            self._http_session = None
+        await self.robots_parser.close()
 
     async def __aenter__(self):
         return await self.start()
@@ -384,9 +449,31 @@ class AsyncWebCrawler:
                 extracted_content = None
                 start_time = time.perf_counter()
 
+                # Derived artifacts are cached per processing configuration
+                config_hash = config.processing_hash()
+
+                # Redirected pages are cached under their final URL, which known
+                # redirects lead to without requesting the source again. Writing
+                # modes follow them too, arun_many crawls its misses as WRITE_ONLY
+                cache_url = url
+                if cache_context.should_read() or cache_context.should_write():
+                    cache_url = await async_db_manager.aget_redirect(url) or url
+
                 # Try to get cached result if appropriate
                 if cache_context.should_read():
-                    cached_result = await async_db_manager.aget_cached_url(url)
+                    revalidate = cache_context.should_revalidate()
+                    cached_result = await async_db_manager.aget_cached_url(
+                        cache_url, include_expired=revalidate, config_hash=config_hash
+                    )
+                    # Stale entries are only served if the server confirms them unchanged
+                    if (
+                        revalidate
+                        and cached_result
+                        and not await async_db_manager.ais_fresh(cache_url)
+                    ):
+                        cached_result = await self._arevalidate_cached(
+                            cache_url, cached_result, config
+                        )
 
                 if cached_result:
                     html = sanitize_input_encode(cached_result.html)
@@ -411,6 +498,40 @@ class AsyncWebCrawler:
                         tag="FETCH",
                     )
 
+                    # The page is cached but was processed with another configuration,
+                    # or its outputs go to sinks: reprocess the cached html instead of
+                    # fetching it again
+                    if (
+                        cached_result
+                        and html
+                        and (
+                            cached_result.cleaned_html is None
+                            or config.cleaned_html_sink
+                            or config.markdown_sink
+                        )
+                    ):
+                        crawl_result = await self.aprocess_html(
+                            url=url,
+                            html=html,
+                            extracted_content=None,
+                            config=config,
+                            screenshot=screenshot_data,
+                            pdf_data=pdf_data,
+                            verbose=config.verbose,
+                            is_raw_html=False,
+                            **kwargs,
+                        )
+                        crawl_result.status_code = cached_result.status_code
+                        crawl_result.redirected_url = cached_result.redirected_url
+                        crawl_result.response_headers = cached_result.response_headers
+                        crawl_result.downloaded_files = cached_result.downloaded_files
+                        if cache_context.should_write():
+                            await async_db_manager.acache_variant(
+                                self._with_cache_key(crawl_result, cache_url),
+                                config_hash,
+                            )
+                        cached_result = crawl_result
+
                 # Fetch fresh content if needed
                 if not cached_result or not html:
                     t1 = time.perf_counter()
@@ -418,6 +539,12 @@ class AsyncWebCrawler:
                     if user_agent:
                         self.crawler_strategy.update_user_agent(user_agent)
 
+                    # Skip URLs that failed recently until their retry time
+                    if cache_context.should_read() and not config.retry_failed:
+                        failure = await async_db_manager.aget_failure(url)
+                        if failure:
+                            return self._failed_url_result(url, failure)
+
                     # Check robots.txt if enabled
                     if config and config.check_robots_txt:
                         if not await self.robots_parser.can_fetch(url, self.browser_config.user_agent):
@@ -431,10 +558,21 @@ class AsyncWebCrawler:
                             )
 
                     # Pass config to crawl method
-                    async_response = await self.crawler_strategy.crawl(
-                        url,
-                        config=config,  # Pass the entire config object
-                    )
+                    fetch_url = cache_url
+                    try:
+                        async_response = await self.crawler_strategy.crawl(
+                            fetch_url,
+                            config=config,  # Pass the entire config object
+                        )
+                    except Exception as e:
+                        if cache_context.should_write():
+                            await async_db_manager.arecord_failure(
+                                url, classify_crawl_error(str(e)), str(e)
+                            )
+                            if fetch_url != url:
+                                await async_db_manager.aclear_redirects([url])
+                        raise
+                    final_url = async_response.redirected_url or fetch_url
 
                     html = sanitize_input_encode(async_response.html)
                     screenshot_data = async_response.screenshot
@@ -448,21 +586,37 @@ class AsyncWebCrawler:
                         tag="FETCH",
                     )
 
-                    # Process the HTML content
-                    crawl_result : CrawlResult = await self.aprocess_html(
-                        url=url,
-                        html=html,
-                        extracted_content=extracted_content,
-                        config=config,  # Pass the config object instead of individual parameters
-                        screenshot=screenshot_data,
-                        pdf_data=pdf_data,
-                        verbose=config.verbose,
-                        is_raw_html=True if url.startswith("raw:") else False,
-                        **kwargs,
-                    )
+                    # Reuse the cached derived fields if the page did not change
+                    crawl_result: CrawlResult = None
+                    if (
+                        config.reuse_unchanged_content
+                        and cache_context.is_cacheable
+                        and not self.always_bypass_cache
+                    ):
+                        crawl_result = await self._aget_unchanged_cached(
+                            final_url, html, config, config_hash
+                        )
+
+                    if crawl_result is not None:
+                        crawl_result.url = url
+                        crawl_result.screenshot = screenshot_data or crawl_result.screenshot
+                        crawl_result.pdf = pdf_data or crawl_result.pdf
+                    else:
+                        # Process the HTML content
+                        crawl_result = await self.aprocess_html(
+                            url=url,
+                            html=html,
+                            extracted_content=extracted_content,
+                            config=config,  # Pass the config object instead of individual parameters
+                            screenshot=screenshot_data,
+                            pdf_data=pdf_data,
+                            verbose=config.verbose,
+                            is_raw_html=True if url.startswith("raw:") else False,
+                            **kwargs,
+                        )
 
                     crawl_result.status_code = async_response.status_code
-                    crawl_result.redirected_url = async_response.redirected_url or url
+                    crawl_result.redirected_url = final_url
                     crawl_result.response_headers = async_response.response_headers
                     crawl_result.downloaded_files = async_response.downloaded_files
                     crawl_result.ssl_certificate = (
@@ -506,9 +660,45 @@ class AsyncWebCrawler:
                         },
                     )
 
+                    # Failures go to the negative cache instead of the page cache
+                    failed = not html or (crawl_result.status_code or 0) >= 400
+                    if failed and cache_context.should_write():
+                        await async_db_manager.arecord_failure(
+                            url,
+                            classify_crawl_error(
+                                crawl_result.error_message, crawl_result.status_code
+                            ),
+                            crawl_result.error_message
+                            or f"HTTP {crawl_result.status_code}",
+                            status_code=crawl_result.status_code,
+                            retry_after=get_retry_after_from_headers(
+                                crawl_result.response_headers
+                            ),
+                        )
+                        # The known redirect may be outdated, request the source next time
+                        if fetch_url != url:
+                            await async_db_manager.aclear_redirects([url])
+                    elif final_url != fetch_url and cache_context.should_write():
+                        chain = async_response.redirect_chain or [fetch_url, final_url]
+                        if fetch_url != url:
+                            chain = [url, *chain]
+                        await async_db_manager.arecord_redirect(url, final_url, chain)
+                        await async_db_manager.aclear_failures([url])
+
                     # Update cache if appropriate
-                    if cache_context.should_write() and not bool(cached_result):
-                        await async_db_manager.acache_url(crawl_result)
+                    if (
+                        cache_context.should_write()
+                        and not bool(cached_result)
+                        and not failed
+                    ):
+                        ttl = self._cache_ttl(config, crawl_result.response_headers)
+                        if ttl is None or ttl > 0:
+                            await async_db_manager.acache_url(
+                                self._with_cache_key(crawl_result, final_url),
+                                ttl=ttl,
+                                config_hash=config_hash,
+                                keep_version=config.cache_versions,
+                            )
 
                     return crawl_result
 
@@ -526,7 +716,8 @@ class AsyncWebCrawler:
 
                     cached_result.success = bool(html)
                     cached_result.session_id = getattr(config, "session_id", None)
-                    cached_result.redirected_url = cached_result.redirected_url or url
+                    cached_result.redirected_url = cached_result.redirected_url or cache_url
+                    cached_result.url = url
                     return cached_result
 
             except Exception as e:
@@ -592,7 +783,42 @@ class AsyncWebCrawler:
             # add keys from kwargs to params that doesn't exist in params
             params.update({k: v for k, v in kwargs.items() if k not in params.keys()})
 
-            result = scraping_strategy.scrap(url, html, **params)
+            # Pages over the hard cap are only processed up to it
+            page_html, truncation = truncate_html(html, config.max_html_length)
+
+            # Markdown generated along with the scraping, when the page is
+            # processed incrementally
+            markdown_result: Optional[MarkdownGenerationResult] = None
+            markdown_options = self._incremental_markdown_options(
+                _url, page_html, extracted_content, config
+            )
+            if markdown_options is not None:
+                processor = IncrementalPageProcessor(
+                    scraping_strategy
+                    if isinstance(scraping_strategy, LXMLWebScrapingStrategy)
+                    else None
+                )
+                result, markdown_result = processor.process(
+                    url, page_html, markdown_options=markdown_options, **params
+                )
+            else:
+                # The page is parsed once and handed to every stage that reads it
+                document = ParsedDocument(page_html)
+                extraction_strategy = config.extraction_strategy
+                extracts_html = (
+                    not bool(extracted_content)
+                    and extraction_strategy
+                    and not isinstance(extraction_strategy, NoExtractionStrategy)
+                    and extraction_strategy.input_format == "html"
+                )
+                if extracts_html:
+                    # Parsed before scraping, so the scraper copies the tree instead of
+                    # parsing the page again and the extraction reads the pristine tree
+                    document.tree
+
+                result = scraping_strategy.scrap(
+                    url, page_html, document=document, **params
+                )
 
             if result is None:
                 raise ValueError(
@@ -617,23 +843,26 @@ class AsyncWebCrawler:
             media = result.media.model_dump()
             links = result.links.model_dump()
             metadata = result.metadata
+        if truncation:
+            metadata = {**(metadata or {}), "truncation": truncation}
 
         # Markdown Generation
-        markdown_generator: Optional[MarkdownGenerationStrategy] = (
-            config.markdown_generator or DefaultMarkdownGenerator()
-        )
+        incremental = markdown_result is not None
+        if not incremental:
+            markdown_generator: Optional[MarkdownGenerationStrategy] = (
+                config.markdown_generator or DefaultMarkdownGenerator()
+            )
 
-        # Uncomment if by default we want to use PruningContentFilter
-        # if not config.content_filter and not markdown_generator.content_filter:
-        #     markdown_generator.content_filter = PruningContentFilter()
+            # Uncomment if by default we want to use PruningContentFilter
+            # if not config.content_filter and not markdown_generator.content_filter:
+            #     markdown_generator.content_filter = PruningContentFilter()
 
-        markdown_result: MarkdownGenerationResult = (
-            markdown_generator.generate_markdown(
+            markdown_result = markdown_generator.generate_markdown(
                 cleaned_html=cleaned_html,
                 base_url=url,
+                document=ParsedDocument(cleaned_html),
                 # html2text_options=kwargs.get('html2text', {})
             )
-        )
         markdown_v2 = markdown_result
         markdown = sanitize_input_encode(markdown_result.raw_markdown)
 
@@ -664,18 +893,18 @@ class AsyncWebCrawler:
 
             content = {
                 "markdown": markdown,
-                "html": html,
+                "html": page_html,
                 "fit_markdown": markdown_result.raw_markdown,
             }.get(content_format, markdown)
 
-            # Use IdentityChunking for HTML input, otherwise use provided chunking strategy
-            chunking = (
-                IdentityChunking()
-                if content_format == "html"
-                else config.chunking_strategy
-            )
-            sections = chunking.chunk(content)
-            extracted_content = config.extraction_strategy.run(url, sections)
+            if content_format == "html":
+                # HTML input is a single section, the page as parsed for scraping
+                extracted_content = config.extraction_strategy.run_document(
+                    url, document
+                )
+            else:
+                sections = config.chunking_strategy.chunk(content)
+                extracted_content = config.extraction_strategy.run(url, sections)
             extracted_content = json.dumps(
                 extracted_content, indent=4, default=str, ensure_ascii=False
             )
@@ -695,6 +924,19 @@ class AsyncWebCrawler:
         if config.prettiify:
             cleaned_html = fast_format_html(cleaned_html)
 
+        # Outputs go to their sinks instead of the result. Incremental processing
+        # wrote them as they were produced.
+        if config.cleaned_html_sink:
+            if not incremental:
+                with open(config.cleaned_html_sink, "w", encoding="utf-8") as f:
+                    f.write(cleaned_html)
+            cleaned_html = None
+        if config.markdown_sink:
+            if not incremental:
+                with open(config.markdown_sink, "w", encoding="utf-8") as f:
+                    f.write(markdown)
+            markdown_v2 = markdown = None
+
         # Return complete crawl result
         return CrawlResult(
             url=url,
@@ -714,6 +956,48 @@ class AsyncWebCrawler:
             error_message="",
         )
 
+    def _incremental_markdown_options(
+        self,
+        url: str,
+        html: str,
+        extracted_content: Optional[str],
+        config: CrawlerRunConfig,
+    ) -> Optional[dict]:
+        """
+        The markdown options to process a page incrementally with, None to process it in full.
+
+        Pages over config.incremental_threshold are processed incrementally unless
+        the configuration needs the whole page: selectors, text-only output,
+        content filters and extraction strategies work on the complete tree or
+        markdown, and custom markdown generators need the complete cleaned HTML.
+        """
+        if config.incremental_threshold is None or len(html) <= config.incremental_threshold:
+            return None
+        markdown_generator = config.markdown_generator or DefaultMarkdownGenerator()
+        markdown_options = None
+        if type(markdown_generator) in (DefaultMarkdownGenerator, LXMLMarkdownGenerator):
+            markdown_options = markdown_generator.converter_options()
+        if (
+            markdown_options is None
+            or markdown_generator.content_filter
+            or config.content_filter
+            or config.css_selector
+            or config.excluded_selector
+            or config.only_text
+            or (
+                not extracted_content
+                and config.extraction_strategy
+                and not isinstance(config.extraction_strategy, NoExtractionStrategy)
+            )
+        ):
+            self.logger.warning(
+                message="{url:.50}... exceeds the incremental threshold, but its configuration needs the whole page",
+                tag="SCRAPE",
+                params={"url": url},
+            )
+            return None
+        return markdown_options
+
     async def arun_many(
         self,
         urls: List[str],
@@ -799,19 +1083,315 @@ class AsyncWebCrawler:
         )
 
         stream = config.stream
-        
+
+        # Cache hits are resolved in bulk and never take a dispatcher slot. Pages cached
+        # under another processing config are dispatched with the batch config, arun
+        # reprocesses them from the cache.
+        misses: List[str] = []
+        reprocess: List[str] = []
+        dispatches = [
+            (reprocess, config),
+            (misses, self._cache_miss_config(config)),
+        ]
+
         if stream:
             async def result_transformer():
-                async for task_result in dispatcher.run_urls_stream(crawler=self, urls=urls, config=config):
+                async for task_result in self._aprefetch_cache(urls, config, misses, reprocess):
                     yield transform_result(task_result)
+                for dispatch_urls, dispatch_config in dispatches:
+                    if dispatch_urls:
+                        async for task_result in dispatcher.run_urls_stream(crawler=self, urls=dispatch_urls, config=dispatch_config):
+                            yield transform_result(task_result)
             return result_transformer()
         else:
-            _results = await dispatcher.run_urls(crawler=self, urls=urls, config=config)
-            return [transform_result(res) for res in _results]    
+            _results = [
+                task_result
+                async for task_result in self._aprefetch_cache(urls, config, misses, reprocess)
+            ]
+            for dispatch_urls, dispatch_config in dispatches:
+                if dispatch_urls:
+                    _results.extend(
+                        await dispatcher.run_urls(crawler=self, urls=dispatch_urls, config=dispatch_config)
+                    )
+            return [transform_result(res) for res in _results]
+
+    def _effective_cache_mode(self, config: CrawlerRunConfig) -> CacheMode:
+        """Resolve the cache mode of a config, honouring the legacy boolean flags"""
+        if config.cache_mode is not None:
+            return config.cache_mode
+        return _legacy_to_cache_mode(
+            disable_cache=config.disable_cache,
+            bypass_cache=config.bypass_cache,
+            no_cache_read=config.no_cache_read,
+            no_cache_write=config.no_cache_write,
+        )
+
+    def _can_prefetch_cache(self, config: CrawlerRunConfig) -> bool:
+        cache_mode = self._effective_cache_mode(config)
+        return (
+            not self.always_bypass_cache
+            and cache_mode in (CacheMode.ENABLED, CacheMode.READ_ONLY)
+            # PDFs are never cached
+            and not config.pdf
+            # Outputs written to sinks need every page processed
+            and not (config.cleaned_html_sink or config.markdown_sink)
+        )
+
+    def _cache_miss_config(self, config: CrawlerRunConfig) -> CrawlerRunConfig:
+        """
+        Config used for URLs that already missed the bulk cache lookup, so that
+        arun does not look them up a second time.
+        """
+        if not self._can_prefetch_cache(config):
+            return config
+        if self._effective_cache_mode(config) == CacheMode.ENABLED:
+            return config.clone(cache_mode=CacheMode.WRITE_ONLY)
+        return config.clone(cache_mode=CacheMode.BYPASS)
+
+    async def _aprefetch_cache(
+        self,
+        urls: List[str],
+        config: CrawlerRunConfig,
+        misses: List[str],
+        reprocess: List[str],
+    ) -> AsyncGenerator[CrawlerTaskResult, None]:
+        """
+        Resolve the cache status of many URLs with one query per chunk.
+
+        Yields a CrawlerTaskResult for every cache hit as soon as its chunk is
+        resolved and appends the remaining URLs to misses. Pages cached under a
+        different processing configuration are appended to reprocess, so that the
+        dispatcher runs them with its concurrency and rate limits.
+
+        Args:
+            urls: URLs to resolve
+            config: Configuration of the batch
+            misses: List receiving URLs that must be crawled
+            reprocess: List receiving cached URLs whose processing variant is missing
+        """
+        if not self._can_prefetch_cache(config):
+            misses.extend(urls)
+            return
+
+        cache_mode = self._effective_cache_mode(config)
+        config_hash = config.processing_hash()
+        served = 0
+        for i in range(0, len(urls), CACHE_PREFETCH_CHUNK_SIZE):
+            chunk = urls[i : i + CACHE_PREFETCH_CHUNK_SIZE]
+            cacheable = [
+                url
+                for url in chunk
+                if CacheContext(url, cache_mode, self.always_bypass_cache).should_read()
+            ]
+            redirects = (
+                await async_db_manager.aget_redirects(cacheable) if cacheable else {}
+            )
+            cached = (
+                await async_db_manager.aget_cached_urls(
+                    [redirects.get(url, url) for url in cacheable],
+                    config_hash=config_hash,
+                )
+                if cacheable
+                else {}
+            )
+            uncached = [
+                url for url in cacheable if redirects.get(url, url) not in cached
+            ]
+            failures = (
+                await async_db_manager.aget_failures(uncached)
+                if uncached and not config.retry_failed
+                else {}
+            )
+
+            for url in chunk:
+                cache_url = redirects.get(url, url)
+                cached_result = cached.get(cache_url)
+                start_time = datetime.now()
+                if url in failures:
+                    cached_result = self._failed_url_result(url, failures[url])
+                elif (
+                    not cached_result
+                    or not cached_result.html
+                    or (config.screenshot and not cached_result.screenshot)
+                ):
+                    misses.append(url)
+                    continue
+                elif cached_result.cleaned_html is None:
+                    # Cached under another processing config, arun reprocesses it
+                    reprocess.append(url)
+                    continue
+                else:
+                    # Several known redirects may lead to the same cached page
+                    cached_result = cached_result.model_copy(update={"url": url})
+                    cached_result.success = True
+                    cached_result.session_id = getattr(config, "session_id", None)
+                    cached_result.redirected_url = (
+                        cached_result.redirected_url or cache_url
+                    )
+                served += 1
+                yield CrawlerTaskResult(
+                    task_id=str(uuid.uuid4()),
+                    url=url,
+                    result=cached_result,
+                    memory_usage=0.0,
+                    peak_memory=0.0,
+                    start_time=start_time,
+                    end_time=datetime.now(),
+                )
+
+        if served:
+            self.logger.info(
+                message="Served {served} of {total} URLs from cache",
+                tag="CACHE",
+                params={"served": served, "total": len(urls)},
+            )
+
+    @staticmethod
+    def _with_cache_key(result: CrawlResult, cache_url: str) -> CrawlResult:
+        """result to store under cache_url, the final URL of a redirected page"""
+        if result.url == cache_url:
+            return result
+        return result.model_copy(update={"url": cache_url})
+
+    def _failed_url_result(self, url: str, failure: dict) -> CrawlResult:
+        """Result for a URL skipped because of a recent failure, see arecord_failure"""
+        retry_in = max(0.0, failure["retry_at"] - time.time())
+        self.logger.info(
+            message="{url:.50}... | Skipped, failed {failures} time(s) ({error_class}), retry in {retry_in:.0f}s",
+            tag="CACHE",
+            params={"url": url, "retry_in": retry_in, **failure},
+        )
+        return CrawlResult(
+            url=url,
+            html="",
+            success=False,
+            status_code=failure["status_code"],
+            error_message=(
+                f"Skipped: failed {failure['failures']} time(s) recently "
+                f"({failure['error_class']}), retry in {retry_in:.0f}s. "
+                f"Last error: {failure['error_message']}. "
+                "Set retry_failed=True to crawl it anyway."
+            ),
+        )
+
+    def _cache_ttl(
+        self, config: CrawlerRunConfig, response_headers: Optional[dict]
+    ) -> Optional[float]:
+        """Resolve the TTL of a cache entry from the config and, if enabled, the response headers"""
+        ttl = config.cache_ttl
+        if config.cache_ttl_from_headers:
+            header_ttl = get_cache_ttl_from_headers(response_headers)
+            if header_ttl is not None:
+                ttl = header_ttl
+        return ttl
+
+    async def _aget_unchanged_cached(
+        self, url: str, html: str, config: CrawlerRunConfig, config_hash: str
+    ) -> Optional[CrawlResult]:
+        """
+        Return the cached result for url if freshly fetched html matches the cached copy.
+
+        The stored content hash is compared first, so unchanged pages are detected without
+        loading the cached html. With config.normalize_volatile_content, pages that differ
+        only in volatile tokens (nonces, CSRF tokens, timestamps) also count as unchanged.
+
+        Returns:
+            The cached result carrying the fresh html, or None if the page must be processed.
+        """
+        cached_hash = await async_db_manager.aget_html_hash(url)
+        if not cached_hash:
+            return None
+        identical = generate_content_hash(html) == cached_hash
+        if not identical and not config.normalize_volatile_content:
+            return None
+
+        cached = await async_db_manager.aget_cached_url(
+            url, include_expired=True, config_hash=config_hash
+        )
+        # Derived fields for this processing configuration are not cached yet
+        if not cached or cached.cleaned_html is None:
+            return None
+        if not identical and normalize_volatile_html(html) != normalize_volatile_html(
+            cached.html
+        ):
+            return None
+
+        cached.html = html
+        self.logger.info(
+            message="{url:.50}... | Content unchanged, reusing cached result",
+            tag="CACHE",
+            params={"url": url},
+        )
+        return cached
+
+    async def _arevalidate_cached(
+        self, url: str, cached_result: CrawlResult, config: CrawlerRunConfig
+    ) -> Optional[CrawlResult]:
+        """
+        Revalidate a stale cache entry with a conditional request.
+
+        Sends the stored ETag / Last-Modified validators. On 304 Not Modified the entry's
+        freshness is renewed and it is served as-is, without running the scraping and
+        extraction pipeline again.
+
+        Returns:
+            The cached result if it is still valid, None if the page has to be fetched again.
+        """
+        stored_headers = cached_result.response_headers or {}
+        validators = {k.lower(): v for k, v in stored_headers.items()}
+        request_headers = {}
+        if validators.get("etag"):
+            request_headers["If-None-Match"] = validators["etag"]
+        if validators.get("last-modified"):
+            request_headers["If-Modified-Since"] = validators["last-modified"]
+        if not request_headers:
+            return None
+
+        request_headers.update(self.browser_config.headers or {})
+        if self.browser_config.user_agent:
+            request_headers["User-Agent"] = self.browser_config.user_agent
+
+        if self._http_session is None or self._http_session.closed:
+            self._http_session = aiohttp.ClientSession()
+
+        t1 = time.perf_counter()
+        try:
+            async with self._http_session.get(
+                url,
+                headers=request_headers,
+                proxy=self.browser_config.proxy,
+                allow_redirects=False,
+                timeout=aiohttp.ClientTimeout(total=config.page_timeout / 1000),
+            ) as response:
+                status = response.status
+                response_headers = dict(response.headers)
+        except Exception as e:
+            self.logger.warning(
+                message="Revalidation of {url} failed: {error}",
+                tag="CACHE",
+                params={"url": url, "error": str(e)},
+            )
+            return None
+
+        if status != 304:
+            return None
+
+        # A 304 may carry updated validators and caching headers
+        headers = {**stored_headers, **response_headers}
+        await async_db_manager.arefresh_url(
+            url, ttl=self._cache_ttl(config, headers), response_headers=headers
+        )
+        cached_result.response_headers = headers
+        self.logger.info(
+            message="{url:.50}... | Not modified ({timing:.2f}s)",
+            tag="CACHE",
+            params={"url": url, "timing": time.perf_counter() - t1},
+        )
+        return cached_result
 
     async def aclear_cache(self):
-        """Clear the cache database."""
-        await async_db_manager.cleanup()
+        """Clear the cache database and its stored content files."""
+        await async_db_manager.aclear_db()
 
     async def aflush_cache(self):
         """Flush the cache database."""
@@ -820,3 +1400,209 @@ class AsyncWebCrawler:
     async def aget_cache_size(self):
         """Get the total number of cached items."""
         return await async_db_manager.aget_total_count()
+
+    async def aget_version(self, url: str, n: int = -1) -> Optional[dict]:
+        """Get version n of a page kept with cache_versions, -1 being the latest."""
+        return await async_db_manager.aget_version(url, n)
+
+    async def adiff(self, url: str, a: int, b: int, field: str = "html") -> Optional[str]:
+        """Unified diff of the html or markdown of two versions of a page."""
+        return await async_db_manager.adiff(url, a, b, field=field)
+
+    async def aexport_cache(self, path: str, **kwargs) -> int:
+        """
+        Export the cache to a Parquet or JSONL file, see CacheExporter.aexport.
+
+        Returns:
+            int: Number of exported rows.
+        """
+        return await CacheExporter(async_db_manager).aexport(path, **kwargs)
+
+    async def areprocess_cache(
+        self,
+        url_filter: Optional[Union[str, Callable[[str], bool]]] = None,
+        config: Optional[CrawlerRunConfig] = None,
+        max_workers: Optional[int] = None,
+        batch_size: int = CACHE_REPROCESS_BATCH_SIZE,
+        resume: bool = True,
+        job_id: Optional[str] = None,
+        progress_callback: Optional[Callable[[dict], None]] = None,
+    ) -> dict:
+        """
+        Reprocess cached pages with a new configuration, without fetching anything.
+
+        Cached html is streamed from the cache database in batches and processed in a
+        pool of worker processes. The results are stored as processing variants of the
+        cached pages, so later arun calls with the same configuration are served from
+        the cache. The browser is never started.
+
+        Progress is saved with every batch; an interrupted job started again with the
+        same filter and configuration continues after the last stored batch. Callables
+        can't be told apart reliably (closures share their code), so progress of a job
+        with a callable filter is only saved when it is given a job_id.
+
+        Args:
+            url_filter: SQLite GLOB pattern on the URL (e.g. "https://example.com/blog/*"),
+                or a callable returning True for URLs to reprocess. Defaults to all pages.
+            config: Processing configuration. Defaults to CrawlerRunConfig().
+            max_workers: Worker processes, defaults to the CPU count. 0 processes in this process.
+            batch_size: Pages per batch and write transaction.
+            resume: Whether to continue an interrupted job instead of starting over.
+            job_id: Identifier for saving progress, derived from a pattern filter and config
+                by default.
+            progress_callback: Called with the job stats after each batch, may be a coroutine function.
+
+        Returns:
+            dict: Job stats with job_id (None if progress is not saved), processed,
+                failed and skipped counts.
+        """
+        config = config or CrawlerRunConfig()
+        config_hash = config.processing_hash()
+        url_pattern = url_filter if isinstance(url_filter, str) else None
+        url_predicate = url_filter if callable(url_filter) else None
+        if job_id is None and url_predicate is None:
+            job_id = generate_content_hash(f"{config_hash}:{url_pattern or ''}")
+
+        progress = (
+            await async_db_manager.aget_reprocess_progress(job_id)
+            if resume and job_id
+            else None
+        )
+        stats = {
+            "job_id": job_id,
+            "processed": progress["processed"] if progress else 0,
+            "failed": 0,
+            "skipped": 0,
+        }
+        if progress:
+            self.logger.info(
+                message="Resuming reprocess job {job_id} after {url}",
+                tag="CACHE",
+                params={"job_id": job_id, "url": progress["last_url"]},
+            )
+
+        pool = self._create_reprocess_pool(config, max_workers)
+        loop = asyncio.get_running_loop()
+        try:
+            async for batch in async_db_manager.aiter_cached_pages(
+                url_pattern,
+                after_url=progress["last_url"] if progress else None,
+                batch_size=batch_size,
+            ):
+                pages = [
+                    (url, html)
+                    for url, html in batch
+                    if url_predicate is None or url_predicate(url)
+                ]
+                stats["skipped"] += len(batch) - len(pages)
+                if pool:
+                    tasks = [
+                        loop.run_in_executor(pool, _reprocess_page, url, html)
+                        for url, html in pages
+                    ]
+                else:
+                    tasks = [
+                        self._areprocess_page(url, html, config) for url, html in pages
+                    ]
+                outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+
+                results = []
+                for (url, _), outcome in zip(pages, outcomes):
+                    if isinstance(outcome, BaseException):
+                        stats["failed"] += 1
+                        self.logger.error_status(
+                            url=url,
+                            error=f"Reprocessing failed: {outcome}",
+                            tag="CACHE",
+                        )
+                    else:
+                        results.append(outcome)
+                stats["processed"] += len(results)
+
+                await async_db_manager.acache_variants(
+                    results,
+                    config_hash,
+                    progress=(job_id, batch[-1][0], stats["processed"]) if job_id else None,
+                )
+                self.logger.info(
+                    message="Reprocessed {processed} pages ({failed} failed)",
+                    tag="CACHE",
+                    params=stats,
+                )
+                if progress_callback:
+                    callback_result = progress_callback(dict(stats))
+                    if asyncio.iscoroutine(callback_result):
+                        await callback_result
+        finally:
+            if pool:
+                pool.shutdown(cancel_futures=True)
+
+        if job_id:
+            await async_db_manager.aclear_reprocess_progress(job_id)
+        return stats
+
+    def _create_reprocess_pool(
+        self, config: CrawlerRunConfig, max_workers: Optional[int]
+    ) -> Optional[ProcessPoolExecutor]:
+        """Worker pool for areprocess_cache, None to process in this process."""
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        if max_workers <= 0:
+            return None
+        try:
+            config_data = pickle.dumps(config)
+        except Exception as e:
+            self.logger.warning(
+                message="Config can't be sent to worker processes, reprocessing in this process: {error}",
+                tag="CACHE",
+                params={"error": str(e)},
+            )
+            return None
+        # Spawned workers don't inherit the event loop or database threads of this process
+        return ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_reprocess_worker,
+            initargs=(config_data,),
+        )
+
+    async def _areprocess_page(
+        self, url: str, html: str, config: CrawlerRunConfig
+    ) -> CrawlResult:
+        return await self.aprocess_html(
+            url=url,
+            html=html,
+            extracted_content=None,
+            config=config,
+            screenshot=None,
+            pdf_data=None,
+            verbose=False,
+        )
+
+    async def arun_cache_maintenance(self, max_cache_size: Optional[int] = None):
+        """
+        Run one cache maintenance pass: drop expired entries, evict least recently
+        used entries beyond the size limit and garbage collect unreferenced content files.
+        """
+        await async_db_manager.aexpire_entries()
+        await async_db_manager.aenforce_size_limit(max_cache_size or self.cache_max_size)
+        await async_db_manager.agc_content()
+
+
+# State of an areprocess_cache worker process, set up by _init_reprocess_worker
+_reprocess_worker = {}
+
+
+def _init_reprocess_worker(config_data: bytes):
+    """Build the processing crawler of a reprocess worker; it has no browser and never fetches."""
+    crawler = AsyncWebCrawler(crawler_strategy=ReplayCrawlerStrategy([]), verbose=False)
+    _reprocess_worker["crawler"] = crawler
+    _reprocess_worker["config"] = pickle.loads(config_data)
+    _reprocess_worker["loop"] = asyncio.new_event_loop()
+
+
+def _reprocess_page(url: str, html: str) -> CrawlResult:
+    crawler = _reprocess_worker["crawler"]
+    return _reprocess_worker["loop"].run_until_complete(
+        crawler._areprocess_page(url, html, _reprocess_worker["config"])
+    )
@@ -0,0 +1,479 @@
+"""
+Storage backends for the page cache.
+
+By default AsyncDatabaseManager keeps cached pages in SQLite, with their content in
+files on disk. A CacheBackend replaces that page store, e.g. with LMDB when many
+concurrent writers contend for SQLite's single write lock.
+
+Usage:
+    crawler = AsyncWebCrawler(cache_backend="lmdb")
+    # or
+    crawler = AsyncWebCrawler(config=BrowserConfig(cache_backend=LMDBCacheBackend(path)))
+"""
+
+import os
+import json
+import time
+import asyncio
+import hashlib
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import (
+    Optional,
+    Dict,
+    List,
+    Tuple,
+    Union,
+    AsyncIterator,
+    Protocol,
+    runtime_checkable,
+    TYPE_CHECKING,
+)
+
+from .models import CrawlResult, MarkdownGenerationResult
+from .config import CACHE_LMDB_MAP_SIZE, CACHE_PREFETCH_CHUNK_SIZE
+
+if TYPE_CHECKING:
+    from .async_database import AsyncDatabaseManager
+
+
+@dataclass
+class CacheEntry:
+    """
+    A cached page.
+
+    Attributes:
+        result: The cached crawl result.
+        created_at: Time the page was cached.
+        expires_at: Time the entry expires, None to keep it until deleted.
+        config_hash: Processing configuration hash the derived fields were produced with.
+    """
+
+    result: CrawlResult
+    created_at: float
+    expires_at: Optional[float] = None
+    config_hash: Optional[str] = None
+
+    @property
+    def url(self) -> str:
+        return self.result.url
+
+    def is_expired(self, now: Optional[float] = None) -> bool:
+        return self.expires_at is not None and self.expires_at <= (now or time.time())
+
+
+@runtime_checkable
+class CacheBackend(Protocol):
+    """
+    Key-value store of cache entries keyed by URL.
+
+    Backends store and return entries as they are, expired ones included;
+    expiry and processing variants are handled by AsyncDatabaseManager.
+
+    A backend may also implement `async def usage() -> List[Tuple[str, float, int]]`,
+    the url, created_at and size in bytes of every entry, to spare the size limit
+    of AsyncDatabaseManager from reading all entries.
+    """
+
+    async def get(self, url: str) -> Optional[CacheEntry]:
+        """Get the entry of url, None if it is not cached"""
+        ...
+
+    async def put(self, entry: CacheEntry) -> None:
+        """Store entry, replacing any entry with the same URL"""
+        ...
+
+    async def bulk_get(self, urls: List[str]) -> Dict[str, CacheEntry]:
+        """Get the entries of several URLs; misses are absent from the result"""
+        ...
+
+    async def delete(self, url: str) -> bool:
+        """Delete the entry of url, returning whether it existed"""
+        ...
+
+    def iterate(self, start_after: Optional[str] = None) -> AsyncIterator[CacheEntry]:
+        """Iterate over all entries in URL order, optionally after a given URL"""
+        ...
+
+    async def count(self) -> int:
+        """Number of stored entries"""
+        ...
+
+    async def clear(self) -> None:
+        """Delete all entries"""
+        ...
+
+    async def close(self) -> None:
+        """Release the resources held by the backend"""
+        ...
+
+
+# CrawlResult fields kept in the entry metadata; html, cleaned_html, markdown,
+# extracted_content and screenshot are stored as separate blobs
+META_FIELDS = (
+    "url",
+    "success",
+    "media",
+    "links",
+    "metadata",
+    "response_headers",
+    "downloaded_files",
+    "status_code",
+    "redirected_url",
+)
+
+
+def entry_to_record(entry: CacheEntry) -> Tuple[dict, Dict[str, bytes]]:
+    """Split an entry into JSON serializable metadata and its text blobs"""
+    result = entry.result
+    meta = {field: getattr(result, field) for field in META_FIELDS}
+    meta["created_at"] = entry.created_at
+    meta["expires_at"] = entry.expires_at
+    meta["config_hash"] = entry.config_hash
+
+    markdown = result.markdown_v2 or result.markdown
+    if isinstance(markdown, str):
+        markdown = MarkdownGenerationResult(
+            raw_markdown=markdown, markdown_with_citations="", references_markdown=""
+        )
+    texts = {
+        "html": result.html,
+        "cleaned_html": result.cleaned_html,
+        "markdown": markdown.model_dump_json() if markdown is not None else None,
+        "extracted_content": result.extracted_content,
+        "screenshot": result.screenshot,
+    }
+    blobs = {
+        field: text.encode("utf-8") for field, text in texts.items() if text is not None
+    }
+    meta["blobs"] = sorted(blobs)
+    meta["size"] = sum(len(blob) for blob in blobs.values())
+    return meta, blobs
+
+
+def entry_size(entry: CacheEntry) -> int:
+    """Size in bytes of the text blobs of an entry"""
+    return entry_to_record(entry)[0]["size"]
+
+
+def record_to_entry(meta: dict, blobs: Dict[str, bytes]) -> CacheEntry:
+    """Rebuild an entry from its metadata and blobs, see entry_to_record"""
+    fields = {field: meta.get(field) for field in META_FIELDS}
+    texts = {field: blob.decode("utf-8") for field, blob in blobs.items()}
+    fields["html"] = texts.get("html", "")
+    fields["cleaned_html"] = texts.get("cleaned_html")
+    fields["extracted_content"] = texts.get("extracted_content")
+    fields["screenshot"] = texts.get("screenshot")
+    if "markdown" in texts:
+        markdown = MarkdownGenerationResult.model_validate_json(texts["markdown"])
+        fields["markdown_v2"] = markdown
+        fields["markdown"] = markdown.raw_markdown
+    fields["media"] = fields["media"] or {}
+    fields["links"] = fields["links"] or {}
+    return CacheEntry(
+        result=CrawlResult(**fields),
+        created_at=meta["created_at"],
+        expires_at=meta.get("expires_at"),
+        config_hash=meta.get("config_hash"),
+    )
+
+
+class SQLiteCacheBackend:
+    """
+    CacheBackend over the built-in SQLite page store of an AsyncDatabaseManager.
+
+    This is the store AsyncDatabaseManager uses when no backend is set; the
+    adapter exposes it through the CacheBackend interface.
+    """
+
+    def __init__(self, db_manager: "AsyncDatabaseManager"):
+        if db_manager.backend is not None:
+            raise ValueError("db_manager must use the built-in SQLite page store")
+        self.db_manager = db_manager
+
+    async def get(self, url: str) -> Optional[CacheEntry]:
+        return (await self.bulk_get([url])).get(url)
+
+    async def put(self, entry: CacheEntry) -> None:
+        ttl = entry.expires_at - time.time() if entry.expires_at is not None else None
+        await self.db_manager.acache_url(
+            entry.result, ttl=ttl, config_hash=entry.config_hash
+        )
+
+    async def bulk_get(self, urls: List[str]) -> Dict[str, CacheEntry]:
+        results = await self.db_manager.aget_cached_urls(urls, include_expired=True)
+        times = await self.db_manager.aget_entry_times(list(results))
+        return {
+            url: CacheEntry(result, *times[url])
+            for url, result in results.items()
+            if url in times
+        }
+
+    async def delete(self, url: str) -> bool:
+        return await self.db_manager.adelete_url(url)
+
+    async def iterate(self, start_after: Optional[str] = None) -> AsyncIterator[CacheEntry]:
+        last_url = start_after or ""
+        while True:
+            urls = await self.db_manager.aget_urls_after(
+                last_url, CACHE_PREFETCH_CHUNK_SIZE
+            )
+            if not urls:
+                return
+            entries = await self.bulk_get(urls)
+            for url in urls:
+                if url in entries:
+                    yield entries[url]
+            last_url = urls[-1]
+
+    async def count(self) -> int:
+        return await self.db_manager.aget_total_count()
+
+    async def clear(self) -> None:
+        await self.db_manager.aclear_db()
+
+    async def close(self) -> None:
+        await self.db_manager.cleanup()
+
+
+class _ReadWriteLock:
+    """Lock shared by any number of threads or held by one; exclusive waiters go first"""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._shared = 0
+        self._exclusive = False
+        self._exclusive_waiting = 0
+
+    @contextmanager
+    def shared(self):
+        with self._condition:
+            while self._exclusive or self._exclusive_waiting:
+                self._condition.wait()
+            self._shared += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._shared -= 1
+                if not self._shared:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def exclusive(self):
+        with self._condition:
+            self._exclusive_waiting += 1
+            while self._exclusive or self._shared:
+                self._condition.wait()
+            self._exclusive_waiting -= 1
+            self._exclusive = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._exclusive = False
+                self._condition.notify_all()
+
+
+class LMDBCacheBackend:
+    """
+    CacheBackend storing entries in an LMDB environment.
+
+    Entry metadata and text blobs live in two memory-mapped B-trees. Readers never
+    block and writes are short transactions, so many concurrent crawlers can share
+    the cache. The map grows automatically when it fills up; LMDB forbids resizing
+    while any transaction of the process is open, so transactions hold a shared lock
+    and resizing an exclusive one.
+
+    Requires the lmdb package: pip install "crawl4ai[lmdb]"
+    """
+
+    # Entries read per transaction while iterating
+    ITERATE_BATCH_SIZE = 100
+
+    def __init__(self, path: str, map_size: int = CACHE_LMDB_MAP_SIZE, **lmdb_kwargs):
+        """
+        Open or create the LMDB environment.
+
+        Args:
+            path: Directory of the LMDB environment.
+            map_size: Initial maximum size of the environment in bytes.
+            **lmdb_kwargs: Additional arguments for lmdb.open.
+        """
+        try:
+            import lmdb
+        except ImportError:
+            raise ImportError(
+                "LMDBCacheBackend requires the lmdb package. "
+                'Install it with: pip install "crawl4ai[lmdb]"'
+            )
+        self._lmdb = lmdb
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.env = lmdb.open(path, map_size=map_size, max_dbs=2, **lmdb_kwargs)
+        self._lock = _ReadWriteLock()
+        self._entries = self.env.open_db(b"entries")
+        self._blobs = self.env.open_db(b"blobs")
+        self._max_key_size = self.env.max_key_size()
+
+    def _entry_key(self, url: str) -> bytes:
+        """URL as key, long URLs truncated with a digest so keys stay in URL order"""
+        key = url.encode("utf-8")
+        if len(key) <= self._max_key_size:
+            return key
+        digest = hashlib.sha256(key).hexdigest()[:32].encode()
+        return key[: self._max_key_size - len(digest) - 1] + b"\0" + digest
+
+    @staticmethod
+    def _blob_key(url: str, field: str) -> bytes:
+        return hashlib.sha256(url.encode("utf-8")).digest() + field.encode()
+
+    def _read(self, txn, value: bytes) -> CacheEntry:
+        meta = json.loads(value)
+        blobs = {
+            field: txn.get(self._blob_key(meta["url"], field), db=self._blobs)
+            for field in meta["blobs"]
+        }
+        return record_to_entry(meta, {f: b for f, b in blobs.items() if b is not None})
+
+    def _delete(self, txn, url: str) -> bool:
+        value = txn.pop(self._entry_key(url), db=self._entries)
+        if value is None:
+            return False
+        for field in json.loads(value)["blobs"]:
+            txn.delete(self._blob_key(url, field), db=self._blobs)
+        return True
+
+    def _write(self, operation, *args):
+        """Run operation in a write transaction, growing the map when it is full"""
+        while True:
+            with self._lock.shared():
+                map_size = self.env.info()["map_size"]
+                try:
+                    with self.env.begin(write=True) as txn:
+                        return operation(txn, *args)
+                except self._lmdb.MapFullError:
+                    pass
+            with self._lock.exclusive():
+                # Another writer may have grown the map in the meantime
+                if self.env.info()["map_size"] == map_size:
+                    self.env.set_mapsize(map_size * 2)
+
+    def _get_many(self, urls: List[str]) -> Dict[str, CacheEntry]:
+        entries = {}
+        with self._lock.shared(), self.env.begin() as txn:
+            for url in urls:
+                value = txn.get(self._entry_key(url), db=self._entries)
+                if value is not None:
+                    entries[url] = self._read(txn, value)
+        return entries
+
+    def _put(self, txn, entry: CacheEntry):
+        meta, blobs = entry_to_record(entry)
+        self._delete(txn, entry.url)
+        txn.put(
+            self._entry_key(entry.url), json.dumps(meta).encode(), db=self._entries
+        )
+        for field, blob in blobs.items():
+            txn.put(self._blob_key(entry.url, field), blob, db=self._blobs)
+
+    def _read_usage(self, txn, value: bytes) -> Tuple[str, float, int]:
+        meta = json.loads(value)
+        size = meta.get("size")
+        if size is None:  # Stored before sizes were recorded
+            size = sum(
+                len(txn.get(self._blob_key(meta["url"], field), b"", db=self._blobs))
+                for field in meta["blobs"]
+            )
+        return meta["url"], meta["created_at"], size
+
+    def _scan(self, start_after: Optional[bytes], read=None) -> List[Tuple[bytes, object]]:
+        """Next batch of (key, read(txn, value)) pairs, entries by default"""
+        read = read or self._read
+        batch = []
+        with self._lock.shared(), self.env.begin() as txn:
+            cursor = txn.cursor(db=self._entries)
+            found = cursor.set_range(start_after) if start_after else cursor.first()
+            if found and start_after and cursor.key() == start_after:
+                found = cursor.next()
+            while found and len(batch) < self.ITERATE_BATCH_SIZE:
+                batch.append((cursor.key(), read(txn, cursor.value())))
+                found = cursor.next()
+        return batch
+
+    def _clear(self, txn):
+        txn.drop(self._entries, delete=False)
+        txn.drop(self._blobs, delete=False)
+
+    async def get(self, url: str) -> Optional[CacheEntry]:
+        return (await self.bulk_get([url])).get(url)
+
+    async def put(self, entry: CacheEntry) -> None:
+        await asyncio.to_thread(self._write, self._put, entry)
+
+    async def bulk_get(self, urls: List[str]) -> Dict[str, CacheEntry]:
+        return await asyncio.to_thread(self._get_many, list(dict.fromkeys(urls)))
+
+    async def delete(self, url: str) -> bool:
+        return await asyncio.to_thread(self._write, self._delete, url)
+
+    async def iterate(self, start_after: Optional[str] = None) -> AsyncIterator[CacheEntry]:
+        key = self._entry_key(start_after) if start_after else None
+        while True:
+            batch = await asyncio.to_thread(self._scan, key)
+            for _, entry in batch:
+                yield entry
+            if len(batch) < self.ITERATE_BATCH_SIZE:
+                return
+            key = batch[-1][0]
+
+    async def usage(self) -> List[Tuple[str, float, int]]:
+        """url, created_at and size of every entry, read from the metadata only"""
+        usage = []
+        key = None
+        while True:
+            batch = await asyncio.to_thread(self._scan, key, self._read_usage)
+            usage.extend(row for _, row in batch)
+            if len(batch) < self.ITERATE_BATCH_SIZE:
+                return usage
+            key = batch[-1][0]
+
+    async def count(self) -> int:
+        def _count():
+            with self._lock.shared(), self.env.begin() as txn:
+                return txn.stat(self._entries)["entries"]
+
+        return await asyncio.to_thread(_count)
+
+    async def clear(self) -> None:
+        await asyncio.to_thread(self._write, self._clear)
+
+    async def close(self) -> None:
+        def _close():
+            with self._lock.exclusive():
+                self.env.close()
+
+        await asyncio.to_thread(_close)
+
+
+def create_cache_backend(
+    backend: Optional[Union[str, CacheBackend]], base_directory: str
+) -> Optional[CacheBackend]:
+    """
+    Resolve a cache backend setting.
+
+    Args:
+        backend: "sqlite" or None for the built-in store, "lmdb", or a CacheBackend instance.
+        base_directory: Directory for backend files, usually ~/.crawl4ai.
+
+    Returns:
+        The backend to use, None for the built-in SQLite store.
+    """
+    if backend is None or backend == "sqlite":
+        return None
+    if backend == "lmdb":
+        return LMDBCacheBackend(os.path.join(base_directory, "cache.lmdb"))
+    if isinstance(backend, CacheBackend):
+        return backend
+    raise ValueError(f"Unknown cache backend: {backend!r}")
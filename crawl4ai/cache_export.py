@@ -0,0 +1,164 @@
+import gzip
+import json
+import asyncio
+from datetime import datetime
+from typing import List, Optional, Union
+
+from .async_database import AsyncDatabaseManager, async_db_manager
+from .config import CACHE_EXPORT_CHUNK_SIZE
+
+# Columns exported when none are selected; screenshots are left out as they are large
+DEFAULT_EXPORT_COLUMNS = [
+    "url",
+    "success",
+    "created_at",
+    "expires_at",
+    "html",
+    "cleaned_html",
+    "markdown",
+    "fit_markdown",
+    "extracted_content",
+    "media",
+    "links",
+    "metadata",
+    "response_headers",
+]
+
+
+class CacheExporter:
+    """
+    Streams the cache into Parquet or JSONL files for analytics.
+
+    Entries are read and written in chunks, so memory use does not grow with the
+    size of the cache. Each chunk becomes a row group of the Parquet file.
+
+    Parquet output requires pyarrow: pip install pyarrow
+
+    Usage:
+        exporter = CacheExporter()
+        await exporter.aexport("cache.parquet", columns=["url", "markdown"],
+                               url_pattern="https://example.com/*")
+    """
+
+    def __init__(
+        self,
+        db_manager: Optional[AsyncDatabaseManager] = None,
+        chunk_size: int = CACHE_EXPORT_CHUNK_SIZE,
+    ):
+        """
+        Initialize the exporter.
+
+        Args:
+            db_manager: Database manager to export. Defaults to the shared cache.
+            chunk_size: Rows read and written per chunk.
+        """
+        self.db_manager = db_manager or async_db_manager
+        self.chunk_size = chunk_size
+
+    async def aexport(
+        self,
+        path: str,
+        format: Optional[str] = None,
+        columns: Optional[List[str]] = None,
+        url_pattern: Optional[str] = None,
+        since: Optional[Union[float, datetime]] = None,
+        until: Optional[Union[float, datetime]] = None,
+        compression: Optional[str] = "zstd",
+    ) -> int:
+        """
+        Export cached entries to a file.
+
+        Args:
+            path: Output file. A path ending in .gz is gzip compressed for JSONL.
+            format: "parquet" or "jsonl", inferred from the path by default.
+            columns: Columns to export, see AsyncDatabaseManager.aiter_export_rows.
+                Defaults to DEFAULT_EXPORT_COLUMNS.
+            url_pattern: SQLite GLOB pattern URLs must match, e.g. "https://example.com/*".
+            since: Only entries cached at or after this time (epoch seconds or datetime).
+            until: Only entries cached before this time (epoch seconds or datetime).
+            compression: Parquet compression codec, e.g. "zstd", "snappy" or None.
+
+        Returns:
+            int: Number of exported rows.
+        """
+        format = format or self._infer_format(path)
+        columns = columns or DEFAULT_EXPORT_COLUMNS
+        rows = self.db_manager.aiter_export_rows(
+            columns,
+            url_pattern=url_pattern,
+            since=since.timestamp() if isinstance(since, datetime) else since,
+            until=until.timestamp() if isinstance(until, datetime) else until,
+            batch_size=self.chunk_size,
+        )
+        if format == "parquet":
+            return await self._aexport_parquet(path, columns, rows, compression)
+        if format == "jsonl":
+            return await self._aexport_jsonl(path, rows)
+        raise ValueError(f"Unsupported export format: {format}")
+
+    @staticmethod
+    def _infer_format(path: str) -> str:
+        name = path.lower()
+        if name.endswith(".parquet"):
+            return "parquet"
+        if name.endswith((".jsonl", ".jsonl.gz", ".ndjson", ".ndjson.gz")):
+            return "jsonl"
+        raise ValueError(f"Cannot infer the export format of {path}, pass format=")
+
+    async def _aexport_jsonl(self, path: str, rows) -> int:
+        opener = gzip.open if path.lower().endswith(".gz") else open
+        count = 0
+        with opener(path, "wt", encoding="utf-8") as f:
+            async for batch in rows:
+                lines = []
+                for row in batch:
+                    for column in AsyncDatabaseManager.EXPORT_JSON_COLUMNS:
+                        if isinstance(row.get(column), str):
+                            row[column] = json.loads(row[column])
+                    lines.append(json.dumps(row, ensure_ascii=False))
+                await asyncio.to_thread(f.write, "\n".join(lines) + "\n")
+                count += len(batch)
+        return count
+
+    async def _aexport_parquet(
+        self, path: str, columns: List[str], rows, compression: Optional[str]
+    ) -> int:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError(
+                "Parquet export requires pyarrow. Install it with: pip install pyarrow"
+            )
+
+        types = {
+            "success": pa.bool_(),
+            "created_at": pa.float64(),
+            "last_accessed": pa.float64(),
+            "expires_at": pa.float64(),
+            "content_size": pa.int64(),
+        }
+        schema = pa.schema(
+            # Page content can exceed the 2 GB offsets of a regular string column per chunk
+            (
+                column,
+                types.get(
+                    column,
+                    pa.large_string()
+                    if column in AsyncDatabaseManager.EXPORT_CONTENT_COLUMNS
+                    else pa.string(),
+                ),
+            )
+            for column in columns
+        )
+
+        count = 0
+        writer = pq.ParquetWriter(path, schema, compression=compression or "none")
+        try:
+            async for batch in rows:
+                table = pa.Table.from_pylist(batch, schema=schema)
+                await asyncio.to_thread(writer.write_table, table)
+                count += len(batch)
+        finally:
+            writer.close()
+        return count
@@ -84,3 +84,38 @@ SHOW_DEPRECATION_WARNINGS = True
 SCREENSHOT_HEIGHT_TRESHOLD = 10000
 PAGE_TIMEOUT = 60000
 DOWNLOAD_PAGE_TIMEOUT = 60000
+
+# Cache maintenance
+CACHE_GC_BATCH_SIZE = 500  # Rows/files handled per step before yielding to the event loop
+CACHE_GC_GRACE_PERIOD = 60  # Seconds a new content file is protected from garbage collection
+CACHE_ACCESS_FLUSH_INTERVAL = 60  # Seconds access times of cache hits are buffered before they are written
+CACHE_ACCESS_FLUSH_SIZE = 1000  # Buffered access times that are written without waiting for the interval
+CACHE_PREFETCH_CHUNK_SIZE = 500  # URLs resolved per query when arun_many prefetches the cache
+CACHE_EXPORT_CHUNK_SIZE = 500  # Rows read and written per chunk when exporting the cache
+CACHE_LMDB_MAP_SIZE = 1024**3  # Initial map size of the LMDB cache backend, grown when full
+CACHE_REPROCESS_BATCH_SIZE = 200  # Pages per batch and write transaction when reprocessing the cache
+CACHE_VERSION_KEYFRAME_INTERVAL = 10  # Every n-th stored page version is a full copy, the rest are deltas
+NEGATIVE_CACHE_BASE_TTL = 300  # Seconds a failed URL is skipped after its first failure, doubled per repeated failure
+NEGATIVE_CACHE_MAX_TTL = 7 * 86400  # Upper bound of the negative cache backoff
+REDIRECT_CACHE_TTL = 7 * 86400  # Seconds a recorded redirect is followed without requesting its source
+SYNC_CACHE_WRITE_BATCH_SIZE = 50  # Rows committed per transaction by WebCrawler.fetch_pages
+MIGRATION_BATCH_SIZE = 1000  # Rows migrated per transaction by crawl4ai-migrate
+MIGRATION_IO_WORKERS = 8  # Threads writing content files in parallel during migrations
+
+# Content filtering
+BM25_STEM_CACHE_SIZE = 100_000  # Words a BM25ContentFilter keeps stemmed before its cache is reset
+
+# Incremental processing of large pages
+INCREMENTAL_CHUNK_SIZE = 64 * 1024  # Characters of HTML fed to the parser at a time
+INCREMENTAL_SECTION_SIZE = 256 * 1024  # Characters an element may span before its children are processed one by one
+
+# Link processing
+BASE_DOMAIN_CACHE_SIZE = 10_000  # Hosts whose base domain is memoized by get_base_domain
+URL_NORMALIZER_CACHE_SIZE = 4096  # URLs a per-page URLNormalizer memoizes per operation
+
+# Structured extraction
+EXTRACTION_PLAN_CACHE_SIZE = 256  # Schemas whose compiled extraction plans are shared across strategies
+
+# Recrawl scheduling
+CHANGE_RATE_PRIOR = 1 / 86400  # Assumed change rate (per second) of URLs without history: once a day
+CHANGE_RATE_PRIOR_WEIGHT = 7 * 86400  # Seconds of observation the prior is worth
@@ -2,15 +2,18 @@ import re
 import time
 from bs4 import BeautifulSoup, Tag
 from typing import List, Tuple, Dict, Optional
-from rank_bm25 import BM25Okapi
+import numpy as np
 from collections import deque
+from itertools import chain
 from bs4 import NavigableString, Comment
+from lxml import etree
 from .utils import clean_tokens, perform_completion_with_backoff, escape_json_string, sanitize_html, get_home_folder, extract_xml_data
 from abc import ABC, abstractmethod
 import math
 from snowballstemmer import stemmer
-from .config import DEFAULT_PROVIDER, OVERLAP_RATE, WORD_TOKEN_RATE
+from .config import DEFAULT_PROVIDER, OVERLAP_RATE, WORD_TOKEN_RATE, BM25_STEM_CACHE_SIZE
 from .models import TokenUsage
+from .parsed_document import ParsedDocument
 from .prompts import PROMPT_FILTER_CONTENT
 import os
 import json
@@ -20,6 +23,215 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from .async_logger import AsyncLogger, LogLevel
 from colorama import Fore, Style, init
 
+# Serialization rules of BeautifulSoup's HTML tree builder, reproduced on lxml trees
+VOID_ELEMENTS = frozenset(
+    {
+        "area", "base", "br", "col", "embed", "hr", "img", "input", "keygen", "link",
+        "menuitem", "meta", "param", "source", "track", "wbr", "basefont", "bgsound",
+        "command", "frame", "image", "isindex", "nextid", "spacer",
+    }
+)
+MULTI_VALUED_ATTRIBUTES = {
+    "*": {"class", "accesskey", "dropzone"},
+    "a": {"rel", "rev"},
+    "link": {"rel", "rev"},
+    "td": {"headers"},
+    "th": {"headers"},
+    "form": {"accept-charset"},
+    "object": {"archive"},
+    "area": {"rel"},
+    "icon": {"sizes"},
+    "iframe": {"sandbox"},
+    "output": {"for"},
+}
+# libxml2 gives valueless boolean attributes their name as value, BeautifulSoup "".
+# An explicit checked="checked" looks the same, but lxml serializes it valueless,
+# so the crawler's cleaned html never contains one.
+BOOLEAN_ATTRIBUTES = frozenset(
+    {
+        "checked", "compact", "declare", "defer", "disabled", "ismap", "multiple",
+        "nohref", "noresize", "noshade", "nowrap", "readonly", "selected",
+    }
+)
+# Text inside these tags is not part of the text of their ancestors
+STRING_CONTAINER_TAGS = frozenset({"template", "rt", "rp", "script", "style"})
+RAW_TEXT_TAGS = frozenset({"script", "style"})
+PRESERVE_WHITESPACE_TAGS = frozenset({"pre", "textarea"})
+# Inline elements, which don't break the text chunks of extract_text_chunks
+INLINE_TAGS = frozenset(
+    {
+        "a", "abbr", "acronym", "b", "bdo", "big", "br", "button", "cite", "code",
+        "dfn", "em", "i", "img", "input", "kbd", "label", "map", "object", "q",
+        "samp", "script", "select", "small", "span", "strong", "sub", "sup",
+        "textarea", "time", "tt", "var",
+    }
+)
+# Tags that typically contain meaningful headers
+HEADER_TAGS = frozenset({"h1", "h2", "h3", "h4", "h5", "h6", "header"})
+# Dropped by RelevantContentFilter.clean_element
+CLEAN_UNWANTED_TAGS = frozenset({"script", "style", "aside", "form", "iframe", "noscript"})
+CLEAN_UNWANTED_ATTRIBUTES = frozenset(
+    {"style", "onclick", "onmouseover", "align", "bgcolor", "class", "id"}
+)
+ASCII_SPACES = " \n\t\x0c\r"
+
+
+def _collapse_whitespace(text: str) -> str:
+    """Whitespace-only strings outside <pre> and <textarea> become one newline or space"""
+    if text.strip(ASCII_SPACES):
+        return text
+    return "\n" if "\n" in text else " "
+
+
+def _escape_text(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _escaped_len(text: str) -> int:
+    return len(text) + 4 * text.count("&") + 3 * (text.count("<") + text.count(">"))
+
+
+def _attribute_values(element):
+    multi_valued = MULTI_VALUED_ATTRIBUTES["*"] | MULTI_VALUED_ATTRIBUTES.get(
+        element.tag, set()
+    )
+    for key, value in element.items():
+        if key in multi_valued:
+            value = " ".join(value.split())
+        elif key in BOOLEAN_ATTRIBUTES and value == key:
+            value = ""
+        yield key, value
+
+
+def _start_tag_len(element) -> int:
+    """Length of the start tag _start_tag renders"""
+    length = len(element.tag) + 2
+    for key, value in _attribute_values(element):
+        length += len(key) + 4 + _escaped_len(value)
+        if '"' in value and "'" in value:
+            length += 5 * value.count('"')
+    return length
+
+
+def _start_tag(element) -> str:
+    """Start tag of element as BeautifulSoup renders it, attributes sorted"""
+    parts = ["<", element.tag]
+    for key, value in sorted(_attribute_values(element)):
+        value = _escape_text(value)
+        quote = '"'
+        if '"' in value:
+            if "'" in value:
+                value = value.replace('"', "&quot;")
+            else:
+                quote = "'"
+        parts.append(f" {key}={quote}{value}{quote}")
+    parts.append(">")
+    return "".join(parts)
+
+
+def _get_text(element) -> str:
+    """Text of element as BeautifulSoup's get_text() returns it"""
+    parts = []
+    stack = [(element, any(
+        isinstance(ancestor.tag, str) and ancestor.tag in PRESERVE_WHITESPACE_TAGS
+        for ancestor in chain([element], element.iterancestors())
+    ))]
+    while stack:
+        item, preserve = stack.pop()
+        if isinstance(item, str):
+            parts.append(item if preserve else _collapse_whitespace(item))
+            continue
+        contents = [(item.text, preserve)] if item.text else []
+        for child in item:
+            if isinstance(child.tag, str) and child.tag not in STRING_CONTAINER_TAGS:
+                contents.append(
+                    (child, preserve or child.tag in PRESERVE_WHITESPACE_TAGS)
+                )
+            if child.tail:
+                contents.append((child.tail, preserve))
+        stack.extend(reversed(contents))
+    return "".join(parts)
+
+
+def _string(element) -> Optional[str]:
+    """The only string inside element, as BeautifulSoup's .string, else None"""
+    while True:
+        contents = [element.text] if element.text else []
+        for child in element:
+            contents.append(child)
+            if child.tail:
+                contents.append(child.tail)
+        if len(contents) != 1:
+            return None
+        if isinstance(contents[0], str):
+            return contents[0]
+        if not isinstance(contents[0].tag, str):
+            return contents[0].text  # Comment
+        element = contents[0]
+
+
+def _bm25_scores(
+    corpus: List[List[int]],
+    query: List[int],
+    k1: float = 1.5,
+    b: float = 0.75,
+    epsilon: float = 0.25,
+) -> np.ndarray:
+    """
+    BM25 Okapi scores of the documents of corpus for query, as rank_bm25 computes them.
+
+    Documents and query are lists of term ids. The term frequencies are counted into
+    a sparse document-term matrix in coordinate form, and the scores are its product
+    with the idf-weighted query vector, so the cost is linear in the number of
+    tokens rather than in documents times query terms.
+
+    Args:
+        corpus: The term ids of each document.
+        query: The term ids of the query; repeated terms count repeatedly.
+        k1, b, epsilon: BM25 Okapi parameters, idf is floored at epsilon times
+            the average idf.
+
+    Returns:
+        np.ndarray: One score per document.
+    """
+    lengths = np.fromiter(map(len, corpus), dtype=np.int64, count=len(corpus))
+    total = int(lengths.sum())
+    if not total or not query:
+        return np.zeros(len(corpus))
+
+    tokens = np.fromiter(chain.from_iterable(corpus), dtype=np.int64, count=total)
+    vocabulary, terms = np.unique(tokens, return_inverse=True)
+    documents = np.repeat(np.arange(len(corpus)), lengths)
+    cells, frequencies = np.unique(
+        documents * len(vocabulary) + terms, return_counts=True
+    )
+    cell_documents, cell_terms = np.divmod(cells, len(vocabulary))
+
+    document_frequencies = np.bincount(cell_terms, minlength=len(vocabulary))
+    idf = np.log(len(corpus) - document_frequencies + 0.5) - np.log(
+        document_frequencies + 0.5
+    )
+    idf[idf < 0] = epsilon * idf.mean()
+
+    query = np.asarray(query, dtype=np.int64)
+    positions = np.searchsorted(vocabulary, query).clip(max=len(vocabulary) - 1)
+    query_terms = np.zeros(len(vocabulary))
+    np.add.at(query_terms, positions[vocabulary[positions] == query], 1)
+    weights = (query_terms * idf)[cell_terms]
+
+    matched = weights != 0
+    frequencies = frequencies[matched]
+    normalized_lengths = lengths[cell_documents[matched]] / (total / len(corpus))
+    return np.bincount(
+        cell_documents[matched],
+        weights=weights[matched]
+        * frequencies
+        * (k1 + 1)
+        / (frequencies + k1 * (1 - b + b * normalized_lengths)),
+        minlength=len(corpus),
+    )
+
+
 class RelevantContentFilter(ABC):
     """Abstract base class for content filtering strategies"""
 
@@ -98,6 +310,15 @@ class RelevantContentFilter(ABC):
         """Abstract method to be implemented by specific filtering strategies"""
         pass
 
+    def filter_document(self, document: ParsedDocument, **kwargs) -> List[str]:
+        """
+        Filter an already parsed page.
+
+        Strategies that can work on the shared tree or its views override this to
+        avoid parsing the page again; by default the page's html is filtered.
+        """
+        return self.filter_content(document.html, **kwargs)
+
     def extract_page_query(self, soup: BeautifulSoup, body: Tag) -> str:
         """Common method to extract page metadata with fallbacks"""
         if self.user_query:
@@ -147,45 +368,6 @@ class RelevantContentFilter(ABC):
         Returns:
             List of (text, tag_name) tuples
         """
-        # Tags to ignore - inline elements that shouldn't break text flow
-        INLINE_TAGS = {
-            "a",
-            "abbr",
-            "acronym",
-            "b",
-            "bdo",
-            "big",
-            "br",
-            "button",
-            "cite",
-            "code",
-            "dfn",
-            "em",
-            "i",
-            "img",
-            "input",
-            "kbd",
-            "label",
-            "map",
-            "object",
-            "q",
-            "samp",
-            "script",
-            "select",
-            "small",
-            "span",
-            "strong",
-            "sub",
-            "sup",
-            "textarea",
-            "time",
-            "tt",
-            "var",
-        }
-
-        # Tags that typically contain meaningful headers
-        HEADER_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6", "header"}
-
         chunks = []
         current_text = []
         chunk_index = 0
@@ -307,17 +489,6 @@ class RelevantContentFilter(ABC):
         if not tag or not isinstance(tag, Tag):
             return ""
 
-        unwanted_tags = {"script", "style", "aside", "form", "iframe", "noscript"}
-        unwanted_attrs = {
-            "style",
-            "onclick",
-            "onmouseover",
-            "align",
-            "bgcolor",
-            "class",
-            "id",
-        }
-
         # Use string builder pattern for better performance
         builder = []
 
@@ -327,14 +498,16 @@ class RelevantContentFilter(ABC):
                     builder.append(elem.strip())
                 return
 
-            if elem.name in unwanted_tags:
+            if elem.name in CLEAN_UNWANTED_TAGS:
                 return
 
             # Start tag
             builder.append(f"<{elem.name}")
 
             # Add cleaned attributes
-            attrs = {k: v for k, v in elem.attrs.items() if k not in unwanted_attrs}
+            attrs = {
+                k: v for k, v in elem.attrs.items() if k not in CLEAN_UNWANTED_ATTRIBUTES
+            }
             for key, value in attrs.items():
                 builder.append(f' {key}="{value}"')
 
@@ -408,6 +581,9 @@ class BM25ContentFilter(RelevantContentFilter):
             "th": 1.5,  # Table headers
         }
         self.stemmer = stemmer(language)
+        # Memoized term ids of words and their stems, see _tokenize
+        self._word_terms: Dict[str, int] = {}
+        self._stem_terms: Dict[str, int] = {}
 
     def filter_content(self, html: str, min_word_threshold: int = None) -> List[str]:
         """
@@ -426,74 +602,207 @@ class BM25ContentFilter(RelevantContentFilter):
         """
         if not html or not isinstance(html, str):
             return []
+        return self.filter_document(ParsedDocument(html), min_word_threshold)
 
-        soup = BeautifulSoup(html, "lxml")
+    def filter_document(
+        self, document: ParsedDocument, min_word_threshold: int = None
+    ) -> List[str]:
+        """
+        filter_content on a parsed page.
 
-        # Check if body is present
-        if not soup.body:
+        Query, chunks and output are taken from the shared lxml tree, following the
+        BeautifulSoup rules of the base class methods. Words are stemmed once per
+        filter instance, and all chunks are scored with one sparse matrix product.
+        """
+        if not document.html:
+            return []
+
+        if document.tree.find("body") is None:
             # Wrap in body tag if missing
-            soup = BeautifulSoup(f"<body>{html}</body>", "lxml")
-        body = soup.find("body")
+            document = ParsedDocument(f"<body>{document.html}</body>")
+        body = document.tree.find("body")
 
-        query = self.extract_page_query(soup, body)
+        query = self._page_query(document.tree, body)
 
         if not query:
             return []
-            # return [self.clean_element(soup)]
 
-        candidates = self.extract_text_chunks(body, min_word_threshold)
+        candidates = self._text_chunks(body, min_word_threshold)
 
         if not candidates:
             return []
 
-        # Tokenize corpus
-        # tokenized_corpus = [chunk.lower().split() for _, chunk, _, _ in candidates]
-        # tokenized_query = query.lower().split()
+        if len(self._word_terms) > BM25_STEM_CACHE_SIZE:
+            self._word_terms.clear()
+            self._stem_terms.clear()
 
-        # tokenized_corpus = [[ps.stem(word) for word in chunk.lower().split()]
-        #                 for _, chunk, _, _ in candidates]
-        # tokenized_query = [ps.stem(word) for word in query.lower().split()]
+        # Stem, clean from stop words and noise, and map to term ids
+        tokenized_corpus = [self._tokenize(chunk) for _, chunk, _, _ in candidates]
+        tokenized_query = self._tokenize(query)
 
-        tokenized_corpus = [
-            [self.stemmer.stemWord(word) for word in chunk.lower().split()]
-            for _, chunk, _, _ in candidates
-        ]
-        tokenized_query = [
-            self.stemmer.stemWord(word) for word in query.lower().split()
-        ]
+        scores = _bm25_scores(tokenized_corpus, tokenized_query)
 
-        # tokenized_corpus = [[self.stemmer.stemWord(word) for word in tokenize_text(chunk.lower())]
-        #            for _, chunk, _, _ in candidates]
-        # tokenized_query = [self.stemmer.stemWord(word) for word in tokenize_text(query.lower())]
-
-        # Clean from stop words and noise
-        tokenized_corpus = [clean_tokens(tokens) for tokens in tokenized_corpus]
-        tokenized_query = clean_tokens(tokenized_query)
-
-        bm25 = BM25Okapi(tokenized_corpus)
-        scores = bm25.get_scores(tokenized_query)
-
-        # Adjust scores with tag weights
-        adjusted_candidates = []
-        for score, (index, chunk, tag_type, tag) in zip(scores, candidates):
-            tag_weight = self.priority_tags.get(tag.name, 1.0)
-            adjusted_score = score * tag_weight
-            adjusted_candidates.append((adjusted_score, index, chunk, tag))
-
-        # Filter candidates by threshold
-        selected_candidates = [
-            (index, chunk, tag)
-            for adjusted_score, index, chunk, tag in adjusted_candidates
-            if adjusted_score >= self.bm25_threshold
-        ]
+        # Adjust scores with tag weights, keep candidates above the threshold
+        tag_weights = np.fromiter(
+            (self.priority_tags.get(tag.tag, 1.0) for _, _, _, tag in candidates),
+            dtype=float,
+            count=len(candidates),
+        )
+        selected = np.flatnonzero(scores * tag_weights >= self.bm25_threshold)
+
+        # Candidates are in document order
+        return [self._clean_element(candidates[i][3]) for i in selected]
+
+    def _tokenize(self, text: str) -> List[int]:
+        """Term ids of the stemmed words of text that clean_tokens keeps"""
+        terms = []
+        for word in text.lower().split():
+            term = self._word_terms.get(word)
+            if term is None:
+                stem = self.stemmer.stemWord(word)
+                if clean_tokens([stem]):
+                    term = self._stem_terms.setdefault(stem, len(self._stem_terms))
+                else:
+                    term = -1
+                self._word_terms[word] = term
+            if term >= 0:
+                terms.append(term)
+        return terms
+
+    def _page_query(self, tree, body) -> str:
+        """extract_page_query on the lxml tree"""
+        if self.user_query:
+            return self.user_query
 
-        if not selected_candidates:
-            return []
+        query_parts = []
 
-        # Sort selected candidates by original document order
-        selected_candidates.sort(key=lambda x: x[0])
+        title = next(tree.iter("title"), None)
+        if title is not None:
+            title = _string(title)
+            if title:
+                query_parts.append(title)
+
+        h1 = next(tree.iter("h1"), None)
+        if h1 is not None:
+            query_parts.append(_get_text(h1))
+
+        # Meta tags
+        temp = ""
+        for meta_name in ["keywords", "description"]:
+            meta = next(
+                (meta for meta in tree.iter("meta") if meta.get("name") == meta_name),
+                None,
+            )
+            if meta is not None and meta.get("content"):
+                query_parts.append(meta.get("content"))
+                temp += meta.get("content")
+
+        # If still empty, grab first significant paragraph
+        if not temp:
+            for p in body.iter("p"):
+                text = _get_text(p)
+                if len(text) > 150:
+                    query_parts.append(text[:150])
+                    break
+
+        return " ".join(filter(None, query_parts))
+
+    def _text_chunks(self, body, min_word_threshold: int = None) -> List[Tuple]:
+        """
+        extract_text_chunks on the lxml tree.
+
+        Returns (index, text, tag_type, element) tuples in document order, where
+        element is the lxml element that closes the chunk.
+        """
+        chunks = []
+        current_text = []
+
+        def flush(element, tag_type):
+            text = " ".join("".join(current_text).split())
+            if text:
+                chunks.append((len(chunks), text, tag_type, element))
+            current_text.clear()
+
+        stack = [(body, False)]
+        while stack:
+            item, visited = stack.pop()
+
+            if visited:
+                # End of block element - flush accumulated text
+                if current_text and item.tag not in INLINE_TAGS:
+                    flush(item, "header" if item.tag in HEADER_TAGS else "content")
+                continue
+
+            if isinstance(item, str):
+                if item.strip():
+                    current_text.append(item.strip())
+                continue
+
+            contents = [item.text] if item.text else []
+            for child in item:
+                if isinstance(child.tag, str):
+                    contents.append(child)
+                elif child.tag is etree.Comment:
+                    # BeautifulSoup's comments are strings of the page too
+                    contents.append(child.text or "")
+                if child.tail:
+                    contents.append(child.tail)
+            if not contents:
+                continue
+
+            # Mark block for revisit after processing children
+            stack.append((item, True))
+            stack.extend((content, False) for content in reversed(contents))
+
+        # Handle any remaining text
+        if current_text:
+            flush(body, "content")
+
+        if min_word_threshold:
+            chunks = [
+                chunk for chunk in chunks if len(chunk[1].split()) >= min_word_threshold
+            ]
+
+        return chunks
+
+    def _clean_element(self, element) -> str:
+        """clean_element for lxml elements"""
+        output = []
+        stack = [element]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                output.append(item)
+                continue
+            if item.tag in CLEAN_UNWANTED_TAGS:
+                continue
+
+            multi_valued = MULTI_VALUED_ATTRIBUTES["*"] | MULTI_VALUED_ATTRIBUTES.get(
+                item.tag, set()
+            )
+            output.append(f"<{item.tag}")
+            for key, value in item.items():
+                if key in CLEAN_UNWANTED_ATTRIBUTES:
+                    continue
+                if key in multi_valued:
+                    value = value.split()  # BeautifulSoup keeps these as lists
+                elif key in BOOLEAN_ATTRIBUTES and value == key:
+                    value = ""
+                output.append(f' {key}="{value}"')
+            output.append(">")
+
+            contents = [item.text.strip()] if item.text else []
+            for child in item:
+                if isinstance(child.tag, str):
+                    contents.append(child)
+                elif child.tag is etree.Comment and child.text:
+                    contents.append(child.text.strip())
+                if child.tail:
+                    contents.append(child.tail.strip())
+            stack.append(f"</{item.tag}>")
+            stack.extend(reversed(contents))
+        return "".join(output)
 
-        return [self.clean_element(tag) for _, _, tag in selected_candidates]
 
 class PruningContentFilter(RelevantContentFilter):
     """
@@ -605,99 +914,246 @@ class PruningContentFilter(RelevantContentFilter):
         """
         if not html or not isinstance(html, str):
             return []
+        return self.filter_document(ParsedDocument(html), min_word_threshold)
 
-        soup = BeautifulSoup(html, "lxml")
-        if not soup.body:
-            soup = BeautifulSoup(f"<body>{html}</body>", "lxml")
+    def filter_document(
+        self, document: ParsedDocument, min_word_threshold: int = None
+    ) -> List[str]:
+        """
+        filter_content on a parsed page.
 
-        # Remove comments and unwanted tags
-        self._remove_comments(soup)
-        self._remove_unwanted_tags(soup)
+        The metrics of every node are gathered in one bottom-up pass over the lxml
+        tree, so the filter is linear in the size of the page. The shared tree is not
+        modified: pruned nodes are skipped when the kept blocks are rendered. Metrics
+        and output follow BeautifulSoup's text and serialization rules, which the
+        filter was originally written against.
+        """
+        if not document.html:
+            return []
+        if document.tree.find("body") is None:
+            document = ParsedDocument(f"<body>{document.html}</body>")
+        body = document.tree.find("body")
 
-        # Prune tree starting from body
-        body = soup.find("body")
-        self._prune_tree(body)
+        metrics = self._compute_node_metrics(body)
+        removed = self._prune_tree(body, metrics)
+        if body in removed:
+            return []
 
         # Extract remaining content as list of HTML strings
         content_blocks = []
-        for element in body.children:
-            if isinstance(element, str) or not hasattr(element, "name"):
-                continue
-            if len(element.get_text(strip=True)) > 0:
-                content_blocks.append(str(element))
+        for element in self._live_children(body):
+            if element not in removed and self._has_text(element, removed):
+                content_blocks.append(self._render(element, removed))
 
         return content_blocks
 
-    def _remove_comments(self, soup):
-        """Removes HTML comments"""
-        for element in soup(text=lambda text: isinstance(text, Comment)):
-            element.extract()
+    def _live_children(self, node) -> List:
+        """Element children of node, without comments and excluded tags"""
+        return [
+            child
+            for child in node
+            if isinstance(child.tag, str) and child.tag not in self.excluded_tags
+        ]
 
-    def _remove_unwanted_tags(self, soup):
-        """Removes unwanted tags"""
-        for tag in self.excluded_tags:
-            for element in soup.find_all(tag):
-                element.decompose()
+    def _compute_node_metrics(self, body) -> Dict:
+        """
+        Computes text length, space count and serialized inner length of every node.
 
-    def _prune_tree(self, node):
+        Nodes are visited children first, each adding its own strings to the totals
+        of its children. Text inside string containers such as <template> only counts
+        for the container itself.
         """
-        Prunes the tree starting from the given node.
+        nodes = []
+        stack = [(body, self._preserves_whitespace(body))]
+        while stack:
+            node, preserve = stack.pop()
+            nodes.append((node, preserve))
+            stack.extend(
+                (child, preserve or child.tag in PRESERVE_WHITESPACE_TAGS)
+                for child in self._live_children(node)
+            )
 
-        Args:
-            node (Tag): The node from which the pruning starts.
+        metrics = {}
+        for node, preserve in reversed(nodes):
+            tag = node.tag
+            strings = [node.text] if node.text else []
+            strings.extend(child.tail for child in node if child.tail)
+            if not preserve:
+                strings = [_collapse_whitespace(string) for string in strings]
+            text_len = spaces = 0
+            tag_len = 0
+            for string in strings:
+                stripped = string.strip()
+                text_len += len(stripped)
+                spaces += stripped.count(" ")
+                tag_len += len(string) if tag in RAW_TEXT_TAGS else _escaped_len(string)
+            for child in self._live_children(node):
+                child_text_len, child_spaces, child_tag_len = metrics[child]
+                if child.tag not in STRING_CONTAINER_TAGS:
+                    text_len += child_text_len
+                    spaces += child_spaces
+                tag_len += _start_tag_len(child) + child_tag_len
+                if child.tag in VOID_ELEMENTS and not child_tag_len:
+                    tag_len += 1  # <br/>
+                else:
+                    tag_len += len(child.tag) + 3  # </tag>
+            metrics[node] = (text_len, spaces, tag_len)
+        return metrics
+
+    def _prune_tree(self, body, node_metrics: Dict) -> set:
         """
-        if not node or not hasattr(node, "name") or node.name is None:
-            return
-
-        text_len = len(node.get_text(strip=True))
-        tag_len = len(node.encode_contents().decode("utf-8"))
-        link_text_len = sum(
-            len(s.strip())
-            for s in (a.string for a in node.find_all("a", recursive=False))
-            if s
-        )
+        Decides which nodes to prune, starting from the given node.
 
-        metrics = {
-            "node": node,
-            "tag_name": node.name,
-            "text_len": text_len,
-            "tag_len": tag_len,
-            "link_text_len": link_text_len,
-        }
+        A pruned node's descendants are not visited, as they are dropped with it.
 
-        score = self._compute_composite_score(metrics, text_len, tag_len, link_text_len)
+        Args:
+            body: The node from which the pruning starts.
+            node_metrics: Metrics of every node, see _compute_node_metrics.
 
-        if self.threshold_type == "fixed":
-            should_remove = score < self.threshold
-        else:  # dynamic
-            tag_importance = self.tag_importance.get(node.name, 0.7)
-            text_ratio = text_len / tag_len if tag_len > 0 else 0
-            link_ratio = link_text_len / text_len if text_len > 0 else 1
+        Returns:
+            set: The pruned nodes.
+        """
+        removed = set()
+        stack = [(body, False)]
+        while stack:
+            node, in_container = stack.pop()
+            text_len, spaces, tag_len = node_metrics[node]
+            if in_container and node.tag not in STRING_CONTAINER_TAGS:
+                # All text below the node belongs to an enclosing container
+                text_len = spaces = 0
+            children = self._live_children(node)
+            link_text_len = 0
+            for child in children:
+                if child.tag == "a":
+                    string = self._single_string(child)
+                    if string:
+                        link_text_len += len(string.strip())
+
+            metrics = {
+                "node": node,
+                "tag_name": node.tag,
+                "text_len": text_len,
+                "tag_len": tag_len,
+                "link_text_len": link_text_len,
+                "word_count": spaces + 1,
+            }
+
+            score = self._compute_composite_score(
+                metrics, text_len, tag_len, link_text_len
+            )
 
-            threshold = self.threshold  # base threshold
-            if tag_importance > 1:
-                threshold *= 0.8
-            if text_ratio > 0.4:
-                threshold *= 0.9
-            if link_ratio > 0.6:
-                threshold *= 1.2
+            if self.threshold_type == "fixed":
+                should_remove = score < self.threshold
+            else:  # dynamic
+                tag_importance = self.tag_importance.get(node.tag, 0.7)
+                text_ratio = text_len / tag_len if tag_len > 0 else 0
+                link_ratio = link_text_len / text_len if text_len > 0 else 1
+
+                threshold = self.threshold  # base threshold
+                if tag_importance > 1:
+                    threshold *= 0.8
+                if text_ratio > 0.4:
+                    threshold *= 0.9
+                if link_ratio > 0.6:
+                    threshold *= 1.2
+
+                should_remove = score < threshold
+
+            if should_remove:
+                removed.add(node)
+            else:
+                stack.extend(
+                    (child, in_container or child.tag in STRING_CONTAINER_TAGS)
+                    for child in children
+                )
+        return removed
+
+    @staticmethod
+    def _preserves_whitespace(node) -> bool:
+        """Whether node is or is inside a <pre> or <textarea>"""
+        return any(
+            isinstance(ancestor.tag, str) and ancestor.tag in PRESERVE_WHITESPACE_TAGS
+            for ancestor in chain([node], node.iterancestors())
+        )
 
-            should_remove = score < threshold
+    def _single_string(self, node) -> Optional[str]:
+        """The only string inside node, following single-child chains, else None"""
+        while True:
+            contents = [node.text] if node.text else []
+            for child in node:
+                if isinstance(child.tag, str) and child.tag not in self.excluded_tags:
+                    contents.append(child)
+                if child.tail:
+                    contents.append(child.tail)
+            if len(contents) != 1:
+                return None
+            if isinstance(contents[0], str):
+                return contents[0]
+            node = contents[0]
+
+    def _has_text(self, element, removed: set) -> bool:
+        """Whether any string of element's kept subtree has non-whitespace text"""
+        target = element.tag if element.tag in STRING_CONTAINER_TAGS else None
+        stack = [(element, target)]
+        while stack:
+            node, container = stack.pop()
+            if container == target:
+                if node.text and node.text.strip():
+                    return True
+                if any(child.tail and child.tail.strip() for child in node):
+                    return True
+            for child in self._live_children(node):
+                if child not in removed:
+                    stack.append(
+                        (
+                            child,
+                            child.tag if child.tag in STRING_CONTAINER_TAGS else container,
+                        )
+                    )
+        return False
 
-        if should_remove:
-            node.decompose()
-        else:
-            children = [child for child in node.children if hasattr(child, "name")]
-            for child in children:
-                self._prune_tree(child)
+    def _render(self, element, removed: set) -> str:
+        """Serializes element without its pruned descendants"""
+        output = []
+        stack = [(element, self._preserves_whitespace(element))]
+        while stack:
+            item, preserve = stack.pop()
+            if isinstance(item, str):
+                output.append(item)
+                continue
+
+            def text(string):
+                if not preserve:
+                    string = _collapse_whitespace(string)
+                return string if item.tag in RAW_TEXT_TAGS else _escape_text(string)
+
+            contents = []
+            if item.text:
+                contents.append((text(item.text), preserve))
+            for child in item:
+                if (
+                    isinstance(child.tag, str)
+                    and child.tag not in self.excluded_tags
+                    and child not in removed
+                ):
+                    contents.append(
+                        (child, preserve or child.tag in PRESERVE_WHITESPACE_TAGS)
+                    )
+                if child.tail:
+                    contents.append((text(child.tail), preserve))
+
+            if not contents and item.tag in VOID_ELEMENTS:
+                output.append(_start_tag(item)[:-1] + "/>")
+                continue
+            output.append(_start_tag(item))
+            stack.append((f"</{item.tag}>", preserve))
+            stack.extend(reversed(contents))
+        return "".join(output)
 
     def _compute_composite_score(self, metrics, text_len, tag_len, link_text_len):
         """Computes the composite score"""
         if self.min_word_threshold:
-            # Get raw text from metrics node - avoid extra processing
-            text = metrics["node"].get_text(strip=True)
-            word_count = text.count(" ") + 1
-            if word_count < self.min_word_threshold:
+            if metrics["word_count"] < self.min_word_threshold:
                 return -1.0  # Guaranteed removal
         score = 0.0
         total_weight = 0.0
@@ -731,12 +1187,12 @@ class PruningContentFilter(RelevantContentFilter):
     def _compute_class_id_weight(self, node):
         """Computes the class ID weight"""
         class_id_score = 0
-        if "class" in node.attrs:
-            classes = " ".join(node["class"])
-            if self.negative_patterns.match(classes):
+        classes = node.get("class")
+        if classes is not None:
+            if self.negative_patterns.match(" ".join(classes.split())):
                 class_id_score -= 0.5
-        if "id" in node.attrs:
-            element_id = node["id"]
+        element_id = node.get("id")
+        if element_id is not None:
             if self.negative_patterns.match(element_id):
                 class_id_score -= 0.5
         return class_id_score
@@ -1,7 +1,7 @@
 import re
 from itertools import chain
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, Iterator, Optional, Tuple
 from bs4 import BeautifulSoup
 import asyncio
 import requests
@@ -19,15 +19,14 @@ from urllib.parse import urljoin
 from requests.exceptions import InvalidSchema
 from .utils import (
     extract_metadata,
-    normalize_url,
-    is_external_url,
-    get_base_domain,
     extract_metadata_using_lxml,
+    URLNormalizer,
 )
 from lxml import etree
 from lxml import html as lhtml
 from typing import List
 from .models import ScrapingResult, MediaItem, Link, Media, Links
+from .parsed_document import ParsedDocument
 
 # Pre-compile regular expressions for Open Graph and Twitter metadata
 OG_REGEX = re.compile(r"^og:")
@@ -35,25 +34,29 @@ TWITTER_REGEX = re.compile(r"^twitter:")
 DIMENSION_REGEX = re.compile(r"(\d+)(\D*)")
 
 
+# Precompiled patterns for image scoring
+IMAGE_FORMAT_REGEX = re.compile(r"jpeg|jpg|png|webp|avif|gif", re.IGNORECASE)
+IMAGE_ICON_HINT_REGEX = re.compile(r"button|icon|logo")
+
+
 # Function to parse srcset
-def parse_srcset(s: str) -> List[Dict]:
+def iter_srcset(s: str) -> Iterator[Tuple[str, Optional[str]]]:
+    """Lazily yields the (url, width) candidates of a srcset attribute"""
     if not s:
-        return []
-    variants = []
+        return
     for part in s.split(","):
-        part = part.strip()
-        if not part:
-            continue
         parts = part.split()
-        if len(parts) >= 1:
-            url = parts[0]
+        if parts:
             width = (
                 parts[1].rstrip("w")
                 if len(parts) > 1 and parts[1].endswith("w")
                 else None
             )
-            variants.append({"url": url, "width": width})
-    return variants
+            yield parts[0], width
+
+
+def parse_srcset(s: str) -> List[Dict]:
+    return [{"url": url, "width": width} for url, width in iter_srcset(s)]
 
 
 # Function to parse image height/width value and units
@@ -269,12 +272,7 @@ class WebScrapingStrategy(ContentScrapingStrategy):
         """
         Process an image element.
 
-        How it works:
-        1. Check if the image has valid display and inside undesired html elements.
-        2. Score an image for it's usefulness.
-        3. Extract image file metadata to extract size and extension.
-        4. Generate a dictionary with the processed image information.
-        5. Return the processed image information.
+        Scores a single image, see process_images() for how.
 
         Args:
             img (Tag): The image element to process.
@@ -284,134 +282,192 @@ class WebScrapingStrategy(ContentScrapingStrategy):
             **kwargs: Additional keyword arguments.
 
         Returns:
-            dict: A dictionary containing the processed image information.
+            list: The variants of the image, or None if it is not useful.
         """
-        # parse_srcset = lambda s: [{'url': u.strip().split()[0], 'width': u.strip().split()[-1].rstrip('w')
-        #                 if ' ' in u else None}
-        #                 for u in [f"http{p}" for p in s.split("http") if p]]
-
-        # Constants for checks
-        classes_to_check = frozenset(["button", "icon", "logo"])
-        tags_to_check = frozenset(["button", "input"])
-        image_formats = frozenset(["jpg", "jpeg", "png", "webp", "avif", "gif"])
-
-        # Pre-fetch commonly used attributes
-        style = img.get("style", "")
-        alt = img.get("alt", "")
-        src = img.get("src", "")
-        data_src = img.get("data-src", "")
-        srcset = img.get("srcset", "")
-        data_srcset = img.get("data-srcset", "")
-        width = img.get("width")
-        height = img.get("height")
-        parent = img.parent
-        parent_classes = parent.get("class", [])
+        return (
+            self.process_images([(index, img)], url, total_images, **kwargs) or None
+        )
 
-        # Quick validation checks
-        if (
-            "display:none" in style
-            or parent.name in tags_to_check
-            or any(c in cls for c in parent_classes for cls in classes_to_check)
-            or any(c in src for c in classes_to_check)
-            or any(c in alt for c in classes_to_check)
-        ):
-            return None
+    def process_images(
+        self,
+        images: Iterable[Tuple[int, Any]],
+        url: str,
+        total_images: Optional[int] = None,
+        **kwargs,
+    ) -> List[Dict]:
+        """
+        Score a batch of image elements and collect the variants of the useful ones.
 
-        # Quick score calculation
-        score = 0
-        if width and width.isdigit():
-            width_val = int(width)
-            score += 1 if width_val > 150 else 0
-        if height and height.isdigit():
-            height_val = int(height)
-            score += 1 if height_val > 150 else 0
-        if alt:
-            score += 1
-        score += index / total_images < 0.5
-
-        # image_format = ''
-        # if "data:image/" in src:
-        #     image_format = src.split(',')[0].split(';')[0].split('/')[1].split(';')[0]
-        # else:
-        #     image_format = os.path.splitext(src)[1].lower().strip('.').split('?')[0]
-
-        # if image_format in ('jpg', 'png', 'webp', 'avif'):
-        #     score += 1
-
-        # Check for image format in all possible sources
-        def has_image_format(url):
-            return any(fmt in url.lower() for fmt in image_formats)
-
-        # Score for having proper image sources
-        if any(has_image_format(url) for url in [src, data_src, srcset, data_srcset]):
-            score += 1
-        if srcset or data_srcset:
-            score += 1
-        if img.find_parent("picture"):
-            score += 1
-
-        # Detect format from any available source
-        detected_format = None
-        for url in [src, data_src, srcset, data_srcset]:
-            if url:
-                format_matches = [fmt for fmt in image_formats if fmt in url.lower()]
-                if format_matches:
-                    detected_format = format_matches[0]
-                    break
+        How it works:
+        1. Skips images whose sources (src, data-src, srcset, data-srcset) were already
+           seen, so a picture repeated across a grid is scored once.
+        2. Drops hidden images and images that look like buttons, icons or logos.
+        3. Scores the rest on size, alt text, position, format, srcset and <picture>.
+        4. For images above the threshold, finds the closest ancestor with useful text.
+           Descriptions are memoized per ancestor for the whole batch.
+        5. Expands srcset candidates lazily, only for kept images and only if
+           expand_image_srcset is True (the default).
 
-        if score <= kwargs.get("image_score_threshold", IMAGE_SCORE_THRESHOLD):
-            return None
+        Args:
+            images (Iterable[Tuple[int, Tag]]): Pairs of the index of an image among the
+                images of the page and the image element, in document order.
+            url (str): The URL of the page containing the images.
+            total_images (int, optional): The number of images of the page. Defaults to
+                the number of images given.
+            **kwargs: Additional keyword arguments.
 
-        # Use set for deduplication
-        unique_urls = set()
-        image_variants = []
+        Returns:
+            list: The variants of the useful images.
+        """
+        images = list(images)
+        if total_images is None:
+            total_images = len(images)
+        image_score_threshold = kwargs.get("image_score_threshold", IMAGE_SCORE_THRESHOLD)
+        description_threshold = kwargs.get(
+            "image_description_min_word_threshold", IMAGE_DESCRIPTION_MIN_WORD_THRESHOLD
+        )
+        expand_srcset = kwargs.get("expand_image_srcset", True)
+        search_format = IMAGE_FORMAT_REGEX.search
+        has_icon_hint = IMAGE_ICON_HINT_REGEX.search
 
-        # Generate a unique group ID for this set of variants
-        group_id = index
-
-        # Base image info template
-        base_info = {
-            "alt": alt,
-            "desc": self.find_closest_parent_with_useful_text(img, **kwargs),
-            "score": score,
-            "type": "image",
-            "group_id": group_id,  # Group ID for this set of variants
-            "format": detected_format,
-        }
+        seen_sources = set()
+        descriptions = {}
+        image_variants = []
+        for index, img in images:
+            # Quick validation checks
+            src = img.get("src") or ""
+            data_src = img.get("data-src") or ""
+            srcset = img.get("srcset") or ""
+            data_srcset = img.get("data-srcset") or ""
+            sources = (src, data_src, srcset, data_srcset)
+            if sources in seen_sources:
+                continue
+            seen_sources.add(sources)
 
-        # Inline function for adding variants
-        def add_variant(src, width=None):
-            if src and not src.startswith("data:") and src not in unique_urls:
-                unique_urls.add(src)
-                image_variants.append({**base_info, "src": src, "width": width})
-
-        # Process all sources
-        add_variant(src)
-        add_variant(data_src)
-
-        # Handle srcset and data-srcset in one pass
-        for attr in ("srcset", "data-srcset"):
-            if value := img.get(attr):
-                for source in parse_srcset(value):
-                    add_variant(source["url"], source["width"])
-
-        # Quick picture element check
-        if picture := img.find_parent("picture"):
-            for source in picture.find_all("source"):
-                if srcset := source.get("srcset"):
-                    for src in parse_srcset(srcset):
-                        add_variant(src["url"], src["width"])
-
-        # Framework-specific attributes in one pass
-        for attr, value in img.attrs.items():
+            alt = img.get("alt") or ""
+            if "display:none" in (img.get("style") or ""):
+                continue
+            parent_tag, parent_classes, picture = self._image_context(img)
             if (
-                attr.startswith("data-")
-                and ("src" in attr or "srcset" in attr)
-                and "http" in value
+                parent_tag in ("button", "input")
+                or has_icon_hint(parent_classes)
+                or has_icon_hint(src)
+                or has_icon_hint(alt)
             ):
-                add_variant(value)
+                continue
+
+            # Score calculation
+            score = 0
+            if (width := img.get("width")) and width.isdigit() and int(width) > 150:
+                score += 1
+            if (height := img.get("height")) and height.isdigit() and int(height) > 150:
+                score += 1
+            if alt:
+                score += 1
+            score += index / total_images < 0.5
+
+            # Detect format from the first source that has one
+            detected_format = None
+            for source in sources:
+                if source and (match := search_format(source)):
+                    detected_format = match.group().lower()
+                    score += 1
+                    break
+            if srcset or data_srcset:
+                score += 1
+            if picture is not None:
+                score += 1
+
+            if score <= image_score_threshold:
+                continue
+
+            base_info = {
+                "alt": alt,
+                "desc": self._image_description(img, description_threshold, descriptions),
+                "score": score,
+                "type": "image",
+                "group_id": index,  # Group ID for this set of variants
+                "format": detected_format,
+            }
+            candidates = [(src, None), (data_src, None)]
+            if expand_srcset:
+                candidates = chain(
+                    candidates,
+                    iter_srcset(srcset),
+                    iter_srcset(data_srcset),
+                    *(
+                        iter_srcset(source_srcset)
+                        for source_srcset in (
+                            self._picture_srcsets(picture) if picture is not None else ()
+                        )
+                    ),
+                )
+            # Framework-specific attributes
+            candidates = chain(
+                candidates,
+                (
+                    (value, None)
+                    for attr, value in self._image_attributes(img)
+                    if attr.startswith("data-")
+                    and ("src" in attr or "srcset" in attr)
+                    and "http" in value
+                ),
+            )
+
+            unique_urls = set()
+            for variant_src, variant_width in candidates:
+                if (
+                    variant_src
+                    and not variant_src.startswith("data:")
+                    and variant_src not in unique_urls
+                ):
+                    unique_urls.add(variant_src)
+                    variant = {**base_info, "src": variant_src}
+                    if variant_width:
+                        variant["width"] = variant_width
+                    image_variants.append(variant)
+
+        return image_variants
 
-        return image_variants if image_variants else None
+    def _image_context(self, img) -> Tuple[str, str, Optional[Tag]]:
+        """The parent tag, the parent classes and the closest <picture> of an image"""
+        parent = img.parent
+        if parent is None:
+            return "", "", None
+        return parent.name, " ".join(parent.get("class", [])), img.find_parent("picture")
+
+    def _picture_srcsets(self, picture: Tag) -> List[str]:
+        return [source.get("srcset") for source in picture.find_all("source")]
+
+    def _image_attributes(self, img: Tag):
+        return img.attrs.items()
+
+    def _image_description(
+        self, img, threshold: int, descriptions: Dict[Any, Optional[str]]
+    ) -> Optional[str]:
+        """
+        Same as find_closest_parent_with_useful_text(), memoized per ancestor in descriptions.
+
+        Images of a page share most of their ancestors, whose text would otherwise be
+        extracted again for every image.
+        """
+        path = []
+        description = None
+        current = img.parent
+        while current:
+            # Keyed by identity, tags compare equal when their markup is the same
+            if id(current) in descriptions:
+                description = descriptions[id(current)]
+                break
+            path.append(id(current))
+            text_content = current.get_text(separator=" ", strip=True)
+            if len(text_content.split()) >= threshold:
+                description = text_content
+                break
+            current = current.parent
+        for key in path:
+            descriptions[key] = description
+        return description
 
     def process_element(self, url, element: PageElement, **kwargs) -> Dict[str, Any]:
         """
@@ -464,7 +520,12 @@ class WebScrapingStrategy(ContentScrapingStrategy):
             # if element.name == 'img':
             #     process_image(element, url, 0, 1)
             #     return True
-            base_domain = kwargs.get("base_domain", get_base_domain(url))
+            url_normalizer = kwargs.get("url_normalizer")
+            if url_normalizer is None:
+                url_normalizer = kwargs["url_normalizer"] = URLNormalizer(
+                    url, kwargs.get("base_domain")
+                )
+            base_domain = url_normalizer.base_domain
 
             if element.name in ["script", "style", "link", "meta", "noscript"]:
                 element.decompose()
@@ -487,7 +548,7 @@ class WebScrapingStrategy(ContentScrapingStrategy):
 
                     # Normalize the URL
                     try:
-                        normalized_href = normalize_url(href, url)
+                        normalized_href = url_normalizer.normalize(href)
                     except ValueError:
                         # logging.warning(f"Invalid URL format: {href}, Error: {str(e)}")
                         return False
@@ -499,13 +560,13 @@ class WebScrapingStrategy(ContentScrapingStrategy):
                         "base_domain": base_domain,
                     }
 
-                    is_external = is_external_url(normalized_href, base_domain)
+                    is_external = url_normalizer.is_external(normalized_href)
 
                     keep_element = True
 
                     # Handle external link exclusions
                     if is_external:
-                        link_base_domain = get_base_domain(normalized_href)
+                        link_base_domain = url_normalizer.base_domain_of(normalized_href)
                         link_data["base_domain"] = link_base_domain
                         if kwargs.get("exclude_external_links", False):
                             element.decompose()
@@ -555,10 +616,10 @@ class WebScrapingStrategy(ContentScrapingStrategy):
                         src = element.attrs["srcset"].split(",")[0].split(" ")[0]
 
                     # If image src is internal, then skip
-                    if not is_external_url(src, base_domain):
+                    if not url_normalizer.is_external(src):
                         return True
 
-                    image_src_base_domain = get_base_domain(src)
+                    image_src_base_domain = url_normalizer.base_domain_of(src)
 
                     # Check flag if we should remove external images
                     if kwargs.get("exclude_external_images", False):
@@ -685,6 +746,7 @@ class WebScrapingStrategy(ContentScrapingStrategy):
         html: str,
         word_count_threshold: int = MIN_WORD_THRESHOLD,
         css_selector: str = None,
+        document: Optional[ParsedDocument] = None,
         **kwargs,
     ) -> Dict[str, Any]:
         """
@@ -695,6 +757,7 @@ class WebScrapingStrategy(ContentScrapingStrategy):
             html (str): The HTML content of the page to scrape.
             word_count_threshold (int): The minimum word count threshold for content extraction.
             css_selector (str): The CSS selector to use for content extraction.
+            document (ParsedDocument): Shared parse of html. Unused, this strategy modifies its own BeautifulSoup tree.
             **kwargs: Additional keyword arguments.
 
         Returns:
@@ -707,7 +770,7 @@ class WebScrapingStrategy(ContentScrapingStrategy):
         parser_type = kwargs.get("parser", "lxml")
         soup = BeautifulSoup(html, parser_type)
         body = soup.body
-        base_domain = get_base_domain(url)
+        url_normalizer = URLNormalizer(url)
 
         try:
             meta = extract_metadata("", soup)
@@ -769,7 +832,8 @@ class WebScrapingStrategy(ContentScrapingStrategy):
             url,
             body,
             word_count_threshold=word_count_threshold,
-            base_domain=base_domain,
+            base_domain=url_normalizer.base_domain,
+            url_normalizer=url_normalizer,
             **kwargs,
         )
 
@@ -782,18 +846,8 @@ class WebScrapingStrategy(ContentScrapingStrategy):
         links["internal"] = list(internal_links_dict.values())
         links["external"] = list(external_links_dict.values())
 
-        # # Process images using ThreadPoolExecutor
         imgs = body.find_all("img")
-
-        media["images"] = [
-            img
-            for result in (
-                self.process_image(img, url, i, len(imgs), **kwargs)
-                for i, img in enumerate(imgs)
-            )
-            if result is not None
-            for img in result
-        ]
+        media["images"] = self.process_images(enumerate(imgs), url, **kwargs)
 
         body = self.flatten_nested_elements(body)
         base64_pattern = re.compile(r'data:image/[^;]+;base64,([^"]+)')
@@ -868,7 +922,10 @@ class LXMLWebScrapingStrategy(WebScrapingStrategy):
         external_links_dict: Dict[str, Any],
         **kwargs,
     ) -> bool:
-        base_domain = kwargs.get("base_domain", get_base_domain(url))
+        url_normalizer = kwargs.get("url_normalizer") or URLNormalizer(
+            url, kwargs.get("base_domain")
+        )
+        base_domain = url_normalizer.base_domain
         exclude_domains = set(kwargs.get("exclude_domains", []))
 
         # Process links
@@ -878,7 +935,7 @@ class LXMLWebScrapingStrategy(WebScrapingStrategy):
                 continue
 
             try:
-                normalized_href = normalize_url(href, url)
+                normalized_href = url_normalizer.normalize(href)
                 link_data = {
                     "href": normalized_href,
                     "text": link.text_content().strip(),
@@ -886,9 +943,9 @@ class LXMLWebScrapingStrategy(WebScrapingStrategy):
                     "base_domain": base_domain,
                 }
 
-                is_external = is_external_url(normalized_href, base_domain)
+                is_external = url_normalizer.is_external(normalized_href)
                 if is_external:
-                    link_base_domain = get_base_domain(normalized_href)
+                    link_base_domain = url_normalizer.base_domain_of(normalized_href)
                     link_data["base_domain"] = link_base_domain
                     if (
                         kwargs.get("exclude_external_links", False)
@@ -910,32 +967,33 @@ class LXMLWebScrapingStrategy(WebScrapingStrategy):
         # Process images
         images = element.xpath(".//img")
         total_images = len(images)
+        candidates = []
 
         for idx, img in enumerate(images):
             src = img.get("src") or ""
-            img_domain = get_base_domain(src)
+            img_domain = url_normalizer.base_domain_of(src)
 
             # Decide if we need to exclude this image
             # 1) If its domain is in exclude_domains, remove.
             # 2) Or if exclude_external_images=True and it's an external domain, remove.
             if (img_domain in exclude_domains) or (
                 kwargs.get("exclude_external_images", False)
-                and is_external_url(src, base_domain)
+                and url_normalizer.is_external(src)
             ):
                 parent = img.getparent()
                 if parent is not None:
                     parent.remove(img)
                 continue
 
-            # Otherwise, process the image as usual.
-            try:
-                processed_images = self.process_image(
-                    img, url, idx, total_images, **kwargs
-                )
-                if processed_images:
-                    media["images"].extend(processed_images)
-            except Exception as e:
-                self._log("error", f"Error processing image: {str(e)}", "SCRAPE")
+            # Otherwise, score the image with the others in one batch
+            candidates.append((idx, img))
+
+        try:
+            media["images"].extend(
+                self.process_images(candidates, url, total_images, **kwargs)
+            )
+        except Exception as e:
+            self._log("error", f"Error processing images: {str(e)}", "SCRAPE")
 
         # Process videos and audios
         for media_type in ["video", "audio"]:
@@ -1004,112 +1062,47 @@ class LXMLWebScrapingStrategy(WebScrapingStrategy):
 
         return element
 
-    def process_image(
-        self, img: lhtml.HtmlElement, url: str, index: int, total_images: int, **kwargs
-    ) -> Optional[List[Dict]]:
-        # Quick validation checks
-        style = img.get("style", "")
-        alt = img.get("alt", "")
-        src = img.get("src", "")
-        data_src = img.get("data-src", "")
-        srcset = img.get("srcset", "")
-        data_srcset = img.get("data-srcset", "")
-
-        if "display:none" in style:
-            return None
-
+    def _image_context(
+        self, img: lhtml.HtmlElement
+    ) -> Tuple[str, str, Optional[lhtml.HtmlElement]]:
         parent = img.getparent()
-        if parent.tag in ["button", "input"]:
-            return None
-
-        parent_classes = parent.get("class", "").split()
-        if any(
-            "button" in cls or "icon" in cls or "logo" in cls for cls in parent_classes
-        ):
-            return None
+        if parent is None:
+            return "", "", None
+        return parent.tag, parent.get("class", ""), next(img.iterancestors("picture"), None)
+
+    def _picture_srcsets(self, picture: lhtml.HtmlElement) -> List[str]:
+        return [
+            source.get("srcset")
+            for source in picture.iterdescendants("source")
+            if source.get("srcset") is not None
+        ]
 
-        # If src is in class or alt, likely an icon
-        if (src and any(c in src for c in ["button", "icon", "logo"])) or (
-            alt and any(c in alt for c in ["button", "icon", "logo"])
-        ):
-            return None
+    def _image_attributes(self, img: lhtml.HtmlElement):
+        return img.attrib.items()
 
-        # Score calculation
-        score = 0
-        if (width := img.get("width")) and width.isdigit():
-            score += 1 if int(width) > 150 else 0
-        if (height := img.get("height")) and height.isdigit():
-            score += 1 if int(height) > 150 else 0
-        if alt:
-            score += 1
-        score += index / total_images < 0.5
-
-        # Check formats in all possible sources
-        image_formats = {"jpg", "jpeg", "png", "webp", "avif", "gif"}
-        detected_format = None
-        for url in [src, data_src, srcset, data_srcset]:
-            if url:
-                format_matches = [fmt for fmt in image_formats if fmt in url.lower()]
-                if format_matches:
-                    detected_format = format_matches[0]
-                    score += 1
+    def _image_description(
+        self,
+        img: lhtml.HtmlElement,
+        threshold: int,
+        descriptions: Dict[Any, Optional[str]],
+    ) -> Optional[str]:
+        path = []
+        description = None
+        current = img
+        while current is not None:
+            if current in descriptions:
+                description = descriptions[current]
+                break
+            path.append(current)
+            if current.text:
+                text_content = current.text_content()
+                if len(text_content.split()) >= threshold:
+                    description = text_content.strip()
                     break
-
-        if srcset or data_srcset:
-            score += 1
-
-        if picture := img.xpath("./ancestor::picture[1]"):
-            score += 1
-
-        if score <= kwargs.get("image_score_threshold", IMAGE_SCORE_THRESHOLD):
-            return None
-
-        # Process image variants
-        unique_urls = set()
-        image_variants = []
-        base_info = {
-            "alt": alt,
-            "desc": self.find_closest_parent_with_useful_text(img, **kwargs),
-            "score": score,
-            "type": "image",
-            "group_id": index,
-            "format": detected_format,
-        }
-
-        def add_variant(src: str, width: Optional[str] = None):
-            if src and not src.startswith("data:") and src not in unique_urls:
-                unique_urls.add(src)
-                variant = {**base_info, "src": src}
-                if width:
-                    variant["width"] = width
-                image_variants.append(variant)
-
-        # Add variants from different sources
-        add_variant(src)
-        add_variant(data_src)
-
-        for srcset_attr in [srcset, data_srcset]:
-            if srcset_attr:
-                for source in parse_srcset(srcset_attr):
-                    add_variant(source["url"], source["width"])
-
-        # Handle picture element
-        if picture:
-            for source in picture[0].xpath(".//source[@srcset]"):
-                if source_srcset := source.get("srcset"):
-                    for src_data in parse_srcset(source_srcset):
-                        add_variant(src_data["url"], src_data["width"])
-
-        # Check framework-specific attributes
-        for attr, value in img.attrib.items():
-            if (
-                attr.startswith("data-")
-                and ("src" in attr or "srcset" in attr)
-                and "http" in value
-            ):
-                add_variant(value)
-
-        return image_variants if image_variants else None
+            current = current.getparent()
+        for element in path:
+            descriptions[element] = description
+        return description
 
     def remove_empty_elements_fast(self, root, word_count_threshold=5):
         """
@@ -1190,6 +1183,7 @@ class LXMLWebScrapingStrategy(WebScrapingStrategy):
         html: str,
         word_count_threshold: int = MIN_WORD_THRESHOLD,
         css_selector: str = None,
+        document: Optional[ParsedDocument] = None,
         **kwargs,
     ) -> Dict[str, Any]:
         if not html:
@@ -1197,12 +1191,16 @@ class LXMLWebScrapingStrategy(WebScrapingStrategy):
 
         success = True
         try:
-            doc = lhtml.document_fromstring(html)
+            # The tree is cleaned in place, so a shared document hands out a copy
+            if document is not None and document.html == html:
+                doc = document.mutable_tree()
+            else:
+                doc = lhtml.document_fromstring(html)
             # Match BeautifulSoup's behavior of using body or full doc
             # body = doc.xpath('//body')[0] if doc.xpath('//body') else doc
             body = doc
 
-            base_domain = get_base_domain(url)
+            url_normalizer = URLNormalizer(url)
 
             # Add comment removal
             if kwargs.get("remove_comments", False):
@@ -1291,7 +1289,8 @@ class LXMLWebScrapingStrategy(WebScrapingStrategy):
                 media,
                 internal_links_dict,
                 external_links_dict,
-                base_domain=base_domain,
+                base_domain=url_normalizer.base_domain,
+                url_normalizer=url_normalizer,
                 **kwargs,
             )
 
@@ -1,16 +1,106 @@
 import os
 from pathlib import Path
 import sqlite3
-from typing import Optional, Tuple
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Optional, Tuple, Dict, List
+from .config import SYNC_CACHE_WRITE_BATCH_SIZE
 
 DB_PATH = os.path.join(os.getenv("CRAWL4_AI_BASE_DIRECTORY", Path.home()), ".crawl4ai")
 os.makedirs(DB_PATH, exist_ok=True)
 DB_PATH = os.path.join(DB_PATH, "crawl4ai.db")
 
+CACHE_COLUMNS = "url, html, cleaned_html, markdown, extracted_content, success, media, links, metadata, screenshot"
+
+
+class _ThreadConnection:
+    """Connection owned by one thread, closed when the thread ends"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+
+    def close(self):
+        try:
+            self.conn.close()
+        except sqlite3.Error:
+            pass
+
+    def __del__(self):
+        self.close()
+
+
+_local = threading.local()
+_open_connections = weakref.WeakSet()
+
+# Rows buffered by batched_writes, keyed by URL
+_pending_writes: Dict[str, tuple] = {}
+_batch_depth = 0
+_write_lock = threading.Lock()
+
+
+def get_connection() -> sqlite3.Connection:
+    """
+    Connection of the calling thread, opened on first use.
+
+    Connections are reused across calls, so a thread pool keeps one connection per
+    worker instead of opening one per query. WAL lets readers proceed while a writer
+    commits, and synchronous=NORMAL avoids an fsync per commit.
+    """
+    holder = getattr(_local, "connection", None)
+    if holder is None or holder.db_path != DB_PATH:
+        if holder is not None:
+            holder.close()
+        holder = _ThreadConnection(DB_PATH)
+        _local.connection = holder
+        _open_connections.add(holder)
+    return holder.conn
+
+
+def close_connections():
+    """Close the connections of all threads, e.g. before removing the database file"""
+    for holder in list(_open_connections):
+        holder.close()
+    _open_connections.clear()
+    _local.__dict__.pop("connection", None)
+
+
+@contextmanager
+def batched_writes():
+    """
+    Buffer cache_url writes and commit them SYNC_CACHE_WRITE_BATCH_SIZE at a time.
+
+    Buffered rows are visible to get_cached_url. Everything left is committed when
+    the outermost batched_writes block exits.
+    """
+    global _batch_depth
+    with _write_lock:
+        _batch_depth += 1
+    try:
+        yield
+    finally:
+        with _write_lock:
+            _batch_depth -= 1
+            done = _batch_depth == 0
+        if done:
+            flush_writes()
+
+
+def flush_writes():
+    """Commit the rows buffered by batched_writes"""
+    with _write_lock:
+        rows = list(_pending_writes.values())
+        _pending_writes.clear()
+    if rows:
+        cache_urls(rows)
+
 
 def init_db():
     global DB_PATH
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection()
     cursor = conn.cursor()
     cursor.execute(
         """
@@ -29,19 +119,17 @@ def init_db():
     """
     )
     conn.commit()
-    conn.close()
 
 
 def alter_db_add_screenshot(new_column: str = "media"):
     check_db_path()
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_connection()
         cursor = conn.cursor()
         cursor.execute(
             f'ALTER TABLE crawled_data ADD COLUMN {new_column} TEXT DEFAULT ""'
         )
         conn.commit()
-        conn.close()
     except Exception as e:
         print(f"Error altering database to add screenshot column: {e}")
 
@@ -55,15 +143,18 @@ def get_cached_url(
     url: str,
 ) -> Optional[Tuple[str, str, str, str, str, str, str, bool, str]]:
     check_db_path()
+    with _write_lock:
+        pending = _pending_writes.get(url)
+    if pending is not None:
+        return pending
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_connection()
         cursor = conn.cursor()
         cursor.execute(
-            "SELECT url, html, cleaned_html, markdown, extracted_content, success, media, links, metadata, screenshot FROM crawled_data WHERE url = ?",
+            f"SELECT {CACHE_COLUMNS} FROM crawled_data WHERE url = ?",
             (url,),
         )
         result = cursor.fetchone()
-        conn.close()
         return result
     except Exception as e:
         print(f"Error retrieving cached URL: {e}")
@@ -82,40 +173,53 @@ def cache_url(
     metadata: str = "{}",
     screenshot: str = "",
 ):
+    row = (
+        url,
+        html,
+        cleaned_html,
+        markdown,
+        extracted_content,
+        success,
+        media,
+        links,
+        metadata,
+        screenshot,
+    )
+    with _write_lock:
+        if _batch_depth:
+            _pending_writes[url] = row
+            full = len(_pending_writes) >= SYNC_CACHE_WRITE_BATCH_SIZE
+        else:
+            full = None
+    if full is None:
+        cache_urls([row])
+    elif full:
+        flush_writes()
+
+
+def cache_urls(rows: List[tuple]):
+    """Insert or update several rows, in CACHE_COLUMNS order, in one transaction"""
     check_db_path()
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            INSERT INTO crawled_data (url, html, cleaned_html, markdown, extracted_content, success, media, links, metadata, screenshot)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(url) DO UPDATE SET
-                html = excluded.html,
-                cleaned_html = excluded.cleaned_html,
-                markdown = excluded.markdown,
-                extracted_content = excluded.extracted_content,
-                success = excluded.success,
-                media = excluded.media,      
-                links = excluded.links,    
-                metadata = excluded.metadata,      
-                screenshot = excluded.screenshot
-        """,
-            (
-                url,
-                html,
-                cleaned_html,
-                markdown,
-                extracted_content,
-                success,
-                media,
-                links,
-                metadata,
-                screenshot,
-            ),
-        )
-        conn.commit()
-        conn.close()
+        conn = get_connection()
+        with conn:
+            conn.executemany(
+                f"""
+                INSERT INTO crawled_data ({CACHE_COLUMNS})
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    html = excluded.html,
+                    cleaned_html = excluded.cleaned_html,
+                    markdown = excluded.markdown,
+                    extracted_content = excluded.extracted_content,
+                    success = excluded.success,
+                    media = excluded.media,
+                    links = excluded.links,
+                    metadata = excluded.metadata,
+                    screenshot = excluded.screenshot
+            """,
+                rows,
+            )
     except Exception as e:
         print(f"Error caching URL: {e}")
 
@@ -123,11 +227,10 @@ def cache_url(
 def get_total_count() -> int:
     check_db_path()
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_connection()
         cursor = conn.cursor()
         cursor.execute("SELECT COUNT(*) FROM crawled_data")
         result = cursor.fetchone()
-        conn.close()
         return result[0]
     except Exception as e:
         print(f"Error getting total count: {e}")
@@ -137,11 +240,10 @@ def get_total_count() -> int:
 def clear_db():
     check_db_path()
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_connection()
         cursor = conn.cursor()
         cursor.execute("DELETE FROM crawled_data")
         conn.commit()
-        conn.close()
     except Exception as e:
         print(f"Error clearing database: {e}")
 
@@ -149,11 +251,10 @@ def clear_db():
 def flush_db():
     check_db_path()
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_connection()
         cursor = conn.cursor()
         cursor.execute("DROP TABLE crawled_data")
         conn.commit()
-        conn.close()
     except Exception as e:
         print(f"Error flushing database: {e}")
 
@@ -161,19 +262,19 @@ def flush_db():
 def update_existing_records(new_column: str = "media", default_value: str = "{}"):
     check_db_path()
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_connection()
         cursor = conn.cursor()
         cursor.execute(
             f'UPDATE crawled_data SET {new_column} = "{default_value}" WHERE screenshot IS NULL'
         )
         conn.commit()
-        conn.close()
     except Exception as e:
         print(f"Error updating existing records: {e}")
 
 
 if __name__ == "__main__":
     # Delete the existing database file
+    close_connections()
     if os.path.exists(DB_PATH):
         os.remove(DB_PATH)
     init_db()
@@ -0,0 +1,534 @@
+"""
+Compiled execution plans for the JSON element extraction strategies.
+
+JsonElementExtractionStrategy interprets its schema for every element of every page:
+each field looks up its type, selector, attribute and transform again, and every
+selector is parsed again by the selector engine. An ExtractionPlan compiles a schema
+once into precompiled lxml selectors and one extractor function per field, so running
+it over a page is a walk over the lxml tree with no schema interpretation left.
+
+Plans reproduce the results of the interpreted strategies, including defaults, error
+handling and the order of fields. A schema the plan cannot compile, such as a selector
+the engine does not support, raises PlanCompilationError and the strategy falls back
+to interpreting it.
+
+Compiling is done once per schema: get_extraction_plan() caches plans by a hash of
+their schema, so strategies created for every crawl of the same template share one.
+"""
+
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+from operator import methodcaller
+from typing import Any, Callable, Dict, List, Optional
+
+import soupsieve
+from bs4.builder import HTMLTreeBuilder
+from cssselect import ExpressionError, HTMLTranslator, SelectorError
+from cssselect.parser import CombinedSelector, parse as parse_css
+from lxml import etree
+
+from .config import EXTRACTION_PLAN_CACHE_SIZE
+
+# Transforms of JsonElementExtractionStrategy._apply_transform()
+TRANSFORMS = {
+    "lowercase": methodcaller("lower"),
+    "uppercase": methodcaller("upper"),
+    "strip": methodcaller("strip"),
+}
+
+# Text of these elements is not part of BeautifulSoup's get_text()
+NON_TEXT_TAGS = frozenset(["script", "style", "template"])
+
+_has_non_text = etree.XPath(
+    "boolean(descendant::script | descendant::style | descendant::template)"
+)
+
+_descendant_text = etree.XPath(".//text()", smart_strings=False)
+
+
+class PlanCompilationError(Exception):
+    """The schema cannot be compiled into a plan and has to be interpreted"""
+
+
+class ExtractionPlan:
+    """
+    A schema compiled into lxml selectors and field extractors.
+
+    Args:
+        schema (Dict[str, Any]): The schema, as for JsonElementExtractionStrategy.
+        engine: Compiles selectors and reads elements, see CSSPlanEngine and
+            XPathPlanEngine.
+        verbose (bool): Print the errors of fields that fall back to their default.
+
+    Raises:
+        PlanCompilationError: If the schema cannot be compiled.
+    """
+
+    def __init__(self, schema: Dict[str, Any], engine, verbose: bool = False):
+        self.engine = engine
+        self.verbose = verbose
+        try:
+            self.base_selector = engine.compile_base(schema["baseSelector"])
+            self.base_fields = [
+                (field["name"], self._compile_single_field(field))
+                for field in schema.get("baseFields", [])
+            ]
+            self.extract_item = self._compile_item(schema["fields"])
+        except PlanCompilationError:
+            raise
+        except Exception as e:
+            raise PlanCompilationError(f"Cannot compile schema: {str(e)}") from e
+
+    def run(self, root) -> List[Dict[str, Any]]:
+        """Extracts the items of the schema from the lxml tree rooted at root"""
+        context = {}
+        results = []
+        for element in self.base_selector.select_all(root):
+            item = {}
+            for name, extract in self.base_fields:
+                value = extract(element, context)
+                if value is not None:
+                    item[name] = value
+            item.update(self.extract_item(element, context))
+            if item:
+                results.append(item)
+        return results
+
+    def _compile_item(self, fields: List[Dict[str, Any]]) -> Callable:
+        steps = [
+            (field["name"], field["type"] == "computed", self._compile_step(field))
+            for field in fields
+        ]
+
+        def extract_item(element, context):
+            item = {}
+            for name, computed, step in steps:
+                value = step(item) if computed else step(element, context)
+                if value is not None:
+                    item[name] = value
+            return item
+
+        return extract_item
+
+    def _compile_step(self, field: Dict[str, Any]) -> Callable:
+        if field["type"] == "computed":
+            return self._compile_computed_field(field)
+        return self._compile_field(field)
+
+    def _compile_field(self, field: Dict[str, Any]) -> Callable:
+        """Same as JsonElementExtractionStrategy._extract_field()"""
+        kind = field["type"]
+        if kind in ("nested", "list", "nested_list"):
+            selector = self.engine.compile(field["selector"])
+            if kind == "list":
+                list_fields = [
+                    (sub_field["name"], self._compile_single_field(sub_field))
+                    for sub_field in field["fields"]
+                ]
+
+                def extract_list_item(element, context):
+                    item = {}
+                    for name, extract_value in list_fields:
+                        value = extract_value(element, context)
+                        if value is not None:
+                            item[name] = value
+                    return item
+
+                def extract(element, context):
+                    return [
+                        extract_list_item(el, context)
+                        for el in selector.select(element, context)
+                    ]
+
+            else:
+                extract_item = self._compile_item(field["fields"])
+                if kind == "nested":
+                    found = self.engine.found
+
+                    def extract(element, context):
+                        selected = selector.select(element, context)
+                        if selected and found(selected[0]):
+                            return extract_item(selected[0], context)
+                        return {}
+
+                else:
+
+                    def extract(element, context):
+                        return [
+                            extract_item(el, context)
+                            for el in selector.select(element, context)
+                        ]
+
+        else:
+            extract = self._compile_single_field(field)
+
+        name = field.get("name")
+        default = field.get("default")
+        verbose = self.verbose
+
+        def extract_field(element, context):
+            try:
+                return extract(element, context)
+            except Exception as e:
+                if verbose:
+                    print(f"Error extracting field {name}: {str(e)}")
+                return default
+
+        return extract_field
+
+    def _compile_single_field(self, field: Dict[str, Any]) -> Callable:
+        """Same as JsonElementExtractionStrategy._extract_single_field()"""
+        engine = self.engine
+        selector = engine.compile(field["selector"]) if "selector" in field else None
+        kind = field["type"]
+        default = field.get("default")
+
+        if kind == "text":
+            read = engine.text
+        elif kind == "attribute":
+            read = engine.attribute_reader(field["attribute"])
+        elif kind == "html":
+            read = engine.html
+        elif kind == "regex":
+            search = re.compile(field["pattern"]).search
+            text = engine.text
+
+            def read(element):
+                match = search(text(element))
+                return match.group(1) if match else None
+
+        else:
+
+            def read(element):
+                return None
+
+        if "transform" in field:
+            transform = TRANSFORMS.get(field["transform"])
+            if transform is not None:
+                untransformed = read
+
+                def read(element):
+                    return transform(untransformed(element))
+
+        if selector is None:
+
+            def extract(element, context):
+                value = read(element)
+                return value if value is not None else default
+
+        else:
+
+            def extract(element, context):
+                selected = selector.select(element, context)
+                if not selected:
+                    return default
+                value = read(selected[0])
+                return value if value is not None else default
+
+        return extract
+
+    def _compile_computed_field(self, field: Dict[str, Any]) -> Callable:
+        """Same as JsonElementExtractionStrategy._compute_field()"""
+        if "expression" in field:
+            expression = field["expression"]
+            try:
+                expression = compile(expression, "<expression>", "eval")
+            except SyntaxError:
+                pass  # Raised again by eval() for each item, like the interpreter does
+
+            def compute(item):
+                return eval(expression, {}, item)
+
+        elif "function" in field:
+            compute = field["function"]
+        else:
+
+            def compute(item):
+                return None
+
+        name = field.get("name")
+        default = field.get("default")
+        verbose = self.verbose
+
+        def compute_field(item):
+            try:
+                return compute(item)
+            except Exception as e:
+                if verbose:
+                    print(f"Error computing field {name}: {str(e)}")
+                return default
+
+        return compute_field
+
+
+_plans: "OrderedDict[tuple, Any]" = OrderedDict()
+_plans_lock = threading.Lock()
+
+
+def schema_hash(schema: Dict[str, Any]) -> str:
+    """
+    Hash of the JSON of a schema. Functions of computed fields are hashed by identity,
+    cached plans keep them alive so they are not confused with later ones.
+
+    Raises:
+        TypeError, ValueError: If the schema cannot be serialized, e.g. non-string keys.
+    """
+    encoded = json.dumps(
+        schema,
+        sort_keys=True,
+        default=lambda value: f"<{type(value).__name__} {id(value):x}>",
+    )
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def get_extraction_plan(
+    schema: Dict[str, Any], engine, verbose: bool = False
+) -> ExtractionPlan:
+    """
+    The plan of a schema, compiled on first use and shared by all strategies using the
+    same schema and engine. The last EXTRACTION_PLAN_CACHE_SIZE schemas are kept.
+
+    Raises:
+        PlanCompilationError: If the schema cannot be compiled, which is cached too.
+    """
+    try:
+        key = (type(engine), verbose, schema_hash(schema))
+    except (TypeError, ValueError):
+        return ExtractionPlan(schema, engine, verbose=verbose)
+
+    with _plans_lock:
+        plan = _plans.get(key)
+        if plan is not None:
+            _plans.move_to_end(key)
+    if plan is None:
+        try:
+            plan = ExtractionPlan(schema, engine, verbose=verbose)
+        except PlanCompilationError as e:
+            plan = str(e)
+        with _plans_lock:
+            _plans[key] = plan
+            while len(_plans) > EXTRACTION_PLAN_CACHE_SIZE:
+                _plans.popitem(last=False)
+    if isinstance(plan, str):
+        raise PlanCompilationError(plan)
+    return plan
+
+
+class CSSPlanSelector:
+    """
+    A CSS selector compiled to XPath that matches like BeautifulSoup's select().
+
+    select() of BeautifulSoup (soupsieve) is not scoped: a descendant of the element
+    matches if the whole selector matches it in the document, so "div.card span"
+    selected from a div.card finds its spans. Selectors without combinators do not
+    depend on ancestors and are evaluated on the descendants directly. The others are
+    matched once per document and the matches are then filtered to the descendants.
+    """
+
+    __slots__ = ("css", "everywhere", "descendants")
+
+    translator = HTMLTranslator()
+
+    def __init__(self, css: str):
+        if ":scope" in css:
+            # cssselect does not scope :scope to the element select() is called on
+            raise PlanCompilationError(f"Unsupported selector: {css}")
+        try:
+            selectors = parse_css(css)
+            self.everywhere = etree.XPath(
+                self.translator.css_to_xpath(css, prefix="descendant-or-self::")
+            )
+            self.descendants = (
+                None
+                if any(
+                    isinstance(selector.parsed_tree, CombinedSelector)
+                    for selector in selectors
+                )
+                else etree.XPath(self.translator.css_to_xpath(css, prefix="descendant::"))
+            )
+        except (SelectorError, ExpressionError, etree.XPathError) as e:
+            raise PlanCompilationError(f"Unsupported selector {css}: {str(e)}") from e
+        self.css = css
+
+    def select_all(self, root) -> list:
+        """Matches in the tree of root, root included"""
+        return self.everywhere(root)
+
+    def select(self, element, context: Dict[Any, Any]) -> list:
+        """Matching descendants of element; context caches matches per run"""
+        if self.descendants is not None:
+            return self.descendants(element)
+        matches = context.get(self)
+        if matches is None:
+            matches = context[self] = set(
+                self.everywhere(element.getroottree().getroot())
+            )
+        if not matches:
+            return []
+        return [el for el in element.iterdescendants() if el in matches]
+
+
+class FailingSelector:
+    """A selector BeautifulSoup rejects; selecting with it raises the same error"""
+
+    __slots__ = ("error",)
+
+    def __init__(self, error: Exception):
+        self.error = error
+
+    def select_all(self, root) -> list:
+        raise self.error
+
+    def select(self, element, context: Dict[Any, Any]) -> list:
+        raise self.error
+
+
+class CSSPlanEngine:
+    """Reads lxml elements the way JsonCssExtractionStrategy reads BeautifulSoup tags"""
+
+    # Attributes BeautifulSoup returns as lists of whitespace-separated values
+    LIST_ATTRIBUTES = HTMLTreeBuilder.DEFAULT_CDATA_LIST_ATTRIBUTES
+
+    def compile(self, css: str):
+        try:
+            soupsieve.compile(css)
+        except Exception as e:
+            # e.g. an empty selector, the field falls back to its default
+            return FailingSelector(e)
+        return CSSPlanSelector(css)
+
+    compile_base = compile
+
+    @staticmethod
+    def found(element) -> bool:
+        """Whether a nested field is extracted from its first match; tags always are"""
+        return True
+
+    @staticmethod
+    def text(element) -> str:
+        """Same as get_text(strip=True) of BeautifulSoup"""
+        if element.tag in NON_TEXT_TAGS or not _has_non_text(element):
+            return "".join(text.strip() for text in element.itertext())
+        return "".join(text.strip() for text in _iter_visible_text(element))
+
+    @staticmethod
+    def html(element) -> str:
+        return etree.tostring(element, encoding="unicode", method="html", with_tail=False)
+
+    def attribute_reader(self, attribute: str) -> Callable:
+        if attribute in self.LIST_ATTRIBUTES["*"]:
+            list_tags = None
+        else:
+            list_tags = frozenset(
+                tag
+                for tag, attributes in self.LIST_ATTRIBUTES.items()
+                if attribute in attributes
+            )
+            if not list_tags:
+
+                def read(element) -> Optional[str]:
+                    return element.get(attribute)
+
+                return read
+
+        def read_list(element):
+            value = element.get(attribute)
+            if value is not None and (list_tags is None or element.tag in list_tags):
+                return value.split()
+            return value
+
+        return read_list
+
+
+class XPathPlanSelector:
+    """An XPath expression compiled once, evaluated like element.xpath()"""
+
+    __slots__ = ("expression", "xpath")
+
+    def __init__(self, expression: str, namespaces: Dict[str, str]):
+        self.xpath = etree.XPath(expression, namespaces=namespaces)
+        self.expression = expression
+
+    def select_all(self, root) -> list:
+        return self.xpath(root)
+
+    def select(self, element, context: Dict[Any, Any]) -> list:
+        return self.xpath(element)
+
+
+class XPathPlanEngine:
+    """
+    Reads lxml elements the way JsonXPathExtractionStrategy does.
+
+    Args:
+        css_to_xpath (Callable[[str], str]): Converts field selectors to XPath, see
+            JsonXPathExtractionStrategy._css_to_xpath().
+        namespaces (Dict[str, str], optional): Prefixes bound in all expressions, in
+            addition to NAMESPACES.
+    """
+
+    # EXSLT functions lxml provides, e.g. re:test(@href, '\.pdf$')
+    NAMESPACES = {
+        "re": "http://exslt.org/regular-expressions",
+        "set": "http://exslt.org/sets",
+        "str": "http://exslt.org/strings",
+    }
+
+    def __init__(
+        self,
+        css_to_xpath: Callable[[str], str],
+        namespaces: Optional[Dict[str, str]] = None,
+    ):
+        self.css_to_xpath = css_to_xpath
+        self.namespaces = {**self.NAMESPACES, **(namespaces or {})}
+
+    def compile_base(self, xpath: str):
+        try:
+            return XPathPlanSelector(xpath, self.namespaces)
+        except etree.XPathError as e:
+            # Interpreted, so that extracting raises the error of element.xpath()
+            raise PlanCompilationError(f"Invalid XPath {xpath}: {str(e)}") from e
+
+    def compile(self, selector: str):
+        xpath = self.css_to_xpath(selector)
+        if not xpath.startswith("."):
+            xpath = "." + xpath
+        try:
+            return XPathPlanSelector(xpath, self.namespaces)
+        except etree.XPathError as e:
+            # e.g. "div.price" becomes ".//div.price", the field falls back to its default
+            return FailingSelector(e)
+
+    @staticmethod
+    def found(element) -> bool:
+        """Whether a nested field is extracted from its first match, as `if element`"""
+        if isinstance(element, etree._Element):
+            return len(element) > 0  # Elements without children are false in lxml
+        return bool(element)
+
+    @staticmethod
+    def text(element) -> str:
+        return "".join(_descendant_text(element)).strip()
+
+    @staticmethod
+    def html(element) -> str:
+        return etree.tostring(element, encoding="unicode")
+
+    def attribute_reader(self, attribute: str) -> Callable:
+        def read(element) -> Optional[str]:
+            return element.get(attribute)
+
+        return read
+
+
+def _iter_visible_text(element):
+    if element.text:
+        yield element.text
+    for child in element:
+        if isinstance(child.tag, str) and child.tag not in NON_TEXT_TAGS:
+            yield from _iter_visible_text(child)
+        if child.tail:
+            yield child.tail
@@ -25,6 +25,14 @@ from .utils import (
 from .models import * # noqa: F403
 
 from .models import TokenUsage
+from .parsed_document import ParsedDocument
+from .extraction_plan import (
+    CSSPlanEngine,
+    ExtractionPlan,
+    PlanCompilationError,
+    XPathPlanEngine,
+    get_extraction_plan,
+)
 
 from .model_loader import * # noqa: F403
 from .model_loader import (
@@ -40,6 +48,7 @@ import numpy as np
 import re
 from bs4 import BeautifulSoup
 from lxml import html, etree
+from lxml.html import soupparser
 
 
 class ExtractionStrategy(ABC):
@@ -90,6 +99,21 @@ class ExtractionStrategy(ABC):
                 extracted_content.extend(future.result())
         return extracted_content
 
+    def run_document(
+        self, url: str, document: ParsedDocument, *q, **kwargs
+    ) -> List[Dict[str, Any]]:
+        """
+        Run the strategy on an already parsed page.
+
+        Strategies that can work on the shared tree override this to avoid parsing
+        the page again; by default the page's html is processed as a single section.
+
+        :param url: The URL of the webpage.
+        :param document: The parsed page.
+        :return: A list of processed JSON blocks.
+        """
+        return self.run(url, [document.html], *q, **kwargs)
+
 
 class NoExtractionStrategy(ExtractionStrategy):
     """
@@ -815,6 +839,25 @@ class JsonElementExtractionStrategy(ExtractionStrategy):
 
     DEL = "\n"
 
+    # Methods a compiled plan replaces; subclasses overriding one are interpreted
+    PLANNED_METHODS = (
+        "_parse_html",
+        "_parse_document",
+        "_get_base_elements",
+        "_get_elements",
+        "_get_element_text",
+        "_get_element_html",
+        "_get_element_attribute",
+        "_extract_field",
+        "_extract_single_field",
+        "_extract_list_item",
+        "_extract_item",
+        "_apply_transform",
+        "_compute_field",
+        "_css_to_xpath",
+        "_basic_css_to_xpath",
+    )
+
     def __init__(self, schema: Dict[str, Any], **kwargs):
         """
         Initialize the JSON element extraction strategy with a schema.
@@ -825,6 +868,42 @@ class JsonElementExtractionStrategy(ExtractionStrategy):
         super().__init__(**kwargs)
         self.schema = schema
         self.verbose = kwargs.get("verbose", False)
+        self._plan = None
+        self._plan_schema = None
+
+    @property
+    def plan(self) -> Optional[ExtractionPlan]:
+        """The compiled schema, or None if the schema has to be interpreted"""
+        if self._plan_schema is not self.schema:
+            # Looked up on first use and again only when a new schema is assigned
+            self._plan_schema = self.schema
+            self._plan = None
+            planned = next(
+                cls for cls in type(self).__mro__ if "_plan_engine" in vars(cls)
+            )
+            engine = self._plan_engine()
+            if engine is not None and all(
+                getattr(type(self), name, None) is getattr(planned, name, None)
+                for name in self.PLANNED_METHODS
+            ):
+                try:
+                    self._plan = get_extraction_plan(
+                        self.schema, engine, verbose=self.verbose
+                    )
+                except PlanCompilationError as e:
+                    if self.verbose:
+                        print(f"Interpreting schema: {str(e)}")
+        return self._plan
+
+    def _plan_engine(self):
+        """The engine to compile the schema with (see extraction_plan), None to interpret it"""
+        return None
+
+    def _plan_tree(self, html_content: str, document: Optional[ParsedDocument] = None):
+        """The lxml tree a plan runs on, the shared one when document is the page"""
+        if document is None or document.html != html_content:
+            document = ParsedDocument(html_content)
+        return document.tree
 
     def extract(
         self, url: str, html_content: str, *q, **kwargs
@@ -837,6 +916,9 @@ class JsonElementExtractionStrategy(ExtractionStrategy):
         2. Identifies base elements using the schema's base selector.
         3. Extracts fields from each base element using `_extract_item`.
 
+        If the schema compiles into a plan (see `plan`), the plan is run on the lxml tree
+        of the page instead.
+
         Args:
             url (str): The URL of the page being processed.
             html_content (str): The raw HTML content to parse and extract.
@@ -847,7 +929,15 @@ class JsonElementExtractionStrategy(ExtractionStrategy):
             List[Dict[str, Any]]: A list of extracted items, each represented as a dictionary.
         """
 
-        parsed_html = self._parse_html(html_content)
+        document = kwargs.get("document")
+        plan = self.plan
+        if plan is not None:
+            return plan.run(self._plan_tree(html_content, document))
+
+        if document is not None and document.html == html_content:
+            parsed_html = self._parse_document(document)
+        else:
+            parsed_html = self._parse_html(html_content)
         base_elements = self._get_base_elements(
             parsed_html, self.schema["baseSelector"]
         )
@@ -876,6 +966,10 @@ class JsonElementExtractionStrategy(ExtractionStrategy):
         """Parse HTML content into appropriate format"""
         pass
 
+    def _parse_document(self, document: ParsedDocument):
+        """Get the format of _parse_html from a parsed page, parsing its html by default"""
+        return self._parse_html(document.html)
+
     @abstractmethod
     def _get_base_elements(self, parsed_html, selector: str):
         """Get all base elements using the selector"""
@@ -1045,6 +1139,21 @@ class JsonElementExtractionStrategy(ExtractionStrategy):
         combined_html = self.DEL.join(sections)
         return self.extract(url, combined_html, **kwargs)
 
+    def run_document(
+        self, url: str, document: ParsedDocument, *q, **kwargs
+    ) -> List[Dict[str, Any]]:
+        """
+        Run the extraction on an already parsed page.
+
+        Args:
+            url (str): The URL of the page being processed.
+            document (ParsedDocument): The parsed page.
+
+        Returns:
+            List[Dict[str, Any]]: A list of extracted items.
+        """
+        return self.extract(url, document.html, document=document, **kwargs)
+
     @abstractmethod
     def _get_element_text(self, element) -> str:
         """Get text content from element"""
@@ -1132,6 +1241,21 @@ class JsonCssExtractionStrategy(JsonElementExtractionStrategy):
     Concrete implementation of `JsonElementExtractionStrategy` using CSS selectors.
 
     How it works:
+    1. Compiles the schema into an ExtractionPlan of precompiled lxml selectors and
+       field extractors on first use, shared by all instances with the same schema.
+    2. Runs the plan on the lxml tree of the page, the shared one when the page was
+       parsed already. libxml2 repairs misnested or unclosed markup differently from
+       html.parser (e.g. it closes a <p> before a <div>), so fragments and pages that
+       are not well nested (see ParsedDocument.is_well_nested) are parsed with
+       html.parser and converted to lxml instead, which costs about as much as
+       interpreting the schema.
+    3. Schemas the plan cannot compile (selectors cssselect does not support, such as
+       :scope or :-soup-contains) and subclasses overriding the element accessors are
+       interpreted with BeautifulSoup instead, as below.
+
+    Plans give the same results as BeautifulSoup, except that "html" fields are serialized by lxml (e.g. <br> instead of <br/>).
+
+    Interpreted extraction:
     1. Parses HTML content with BeautifulSoup.
     2. Selects elements using CSS selectors defined in the schema.
     3. Extracts field data and applies transformations as defined.
@@ -1153,6 +1277,17 @@ class JsonCssExtractionStrategy(JsonElementExtractionStrategy):
         kwargs["input_format"] = "html"  # Force HTML input
         super().__init__(schema, **kwargs)
 
+    def _plan_engine(self):
+        return CSSPlanEngine()
+
+    def _plan_tree(self, html_content: str, document: Optional[ParsedDocument] = None):
+        if document is None or document.html != html_content:
+            document = ParsedDocument(html_content)
+        # Both parsers build the same tree only when nothing needs repairing
+        if document.is_full_document and document.is_well_nested:
+            return document.tree
+        return soupparser.fromstring(html_content, features="html.parser")
+
     def _parse_html(self, html_content: str):
         return BeautifulSoup(html_content, "html.parser")
 
@@ -1183,6 +1318,13 @@ class JsonXPathExtractionStrategy(JsonElementExtractionStrategy):
     2. Selects elements using XPath expressions.
     3. Converts CSS selectors to XPath when needed.
 
+    The schema is compiled on first use into an ExtractionPlan of etree.XPath objects,
+    shared by all instances with the same schema, so lxml compiles each expression once
+    instead of once per page and element. Prefixes of the optional "namespaces" entry
+    of the schema, and the EXSLT prefixes "re", "set" and "str", are bound in compiled
+    expressions. Schemas with an invalid base selector and subclasses overriding the
+    element accessors are interpreted as below.
+
     Attributes:
         schema (Dict[str, Any]): The schema defining the extraction rules.
         verbose (bool): Enables verbose logging for debugging purposes.
@@ -1201,9 +1343,25 @@ class JsonXPathExtractionStrategy(JsonElementExtractionStrategy):
         kwargs["input_format"] = "html"  # Force HTML input
         super().__init__(schema, **kwargs)
 
+    def _plan_engine(self):
+        return XPathPlanEngine(self._css_to_xpath, self.schema.get("namespaces"))
+
+    def _plan_tree(self, html_content: str, document: Optional[ParsedDocument] = None):
+        # The tree extraction is interpreted on, relative expressions depend on its root
+        if document is not None and document.html == html_content:
+            return self._parse_document(document)
+        return self._parse_html(html_content)
+
     def _parse_html(self, html_content: str):
         return html.fromstring(html_content)
 
+    def _parse_document(self, document: ParsedDocument):
+        # The shared tree is only read, XPath evaluation never modifies it.
+        # Fragments keep their own parse, rooted at the fragment like html.fromstring.
+        if document.is_full_document:
+            return document.tree
+        return self._parse_html(document.html)
+
     def _get_base_elements(self, parsed_html, selector: str):
         return parsed_html.xpath(selector)
 
@@ -0,0 +1,357 @@
+from contextlib import ExitStack
+from html import escape
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from lxml import etree
+from lxml import html as lhtml
+
+from .config import (
+    IMPORTANT_ATTRS,
+    INCREMENTAL_CHUNK_SIZE,
+    INCREMENTAL_SECTION_SIZE,
+    SOCIAL_MEDIA_DOMAINS,
+)
+from .content_scraping_strategy import LXMLWebScrapingStrategy
+from .lxml_markdown import ATTRIBUTE_TAGS, LXMLMarkdownConverter
+from .models import MarkdownGenerationResult
+from .utils import URLNormalizer, extract_metadata_using_lxml
+
+# Removed with their content, like LXMLWebScrapingStrategy does
+REMOVED_TAGS = frozenset({"script", "style", "link", "meta", "noscript"})
+
+
+def truncate_html(
+    html: str, max_length: Optional[int]
+) -> Tuple[str, Optional[Dict[str, int]]]:
+    """
+    Cut html down to at most max_length characters.
+
+    The cut is made after the last complete tag, so that no tag is split. The
+    parser closes the elements left open.
+
+    Args:
+        html: The HTML of the page.
+        max_length: Maximum length of the HTML, None for no limit.
+
+    Returns:
+        Tuple[str, Optional[Dict[str, int]]]: The HTML and the truncation metadata
+        (max_length, processed_length and total_length), None if it was not cut.
+    """
+    if not max_length or len(html) <= max_length:
+        return html, None
+    cut = html.rfind(">", 0, max_length) + 1 or max_length
+    return html[:cut], {
+        "max_length": max_length,
+        "processed_length": cut,
+        "total_length": len(html),
+    }
+
+
+class _Frame:
+    """An element the parser has started and not yet ended"""
+
+    __slots__ = ("element", "position", "opened", "skipped")
+
+    def __init__(self, element: lhtml.HtmlElement, position: int):
+        self.element = element
+        self.position = position
+        self.opened = False
+        self.skipped = False
+
+
+class IncrementalPageProcessor:
+    """
+    Cleans a page and converts it to markdown while it is parsed, in bounded memory.
+
+    The HTML is fed to lxml's HTMLPullParser in chunks. Each completed subtree is
+    cleaned by the rules of LXMLWebScrapingStrategy, converted by one
+    LXMLMarkdownConverter, written out and dropped from the tree, so only the
+    open elements and the subtrees in progress are held in memory. Subtrees are
+    kept whole up to section_size characters; an element spanning more is
+    opened: its tags are written on their own and its children processed one by
+    one. Cleaned HTML and markdown are written to file sinks or collected in
+    memory.
+
+    Compared with the full scrape, opened elements are kept even if they end up
+    empty, links of opened <a> elements are not collected, and images are scored
+    by their position within their subtree.
+
+    Usage:
+        processor = IncrementalPageProcessor()
+        scraped, markdown = processor.process(url, html, markdown_sink="page.md")
+    """
+
+    def __init__(
+        self,
+        scraping_strategy: Optional[LXMLWebScrapingStrategy] = None,
+        chunk_size: int = INCREMENTAL_CHUNK_SIZE,
+        section_size: int = INCREMENTAL_SECTION_SIZE,
+    ):
+        """
+        Initialize the processor.
+
+        Args:
+            scraping_strategy: Strategy whose cleaning rules are applied to each subtree.
+            chunk_size: Characters of HTML fed to the parser at a time.
+            section_size: Characters a subtree may span before it is opened.
+        """
+        self.scraping_strategy = scraping_strategy or LXMLWebScrapingStrategy()
+        self.chunk_size = chunk_size
+        self.section_size = section_size
+
+    def process(
+        self,
+        url: str,
+        html: str,
+        markdown_options: Optional[Dict[str, Any]] = None,
+        citations: bool = True,
+        cleaned_html_sink: Optional[str] = None,
+        markdown_sink: Optional[str] = None,
+        **kwargs,
+    ) -> Tuple[Dict[str, Any], MarkdownGenerationResult]:
+        """
+        Process a page.
+
+        Args:
+            url: URL of the page, the base of its links.
+            html: HTML of the page.
+            markdown_options: LXMLMarkdownConverter options.
+            citations: Whether to number links and images. Not done for a markdown_sink.
+            cleaned_html_sink: Path the cleaned HTML is written to instead of being returned.
+            markdown_sink: Path the raw markdown is written to instead of being returned.
+            **kwargs: Scraping parameters, as for LXMLWebScrapingStrategy.scrap().
+
+        Returns:
+            Tuple[Dict[str, Any], MarkdownGenerationResult]: The scraping result, in
+            the form ContentScrapingStrategy._scrap() returns it, and the markdown.
+            Outputs written to a sink are empty.
+        """
+        # Same normalization as LXMLWebScrapingStrategy._scrap()
+        kwargs["exclude_domains"] = set(kwargs.get("exclude_domains", []))
+        if kwargs.get("exclude_social_media_links", False):
+            kwargs["exclude_domains"].update(
+                kwargs.get("exclude_social_media_domains", []) + SOCIAL_MEDIA_DOMAINS
+            )
+        self._url = url
+        self._url_normalizer = URLNormalizer(url)
+        self._kwargs = kwargs
+        self._removed_tags = REMOVED_TAGS.union(kwargs.get("excluded_tags") or [])
+        if kwargs.get("remove_forms", False):
+            self._removed_tags = self._removed_tags | {"form"}
+        self._converter = LXMLMarkdownConverter(url, **(markdown_options or {}))
+        self._link_map = {} if citations and not markdown_sink else None
+        self._media = {"images": [], "videos": [], "audios": []}
+        self._internal_links: Dict[str, Any] = {}
+        self._external_links: Dict[str, Any] = {}
+        self._metadata: Dict[str, Any] = {}
+        self._written: Set[lhtml.HtmlElement] = set()
+
+        cleaned_html: List[str] = []
+        markdown: List[str] = []
+        markdown_with_citations: List[str] = []
+        with ExitStack() as files:
+            if cleaned_html_sink:
+                sink = files.enter_context(open(cleaned_html_sink, "w", encoding="utf-8"))
+                self._write_html = sink.write
+            else:
+                self._write_html = cleaned_html.append
+            if markdown_sink:
+                sink = files.enter_context(open(markdown_sink, "w", encoding="utf-8"))
+                self._write_markdown = sink.write
+            else:
+                self._write_markdown = markdown.append
+            self._write_citations = markdown_with_citations.append
+
+            self._parse(html or "")
+            self._converter.finish()
+            self._take()
+
+        references = (
+            self._converter.references(self._link_map) if self._link_map else ""
+        )
+        scraped = {
+            "cleaned_html": "".join(cleaned_html).strip(),
+            "success": True,
+            "media": self._media,
+            "links": {
+                "internal": list(self._internal_links.values()),
+                "external": list(self._external_links.values()),
+            },
+            "metadata": self._metadata,
+        }
+        return scraped, MarkdownGenerationResult(
+            raw_markdown="".join(markdown),
+            markdown_with_citations="".join(markdown_with_citations),
+            references_markdown=references,
+        )
+
+    def _parse(self, html: str) -> None:
+        """Feeds html to the parser chunk by chunk, processing the events of each"""
+        parser = etree.HTMLPullParser(events=("start", "end"))
+        parser.set_element_class_lookup(lhtml.HtmlElementClassLookup())
+        stack: List[_Frame] = []
+        for position in range(0, len(html), self.chunk_size):
+            parser.feed(html[position : position + self.chunk_size])
+            self._handle_events(parser.read_events(), stack, position)
+        try:
+            root = parser.close()
+        except etree.XMLSyntaxError:
+            # Nothing to parse
+            return
+        self._handle_events(parser.read_events(), stack, len(html))
+        if root not in self._written:
+            # The whole page fit in one section
+            self._write_subtree(root)
+            self._take()
+
+    def _handle_events(self, events, stack: List[_Frame], position: int) -> None:
+        for event, element in events:
+            if event == "start":
+                if stack:
+                    parent = stack[-1]
+                    if (
+                        not parent.opened
+                        and position - parent.position > self.section_size
+                        # The head is kept whole for the metadata
+                        and not any(frame.element.tag == "head" for frame in stack)
+                    ):
+                        self._open_frames(stack, element)
+                    elif parent.opened:
+                        self._flush(parent, until=element)
+                        self._take()
+                stack.append(_Frame(element, position))
+            else:
+                frame = stack.pop()
+                if frame.opened:
+                    self._flush(frame)
+                    if not frame.skipped:
+                        self._close(element)
+                    self._written.add(element)
+                    self._take()
+
+    def _open_frames(self, stack: List[_Frame], element: lhtml.HtmlElement) -> None:
+        """Opens the frames of the stack that are not yet, outermost first"""
+        for index, frame in enumerate(stack):
+            if frame.opened:
+                continue
+            frame.opened = True
+            frame.skipped = (index and stack[index - 1].skipped) or (
+                frame.element.tag in self._removed_tags
+            )
+            if not frame.skipped:
+                self._open(frame.element)
+            following = stack[index + 1].element if index + 1 < len(stack) else element
+            self._flush(frame, until=following)
+        self._take()
+
+    def _open(self, element: lhtml.HtmlElement) -> None:
+        """Writes the start tag and the text of an element"""
+        tag = element.tag
+        attributes = self._attributes(element)
+        self._converter.handle_tag(
+            tag, attributes if tag in ATTRIBUTE_TAGS else {}, True
+        )
+        try:
+            markup = lhtml.tostring(
+                lhtml.Element(tag, attributes), encoding="unicode", method="html"
+            )
+            self._write_html(markup[: markup.rindex("</")])
+        except ValueError:
+            self._write_html(f"<{tag}>")
+        self._text(element.text)
+
+    def _close(self, element: lhtml.HtmlElement) -> None:
+        """Writes the end tag of an element"""
+        if element.tag not in lhtml.defs.empty_tags:
+            self._converter.handle_tag(element.tag, {}, False)
+            self._write_html(f"</{element.tag}>")
+
+    def _flush(self, frame: _Frame, until: Optional[lhtml.HtmlElement] = None) -> None:
+        """Processes and drops the children of an opened frame before until, or all of them"""
+        element = frame.element
+        while len(element):
+            child = element[0]
+            if child is until:
+                break
+            tail = child.tail
+            if frame.skipped:
+                pass
+            elif child in self._written:
+                self._written.discard(child)
+            elif isinstance(child.tag, str):
+                self._write_subtree(child)
+            elif not self._kwargs.get("remove_comments", False):
+                self._write_html(lhtml.tostring(child, encoding="unicode", with_tail=False))
+            if child.getparent() is element:
+                element.remove(child)
+            if not frame.skipped:
+                self._text(tail)
+
+    def _write_subtree(self, element: lhtml.HtmlElement) -> None:
+        """Cleans a complete subtree, without its tail, and writes it out"""
+        wrapper = lhtml.Element("div")
+        wrapper.append(element)
+        element.tail = None
+        if element.tag in ("html", "head"):
+            self._metadata = extract_metadata_using_lxml("", wrapper)
+        self._clean(wrapper)
+        for cleaned in wrapper:
+            if isinstance(cleaned.tag, str):
+                self._converter.feed(cleaned)
+            self._write_html(
+                lhtml.tostring(cleaned, encoding="unicode", method="html", with_tail=False)
+            )
+
+    def _clean(self, wrapper: lhtml.HtmlElement) -> None:
+        """Applies the cleaning of LXMLWebScrapingStrategy._scrap() to the content of wrapper"""
+        scraping_strategy = self.scraping_strategy
+        if self._kwargs.get("remove_comments", False):
+            for comment in wrapper.xpath(".//comment()"):
+                comment.getparent().remove(comment)
+        for element in list(wrapper.iterdescendants(*self._removed_tags)):
+            if element.getparent() is not None:
+                element.getparent().remove(element)
+
+        scraping_strategy._process_element(
+            self._url,
+            wrapper,
+            self._media,
+            self._internal_links,
+            self._external_links,
+            base_domain=self._url_normalizer.base_domain,
+            url_normalizer=self._url_normalizer,
+            **self._kwargs,
+        )
+        for img in wrapper.xpath(".//img[@src]"):
+            src = img.get("src", "")
+            if scraping_strategy.BASE64_PATTERN.match(src):
+                img.set("src", scraping_strategy.BASE64_PATTERN.sub("", src))
+        scraping_strategy.remove_empty_elements_fast(wrapper, 1)
+        scraping_strategy.remove_unwanted_attributes_fast(
+            wrapper, keep_data_attributes=self._kwargs.get("keep_data_attributes", False)
+        )
+
+    def _attributes(self, element: lhtml.HtmlElement) -> Dict[str, str]:
+        """The attributes of an element kept in the cleaned HTML"""
+        keep_data_attributes = self._kwargs.get("keep_data_attributes", False)
+        return {
+            name: value
+            for name, value in element.attrib.items()
+            if name in IMPORTANT_ATTRS
+            or (keep_data_attributes and name.startswith("data-"))
+        }
+
+    def _text(self, text: Optional[str]) -> None:
+        if text:
+            self._converter.feed_data(text)
+            self._write_html(escape(text, quote=False))
+
+    def _take(self) -> None:
+        """Writes out the markdown converted so far, unless a link is open"""
+        if self._converter.astack:
+            return
+        markdown, markdown_with_citations = self._converter.take(self._link_map)
+        if markdown:
+            self._write_markdown(markdown)
+        if markdown_with_citations:
+            self._write_citations(markdown_with_citations)
@@ -0,0 +1,698 @@
+import re
+import string
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+from lxml import etree
+from lxml import html as lhtml
+
+from .html2text.elements import ListElement
+from .html2text.utils import escape_md, hn, list_numbering_start
+from .utils import fast_urljoin
+
+# html2text options LXMLMarkdownConverter implements, with their CustomHTML2Text
+# defaults. Other options, or FIXED_OPTIONS at other values, need html2text.
+CONVERTER_OPTIONS = {
+    "ignore_emphasis": False,
+    "ignore_links": False,
+    "ignore_images": False,
+    "protect_links": False,
+    "single_line_break": False,
+    "skip_internal_links": False,
+    "ignore_mailto_links": True,
+    "include_sup_sub": False,
+    "handle_code_in_pre": False,
+    "mark_code": False,  # Only affects <pre>, which crawl4ai renders as fenced code
+}
+FIXED_OPTIONS = {"body_width": 0, "escape_snob": False}
+
+# Tags whose attributes the conversion reads
+ATTRIBUTE_TAGS = frozenset({"a", "img", "ol", "ul", "abbr"})
+# HTMLParser reports these characters, written as entities, as separate strings
+ENTITY_CHARACTERS = re.compile(r"([&<>])")
+WHITESPACE = re.compile(r"\s+")
+ABSOLUTE_URL = re.compile(r"^[a-zA-Z+]+://")
+STRESS_SPACING = re.compile(r"[^][(){}\s.!?]")
+# The part of a markdown link after its text, as convert_links_to_citations reads it
+LINK_TARGET = re.compile(r'\]\(([^)]+?)(?:\s+"([^"]*)")?\)')
+
+
+class LXMLMarkdownConverter:
+    """
+    Converts an lxml tree to markdown with the rules of crawl4ai's CustomHTML2Text.
+
+    The tree is walked directly instead of serialized and tokenized again by
+    HTMLParser, and links and images are numbered as they are written, so the
+    citations need no second pass over the markdown. The conversion state follows
+    html2text's attribute for attribute and, like a CustomHTML2Text instance,
+    carries over between the documents converted with the same converter.
+
+    The tree does not record how characters were written in the source, so named
+    entities other than &amp;, &lt; and &gt; (which html2text would turn into
+    ASCII, like &mdash; into --) are converted as the characters they stand for.
+
+    Usage:
+        converter = LXMLMarkdownConverter(base_url, protect_links=True)
+        markdown, with_citations, references = converter.convert(tree)
+    """
+
+    def __init__(self, base_url: str = "", **options):
+        """
+        Initialize the converter.
+
+        Args:
+            base_url: URL relative links are joined with.
+            **options: html2text options, see CONVERTER_OPTIONS.
+        """
+        unknown = set(options) - set(CONVERTER_OPTIONS)
+        if unknown:
+            raise ValueError(f"Unsupported html2text options: {sorted(unknown)}")
+        for key, default in CONVERTER_OPTIONS.items():
+            setattr(self, key, options.get(key, default))
+        self.baseurl = base_url
+
+        self.outtextlist: List[str] = []
+        self.quiet = 0
+        self.p_p = 0
+        self.start = True
+        self.space = False
+        self.astack: List[Optional[Dict[str, Optional[str]]]] = []
+        self.maybe_automatic_link: Optional[str] = None
+        self.empty_link = False
+        self.list: List[ListElement] = []
+        self.blockquote = 0
+        self.code = False
+        self.quote = False
+        self.br_toggle = ""
+        self.lastWasNL = False
+        self.lastWasList = False
+        self.stressed = False
+        self.preceding_stressed = False
+        self.preceding_data = ""
+        self.current_tag = ""
+        self.inheader = False
+        self.abbr_title: Optional[str] = None
+        self.abbr_data: Optional[str] = None
+        self.abbr_list: Dict[str, str] = {}
+        self.split_next_td = False
+        self.td_count = 0
+        self.table_start = False
+        self.inside_pre = False
+        self.inside_code = False
+
+        # Citation bookkeeping: output index of each open link's "[", the link
+        # that owns maybe_automatic_link, and the (kind, start, end) output
+        # indexes of the links and images written
+        self._link_opens: List[Optional[int]] = []
+        self._link_slot: Optional[int] = None
+        self._links: List[Tuple[str, int, int]] = []
+        self._wrote = False
+        self._joined_urls: Dict[str, str] = {}
+        self._url_cache: Dict[str, str] = {}
+
+    def convert(
+        self, tree: lhtml.HtmlElement, citations: bool = True
+    ) -> Tuple[str, str, str]:
+        """
+        Convert a tree.
+
+        Args:
+            tree: Root of the tree, not modified.
+            citations: Whether to number the links and images.
+
+        Returns:
+            Tuple[str, str, str]: The markdown, the markdown with citations and the
+            references markdown (both empty if citations is False).
+        """
+        self.start = True
+        self._links = []
+        self._walk(tree)
+        self.finish()
+        if not citations:
+            return self.take()[0], "", ""
+        link_map = {}
+        markdown, with_citations = self.take(link_map)
+        return markdown, with_citations, self.references(link_map)
+
+    def feed(self, element: lhtml.HtmlElement) -> None:
+        """Converts element and its descendants, without its tail"""
+        self._walk(element)
+
+    def finish(self) -> None:
+        """Writes what the end of the document completes, HTML2Text.finish()"""
+        self.pbr()
+        self.o("", force="end")
+
+    def take(self, link_map: Optional[Dict[str, Tuple[int, str]]] = None) -> Tuple[str, str]:
+        """
+        Takes the markdown written since the last call.
+
+        Lets a document be converted in pieces. Call it only outside of links,
+        when astack is empty, as the citations of an open link are not known yet.
+
+        Args:
+            link_map: Numbers of the URLs cited so far, updated with the links and
+                images taken. Without it no citations are made.
+
+        Returns:
+            Tuple[str, str]: The markdown and the markdown with citations.
+        """
+        parts = self.outtextlist
+        links = self._links
+        self.outtextlist = []
+        self._links = []
+        markdown = "".join(parts)
+        if link_map is None:
+            return markdown, ""
+        return markdown, self._cite(parts, links, link_map)
+
+    def _walk(self, root) -> None:
+        """Feeds the start tags, strings and end tags of root in document order"""
+        for event, item in etree.iterwalk(root, events=("start", "end")):
+            tag = item.tag
+            if event == "start":
+                if isinstance(tag, str):
+                    self.handle_tag(
+                        tag, dict(item.attrib) if tag in ATTRIBUTE_TAGS else {}, True
+                    )
+                    if item.text:
+                        self.feed_data(item.text)
+                # Comments and processing instructions only split the text
+                continue
+            if isinstance(tag, str) and tag not in lhtml.defs.empty_tags:
+                self.handle_tag(tag, {}, False)
+            if item.tail and item is not root:
+                self.feed_data(item.tail)
+
+    def feed_data(self, text: str) -> None:
+        """Hands text to handle_data in the pieces HTMLParser would report"""
+        if "&" in text or "<" in text or ">" in text:
+            for piece in ENTITY_CHARACTERS.split(text):
+                if piece:
+                    self.handle_data(piece)
+        else:
+            self.handle_data(text)
+
+    # Conversion rules of HTML2Text and CustomHTML2Text
+
+    def handle_tag(self, tag: str, attrs: Dict[str, Optional[str]], start: bool) -> None:
+        if tag == "pre":
+            if start:
+                self.o("```\n")
+                self.inside_pre = True
+            else:
+                self.o("\n```\n")
+                self.inside_pre = False
+            return
+        if tag == "code":
+            if self.inside_pre and not self.handle_code_in_pre:
+                return
+            self.o("`")
+            self.inside_code = start
+            return
+
+        self.current_tag = tag
+
+        # first thing inside the anchor tag is another tag that produces some output
+        if (
+            start
+            and self.maybe_automatic_link is not None
+            and tag not in ("p", "div", "style", "dl", "dt")
+            and (tag != "img" or self.ignore_images)
+        ):
+            self._open_link("[")
+            self.maybe_automatic_link = None
+            self.empty_link = False
+
+        level = hn(tag)
+        if level:
+            if self.astack:
+                if start:
+                    self.inheader = True
+                    # are inside link name, so only add '#' if it can appear before '['
+                    if self.outtextlist and self.outtextlist[-1] == "[":
+                        self.outtextlist.pop()
+                        index = len(self.outtextlist)
+                        reopen = [
+                            slot
+                            for slot, opened in enumerate(self._link_opens)
+                            if opened == index
+                        ]
+                        for slot in reopen:
+                            self._link_opens[slot] = None
+                        self.space = False
+                        self.o(level * "#" + " ")
+                        self.o("[")
+                        if self._wrote:
+                            for slot in reopen:
+                                self._link_opens[slot] = len(self.outtextlist) - 1
+                else:
+                    self.p_p = 0  # don't break up link name
+                    self.inheader = False
+                    return  # prevent redundant emphasis marks on headers
+            else:
+                self.p()
+                if start:
+                    self.inheader = True
+                    self.o(level * "#" + " ")
+                else:
+                    self.inheader = False
+                    return  # prevent redundant emphasis marks on headers
+
+        handler = self.TAG_HANDLERS.get(tag)
+        if handler is not None:
+            handler(self, tag, attrs, start)
+
+        if tag == "ol" or tag == "ul":
+            self.lastWasList = True
+        else:
+            self.lastWasList = False
+
+    def _block(self, tag, attrs, start):
+        if not self.astack and not self.split_next_td:
+            self.p()
+
+    def _br(self, tag, attrs, start):
+        if start:
+            self.o("  \n> " if self.blockquote > 0 else "  \n")
+
+    def _hr(self, tag, attrs, start):
+        if start:
+            self.p()
+            self.o("* * *")
+            self.p()
+
+    def _quiet(self, tag, attrs, start):
+        self.quiet += 1 if start else -1
+
+    def _body(self, tag, attrs, start):
+        self.quiet = 0  # sites like 9rules.com never close <head>
+
+    def _blockquote(self, tag, attrs, start):
+        if start:
+            self.p()
+            self.o("> ", force=True)
+            self.start = True
+            self.blockquote += 1
+        else:
+            self.blockquote -= 1
+            self.p()
+
+    def _emphasis(self, tag, attrs, start):
+        if self.ignore_emphasis:
+            return
+        # Separate with a space if we immediately follow an alphanumeric character
+        if (
+            start
+            and self.preceding_data
+            and self.preceding_data[-1] not in string.whitespace
+            and self.preceding_data[-1] not in string.punctuation
+        ):
+            emphasis = " _"
+            self.preceding_data += " "
+        else:
+            emphasis = "_"
+        self.o(emphasis)
+        if start:
+            self.stressed = True
+
+    def _strong(self, tag, attrs, start):
+        if self.ignore_emphasis:
+            return
+        # Separate with space if we immediately follow an * character
+        if start and self.preceding_data and self.preceding_data[-1] == "*":
+            strong = " **"
+            self.preceding_data += " "
+        else:
+            strong = "**"
+        self.o(strong)
+        if start:
+            self.stressed = True
+
+    def _strike(self, tag, attrs, start):
+        if start and self.preceding_data and self.preceding_data[-1] == "~":
+            strike = " ~~"
+            self.preceding_data += " "
+        else:
+            strike = "~~"
+        self.o(strike)
+        if start:
+            self.stressed = True
+
+    def _inline_code(self, tag, attrs, start):
+        self.o("`")
+        self.code = not self.code
+
+    def _abbr(self, tag, attrs, start):
+        if start:
+            self.abbr_title = None
+            self.abbr_data = ""
+            if "title" in attrs:
+                self.abbr_title = attrs["title"]
+        else:
+            if self.abbr_title is not None:
+                self.abbr_list[self.abbr_data] = self.abbr_title
+                self.abbr_title = None
+            self.abbr_data = None
+
+    def _q(self, tag, attrs, start):
+        self.o('"')
+        self.quote = not self.quote
+
+    def _a(self, tag, attrs, start):
+        if self.ignore_links:
+            return
+        if start:
+            href = attrs.get("href")
+            if (
+                href is not None
+                and not (self.skip_internal_links and href.startswith("#"))
+                and not (self.ignore_mailto_links and href.startswith("mailto:"))
+            ):
+                self.astack.append(attrs)
+                self._link_opens.append(None)
+                self._link_slot = len(self.astack) - 1
+                self.maybe_automatic_link = href
+                self.empty_link = True
+                if self.protect_links:
+                    attrs["href"] = "<" + href + ">"
+            else:
+                self.astack.append(None)
+                self._link_opens.append(None)
+        elif self.astack:
+            a = self.astack.pop()
+            opened = self._link_opens.pop()
+            if self.maybe_automatic_link and not self.empty_link:
+                self.maybe_automatic_link = None
+            elif a:
+                if self.empty_link:
+                    self.o("[")
+                    if self._wrote:
+                        opened = len(self.outtextlist) - 1
+                    self.empty_link = False
+                    self.maybe_automatic_link = None
+                self.p_p = 0
+                title = escape_md(a.get("title") or "")
+                url = self._urljoin(a["href"])
+                title = ' "{}"'.format(title) if title.strip() else ""
+                self.o("]({url}{title})".format(url=escape_md(url), title=title))
+                if self._wrote and opened is not None:
+                    self._links.append(("link", opened, len(self.outtextlist) - 1))
+
+    def _img(self, tag, attrs, start):
+        if not start or self.ignore_images or attrs.get("src") is None:
+            return
+        alt = attrs.get("alt") or ""
+        if self.maybe_automatic_link is not None:
+            self._open_link("[")
+            self.maybe_automatic_link = None
+            self.empty_link = False
+        self.o("![" + escape_md(alt) + "]")
+        opened = len(self.outtextlist) - 1 if self._wrote else None
+        self.o("(" + escape_md(self._urljoin(attrs["src"])) + ")")
+        if self._wrote and opened is not None:
+            self._links.append(("image", opened, len(self.outtextlist) - 1))
+
+    def _urljoin(self, url: str) -> str:
+        joined = self._joined_urls.get(url)
+        if joined is None:
+            joined = self._joined_urls[url] = urljoin(self.baseurl, url)
+        return joined
+
+    def _dl(self, tag, attrs, start):
+        if start:
+            self.p()
+
+    def _dt(self, tag, attrs, start):
+        if not start:
+            self.pbr()
+
+    def _dd(self, tag, attrs, start):
+        if start:
+            self.o("    ")
+        else:
+            self.pbr()
+
+    def _list(self, tag, attrs, start):
+        if not self.list and not self.lastWasList:
+            self.p()
+        if start:
+            self.list.append(ListElement(tag, list_numbering_start(attrs)))
+        elif self.list:
+            self.list.pop()
+            if not self.list:
+                self.o("\n")
+
+    def _li(self, tag, attrs, start):
+        self.pbr()
+        if start:
+            li = self.list[-1] if self.list else ListElement("ul", 0)
+            # Indent two spaces per list, except use three spaces for an
+            # unordered list inside an ordered list.
+            parent_list = None
+            for element in self.list:
+                self.o("   " if parent_list == "ol" and element.name == "ul" else "  ")
+                parent_list = element.name
+            if li.name == "ul":
+                self.o("* ")
+            elif li.name == "ol":
+                li.num += 1
+                self.o(str(li.num) + ". ")
+            self.start = True
+
+    def _table(self, tag, attrs, start):
+        if start:
+            self.table_start = True
+
+    def _cell(self, tag, attrs, start):
+        if start:
+            if self.split_next_td:
+                self.o("| ")
+            self.split_next_td = True
+            self.td_count += 1
+
+    def _tr(self, tag, attrs, start):
+        if start:
+            self.td_count = 0
+        else:
+            self.split_next_td = False
+            self.soft_br()
+            if self.table_start:
+                # Underline table header
+                self.o("|".join(["---"] * self.td_count))
+                self.soft_br()
+                self.table_start = False
+
+    def _sup_sub(self, tag, attrs, start):
+        if self.include_sup_sub:
+            self.o("<{}>".format(tag) if start else "</{}>".format(tag))
+
+    TAG_HANDLERS = {
+        "p": _block,
+        "div": _block,
+        "br": _br,
+        "hr": _hr,
+        "head": _quiet,
+        "style": _quiet,
+        "script": _quiet,
+        "body": _body,
+        "blockquote": _blockquote,
+        "em": _emphasis,
+        "i": _emphasis,
+        "u": _emphasis,
+        "strong": _strong,
+        "b": _strong,
+        "del": _strike,
+        "strike": _strike,
+        "s": _strike,
+        "kbd": _inline_code,
+        "tt": _inline_code,
+        "abbr": _abbr,
+        "q": _q,
+        "a": _a,
+        "img": _img,
+        "dl": _dl,
+        "dt": _dt,
+        "dd": _dd,
+        "ol": _list,
+        "ul": _list,
+        "li": _li,
+        "table": _table,
+        "td": _cell,
+        "th": _cell,
+        "tr": _tr,
+        "sup": _sup_sub,
+        "sub": _sup_sub,
+    }
+
+    def handle_data(self, data: str) -> None:
+        if self.inside_pre:
+            self.o(data)
+            return
+        if self.inside_code:
+            self.o(data.replace("\n", " "))
+            return
+
+        if self.stressed:
+            data = data.strip()
+            self.stressed = False
+            self.preceding_stressed = True
+        elif self.preceding_stressed:
+            if (
+                STRESS_SPACING.match(data[0])
+                and not hn(self.current_tag)
+                and self.current_tag not in ("a", "code", "pre")
+            ):
+                # should match a letter or common punctuation
+                data = " " + data
+            self.preceding_stressed = False
+
+        if self.maybe_automatic_link is not None:
+            href = self.maybe_automatic_link
+            if href == data and ABSOLUTE_URL.match(href):
+                self.o("<" + data + ">")
+                self.empty_link = False
+                return
+            self._open_link("[")
+            self.maybe_automatic_link = None
+            self.empty_link = False
+
+        self.preceding_data = data
+        self.o(data, puredata=True)
+
+    def _open_link(self, bracket: str) -> None:
+        """Writes the "[" of the link that owns maybe_automatic_link"""
+        self.o(bracket)
+        if self._wrote and self._link_slot is not None and self._link_slot < len(
+            self._link_opens
+        ):
+            self._link_opens[self._link_slot] = len(self.outtextlist) - 1
+
+    def pbr(self) -> None:
+        if self.p_p == 0:
+            self.p_p = 1
+
+    def p(self) -> None:
+        self.p_p = 1 if self.single_line_break else 2
+
+    def soft_br(self) -> None:
+        self.pbr()
+        self.br_toggle = "  "
+
+    def out(self, s: str) -> None:
+        self.outtextlist.append(s)
+        if s:
+            self.lastWasNL = s[-1] == "\n"
+
+    def o(self, data: str, puredata: bool = False, force=False) -> None:
+        """Writes data after the pending line breaks and space"""
+        self._wrote = False
+        if self.abbr_data is not None:
+            self.abbr_data += data
+
+        if self.quiet:
+            return
+        if puredata:
+            data = WHITESPACE.sub(" ", data)
+            if data and data[0] == " ":
+                self.space = True
+                data = data[1:]
+        if not data and not force:
+            return
+
+        bq = ">" * self.blockquote
+        if not (force and data and data[0] == ">") and self.blockquote:
+            bq += " "
+
+        if self.start:
+            self.space = False
+            self.p_p = 0
+            self.start = False
+
+        if force == "end":
+            # It's the end.
+            self.p_p = 0
+            self.out("\n")
+            self.space = False
+
+        if self.p_p:
+            self.out((self.br_toggle + "\n" + bq) * self.p_p)
+            self.space = False
+            self.br_toggle = ""
+
+        if self.space:
+            if not self.lastWasNL:
+                self.out(" ")
+            self.space = False
+
+        if self.abbr_list and force == "end":
+            for abbr, definition in self.abbr_list.items():
+                self.out("  *[" + abbr + "]: " + definition + "\n")
+
+        self.p_p = 0
+        self.out(data)
+        self._wrote = True
+
+    # Citations
+
+    def _cite(
+        self,
+        parts: List[str],
+        links: List[Tuple[str, int, int]],
+        link_map: Dict[str, Tuple[int, str]],
+    ) -> str:
+        """
+        Numbers the links and images written to parts.
+
+        Follows convert_links_to_citations: a link or image becomes its text and
+        the number of its URL, and each URL is listed once in the references with
+        its title and text. Links and images without text, or whose text contains
+        "]", are left as they are.
+        """
+        replacements = {}
+        for kind, start, end in sorted(links, key=lambda link: link[1]):
+            if kind == "link":
+                text = "".join(parts[start + 1 : end])
+                target = LINK_TARGET.match(parts[end])
+                rest = parts[end][target.end():] if target else ""
+            else:
+                text = parts[start][2:-1]
+                target = LINK_TARGET.match("]" + parts[end])
+                rest = ("]" + parts[end])[target.end():] if target else ""
+            if not text or "]" in text or not target:
+                continue
+
+            url, title = target.groups()
+            if self.baseurl and not url.startswith(("http://", "https://", "mailto:")):
+                if url not in self._url_cache:
+                    self._url_cache[url] = fast_urljoin(self.baseurl, url)
+                url = self._url_cache[url]
+            if url not in link_map:
+                desc = []
+                if title:
+                    desc.append(title)
+                if text and text != title:
+                    desc.append(text)
+                link_map[url] = (len(link_map) + 1, ": " + " - ".join(desc) if desc else "")
+            num = link_map[url][0]
+
+            replacements[start] = ""
+            if kind == "link":
+                replacements[end] = f"⟨{num}⟩{rest}"
+            else:
+                replacements[end] = f"![{text}⟨{num}⟩]{rest}"
+
+        return "".join(
+            replacements.get(index, part) for index, part in enumerate(parts)
+        )
+
+    @staticmethod
+    def references(link_map: Dict[str, Tuple[int, str]]) -> str:
+        """The references markdown of the URLs in link_map"""
+        references = ["\n\n## References\n\n"]
+        references.extend(
+            f"⟨{num}⟩ {url}{desc}\n"
+            for url, (num, desc) in sorted(link_map.items(), key=lambda x: x[1][0])
+        )
+        return "".join(references)
+
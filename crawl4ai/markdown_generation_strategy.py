@@ -3,25 +3,15 @@ from typing import Optional, Dict, Any, Tuple
 from .models import MarkdownGenerationResult
 from .html2text import CustomHTML2Text
 from .content_filter_strategy import RelevantContentFilter
+from .parsed_document import ParsedDocument
+from .lxml_markdown import CONVERTER_OPTIONS, FIXED_OPTIONS, LXMLMarkdownConverter
+from .utils import fast_urljoin
 import re
-from urllib.parse import urljoin
 
 # Pre-compile the regex pattern
 LINK_PATTERN = re.compile(r'!?\[([^\]]+)\]\(([^)]+?)(?:\s+"([^"]*)")?\)')
 
 
-def fast_urljoin(base: str, url: str) -> str:
-    """Fast URL joining for common cases."""
-    if url.startswith(("http://", "https://", "mailto:", "//")):
-        return url
-    if url.startswith("/"):
-        # Handle absolute paths
-        if base.endswith("/"):
-            return base[:-1] + url
-        return base + url
-    return urljoin(base, url)
-
-
 class MarkdownGenerationStrategy(ABC):
     """Abstract base class for markdown generation strategies."""
 
@@ -72,6 +62,46 @@ class DefaultMarkdownGenerator(MarkdownGenerationStrategy):
     ):
         super().__init__(content_filter, options)
 
+    def html2text_options(
+        self,
+        html2text_options: Optional[Dict[str, Any]] = None,
+        options: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """The HTML2Text options of a generate_markdown call"""
+        default_options = {
+            "body_width": 0,  # Disable text wrapping
+            "ignore_emphasis": False,
+            "ignore_links": False,
+            "ignore_images": False,
+            "protect_links": True,
+            "single_line_break": True,
+            "mark_code": True,
+            "escape_snob": False,
+        }
+
+        # Update with custom options if provided
+        if html2text_options:
+            default_options.update(html2text_options)
+        elif options:
+            default_options.update(options)
+        elif self.options:
+            default_options.update(self.options)
+        return default_options
+
+    def converter_options(
+        self,
+        html2text_options: Optional[Dict[str, Any]] = None,
+        options: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """The LXMLMarkdownConverter options of a generate_markdown call, None if it needs html2text"""
+        converter_options = {}
+        for key, value in self.html2text_options(html2text_options, options).items():
+            if key in CONVERTER_OPTIONS:
+                converter_options[key] = value
+            elif key not in FIXED_OPTIONS or FIXED_OPTIONS[key] != value:
+                return None
+        return converter_options
+
     def convert_links_to_citations(
         self, markdown: str, base_url: str = ""
     ) -> Tuple[str, str]:
@@ -146,6 +176,7 @@ class DefaultMarkdownGenerator(MarkdownGenerationStrategy):
         options: Optional[Dict[str, Any]] = None,
         content_filter: Optional[RelevantContentFilter] = None,
         citations: bool = True,
+        document: Optional[ParsedDocument] = None,
         **kwargs,
     ) -> MarkdownGenerationResult:
         """
@@ -164,6 +195,7 @@ class DefaultMarkdownGenerator(MarkdownGenerationStrategy):
             options (Optional[Dict[str, Any]]): Additional options for markdown generation.
             content_filter (Optional[RelevantContentFilter]): Content filter for generating fit markdown.
             citations (bool): Whether to generate citations.
+            document (Optional[ParsedDocument]): Shared parse of cleaned_html, handed to the content filter.
 
         Returns:
             MarkdownGenerationResult: Result containing raw markdown, fit markdown, fit HTML, and references markdown.
@@ -171,26 +203,7 @@ class DefaultMarkdownGenerator(MarkdownGenerationStrategy):
         try:
             # Initialize HTML2Text with default options for better conversion
             h = CustomHTML2Text(baseurl=base_url)
-            default_options = {
-                "body_width": 0,  # Disable text wrapping
-                "ignore_emphasis": False,
-                "ignore_links": False,
-                "ignore_images": False,
-                "protect_links": True,
-                "single_line_break": True,
-                "mark_code": True,
-                "escape_snob": False,
-            }
-
-            # Update with custom options if provided
-            if html2text_options:
-                default_options.update(html2text_options)
-            elif options:
-                default_options.update(options)
-            elif self.options:
-                default_options.update(self.options)
-
-            h.update_params(**default_options)
+            h.update_params(**self.html2text_options(html2text_options, options))
 
             # Ensure we have valid input
             if not cleaned_html:
@@ -225,7 +238,9 @@ class DefaultMarkdownGenerator(MarkdownGenerationStrategy):
             if content_filter or self.content_filter:
                 try:
                     content_filter = content_filter or self.content_filter
-                    filtered_html = content_filter.filter_content(cleaned_html)
+                    if document is None or document.html != cleaned_html:
+                        document = ParsedDocument(cleaned_html)
+                    filtered_html = content_filter.filter_document(document)
                     filtered_html = "\n".join(
                         "<div>{}</div>".format(s) for s in filtered_html
                     )
@@ -251,3 +266,128 @@ class DefaultMarkdownGenerator(MarkdownGenerationStrategy):
                 fit_markdown="",
                 fit_html="",
             )
+
+
+class LXMLMarkdownGenerator(DefaultMarkdownGenerator):
+    """
+    Markdown generation that walks the lxml tree of the cleaned HTML.
+
+    Produces the markdown of DefaultMarkdownGenerator in about half the time on large
+    pages: the shared tree of the page is converted directly instead of being
+    tokenized again by HTMLParser, and links are numbered as they are written, so
+    citations need no regex pass over the markdown. Calls with html2text options the
+    converter does not implement are handed to DefaultMarkdownGenerator.
+
+    Citations differ from convert_links_to_citations only for link texts containing
+    "]", such as images inside links, which the regex splits at the wrong bracket;
+    those links are kept as they are and the images inside them are numbered.
+
+    Args:
+        content_filter (Optional[RelevantContentFilter]): Content filter for generating fit markdown.
+        options (Optional[Dict[str, Any]]): Additional options for markdown generation. Defaults to None.
+
+    Returns:
+        MarkdownGenerationResult: Result containing raw markdown, fit markdown, fit HTML, and references markdown.
+    """
+
+    def generate_markdown(
+        self,
+        cleaned_html: str,
+        base_url: str = "",
+        html2text_options: Optional[Dict[str, Any]] = None,
+        options: Optional[Dict[str, Any]] = None,
+        content_filter: Optional[RelevantContentFilter] = None,
+        citations: bool = True,
+        document: Optional[ParsedDocument] = None,
+        **kwargs,
+    ) -> MarkdownGenerationResult:
+        """
+        Generate markdown with citations from cleaned HTML.
+
+        Args:
+            cleaned_html (str): Cleaned HTML content.
+            base_url (str): Base URL for URL joins.
+            html2text_options (Optional[Dict[str, Any]]): HTML2Text options.
+            options (Optional[Dict[str, Any]]): Additional options for markdown generation.
+            content_filter (Optional[RelevantContentFilter]): Content filter for generating fit markdown.
+            citations (bool): Whether to generate citations.
+            document (Optional[ParsedDocument]): Shared parse of cleaned_html, converted instead of parsing it again.
+
+        Returns:
+            MarkdownGenerationResult: Result containing raw markdown, fit markdown, fit HTML, and references markdown.
+        """
+        converter_options = self.converter_options(html2text_options, options)
+        if converter_options is None:
+            return super().generate_markdown(
+                cleaned_html,
+                base_url=base_url,
+                html2text_options=html2text_options,
+                options=options,
+                content_filter=content_filter,
+                citations=citations,
+                document=document,
+                **kwargs,
+            )
+
+        try:
+            converter = LXMLMarkdownConverter(base_url, **converter_options)
+
+            # Ensure we have valid input
+            if not cleaned_html:
+                cleaned_html = ""
+            elif not isinstance(cleaned_html, str):
+                cleaned_html = str(cleaned_html)
+            if document is None or document.html != cleaned_html:
+                document = ParsedDocument(cleaned_html)
+
+            # Generate raw markdown, numbering links on the way
+            try:
+                (
+                    raw_markdown,
+                    markdown_with_citations,
+                    references_markdown,
+                ) = converter.convert(document.tree, citations=citations)
+            except Exception as e:
+                raw_markdown = f"Error converting HTML to markdown: {str(e)}"
+                markdown_with_citations, references_markdown = raw_markdown, ""
+
+            raw_markdown = raw_markdown.replace("    ```", "```")
+            if citations:
+                markdown_with_citations = markdown_with_citations.replace("    ```", "```")
+            else:
+                markdown_with_citations = raw_markdown
+
+            # Generate fit markdown if content filter is provided
+            fit_markdown: Optional[str] = ""
+            filtered_html: Optional[str] = ""
+            if content_filter or self.content_filter:
+                try:
+                    content_filter = content_filter or self.content_filter
+                    filtered_html = content_filter.filter_document(document)
+                    filtered_html = "\n".join(
+                        "<div>{}</div>".format(s) for s in filtered_html
+                    )
+                    fit_markdown, _, _ = converter.convert(
+                        ParsedDocument(filtered_html).tree, citations=False
+                    )
+                except Exception as e:
+                    fit_markdown = f"Error generating fit markdown: {str(e)}"
+                    filtered_html = ""
+
+            return MarkdownGenerationResult(
+                raw_markdown=raw_markdown or "",
+                markdown_with_citations=markdown_with_citations or "",
+                references_markdown=references_markdown or "",
+                fit_markdown=fit_markdown or "",
+                fit_html=filtered_html or "",
+            )
+        except Exception as e:
+            # If anything fails, return empty strings with error message
+            error_msg = f"Error in markdown generation: {str(e)}"
+            return MarkdownGenerationResult(
+                raw_markdown=error_msg,
+                markdown_with_citations=error_msg,
+                references_markdown="",
+                fit_markdown="",
+                fit_html="",
+            )
@@ -1,13 +1,15 @@
 import os
+import time
 import asyncio
 from pathlib import Path
 import aiosqlite
 from typing import Optional
 import xxhash
-import aiofiles
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from .async_logger import AsyncLogger, LogLevel
+from .config import MIGRATION_BATCH_SIZE, MIGRATION_IO_WORKERS
 
 # Initialize logger
 logger = AsyncLogger(log_level=LogLevel.DEBUG, verbose=True)
@@ -17,8 +19,38 @@ logger = AsyncLogger(log_level=LogLevel.DEBUG, verbose=True)
 
 
 class DatabaseMigration:
-    def __init__(self, db_path: str):
+    # Name of this migration in the migration_progress table
+    MIGRATION_NAME = "file_storage"
+
+    # crawled_data columns moved to the content store, with their content type
+    CONTENT_COLUMNS = {
+        "html": "html",
+        "cleaned_html": "cleaned",
+        "markdown": "markdown",
+        "extracted_content": "extracted",
+        "screenshot": "screenshots",
+    }
+
+    def __init__(
+        self,
+        db_path: str,
+        batch_size: int = MIGRATION_BATCH_SIZE,
+        max_workers: int = MIGRATION_IO_WORKERS,
+        verify: bool = True,
+    ):
+        """
+        Initialize the migration.
+
+        Args:
+            db_path: Path of the cache database.
+            batch_size: Rows migrated per transaction.
+            max_workers: Threads writing content files in parallel.
+            verify: Read every written file back and check its content hash.
+        """
         self.db_path = db_path
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.verify = verify
         self.content_paths = self._ensure_content_dirs(os.path.dirname(db_path))
 
     def _ensure_content_dirs(self, base_path: str) -> dict:
@@ -43,85 +75,171 @@ class DatabaseMigration:
         return content_hash
         # return hashlib.sha256(content.encode()).hexdigest()
 
-    async def _store_content(self, content: str, content_type: str) -> str:
-        if not content:
-            return ""
+    def _is_content_ref(self, value: str, content_type: str) -> bool:
+        """Whether a column value is already a hash of a file in the content store"""
+        return (
+            len(value) == 16
+            and all(c in "0123456789abcdef" for c in value)
+            and os.path.exists(os.path.join(self.content_paths[content_type], value))
+        )
 
+    def _write_content(self, content: str, content_type: str) -> str:
+        """Write content to the content store and return its hash, run in a worker thread"""
         content_hash = self._generate_content_hash(content)
         file_path = os.path.join(self.content_paths[content_type], content_hash)
-
         if not os.path.exists(file_path):
-            async with aiofiles.open(file_path, "w", encoding="utf-8") as f:
-                await f.write(content)
-
+            # Write to a temporary file first so an interruption never leaves a partial file
+            tmp_path = f"{file_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(tmp_path, file_path)
+        if self.verify:
+            with open(file_path, "r", encoding="utf-8") as f:
+                if self._generate_content_hash(f.read()) != content_hash:
+                    raise ValueError(f"Content hash mismatch after writing {file_path}")
         return content_hash
 
-    async def migrate_database(self):
-        """Migrate existing database to file-based storage"""
-        # logger.info("Starting database migration...")
-        logger.info("Starting database migration...", tag="INIT")
+    async def _get_high_water_mark(self, db) -> int:
+        async with db.execute(
+            "SELECT last_rowid FROM migration_progress WHERE name = ?",
+            (self.MIGRATION_NAME,),
+        ) as cursor:
+            row = await cursor.fetchone()
+        return row[0] if row else 0
+
+    async def migrate_database(
+        self, dry_run: bool = False, resume: bool = True
+    ) -> dict:
+        """
+        Migrate existing database to file-based storage.
+
+        Rows are processed in rowid order, batch_size at a time. The content of a batch
+        is written with parallel file I/O, then its rows and the high-water mark are
+        updated in one transaction, so an interrupted migration resumes after the last
+        committed batch. Values that already reference stored files are left untouched,
+        which makes running the migration again safe.
+
+        Args:
+            dry_run: Only scan the rows and estimate the migration, without writing anything.
+            resume: Continue after the high-water mark of a previous run instead of rescanning.
+
+        Returns:
+            dict: Stats with rows scanned, rows and fields migrated, content bytes to move and
+            the unique bytes stored after deduplication.
+        """
+        logger.info(
+            "Starting database migration{mode}...",
+            tag="INIT",
+            params={"mode": " (dry run)" if dry_run else ""},
+        )
+        stats = {
+            "scanned": 0,
+            "migrated_rows": 0,
+            "migrated_fields": 0,
+            "content_bytes": 0,
+            "unique_bytes": 0,
+        }
+        seen_hashes = set()
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
 
         try:
             async with aiosqlite.connect(self.db_path) as db:
-                # Get all rows
-                async with db.execute(
-                    """SELECT url, html, cleaned_html, markdown, 
-                       extracted_content, screenshot FROM crawled_data"""
-                ) as cursor:
-                    rows = await cursor.fetchall()
-
-                migrated_count = 0
-                for row in rows:
-                    (
-                        url,
-                        html,
-                        cleaned_html,
-                        markdown,
-                        extracted_content,
-                        screenshot,
-                    ) = row
-
-                    # Store content in files and get hashes
-                    html_hash = await self._store_content(html, "html")
-                    cleaned_hash = await self._store_content(cleaned_html, "cleaned")
-                    markdown_hash = await self._store_content(markdown, "markdown")
-                    extracted_hash = await self._store_content(
-                        extracted_content, "extracted"
+                await db.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS migration_progress (
+                        name TEXT PRIMARY KEY,
+                        last_rowid INTEGER,
+                        migrated INTEGER DEFAULT 0,
+                        updated_at REAL
                     )
-                    screenshot_hash = await self._store_content(
-                        screenshot, "screenshots"
+                """
+                )
+                last_rowid = await self._get_high_water_mark(db) if resume else 0
+                if last_rowid:
+                    logger.info(
+                        "Resuming migration after row {rowid}",
+                        tag="INIT",
+                        params={"rowid": last_rowid},
                     )
 
-                    # Update database with hashes
+                while True:
+                    async with db.execute(
+                        f"SELECT rowid, url, {', '.join(self.CONTENT_COLUMNS)} "
+                        "FROM crawled_data WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                        (last_rowid, self.batch_size),
+                    ) as cursor:
+                        rows = await cursor.fetchall()
+                    if not rows:
+                        break
+
+                    # (url, column, content, content_type) of values still stored inline
+                    pending = []
+                    for rowid, url, *values in rows:
+                        fields = [
+                            (url, column, value, content_type)
+                            for (column, content_type), value in zip(
+                                self.CONTENT_COLUMNS.items(), values
+                            )
+                            if value and not self._is_content_ref(value, content_type)
+                        ]
+                        stats["migrated_rows"] += bool(fields)
+                        pending.extend(fields)
+                    stats["scanned"] += len(rows)
+                    stats["migrated_fields"] += len(pending)
+                    last_rowid = rows[-1][0]
+
+                    for _, _, content, _ in pending:
+                        size = len(content.encode("utf-8"))
+                        stats["content_bytes"] += size
+                        content_hash = self._generate_content_hash(content)
+                        if content_hash not in seen_hashes:
+                            seen_hashes.add(content_hash)
+                            stats["unique_bytes"] += size
+                    if dry_run:
+                        continue
+
+                    hashes = await asyncio.gather(
+                        *(
+                            loop.run_in_executor(
+                                executor, self._write_content, content, content_type
+                            )
+                            for _, _, content, content_type in pending
+                        )
+                    )
+                    for (url, column, _, _), content_hash in zip(pending, hashes):
+                        await db.execute(
+                            f"UPDATE crawled_data SET {column} = ? WHERE url = ?",
+                            (content_hash, url),
+                        )
                     await db.execute(
-                        """
-                        UPDATE crawled_data 
-                        SET html = ?, 
-                            cleaned_html = ?,
-                            markdown = ?,
-                            extracted_content = ?,
-                            screenshot = ?
-                        WHERE url = ?
-                    """,
-                        (
-                            html_hash,
-                            cleaned_hash,
-                            markdown_hash,
-                            extracted_hash,
-                            screenshot_hash,
-                            url,
-                        ),
+                        "INSERT INTO migration_progress (name, last_rowid, migrated, updated_at) "
+                        "VALUES (?, ?, ?, ?) ON CONFLICT(name) DO UPDATE SET "
+                        "last_rowid = excluded.last_rowid, "
+                        "migrated = migration_progress.migrated + excluded.migrated, "
+                        "updated_at = excluded.updated_at",
+                        (self.MIGRATION_NAME, last_rowid, len(pending), time.time()),
+                    )
+                    await db.commit()
+                    logger.info(
+                        "Migrated {rows} of {scanned} scanned records...",
+                        tag="INIT",
+                        params={"rows": stats["migrated_rows"], "scanned": stats["scanned"]},
                     )
 
-                    migrated_count += 1
-                    if migrated_count % 100 == 0:
-                        logger.info(f"Migrated {migrated_count} records...", tag="INIT")
-
-                await db.commit()
-                logger.success(
-                    f"Migration completed. {migrated_count} records processed.",
-                    tag="COMPLETE",
-                )
+            logger.success(
+                "Migration{mode} completed. {rows} of {scanned} records had inline content, "
+                "{size} ({unique} after deduplication).",
+                tag="COMPLETE",
+                params={
+                    "mode": " dry run" if dry_run else "",
+                    "rows": stats["migrated_rows"],
+                    "scanned": stats["scanned"],
+                    "size": _format_size(stats["content_bytes"]),
+                    "unique": _format_size(stats["unique_bytes"]),
+                },
+            )
+            return stats
 
         except Exception as e:
             # logger.error(f"Migration failed: {e}")
@@ -131,6 +249,16 @@ class DatabaseMigration:
                 params={"error": str(e)},
             )
             raise e
+        finally:
+            executor.shutdown(wait=True)
+
+
+def _format_size(size: int) -> str:
+    for unit in ["B", "KB", "MB", "GB"]:
+        if size < 1024:
+            return f"{size:.0f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
 
 
 async def backup_database(db_path: str) -> str:
@@ -159,22 +287,32 @@ async def backup_database(db_path: str) -> str:
         raise e
 
 
-async def run_migration(db_path: Optional[str] = None):
-    """Run database migration"""
+async def run_migration(
+    db_path: Optional[str] = None,
+    dry_run: bool = False,
+    resume: bool = True,
+    batch_size: int = MIGRATION_BATCH_SIZE,
+    max_workers: int = MIGRATION_IO_WORKERS,
+    verify: bool = True,
+) -> Optional[dict]:
+    """Run database migration, see DatabaseMigration.migrate_database"""
     if db_path is None:
         db_path = os.path.join(Path.home(), ".crawl4ai", "crawl4ai.db")
 
     if not os.path.exists(db_path):
         logger.info("No existing database found. Skipping migration.", tag="INIT")
-        return
+        return None
 
     # Create backup first
-    backup_path = await backup_database(db_path)
-    if not backup_path:
-        return
+    if not dry_run:
+        backup_path = await backup_database(db_path)
+        if not backup_path:
+            return None
 
-    migration = DatabaseMigration(db_path)
-    await migration.migrate_database()
+    migration = DatabaseMigration(
+        db_path, batch_size=batch_size, max_workers=max_workers, verify=verify
+    )
+    return await migration.migrate_database(dry_run=dry_run, resume=resume)
 
 
 def main():
@@ -185,9 +323,39 @@ def main():
         description="Migrate Crawl4AI database to file-based storage"
     )
     parser.add_argument("--db-path", help="Custom database path")
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only estimate the migration without writing anything",
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Rescan all rows instead of resuming after the last migrated batch",
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=MIGRATION_BATCH_SIZE, help="Rows per transaction"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=MIGRATION_IO_WORKERS, help="Parallel file writers"
+    )
+    parser.add_argument(
+        "--no-verify",
+        action="store_true",
+        help="Skip checking the content hash of written files",
+    )
     args = parser.parse_args()
 
-    asyncio.run(run_migration(args.db_path))
+    asyncio.run(
+        run_migration(
+            args.db_path,
+            dry_run=args.dry_run,
+            resume=not args.restart,
+            batch_size=args.batch_size,
+            max_workers=args.workers,
+            verify=not args.no_verify,
+        )
+    )
 
 
 if __name__ == "__main__":
@@ -15,6 +15,7 @@ class DomainState:
     last_request_time: float = 0
     current_delay: float = 0
     fail_count: int = 0
+    crawl_delay: float = 0  # Minimum delay requested by robots.txt
 
 
 @dataclass
@@ -133,6 +134,7 @@ class AsyncCrawlResponse(BaseModel):
     downloaded_files: Optional[List[str]] = None
     ssl_certificate: Optional[SSLCertificate] = None
     redirected_url: Optional[str] = None
+    redirect_chain: Optional[List[str]] = None
 
     class Config:
         arbitrary_types_allowed = True
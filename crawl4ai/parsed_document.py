@@ -0,0 +1,137 @@
+import re
+import copy
+from collections import Counter
+from typing import Optional
+
+from bs4 import BeautifulSoup
+from lxml import etree
+from lxml import html as lhtml
+from lxml.html.defs import empty_tags
+
+# Same test lxml.html.fromstring uses to parse a string as a document, not a fragment
+FULL_DOCUMENT_PATTERN = re.compile(r"^\s*<(?:html|!doctype)", re.I)
+# Comments and the contents of raw text elements, whose tags are not markup
+RAW_TEXT_PATTERN = re.compile(
+    r"<!--.*?(?:-->|$)|(<(script|style|textarea|title)\b[^>]*>).*?(</\2\s*>|$)",
+    re.I | re.S,
+)
+# End tags, and start tags closing themselves like <path/>, which both parsers honour
+END_TAG_PATTERN = re.compile(
+    r"</([a-zA-Z][^\s/>]*)|<([a-zA-Z][^\s/>]*)(?:[^<>\"']|\"[^\"]*\"|'[^']*')*/>"
+)
+
+
+class ParsedDocument:
+    """
+    An HTML page parsed once and shared by the processing stages.
+
+    The lxml tree is the canonical parse. It and the derived views are built lazily
+    on first access and then reused, so a page is parsed at most once however many
+    stages read it. Stages must not modify the shared tree or views; stages that
+    modify a tree in place take their own copy with mutable_tree().
+
+    Usage:
+        document = ParsedDocument(html)
+        titles = document.tree.xpath("//h1/text()")
+    """
+
+    def __init__(self, html: str, tree: Optional[lhtml.HtmlElement] = None):
+        """
+        Initialize the document.
+
+        Args:
+            html: The HTML of the page.
+            tree: The lxml tree of html, if it was parsed already.
+        """
+        self.html = html or ""
+        self._tree = tree
+        self._soup = None
+        # Whether libxml2 reported misnested end tags, unknown for trees given by the caller
+        self._tag_mismatch: Optional[bool] = None
+        self._well_nested: Optional[bool] = None
+
+    @property
+    def is_parsed(self) -> bool:
+        """Whether the lxml tree was built already"""
+        return self._tree is not None
+
+    @property
+    def is_full_document(self) -> bool:
+        """Whether the html is a complete document rather than a fragment"""
+        return bool(FULL_DOCUMENT_PATTERN.match(self.html))
+
+    @property
+    def is_well_nested(self) -> bool:
+        """
+        Whether every element of the html is closed explicitly and in order.
+
+        libxml2 repairs other markup differently from html.parser: it closes a <p>
+        before a <div> and an unclosed <li> at the next <li>, where html.parser keeps
+        them open. The tree of a well-nested document is the same with either parser.
+        """
+        if self._well_nested is None:
+            tree = self.tree
+            if self._tag_mismatch is not False:
+                self._well_nested = False
+            else:
+                markup = RAW_TEXT_PATTERN.sub(r"\1\3", self.html)
+                end_tags = Counter(
+                    (end or closed).lower()
+                    for end, closed in END_TAG_PATTERN.findall(markup)
+                )
+                for tag in empty_tags:
+                    end_tags.pop(tag, None)
+                elements = Counter(
+                    element.tag
+                    for element in tree.iter()
+                    if isinstance(element.tag, str) and element.tag not in empty_tags
+                )
+                self._well_nested = end_tags == elements
+        return self._well_nested
+
+    @property
+    def tree(self) -> lhtml.HtmlElement:
+        """The lxml document tree (root <html> element), parsed on first access"""
+        if self._tree is None:
+            self._tree = self._parse()
+        return self._tree
+
+    @property
+    def body(self) -> lhtml.HtmlElement:
+        """The <body> element of the tree, or the root if there is none"""
+        body = self.tree.find("body")
+        return body if body is not None else self.tree
+
+    @property
+    def soup(self) -> BeautifulSoup:
+        """A BeautifulSoup view of the page for stages not ported to lxml yet"""
+        if self._soup is None:
+            self._soup = BeautifulSoup(self.html, "lxml")
+        return self._soup
+
+    def mutable_tree(self) -> lhtml.HtmlElement:
+        """
+        Get a tree the caller may modify in place.
+
+        Copying the shared tree is several times cheaper than parsing the html again.
+        If the shared tree was not needed so far, a private tree is parsed instead and
+        the shared one is left to be built on demand.
+        """
+        if self._tree is not None:
+            return copy.deepcopy(self._tree)
+        return self._parse()
+
+    def _parse(self) -> lhtml.HtmlElement:
+        parser = lhtml.HTMLParser()
+        try:
+            tree = lhtml.document_fromstring(self.html, parser=parser)
+        except etree.ParserError:
+            # Empty or whitespace-only documents
+            return lhtml.document_fromstring("<html><body></body></html>")
+        # "Element script embeds close tag" is logged for text, not for a repair
+        self._tag_mismatch = any(
+            error.type == etree.ErrorTypes.ERR_TAG_NAME_MISMATCH
+            and "embeds close tag" not in error.message
+            for error in parser.error_log
+        )
+        return tree
@@ -0,0 +1,119 @@
+"""
+Registrable domain extraction with the Public Suffix List.
+
+The rules come from an offline snapshot of https://publicsuffix.org/list/ that ships
+with the package (public_suffix_list.dat), so no network access is needed. They are
+compiled once into a trie of reversed domain labels: looking up a host walks at most
+one node per label instead of testing every suffix.
+"""
+
+import os
+from functools import lru_cache
+from typing import Dict, Iterable, List
+
+PUBLIC_SUFFIX_LIST_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "public_suffix_list.dat"
+)
+
+# Keys marking the end of a rule in a trie node; labels never contain these characters
+_RULE = "$"
+_EXCEPTION = "!"
+
+
+class PublicSuffixTrie:
+    """
+    Trie of public suffix rules, keyed by domain labels from right to left.
+
+    Supports the three kinds of rules of the list: plain rules ("co.uk"), wildcard
+    rules ("*.ck") and exception rules ("!www.ck"). Rules with non-ASCII labels are
+    also added in their punycode form, as hosts parsed from URLs usually are.
+
+    Args:
+        rules (Iterable[str]): Rules in the syntax of public_suffix_list.dat.
+    """
+
+    def __init__(self, rules: Iterable[str] = ()):
+        self.root: Dict[str, dict] = {}
+        for rule in rules:
+            self.add(rule)
+
+    @classmethod
+    def from_file(cls, path: str = PUBLIC_SUFFIX_LIST_PATH) -> "PublicSuffixTrie":
+        """Compiles the rules of a public_suffix_list.dat file"""
+        with open(path, encoding="utf-8") as f:
+            return cls(
+                line.split()[0]
+                for line in f
+                if line.strip() and not line.startswith("//")
+            )
+
+    def add(self, rule: str) -> None:
+        rule = rule.strip().lower()
+        exception = rule.startswith("!")
+        if exception:
+            rule = rule[1:]
+        variants = {rule}
+        if not rule.isascii():
+            try:
+                variants.add(
+                    ".".join(
+                        label if label == "*" else label.encode("idna").decode("ascii")
+                        for label in rule.split(".")
+                    )
+                )
+            except UnicodeError:
+                pass
+        for variant in variants:
+            node = self.root
+            for label in reversed(variant.split(".")):
+                node = node.setdefault(label, {})
+            node[_EXCEPTION if exception else _RULE] = True
+
+    def suffix_length(self, labels: List[str]) -> int:
+        """
+        Number of trailing labels that form the public suffix.
+
+        Follows the algorithm of the list: an exception rule wins, otherwise the
+        longest matching rule does, and the implicit rule "*" makes the last label a
+        public suffix when nothing matches.
+        """
+        length = 1
+        nodes = [self.root]
+        for depth, label in enumerate(reversed(labels), 1):
+            children = []
+            for node in nodes:
+                for key in (label, "*"):
+                    child = node.get(key)
+                    if child is None:
+                        continue
+                    if _EXCEPTION in child:
+                        return depth - 1
+                    if _RULE in child:
+                        length = depth
+                    children.append(child)
+            if not children:
+                break
+            nodes = children
+        return length
+
+    def public_suffix(self, host: str) -> str:
+        labels = host.lower().rstrip(".").split(".")
+        return ".".join(labels[-self.suffix_length(labels) :])
+
+    def registrable_domain(self, host: str) -> str:
+        """
+        The public suffix of host plus one label, e.g. "bbc.co.uk" for "news.bbc.co.uk".
+
+        A host that is itself a public suffix, like "github.io", is returned as is.
+        """
+        labels = host.lower().rstrip(".").split(".")
+        length = self.suffix_length(labels)
+        if len(labels) <= length:
+            return ".".join(labels)
+        return ".".join(labels[-length - 1 :])
+
+
+@lru_cache(maxsize=None)
+def get_public_suffix_trie() -> PublicSuffixTrie:
+    """The trie of the bundled list, compiled on first use"""
+    return PublicSuffixTrie.from_file()
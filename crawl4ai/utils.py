@@ -4,41 +4,67 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from bs4 import BeautifulSoup, Comment, element, Tag, NavigableString
 import json
 import html
+import math
+import difflib
 import re
 import os
 import platform
 from .prompts import PROMPT_EXTRACT_BLOCKS
 from .config import *
+from .public_suffix import get_public_suffix_trie
 from pathlib import Path
 from typing import Dict, Any
 from urllib.parse import urljoin
 import requests
 from requests.exceptions import InvalidSchema
-from typing import Dict, Any
+from typing import Dict, Any, Optional, List, Tuple, Union
+from email.utils import parsedate_to_datetime
+from enum import Enum
 import xxhash
 from colorama import Fore, Style, init
 import textwrap
 import cProfile
 import pstats
-from functools import wraps
+from functools import lru_cache, wraps
 import asyncio
 
 import sqlite3
 import hashlib
+import ipaddress
 from urllib.parse import urljoin, urlparse
 from urllib.robotparser import RobotFileParser
 import aiohttp
+import aiosqlite
+from collections import OrderedDict
 
 class RobotsParser:
+    """
+    Checks URLs against robots.txt with a two-level cache.
+
+    Parsed rules are held in an in-memory LRU keyed by domain, backed by a SQLite
+    cache on disk so they survive restarts. Concurrent lookups for the same domain
+    share a single fetch, and all fetches go through one HTTP session.
+    """
+
     # Default 7 days cache TTL
     CACHE_TTL = 7 * 24 * 60 * 60
+    # Domains whose parsed rules are kept in memory
+    MEMORY_CACHE_SIZE = 1024
+    # Seconds a failed fetch (timeout, connection error) is remembered before retrying
+    ERROR_TTL = 5 * 60
+    FETCH_TIMEOUT = 2
 
-    def __init__(self, cache_dir=None, cache_ttl=None):
+    def __init__(self, cache_dir=None, cache_ttl=None, memory_cache_size=None):
         self.cache_dir = cache_dir or os.path.join(get_home_folder(), ".crawl4ai", "robots")
         self.cache_ttl = cache_ttl or self.CACHE_TTL
+        self.memory_cache_size = memory_cache_size or self.MEMORY_CACHE_SIZE
         os.makedirs(self.cache_dir, exist_ok=True)
         self.db_path = os.path.join(self.cache_dir, "robots_cache.db")
         self._init_db()
+        # domain -> (parser or None to allow everything, expiry time)
+        self._parsers: "OrderedDict[str, Tuple[Optional[RobotFileParser], float]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
 
     def _init_db(self):
         # Use WAL mode for better concurrency and performance
@@ -54,107 +80,179 @@ class RobotsParser:
             """)
             conn.execute("CREATE INDEX IF NOT EXISTS idx_domain ON robots_cache(domain)")
 
-    def _get_cached_rules(self, domain: str) -> tuple[str, bool]:
-        """Get cached rules. Returns (rules, is_fresh)"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(
-                "SELECT rules, fetch_time, hash FROM robots_cache WHERE domain = ?", 
+    async def _get_cached_rules(self, domain: str) -> Tuple[Optional[str], float]:
+        """Get cached rules. Returns (rules, fetch_time)"""
+        async with aiosqlite.connect(self.db_path) as conn:
+            async with conn.execute(
+                "SELECT rules, fetch_time FROM robots_cache WHERE domain = ?",
                 (domain,)
-            )
-            result = cursor.fetchone()
-            
-            if not result:
-                return None, False
-                
-            rules, fetch_time, _ = result
-            # Check if cache is still fresh based on TTL
-            return rules, (time.time() - fetch_time) < self.cache_ttl
-
-    def _cache_rules(self, domain: str, content: str):
+            ) as cursor:
+                result = await cursor.fetchone()
+        if not result:
+            return None, 0
+        return result[0], result[1]
+
+    async def _cache_rules(self, domain: str, content: str):
         """Cache robots.txt content with hash for change detection"""
         hash_val = hashlib.md5(content.encode()).hexdigest()
-        with sqlite3.connect(self.db_path) as conn:
-            # Check if content actually changed
-            cursor = conn.execute(
-                "SELECT hash FROM robots_cache WHERE domain = ?", 
-                (domain,)
+        async with aiosqlite.connect(self.db_path) as conn:
+            await conn.execute(
+                """INSERT OR REPLACE INTO robots_cache
+                   (domain, rules, fetch_time, hash)
+                   VALUES (?, ?, ?, ?)""",
+                (domain, content, int(time.time()), hash_val)
             )
-            result = cursor.fetchone()
-            
-            # Only update if hash changed or no previous entry
-            if not result or result[0] != hash_val:
-                conn.execute(
-                    """INSERT OR REPLACE INTO robots_cache 
-                       (domain, rules, fetch_time, hash) 
-                       VALUES (?, ?, ?, ?)""",
-                    (domain, content, int(time.time()), hash_val)
-                )
+            await conn.commit()
+
+    def _remember(self, domain: str, parser: Optional[RobotFileParser], expires_at: float):
+        """Store parsed rules in the in-memory LRU"""
+        self._parsers[domain] = (parser, expires_at)
+        self._parsers.move_to_end(domain)
+        while len(self._parsers) > self.memory_cache_size:
+            self._parsers.popitem(last=False)
+
+    @staticmethod
+    def _parse(rules: str) -> Optional[RobotFileParser]:
+        if not rules:
+            return None
+        parser = RobotFileParser()
+        parser.parse(rules.splitlines())
+        # If parser can't read rules, allow access
+        if not parser.mtime():
+            return None
+        return parser
+
+    async def _load_parser(self, scheme: str, domain: str) -> Optional[RobotFileParser]:
+        """Load rules from the disk cache or fetch them, and remember the parsed result"""
+        now = time.time()
+        rules, fetch_time = await self._get_cached_rules(domain)
+        if rules is not None and now - fetch_time < self.cache_ttl:
+            parser = self._parse(rules)
+            self._remember(domain, parser, fetch_time + self.cache_ttl)
+            return parser
+
+        # Ensure we use the same scheme as the input URL
+        robots_url = f"{scheme or 'http'}://{domain}/robots.txt"
+        try:
+            if self._session is None or self._session.closed:
+                self._session = aiohttp.ClientSession()
+            async with self._session.get(
+                robots_url, timeout=aiohttp.ClientTimeout(total=self.FETCH_TIMEOUT)
+            ) as response:
+                if response.status == 200:
+                    rules = await response.text()
+                    await self._cache_rules(domain, rules)
+                elif 400 <= response.status < 500 and response.status != 429:
+                    # No robots.txt: everything is allowed
+                    rules = ""
+                else:
+                    # Server errors and rate limiting are transient, ask again soon
+                    self._remember(domain, None, now + min(self.ERROR_TTL, self.cache_ttl))
+                    return None
+            parser = self._parse(rules)
+            self._remember(domain, parser, now + self.cache_ttl)
+        except Exception:
+            # On any error (timeout, connection failed, etc), allow access for a while
+            parser = None
+            self._remember(domain, parser, now + min(self.ERROR_TTL, self.cache_ttl))
+        return parser
+
+    async def _get_parser(self, url: str) -> Optional[RobotFileParser]:
+        """Parsed rules for the domain of url, or None if everything is allowed"""
+        # Handle empty/invalid URLs
+        try:
+            parsed = urlparse(url)
+            domain = parsed.netloc
+            if not domain:
+                return None
+        except Exception:
+            return None
+
+        # Fast path - parsed rules in memory
+        entry = self._parsers.get(domain)
+        if entry and entry[1] > time.time():
+            self._parsers.move_to_end(domain)
+            return entry[0]
+
+        # Coalesce concurrent lookups for the same domain into one fetch
+        pending = self._inflight.get(domain)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[domain] = future
+        parser = None
+        try:
+            parser = await self._load_parser(parsed.scheme, domain)
+        except Exception:
+            pass
+        finally:
+            # Release waiters even if this lookup was cancelled
+            del self._inflight[domain]
+            future.set_result(parser)
+        return parser
 
     async def can_fetch(self, url: str, user_agent: str = "*") -> bool:
         """
         Check if URL can be fetched according to robots.txt rules.
-        
+
         Args:
             url: The URL to check
             user_agent: User agent string to check against (default: "*")
-            
+
         Returns:
             bool: True if allowed, False if disallowed by robots.txt
         """
-        # Handle empty/invalid URLs
-        try:
-            parsed = urlparse(url)
-            domain = parsed.netloc
-            if not domain:
-                return True
-        except:
+        parser = await self._get_parser(url)
+        if parser is None:
             return True
+        return parser.can_fetch(user_agent, url)
 
-        # Fast path - check cache first
-        rules, is_fresh = self._get_cached_rules(domain)
-        
-        # If rules not found or stale, fetch new ones
-        if not is_fresh:
-            try:
-                # Ensure we use the same scheme as the input URL
-                scheme = parsed.scheme or 'http'
-                robots_url = f"{scheme}://{domain}/robots.txt"
-                
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(robots_url, timeout=2) as response:
-                        if response.status == 200:
-                            rules = await response.text()
-                            self._cache_rules(domain, rules)
-                        else:
-                            return True
-            except:
-                # On any error (timeout, connection failed, etc), allow access
-                return True
+    async def get_crawl_delay(self, url: str, user_agent: str = "*") -> Optional[float]:
+        """
+        Get the delay between requests robots.txt asks for on the domain of url.
 
-        if not rules:
-            return True
+        Uses `Crawl-delay`, or `Request-rate` converted to seconds per request.
 
-        # Create parser for this check
-        parser = RobotFileParser() 
-        parser.parse(rules.splitlines())
-        
-        # If parser can't read rules, allow access
-        if not parser.mtime():
-            return True
-            
-        return parser.can_fetch(user_agent, url)
+        Args:
+            url: A URL on the domain
+            user_agent: User agent string to check against (default: "*")
+
+        Returns:
+            Optional[float]: Delay in seconds, or None if robots.txt sets none.
+        """
+        parser = await self._get_parser(url)
+        if parser is None:
+            return None
+        delay = parser.crawl_delay(user_agent)
+        if delay is not None:
+            return float(delay)
+        rate = parser.request_rate(user_agent)
+        if rate and rate.requests:
+            return rate.seconds / rate.requests
+        return None
+
+    async def close(self):
+        """Close the shared HTTP session"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
 
     def clear_cache(self):
         """Clear all cached robots.txt entries"""
+        self._parsers.clear()
         with sqlite3.connect(self.db_path) as conn:
             conn.execute("DELETE FROM robots_cache")
 
     def clear_expired(self):
         """Remove only expired entries from cache"""
+        now = time.time()
+        for domain in [d for d, (_, expires_at) in self._parsers.items() if expires_at <= now]:
+            del self._parsers[domain]
         with sqlite3.connect(self.db_path) as conn:
-            expire_time = int(time.time()) - self.cache_ttl
+            expire_time = int(now) - self.cache_ttl
             conn.execute("DELETE FROM robots_cache WHERE fetch_time < ?", (expire_time,))
-      
+
 
 class InvalidCSSSelectorError(Exception):
     pass
@@ -1750,9 +1848,13 @@ def get_base_domain(url: str) -> str:
     Extract the base domain from a given URL, handling common edge cases.
 
     How it works:
-    1. Parses the URL to extract the domain.
-    2. Removes the port number and 'www' prefix.
-    3. Handles special domains (e.g., 'co.uk') to extract the correct base.
+    1. Parses the URL to extract the host, without port or credentials.
+    2. Removes the 'www' prefix.
+    3. Looks up the registrable domain in the bundled Public Suffix List, so that
+       multi-level suffixes (e.g. 'co.uk', 'github.io') give the correct base.
+       IP addresses are returned unchanged.
+
+    Results are memoized per host.
 
     Args:
         url (str): The URL to extract the base domain from.
@@ -1761,73 +1863,123 @@ def get_base_domain(url: str) -> str:
         str: The extracted base domain or an empty string if parsing fails.
     """
     try:
-        # Get domain from URL
-        domain = urlparse(url).netloc.lower()
-        if not domain:
-            return ""
-
-        # Remove port if present
-        domain = domain.split(":")[0]
-
-        # Remove www
-        domain = re.sub(r"^www\.", "", domain)
-
-        # Extract last two parts of domain (handles co.uk etc)
-        parts = domain.split(".")
-        if len(parts) > 2 and parts[-2] in {
-            "co",
-            "com",
-            "org",
-            "gov",
-            "edu",
-            "net",
-            "mil",
-            "int",
-            "ac",
-            "ad",
-            "ae",
-            "af",
-            "ag",
-        }:
-            return ".".join(parts[-3:])
-
-        return ".".join(parts[-2:])
-    except Exception:
+        host = urlparse(url).hostname
+    except ValueError:
         return ""
+    if not host:
+        return ""
+    return _base_domain_of_host(host)
+
+
+@lru_cache(maxsize=BASE_DOMAIN_CACHE_SIZE)
+def _base_domain_of_host(host: str) -> str:
+    try:
+        ipaddress.ip_address(host)
+        return host
+    except ValueError:
+        pass
+    if host.startswith("www."):
+        host = host[4:]
+    return get_public_suffix_trie().registrable_domain(host)
+
+
+NON_HTTP_SCHEMES = ("mailto:", "tel:", "ftp:", "file:", "data:", "javascript:")
 
 
 def is_external_url(url: str, base_domain: str) -> bool:
     """
-    Extract the base domain from a given URL, handling common edge cases.
+    Check whether a URL points outside of a base domain.
 
-    How it works:
-    1. Parses the URL to extract the domain.
-    2. Removes the port number and 'www' prefix.
-    3. Handles special domains (e.g., 'co.uk') to extract the correct base.
+    The host of the URL must be the base domain or one of its subdomains; a host that
+    merely ends with the same characters, like 'notexample.com' for 'example.com', is
+    external. Ports and credentials are ignored.
 
     Args:
-        url (str): The URL to extract the base domain from.
+        url (str): The URL to check.
+        base_domain (str): The base domain of the page, as returned by get_base_domain().
 
     Returns:
-        str: The extracted base domain or an empty string if parsing fails.
+        bool: True for external and non-HTTP URLs (mailto:, tel:, ...), False for
+        internal and relative URLs.
     """
-    special = {"mailto:", "tel:", "ftp:", "file:", "data:", "javascript:"}
-    if any(url.lower().startswith(p) for p in special):
+    if url[:11].lower().startswith(NON_HTTP_SCHEMES):
         return True
 
     try:
-        parsed = urlparse(url)
-        if not parsed.netloc:  # Relative URL
-            return False
+        host = urlparse(url).hostname
+    except ValueError:
+        return False
+    if not host:  # Relative URL
+        return False
 
-        # Strip 'www.' from both domains for comparison
-        url_domain = parsed.netloc.lower().replace("www.", "")
-        base = base_domain.lower().replace("www.", "")
+    base = base_domain.lower()
+    if base.startswith("www."):
+        base = base[4:]
+    return not (host == base or host.endswith("." + base))
 
-        # Check if URL domain ends with base domain
-        return not url_domain.endswith(base)
-    except Exception:
-        return False
+
+class URLNormalizer:
+    """
+    Normalizes and classifies the links of one page.
+
+    Pages repeat the same hrefs and hosts many times, and each occurrence used to be
+    joined, parsed and looked up again. The normalizer parses the page URL once and
+    memoizes the results of every operation in a bounded LRU cache of its own, so it
+    should live as long as the page is processed.
+
+    Args:
+        base_url (str): URL of the page the links were found on.
+        base_domain (str, optional): Base domain links are classified against.
+            Defaults to the base domain of base_url.
+        cache_size (int): Entries memoized per operation.
+
+    Example:
+        >>> normalizer = URLNormalizer("https://news.bbc.co.uk/world")
+        >>> normalizer.normalize("/sport")
+        'https://news.bbc.co.uk/sport'
+        >>> normalizer.is_external("https://www.bbc.co.uk/")
+        False
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        base_domain: Optional[str] = None,
+        cache_size: int = URL_NORMALIZER_CACHE_SIZE,
+    ):
+        self.base_url = base_url
+        try:
+            parsed_base = urlparse(base_url)
+            self.valid = bool(parsed_base.scheme and parsed_base.netloc)
+        except ValueError:
+            self.valid = False
+        self.base_domain = (
+            get_base_domain(base_url) if base_domain is None else base_domain
+        )
+        self.normalize = lru_cache(maxsize=cache_size)(self._normalize)
+        self.is_external = lru_cache(maxsize=cache_size)(self._is_external)
+        self.base_domain_of = lru_cache(maxsize=cache_size)(get_base_domain)
+
+    def _normalize(self, href: str) -> str:
+        """Same as normalize_url(href, base_url); raises ValueError if the base URL is invalid"""
+        if not self.valid:
+            raise ValueError(f"Invalid base URL format: {self.base_url}")
+        return urljoin(self.base_url, href.strip())
+
+    def _is_external(self, url: str) -> bool:
+        return is_external_url(url, self.base_domain)
+
+
+def fast_urljoin(base: str, url: str) -> str:
+    """Fast URL joining for common cases."""
+    if url.startswith(("http://", "https://", "mailto:", "//")):
+        return url
+    if url.startswith("/"):
+        # Handle absolute paths
+        if base.endswith("/"):
+            return base[:-1] + url
+        return base + url
+    return urljoin(base, url)
 
 
 def clean_tokens(tokens: list[str]) -> list[str]:
@@ -2112,6 +2264,303 @@ def generate_content_hash(content: str) -> str:
     # return hashlib.sha256(content.encode()).hexdigest()
 
 
+def compute_line_delta(old: str, new: str) -> List[Union[List[int], str]]:
+    """
+    Compute a line delta that turns old into new.
+
+    The delta is a JSON-serializable list of operations: a [start, end] pair copies
+    lines old[start:end], a string is inserted as-is.
+
+    Args:
+        old (str): The previous version.
+        new (str): The current version.
+
+    Returns:
+        List[Union[List[int], str]]: The delta, see apply_line_delta.
+    """
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    delta = []
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            delta.append([i1, i2])
+        elif tag in ("replace", "insert"):
+            delta.append("".join(new_lines[j1:j2]))
+    return delta
+
+
+def apply_line_delta(old: str, delta: List[Union[List[int], str]]) -> str:
+    """Rebuild a version from its predecessor and a delta from compute_line_delta"""
+    old_lines = old.splitlines(keepends=True)
+    parts = []
+    for op in delta:
+        if isinstance(op, str):
+            parts.append(op)
+        else:
+            parts.extend(old_lines[op[0] : op[1]])
+    return "".join(parts)
+
+
+# Tokens that change on every request without the page content changing,
+# as (pattern, replacement) pairs
+VOLATILE_HTML_PATTERNS = [
+    # CSP nonces
+    (re.compile(r'\s(?:nonce|data-nonce)\s*=\s*(["\']).*?\1', re.IGNORECASE), ""),
+    # CSRF / anti-forgery tokens in hidden inputs and meta tags
+    (
+        re.compile(
+            r'(<(?:input|meta)\b[^>]*?(?:csrf|xsrf|authenticity_token|__requestverificationtoken)'
+            r'[^>]*?\s(?:value|content)\s*=\s*)(["\']).*?\2',
+            re.IGNORECASE,
+        ),
+        r"\1\2\2",
+    ),
+    # ISO 8601 timestamps
+    (
+        re.compile(
+            r"\b\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?\b"
+        ),
+        "",
+    ),
+    # Unix timestamps in seconds or milliseconds
+    (re.compile(r"\b1\d{9}(?:\d{3})?\b"), ""),
+]
+
+
+def normalize_volatile_html(html: str) -> str:
+    """
+    Remove per-request tokens from HTML so unchanged pages hash identically.
+
+    How it works:
+    1. Drops nonce attributes and blanks CSRF token values.
+    2. Removes ISO 8601 and Unix timestamps.
+
+    Args:
+        html (str): The HTML to normalize.
+
+    Returns:
+        str: The normalized HTML, only suitable for comparison.
+    """
+    if not html:
+        return ""
+    for pattern, replacement in VOLATILE_HTML_PATTERNS:
+        html = pattern.sub(replacement, html)
+    return html
+
+
+def get_cache_ttl_from_headers(headers: Dict[str, str]) -> Optional[float]:
+    """
+    Derive a cache TTL in seconds from HTTP response headers.
+
+    How it works:
+    1. `Cache-Control: no-store` or `no-cache` yields 0 (do not serve from cache).
+    2. `s-maxage` takes precedence over `max-age`; `Age` is subtracted when present.
+    3. Otherwise `Expires` is compared with `Date` (or the current time).
+
+    Args:
+        headers (Dict[str, str]): Response headers, matched case-insensitively.
+
+    Returns:
+        Optional[float]: TTL in seconds, or None if the headers carry no freshness information.
+    """
+    if not headers:
+        return None
+    headers = {k.lower(): v for k, v in headers.items()}
+
+    cache_control = headers.get("cache-control", "")
+    if cache_control:
+        directives = {}
+        for part in cache_control.split(","):
+            name, _, value = part.strip().partition("=")
+            directives[name.strip().lower()] = value.strip().strip('"')
+        if "no-store" in directives or "no-cache" in directives:
+            return 0.0
+        for name in ("s-maxage", "max-age"):
+            if name in directives:
+                try:
+                    max_age = float(directives[name])
+                except ValueError:
+                    continue
+                try:
+                    age = float(headers.get("age", 0))
+                except ValueError:
+                    age = 0.0
+                return max(0.0, max_age - age)
+
+    expires = headers.get("expires")
+    if expires:
+        try:
+            expires_at = parsedate_to_datetime(expires).timestamp()
+        except (TypeError, ValueError):
+            # Invalid Expires values (e.g. "0") mean already expired
+            return 0.0
+        try:
+            now = parsedate_to_datetime(headers["date"]).timestamp()
+        except (KeyError, TypeError, ValueError):
+            now = time.time()
+        return max(0.0, expires_at - now)
+
+    return None
+
+
+def get_retry_after_from_headers(headers: Dict[str, str]) -> Optional[float]:
+    """
+    Seconds to wait before retrying, from the Retry-After header (delay or HTTP date).
+
+    Returns:
+        Optional[float]: The delay, or None if the header is missing or invalid.
+    """
+    if not headers:
+        return None
+    headers = {k.lower(): v for k, v in headers.items()}
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+# (error class, substrings of error messages) checked in order by classify_crawl_error
+CRAWL_ERROR_PATTERNS = [
+    ("dns", ("ERR_NAME_NOT_RESOLVED", "getaddrinfo", "Name or service not known", "nodename nor servname")),
+    ("timeout", ("Timeout", "timed out", "ERR_TIMED_OUT")),
+    ("connection", ("ERR_CONNECTION", "Connection refused", "ECONNREFUSED", "ERR_ADDRESS_UNREACHABLE", "ERR_SSL", "ERR_CERT")),
+]
+
+
+def classify_crawl_error(
+    error_message: Optional[str] = None, status_code: Optional[int] = None
+) -> str:
+    """
+    Classify a failed crawl for the negative cache.
+
+    Returns:
+        str: "not_found" (404/410), "http_4xx", "http_5xx", "dns", "timeout", "connection"
+        or "error" for anything else.
+    """
+    if status_code in (404, 410):
+        return "not_found"
+    if status_code and 400 <= status_code < 500:
+        return "http_4xx"
+    if status_code and status_code >= 500:
+        return "http_5xx"
+    for error_class, patterns in CRAWL_ERROR_PATTERNS:
+        if error_message and any(p.lower() in error_message.lower() for p in patterns):
+            return error_class
+    return "error"
+
+
+def estimate_change_rate(
+    checks: int,
+    changes: int,
+    observed_time: float,
+    prior_rate: float = CHANGE_RATE_PRIOR,
+    prior_weight: float = CHANGE_RATE_PRIOR_WEIGHT,
+) -> float:
+    """
+    Estimate how often a page changes, assuming changes follow a Poisson process.
+
+    How it works:
+    1. A check only reveals whether the page changed at least once since the previous
+       check, so the number of changes is corrected with the Cho & Garcia-Molina estimator
+       -n * log((n - X + 0.5) / (n + 0.5)) for n checks with X detected changes.
+    2. The result is smoothed with a prior of prior_rate worth prior_weight seconds of
+       observation, so URLs with little history are neither ignored nor over-crawled.
+
+    Args:
+        checks (int): Number of checks with a previous observation to compare to.
+        changes (int): Number of those checks that found changed content.
+        observed_time (float): Total seconds covered by the checks.
+        prior_rate (float): Change rate per second assumed without history.
+        prior_weight (float): Seconds of observation the prior is worth.
+
+    Returns:
+        float: Estimated changes per second.
+    """
+    events = 0.0
+    if checks > 0:
+        changes = min(max(changes, 0), checks)
+        events = -checks * math.log((checks - changes + 0.5) / (checks + 0.5))
+    return (events + prior_rate * prior_weight) / (max(observed_time, 0.0) + prior_weight)
+
+
+# Runtime state that does not influence processing output
+FINGERPRINT_IGNORED_ATTRS = {
+    "logger",
+    "verbose",
+    "usages",
+    "total_usage",
+    "timer",
+    "buffer_embeddings",
+    "device",
+    "default_batch_size",
+    "get_embedding_method",
+    "api_token",
+}
+
+
+def _fingerprint_value(value, depth: int = 0):
+    """Convert a value into a JSON-serializable structure for fingerprinting"""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if depth > 5:
+        return type(value).__qualname__
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, re.Pattern):
+        return value.pattern
+    if isinstance(value, dict):
+        return {
+            str(k): _fingerprint_value(v, depth + 1)
+            for k, v in sorted(value.items(), key=lambda item: str(item[0]))
+        }
+    if isinstance(value, (set, frozenset)):
+        return sorted(str(_fingerprint_value(v, depth + 1)) for v in value)
+    if isinstance(value, (list, tuple)):
+        return [_fingerprint_value(v, depth + 1) for v in value]
+
+    cls = type(value)
+    name = f"{cls.__module__}.{cls.__qualname__}"
+    # Only walk the state of our own strategy objects; third party objects
+    # (models, stemmers, tokenizers) are identified by their type.
+    if not cls.__module__.startswith("crawl4ai") or not hasattr(value, "__dict__"):
+        return name
+    return {
+        "__class__": name,
+        **{
+            k: _fingerprint_value(v, depth + 1)
+            for k, v in sorted(vars(value).items())
+            if not k.startswith("_")
+            and k not in FINGERPRINT_IGNORED_ATTRS
+            and not callable(v)
+        },
+    }
+
+
+def generate_config_fingerprint(values: Dict[str, Any]) -> str:
+    """
+    Generate a stable hash for a set of configuration values.
+
+    Strategy objects defined in crawl4ai are fingerprinted from their public
+    attributes, so two equally configured instances produce the same hash.
+
+    Args:
+        values (Dict[str, Any]): Configuration values to fingerprint.
+
+    Returns:
+        str: Hex digest identifying the configuration.
+    """
+    serialized = json.dumps(_fingerprint_value(values), sort_keys=True, default=str)
+    return generate_content_hash(serialized)
+
+
 def ensure_content_dirs(base_path: str) -> Dict[str, str]:
     """Create content directories if they don't exist"""
     dirs = {
@@ -0,0 +1,446 @@
+"""WARC (ISO 28500) and HAR archive support for recording and replaying crawls."""
+
+import base64
+import gzip
+import hashlib
+import json
+import os
+import threading
+import uuid
+import zlib
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .__version__ import __version__ as crawl4ai_version
+
+WARC_VERSION = "WARC/1.1"
+
+# The browser hands out decoded bodies, so these no longer describe the stored payload
+STRIPPED_RESPONSE_HEADERS = {"content-encoding", "transfer-encoding", "content-length"}
+
+
+def _warc_date(timestamp: Optional[float] = None) -> str:
+    moment = (
+        datetime.fromtimestamp(timestamp, timezone.utc)
+        if timestamp is not None
+        else datetime.now(timezone.utc)
+    )
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def _sha1_digest(data: bytes) -> str:
+    return "sha1:" + base64.b32encode(hashlib.sha1(data).digest()).decode("ascii")
+
+
+class WARCRecord:
+    """
+    A single WARC record.
+
+    Attributes:
+        headers (Dict[str, str]): WARC named fields, e.g. WARC-Type and WARC-Target-URI.
+        block (bytes): The record content block.
+    """
+
+    def __init__(self, headers: Dict[str, str], block: bytes):
+        self.headers = headers
+        self.block = block
+
+    @property
+    def type(self) -> Optional[str]:
+        return self.headers.get("WARC-Type")
+
+    @property
+    def target_uri(self) -> Optional[str]:
+        uri = self.headers.get("WARC-Target-URI")
+        # WARC/1.0 writers may wrap the URI in angle brackets
+        return uri.strip("<>") if uri else uri
+
+    def parse_http_response(self) -> Tuple[int, Dict[str, str], bytes]:
+        """
+        Parse the block of a response record.
+
+        Returns:
+            Tuple[int, Dict[str, str], bytes]: Status code, headers and decoded body.
+        """
+        head, _, body = self.block.partition(b"\r\n\r\n")
+        lines = head.decode("iso-8859-1").split("\r\n")
+        status_parts = lines[0].split(" ", 2)
+        status_code = int(status_parts[1]) if len(status_parts) > 1 else 200
+        headers = {}
+        for line in lines[1:]:
+            name, sep, value = line.partition(":")
+            if sep:
+                headers[name.strip()] = value.strip()
+        return status_code, headers, decode_http_body(body, headers)
+
+
+class WARCWriter:
+    """
+    Writes WARC/1.1 files.
+
+    Each record is written as its own gzip member when gzip is enabled, so that
+    the file stays readable by standard WARC tools and appends are safe.
+
+    Usage:
+        writer = WARCWriter("crawl.warc.gz")
+        writer.write_response(url, 200, headers, body)
+        writer.close()
+    """
+
+    def __init__(self, path: str, gzip_records: Optional[bool] = None):
+        """
+        Open a WARC file for appending.
+
+        Args:
+            path (str): Output path.
+            gzip_records (bool, optional): Compress records. Defaults to True for *.gz paths.
+        """
+        self.path = path
+        self.gzip_records = path.endswith(".gz") if gzip_records is None else gzip_records
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, "ab")
+        self._lock = threading.Lock()
+        if is_new:
+            self.write_warcinfo()
+
+    def _write_record(self, headers: Dict[str, str], block: bytes) -> str:
+        record_id = headers.get("WARC-Record-ID") or f"<urn:uuid:{uuid.uuid4()}>"
+        fields = {
+            "WARC-Type": headers.pop("WARC-Type"),
+            "WARC-Record-ID": record_id,
+            "WARC-Date": headers.pop("WARC-Date", None) or _warc_date(),
+            **{k: v for k, v in headers.items() if k != "WARC-Record-ID"},
+            "WARC-Block-Digest": _sha1_digest(block),
+            "Content-Length": str(len(block)),
+        }
+        head = WARC_VERSION + "\r\n"
+        head += "".join(f"{name}: {value}\r\n" for name, value in fields.items())
+        data = head.encode("utf-8") + b"\r\n" + block + b"\r\n\r\n"
+        if self.gzip_records:
+            data = gzip.compress(data)
+        with self._lock:
+            self._file.write(data)
+            self._file.flush()
+        return record_id
+
+    def write_warcinfo(self) -> str:
+        """Write the warcinfo record describing the file"""
+        block = (
+            f"software: crawl4ai/{crawl4ai_version}\r\n"
+            "format: WARC File Format 1.1\r\n"
+            "conformsTo: http://iipc.github.io/warc-specifications/specifications/warc-format/warc-1.1/\r\n"
+        ).encode("utf-8")
+        return self._write_record(
+            {
+                "WARC-Type": "warcinfo",
+                "WARC-Filename": os.path.basename(self.path),
+                "Content-Type": "application/warc-fields",
+            },
+            block,
+        )
+
+    def write_response(
+        self,
+        url: str,
+        status_code: int,
+        headers: Dict[str, str],
+        body: bytes,
+        reason: str = "",
+        method: str = "GET",
+        request_headers: Optional[Dict[str, str]] = None,
+        timestamp: Optional[float] = None,
+    ) -> str:
+        """
+        Write a response record, preceded by its request record.
+
+        Args:
+            url (str): The response URL.
+            status_code (int): HTTP status code.
+            headers (Dict[str, str]): Response headers.
+            body (bytes): Decoded response body.
+            reason (str): HTTP reason phrase.
+            method (str): Request method.
+            request_headers (Dict[str, str], optional): Request headers.
+            timestamp (float, optional): Capture time, defaults to now.
+
+        Returns:
+            str: The WARC-Record-ID of the response record.
+        """
+        date = _warc_date(timestamp)
+        http_headers = [
+            (name, value)
+            for name, value in headers.items()
+            if name.lower() not in STRIPPED_RESPONSE_HEADERS
+        ]
+        http_headers.append(("Content-Length", str(len(body))))
+        head = f"HTTP/1.1 {status_code} {reason}".rstrip() + "\r\n"
+        head += "".join(f"{name}: {value}\r\n" for name, value in http_headers)
+        block = head.encode("utf-8", errors="replace") + b"\r\n" + body
+
+        response_id = f"<urn:uuid:{uuid.uuid4()}>"
+        self._write_record(
+            {
+                "WARC-Type": "response",
+                "WARC-Record-ID": response_id,
+                "WARC-Date": date,
+                "WARC-Target-URI": url,
+                "Content-Type": "application/http;msgtype=response",
+                "WARC-Payload-Digest": _sha1_digest(body),
+            },
+            block,
+        )
+
+        if request_headers is not None:
+            request_block = f"{method} {url} HTTP/1.1\r\n"
+            request_block += "".join(
+                f"{name}: {value}\r\n" for name, value in request_headers.items()
+            )
+            self._write_record(
+                {
+                    "WARC-Type": "request",
+                    "WARC-Date": date,
+                    "WARC-Target-URI": url,
+                    "WARC-Concurrent-To": response_id,
+                    "Content-Type": "application/http;msgtype=request",
+                },
+                (request_block + "\r\n").encode("utf-8", errors="replace"),
+            )
+        return response_id
+
+    def write_rendered(
+        self, url: str, html: str, refers_to: Optional[str] = None
+    ) -> str:
+        """
+        Write the DOM rendered by the browser as a conversion record.
+
+        Args:
+            url (str): The page URL.
+            html (str): The rendered HTML.
+            refers_to (str, optional): WARC-Record-ID of the response it was rendered from.
+
+        Returns:
+            str: The WARC-Record-ID of the conversion record.
+        """
+        headers = {
+            "WARC-Type": "conversion",
+            "WARC-Target-URI": url,
+            "Content-Type": "text/html; charset=utf-8",
+        }
+        if refers_to:
+            headers["WARC-Refers-To"] = refers_to
+        return self._write_record(headers, html.encode("utf-8"))
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def iter_warc_records(path: str) -> Iterator[WARCRecord]:
+    """
+    Iterate over the records of a WARC file, gzip compressed or not.
+
+    Args:
+        path (str): Path of the WARC file.
+
+    Yields:
+        WARCRecord: The records in file order.
+    """
+    with open(path, "rb") as raw:
+        compressed = raw.read(2) == b"\x1f\x8b"
+    stream = gzip.open(path, "rb") if compressed else open(path, "rb")
+    with stream:
+        while True:
+            line = stream.readline()
+            if not line:
+                return
+            if not line.strip():
+                continue
+            if not line.startswith(b"WARC/"):
+                raise ValueError(f"Invalid WARC record header in {path}: {line[:50]!r}")
+            headers = {}
+            for line in iter(stream.readline, b""):
+                line = line.rstrip(b"\r\n")
+                if not line:
+                    break
+                name, _, value = line.decode("utf-8").partition(":")
+                headers[name.strip()] = value.strip()
+            length = int(headers.get("Content-Length", 0))
+            yield WARCRecord(headers, stream.read(length))
+
+
+def decode_http_body(body: bytes, headers: Dict[str, str]) -> bytes:
+    """Undo chunked transfer encoding and gzip/deflate content encoding of an archived body"""
+    lowered = {k.lower(): v.lower() for k, v in headers.items()}
+    if "chunked" in lowered.get("transfer-encoding", ""):
+        decoded, rest = b"", body
+        while rest:
+            size_line, _, rest = rest.partition(b"\r\n")
+            try:
+                size = int(size_line.split(b";")[0], 16)
+            except ValueError:
+                break
+            if size == 0:
+                break
+            decoded += rest[:size]
+            rest = rest[size + 2 :]
+        body = decoded
+    encoding = lowered.get("content-encoding", "")
+    try:
+        if encoding in ("gzip", "x-gzip"):
+            body = gzip.decompress(body)
+        elif encoding == "deflate":
+            try:
+                body = zlib.decompress(body)
+            except zlib.error:
+                body = zlib.decompress(body, -zlib.MAX_WBITS)
+    except (OSError, zlib.error):
+        pass
+    return body
+
+
+def decode_html(body: bytes, headers: Dict[str, str]) -> str:
+    """Decode a response body using the charset of its Content-Type, defaulting to UTF-8"""
+    content_type = next(
+        (v for k, v in headers.items() if k.lower() == "content-type"), ""
+    )
+    charset = "utf-8"
+    for part in content_type.split(";"):
+        name, _, value = part.strip().partition("=")
+        if name.lower() == "charset" and value:
+            charset = value.strip("\"'")
+    try:
+        return body.decode(charset, errors="replace")
+    except LookupError:
+        return body.decode("utf-8", errors="replace")
+
+
+class ArchivedResponse:
+    """A response loaded from a WARC or HAR archive"""
+
+    def __init__(
+        self,
+        url: str,
+        status_code: int,
+        headers: Dict[str, str],
+        body: bytes,
+        rendered_html: Optional[str] = None,
+    ):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+        self.rendered_html = rendered_html
+
+    @property
+    def html(self) -> str:
+        if self.rendered_html is not None:
+            return self.rendered_html
+        return decode_html(self.body, self.headers)
+
+
+def load_warc_responses(path: str) -> Dict[str, ArchivedResponse]:
+    """
+    Index the responses of a WARC file by URL.
+
+    Later records for the same URL replace earlier ones. Conversion records written
+    by WARCWriter.write_rendered provide the rendered HTML of a page.
+
+    Args:
+        path (str): Path of the WARC file.
+
+    Returns:
+        Dict[str, ArchivedResponse]: Responses by URL.
+    """
+    responses: Dict[str, ArchivedResponse] = {}
+    rendered: Dict[str, str] = {}
+    for record in iter_warc_records(path):
+        url = record.target_uri
+        if not url:
+            continue
+        if record.type == "response":
+            try:
+                status_code, headers, body = record.parse_http_response()
+            except (ValueError, IndexError):
+                continue
+            responses[url] = ArchivedResponse(url, status_code, headers, body)
+        elif record.type == "resource":
+            content_type = record.headers.get("Content-Type", "")
+            responses[url] = ArchivedResponse(
+                url, 200, {"Content-Type": content_type}, record.block
+            )
+        elif record.type == "conversion":
+            rendered[url] = decode_html(
+                record.block, {"Content-Type": record.headers.get("Content-Type", "")}
+            )
+    for url, html in rendered.items():
+        if url in responses:
+            responses[url].rendered_html = html
+        else:
+            responses[url] = ArchivedResponse(
+                url, 200, {"Content-Type": "text/html; charset=utf-8"}, b"", html
+            )
+    return responses
+
+
+def load_har_responses(path: str) -> Dict[str, ArchivedResponse]:
+    """
+    Index the responses of a HAR file by URL.
+
+    Supports inline (plain or base64) content and content attached as separate
+    files, as written by Playwright's record_har_content="attach".
+
+    Args:
+        path (str): Path of the HAR file.
+
+    Returns:
+        Dict[str, ArchivedResponse]: Responses by URL.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        har = json.load(f)
+
+    responses: Dict[str, ArchivedResponse] = {}
+    base_dir = os.path.dirname(os.path.abspath(path))
+    for entry in har.get("log", {}).get("entries", []):
+        url = entry.get("request", {}).get("url")
+        response = entry.get("response", {})
+        if not url:
+            continue
+        headers = {h["name"]: h["value"] for h in response.get("headers", [])}
+        content = response.get("content", {})
+        if content.get("_file"):
+            with open(os.path.join(base_dir, content["_file"]), "rb") as f:
+                body = f.read()
+        elif content.get("encoding") == "base64":
+            body = base64.b64decode(content.get("text", ""))
+        else:
+            body = content.get("text", "").encode("utf-8")
+        if response.get("redirectURL") and not any(
+            k.lower() == "location" for k in headers
+        ):
+            headers["Location"] = response["redirectURL"]
+        # Bodies in HAR files are already decoded
+        headers = {
+            k: v for k, v in headers.items() if k.lower() not in STRIPPED_RESPONSE_HEADERS
+        }
+        responses[url] = ArchivedResponse(url, response.get("status", 200), headers, body)
+    return responses
+
+
+def load_archive(paths: List[str]) -> Dict[str, ArchivedResponse]:
+    """Index responses from WARC (.warc, .warc.gz) and HAR (.har) files, later files taking precedence"""
+    responses: Dict[str, ArchivedResponse] = {}
+    for path in paths:
+        if path.lower().endswith(".har"):
+            responses.update(load_har_responses(path))
+        else:
+            responses.update(load_warc_responses(path))
+    return responses
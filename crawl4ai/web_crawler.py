@@ -4,7 +4,7 @@ os.environ["TOKENIZERS_PARALLELISM"] = "false"
 from pathlib import Path
 
 from .models import UrlModel, CrawlResult
-from .database import init_db, get_cached_url, cache_url
+from .database import init_db, get_cached_url, cache_url, batched_writes
 from .utils import *
 from .chunking_strategy import *
 from .extraction_strategy import *
@@ -98,7 +98,7 @@ class WebCrawler:
         def fetch_page_wrapper(url_model, *args, **kwargs):
             return self.fetch_page(url_model, *args, **kwargs)
 
-        with ThreadPoolExecutor() as executor:
+        with batched_writes(), ThreadPoolExecutor() as executor:
             results = list(
                 executor.map(
                     fetch_page_wrapper,
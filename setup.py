@@ -51,7 +51,7 @@ setup(
     author_email="unclecode@kidocode.com",
     license="MIT",
     packages=find_packages(),
-    package_data={"crawl4ai": ["js_snippet/*.js"]},
+    package_data={"crawl4ai": ["js_snippet/*.js", "public_suffix_list.dat"]},
     classifiers=[
         "Development Status :: 3 - Alpha",
         "Intended Audience :: Developers",
@@ -0,0 +1,210 @@
+import os
+import sys
+import time
+import asyncio
+import pytest
+import pytest_asyncio
+
+# Add the parent directory to the Python path
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+
+import crawl4ai.async_webcrawler as async_webcrawler
+from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, CacheMode
+from crawl4ai.async_crawler_strategy import AsyncCrawlerStrategy
+from crawl4ai.async_database import AsyncDatabaseManager
+from crawl4ai.cache_backend import (
+    CacheBackend,
+    CacheEntry,
+    SQLiteCacheBackend,
+    LMDBCacheBackend,
+)
+from crawl4ai.models import AsyncCrawlResponse, CrawlResult, MarkdownGenerationResult
+
+PAGE = """
+<html><body>
+    <div class="intro"><p>Introduction paragraph with enough words to be kept around.</p></div>
+    <div class="main"><p>Main paragraph with enough words to be kept around as well.</p></div>
+</body></html>
+"""
+
+
+def make_entry(url, expires_at=None):
+    result = CrawlResult(
+        url=url,
+        html=f"<html><body>{url}</body></html>",
+        success=True,
+        cleaned_html="<body>cleaned</body>",
+        markdown=MarkdownGenerationResult(
+            raw_markdown=f"# {url}",
+            markdown_with_citations="",
+            references_markdown="",
+        ),
+        media={"images": [{"src": "a.png"}]},
+        links={"internal": [{"href": url}]},
+        metadata={"title": "Title"},
+        response_headers={"etag": '"1"'},
+    )
+    return CacheEntry(result=result, created_at=time.time(), expires_at=expires_at)
+
+
+@pytest_asyncio.fixture(params=["sqlite", "lmdb"])
+async def backend(request, tmp_path):
+    if request.param == "sqlite":
+        backend = SQLiteCacheBackend(AsyncDatabaseManager(db_directory=str(tmp_path)))
+    else:
+        pytest.importorskip("lmdb")
+        backend = LMDBCacheBackend(str(tmp_path / "cache.lmdb"))
+    assert isinstance(backend, CacheBackend)
+    yield backend
+    await backend.close()
+
+
+@pytest.mark.asyncio
+async def test_put_get_delete(backend):
+    expires_at = time.time() + 60
+    await backend.put(make_entry("https://example.com/a", expires_at))
+
+    entry = await backend.get("https://example.com/a")
+    assert entry.result.html == "<html><body>https://example.com/a</body></html>"
+    assert entry.result.markdown == "# https://example.com/a"
+    assert entry.result.media == {"images": [{"src": "a.png"}]}
+    assert entry.result.response_headers == {"etag": '"1"'}
+    assert entry.expires_at == pytest.approx(expires_at, abs=1)
+
+    # Expired entries are still returned, expiry is up to the caller
+    await backend.put(make_entry("https://example.com/b", time.time() - 1))
+    assert (await backend.get("https://example.com/b")).is_expired()
+
+    found = await backend.bulk_get(["https://example.com/a", "https://example.com/missing"])
+    assert list(found) == ["https://example.com/a"]
+    assert await backend.count() == 2
+
+    assert await backend.delete("https://example.com/a")
+    assert not await backend.delete("https://example.com/a")
+    assert await backend.get("https://example.com/a") is None
+
+    await backend.clear()
+    assert await backend.count() == 0
+
+
+@pytest.mark.asyncio
+async def test_iterate_in_url_order(backend):
+    long_url = "https://example.com/long?" + "q" * 1000
+    urls = ["https://example.com/c", "https://example.com/a", long_url, "https://example.com/b"]
+    for url in urls:
+        await backend.put(make_entry(url))
+
+    assert [e.url async for e in backend.iterate()] == sorted(urls)
+    assert [e.url async for e in backend.iterate(start_after="https://example.com/b")] == [
+        "https://example.com/c",
+        long_url,
+    ]
+    assert (await backend.get(long_url)).result.markdown == f"# {long_url}"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writers(backend):
+    urls = [f"https://example.com/page/{i}" for i in range(200)]
+    start = time.perf_counter()
+    await asyncio.gather(*(backend.put(make_entry(url)) for url in urls))
+    found = await backend.bulk_get(urls)
+    elapsed = time.perf_counter() - start
+
+    assert len(found) == len(urls)
+    print(f"{type(backend).__name__}: {len(urls) / elapsed:.0f} writes+reads/s")
+
+
+@pytest.mark.asyncio
+async def test_lmdb_backend_keeps_sqlite_bookkeeping(tmp_path):
+    pytest.importorskip("lmdb")
+    manager = AsyncDatabaseManager(
+        db_directory=str(tmp_path),
+        backend=LMDBCacheBackend(str(tmp_path / "cache.lmdb")),
+    )
+    url = "https://example.com/tracked"
+    await manager.arecord_failure(url, "timeout")
+    assert await manager.aget_failure(url)
+
+    entry = make_entry(url)
+    await manager.acache_url(entry.result)
+    assert await manager.aget_failure(url) is None
+    entry.result.html = "<html><body>changed</body></html>"
+    await manager.acache_url(entry.result)
+    await manager.arefresh_url(url, ttl=60)
+
+    # Change history stays in SQLite, so the recrawl scheduler sees these checks
+    history = (await manager.aget_change_history([url]))[url]
+    assert history["checks"] == 2 and history["changes"] == 1
+    await manager.backend.close()
+
+
+@pytest.mark.asyncio
+async def test_lmdb_backend_grows_and_evicts(tmp_path):
+    pytest.importorskip("lmdb")
+    backend = LMDBCacheBackend(str(tmp_path / "cache.lmdb"), map_size=64 * 1024)
+    manager = AsyncDatabaseManager(db_directory=str(tmp_path), backend=backend)
+    urls = [f"https://example.com/page/{i}" for i in range(300)]
+    entries = [make_entry(url) for url in urls]
+    for age, entry in enumerate(entries):
+        entry.created_at = age
+
+    # Readers keep transactions open while writers fill and resize the map
+    async def read():
+        for _ in range(30):
+            await backend.bulk_get(urls[:20])
+
+    await asyncio.gather(*(backend.put(entry) for entry in entries), read(), read())
+    assert backend.env.info()["map_size"] > 64 * 1024
+    assert len(await backend.bulk_get(urls)) == len(urls)
+
+    total = await manager.aget_total_size()
+    assert total > 0
+    assert await manager.aenforce_size_limit(total // 2) > 0
+    assert 0 < await manager.aget_total_size() <= total // 2
+    assert await backend.get(urls[0]) is None
+    assert await backend.get(urls[-1]) is not None
+    await backend.close()
+
+
+@pytest.mark.asyncio
+async def test_crawler_with_lmdb_backend(tmp_path, monkeypatch):
+    pytest.importorskip("lmdb")
+    manager = AsyncDatabaseManager(db_directory=str(tmp_path))
+    monkeypatch.setattr(async_webcrawler, "async_db_manager", manager)
+
+    class CountingStrategy(AsyncCrawlerStrategy):
+        def __init__(self):
+            self.logger = None
+            self.fetches = 0
+
+        async def crawl(self, url, **kwargs):
+            self.fetches += 1
+            return AsyncCrawlResponse(html=PAGE, response_headers={}, status_code=200)
+
+    strategy = CountingStrategy()
+    crawler = AsyncWebCrawler(
+        crawler_strategy=strategy,
+        cache_backend="lmdb",
+        base_directory=str(tmp_path),
+        verbose=False,
+    )
+    assert isinstance(manager.backend, LMDBCacheBackend)
+
+    url = "https://example.com/lmdb"
+    intro = CrawlerRunConfig(css_selector=".intro", cache_mode=CacheMode.ENABLED)
+    main = CrawlerRunConfig(css_selector=".main", cache_mode=CacheMode.ENABLED)
+
+    first = await crawler.arun(url, config=intro)
+    again = await crawler.arun(url, config=intro)
+    assert again.markdown == first.markdown
+    # A new processing configuration reprocesses the cached html
+    other = await crawler.arun(url, config=main)
+    assert "Main" in other.markdown and "Introduction" not in other.markdown
+    assert strategy.fetches == 1
+    assert await crawler.aget_cache_size() == 1
+    await manager.backend.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,90 @@
+import os
+import sys
+import gzip
+import json
+import time
+import pytest
+
+# Add the parent directory to the Python path
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+
+from crawl4ai.async_database import AsyncDatabaseManager
+from crawl4ai.cache_export import CacheExporter
+from crawl4ai.models import CrawlResult, MarkdownGenerationResult
+
+
+@pytest.fixture
+def db(tmp_path):
+    return AsyncDatabaseManager(db_directory=str(tmp_path))
+
+
+async def populate(db, count):
+    for i in range(count):
+        section = "blog" if i % 2 else "shop"
+        await db.acache_url(
+            CrawlResult(
+                url=f"https://example.com/{section}/{i:03d}",
+                html=f"<html><body>page {i}</body></html>",
+                success=True,
+                cleaned_html=f"<body>page {i}</body>",
+                markdown=MarkdownGenerationResult(
+                    raw_markdown=f"page {i}",
+                    markdown_with_citations="",
+                    references_markdown="",
+                    fit_markdown=f"fit {i}",
+                ),
+                links={"internal": [{"href": "/"}]},
+            )
+        )
+
+
+@pytest.mark.asyncio
+async def test_export_parquet_in_chunks(db, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    await populate(db, 25)
+    path = str(tmp_path / "cache.parquet")
+
+    exporter = CacheExporter(db, chunk_size=4)
+    count = await exporter.aexport(
+        path,
+        columns=["url", "success", "markdown", "fit_markdown", "links"],
+        url_pattern="https://example.com/blog/*",
+    )
+    assert count == 12
+
+    parquet = pq.ParquetFile(path)
+    assert parquet.metadata.num_row_groups == 3
+    assert parquet.metadata.row_group(0).column(0).compression == "ZSTD"
+    table = parquet.read()
+    assert table.column_names == ["url", "success", "markdown", "fit_markdown", "links"]
+    rows = table.to_pylist()
+    assert rows[0]["url"] == "https://example.com/blog/001"
+    assert rows[0]["success"] is True
+    assert rows[0]["markdown"] == "page 1" and rows[0]["fit_markdown"] == "fit 1"
+    assert json.loads(rows[0]["links"]) == {"internal": [{"href": "/"}]}
+
+
+@pytest.mark.asyncio
+async def test_export_jsonl_with_time_filter(db, tmp_path):
+    await populate(db, 3)
+    cutoff = time.time()
+    await populate(db, 5)  # re-caches every page, the last two for the first time after cutoff
+
+    path = str(tmp_path / "cache.jsonl.gz")
+    count = await CacheExporter(db).aexport(path, columns=["url", "links"], until=cutoff)
+    assert count == 0
+    count = await CacheExporter(db).aexport(path, columns=["url", "links"], since=cutoff)
+    assert count == 5
+
+    with gzip.open(path, "rt") as f:
+        rows = [json.loads(line) for line in f]
+    assert [row["url"] for row in rows] == sorted(row["url"] for row in rows)
+    assert rows[0]["links"] == {"internal": [{"href": "/"}]}
+
+    with pytest.raises(ValueError):
+        await CacheExporter(db).aexport(path, columns=["url", "password"])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
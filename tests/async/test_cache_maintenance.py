@@ -0,0 +1,148 @@
+import os
+import sys
+import asyncio
+import aiosqlite
+import pytest
+
+# Add the parent directory to the Python path
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+
+from crawl4ai.async_database import AsyncDatabaseManager
+from crawl4ai.models import CrawlResult, MarkdownGenerationResult
+from crawl4ai.utils import get_cache_ttl_from_headers
+
+
+def make_result(url, html):
+    markdown = MarkdownGenerationResult(
+        raw_markdown=html,
+        markdown_with_citations=html,
+        references_markdown="",
+    )
+    return CrawlResult(
+        url=url,
+        html=html,
+        success=True,
+        cleaned_html=html,
+        markdown=markdown.raw_markdown,
+        markdown_v2=markdown,
+    )
+
+
+@pytest.fixture
+def db(tmp_path):
+    return AsyncDatabaseManager(db_directory=str(tmp_path))
+
+
+def stored_files(db, content_type):
+    return set(os.listdir(db.content_paths[content_type]))
+
+
+@pytest.mark.asyncio
+async def test_expired_entries_are_misses(db):
+    await db.acache_url(make_result("https://example.com/a", "<p>a</p>"), ttl=0.05)
+    await db.acache_url(make_result("https://example.com/b", "<p>b</p>"))
+    await asyncio.sleep(0.1)
+
+    assert await db.aget_cached_url("https://example.com/a") is None
+    assert await db.aget_cached_url("https://example.com/a", include_expired=True)
+    assert await db.aget_cached_url("https://example.com/b")
+
+    assert await db.aexpire_entries() == 1
+    assert await db.aget_total_count() == 1
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction(db):
+    for name in ("a", "b", "c"):
+        await db.acache_url(make_result(f"https://example.com/{name}", name * 100))
+        await asyncio.sleep(0.01)
+
+    # Touch "a" so that "b" becomes the least recently used entry
+    await db.aget_cached_url("https://example.com/a")
+    total = await db.aget_total_size()
+
+    evicted = await db.aenforce_size_limit(total * 2 // 3)
+    assert evicted == 1
+    assert await db.aget_cached_url("https://example.com/b") is None
+    assert await db.aget_cached_url("https://example.com/a")
+    assert await db.aget_cached_url("https://example.com/c")
+
+
+@pytest.mark.asyncio
+async def test_hits_buffer_access_times(db):
+    url = "https://example.com/a"
+    await db.acache_url(make_result(url, "<p>a</p>"))
+
+    async def last_accessed():
+        async with aiosqlite.connect(db.db_path) as conn:
+            async with conn.execute(
+                "SELECT last_accessed FROM crawled_data WHERE url = ?", (url,)
+            ) as cursor:
+                return (await cursor.fetchone())[0]
+
+    written = await last_accessed()
+    await asyncio.sleep(0.01)
+    assert await db.aget_cached_url(url)
+    assert await db.aget_cached_urls([url])
+    # Hits are reads only, their access time is written in a later batch
+    assert await last_accessed() == written
+    assert url in db._access_times
+
+    await db.aflush_access_times()
+    assert await last_accessed() > written
+    assert db._access_times == {}
+
+
+@pytest.mark.asyncio
+async def test_gc_removes_overwritten_content(db):
+    url = "https://example.com/page"
+    await db.acache_url(make_result(url, "<p>old version</p>"))
+    await db.acache_url(make_result(url, "<p>new version</p>"))
+    assert len(stored_files(db, "html")) == 2
+
+    removed = await db.agc_content(grace_period=0)
+    assert removed >= 1
+    assert len(stored_files(db, "html")) == 1
+    cached = await db.aget_cached_url(url)
+    assert cached.html == "<p>new version</p>"
+
+
+@pytest.mark.asyncio
+async def test_gc_respects_grace_period(db):
+    url = "https://example.com/page"
+    await db.acache_url(make_result(url, "<p>old version</p>"))
+    await db.acache_url(make_result(url, "<p>new version</p>"))
+
+    assert await db.agc_content(grace_period=3600) == 0
+    assert len(stored_files(db, "html")) == 2
+
+
+@pytest.mark.asyncio
+async def test_clear_db_removes_content_files(db):
+    await db.acache_url(make_result("https://example.com/a", "<p>a</p>"))
+    await db.aclear_db()
+    # Files written moments ago are protected by the grace period
+    assert await db.agc_content(grace_period=0) >= 1
+    assert stored_files(db, "html") == set()
+
+
+def test_cache_ttl_from_headers():
+    assert get_cache_ttl_from_headers({"Cache-Control": "max-age=600", "Age": "100"}) == 500
+    assert get_cache_ttl_from_headers({"cache-control": "s-maxage=60, max-age=600"}) == 60
+    assert get_cache_ttl_from_headers({"Cache-Control": "no-store"}) == 0
+    assert (
+        get_cache_ttl_from_headers(
+            {
+                "Expires": "Wed, 21 Oct 2015 07:28:00 GMT",
+                "Date": "Wed, 21 Oct 2015 07:18:00 GMT",
+            }
+        )
+        == 600
+    )
+    assert get_cache_ttl_from_headers({"Expires": "0"}) == 0
+    assert get_cache_ttl_from_headers({"Content-Type": "text/html"}) is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
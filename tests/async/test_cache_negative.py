@@ -0,0 +1,137 @@
+import os
+import sys
+import time
+import pytest
+
+# Add the parent directory to the Python path
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+
+import crawl4ai.async_webcrawler as async_webcrawler
+from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, CacheMode, SemaphoreDispatcher
+from crawl4ai.async_crawler_strategy import AsyncCrawlerStrategy
+from crawl4ai.async_database import AsyncDatabaseManager
+from crawl4ai.config import NEGATIVE_CACHE_BASE_TTL
+from crawl4ai.models import AsyncCrawlResponse
+from crawl4ai.utils import classify_crawl_error
+
+
+class FlakyStrategy(AsyncCrawlerStrategy):
+    """Fails for URLs containing "down" or "gone" and records fetched URLs"""
+
+    def __init__(self):
+        self.logger = None
+        self.fetched = []
+
+    async def crawl(self, url, **kwargs):
+        self.fetched.append(url)
+        if "down" in url:
+            raise RuntimeError("net::ERR_NAME_NOT_RESOLVED at " + url)
+        if "gone" in url:
+            return AsyncCrawlResponse(
+                html="<html><body>Not here</body></html>",
+                response_headers={"Retry-After": "3600"},
+                status_code=404,
+            )
+        return AsyncCrawlResponse(
+            html=f"<html><body><p>Content of {url} with a few words</p></body></html>",
+            response_headers={},
+            status_code=200,
+        )
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    manager = AsyncDatabaseManager(db_directory=str(tmp_path))
+    monkeypatch.setattr(async_webcrawler, "async_db_manager", manager)
+    return manager
+
+
+def test_classify_crawl_error():
+    assert classify_crawl_error(status_code=404) == "not_found"
+    assert classify_crawl_error(status_code=403) == "http_4xx"
+    assert classify_crawl_error(status_code=503) == "http_5xx"
+    assert classify_crawl_error("net::ERR_NAME_NOT_RESOLVED") == "dns"
+    assert classify_crawl_error("Timeout 30000ms exceeded") == "timeout"
+    assert classify_crawl_error("net::ERR_CONNECTION_REFUSED") == "connection"
+    assert classify_crawl_error("Something else") == "error"
+
+
+@pytest.mark.asyncio
+async def test_failed_url_is_skipped_until_retry(db):
+    strategy = FlakyStrategy()
+    crawler = AsyncWebCrawler(crawler_strategy=strategy, verbose=False)
+    config = CrawlerRunConfig(cache_mode=CacheMode.ENABLED)
+    url = "https://down.example.com/"
+
+    first = await crawler.arun(url, config=config)
+    assert not first.success
+    failure = await db.aget_failure(url)
+    assert failure["error_class"] == "dns"
+    assert failure["failures"] == 1
+
+    second = await crawler.arun(url, config=config)
+    assert not second.success
+    assert "retry_failed=True" in second.error_message
+    assert strategy.fetched == [url]
+
+    # retry_failed fetches again and the backoff doubles
+    await crawler.arun(url, config=config.clone(retry_failed=True))
+    assert strategy.fetched == [url, url]
+    failure = await db.aget_failure(url)
+    assert failure["failures"] == 2
+    assert failure["retry_at"] - failure["last_failed_at"] == pytest.approx(
+        2 * NEGATIVE_CACHE_BASE_TTL
+    )
+
+
+@pytest.mark.asyncio
+async def test_error_status_is_not_cached_as_content(db):
+    strategy = FlakyStrategy()
+    crawler = AsyncWebCrawler(crawler_strategy=strategy, verbose=False)
+    config = CrawlerRunConfig(cache_mode=CacheMode.ENABLED)
+    url = "https://example.com/gone"
+
+    await crawler.arun(url, config=config)
+    assert await db.aget_cached_url(url) is None
+    failure = await db.aget_failure(url)
+    assert failure["error_class"] == "not_found"
+    assert failure["status_code"] == 404
+    # Retry-After extends the first backoff step
+    assert failure["retry_at"] - failure["last_failed_at"] == pytest.approx(3600)
+
+
+@pytest.mark.asyncio
+async def test_success_clears_failure_and_batches_skip(db):
+    strategy = FlakyStrategy()
+    crawler = AsyncWebCrawler(crawler_strategy=strategy, verbose=False)
+    config = CrawlerRunConfig(cache_mode=CacheMode.ENABLED)
+    ok = "https://example.com/ok"
+    down = "https://down.example.com/page"
+
+    await db.arecord_failure(ok, "timeout", "Timeout exceeded")
+    await crawler.arun(down, config=config)
+    strategy.fetched.clear()
+
+    results = await crawler.arun_many(
+        [ok, down], config=config, dispatcher=SemaphoreDispatcher()
+    )
+    assert strategy.fetched == []
+    assert not any(r.success for r in results)
+
+    await crawler.arun(ok, config=config.clone(retry_failed=True))
+    assert await db.aget_failure(ok) is None
+    assert await db.aget_failures([ok, down]) == {down: await db.aget_failure(down)}
+
+    # Expired records no longer skip the URL
+    await db.execute_with_retry(
+        lambda conn: conn.execute(
+            "UPDATE failed_urls SET retry_at = ?", (time.time() - 1,)
+        )
+    )
+    await crawler.arun(down, config=config)
+    assert strategy.fetched == [ok, down]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,154 @@
+import os
+import sys
+import pytest
+
+# Add the parent directory to the Python path
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+
+import crawl4ai.async_webcrawler as async_webcrawler
+from crawl4ai import (
+    AsyncWebCrawler,
+    CrawlerRunConfig,
+    CacheMode,
+    MemoryAdaptiveDispatcher,
+    SemaphoreDispatcher,
+)
+from crawl4ai.async_crawler_strategy import AsyncCrawlerStrategy
+from crawl4ai.async_database import AsyncDatabaseManager
+from crawl4ai.models import AsyncCrawlResponse
+
+
+class CountingStrategy(AsyncCrawlerStrategy):
+    """Serves a page per URL and records which URLs were fetched"""
+
+    def __init__(self):
+        self.logger = None
+        self.fetched = []
+
+    async def crawl(self, url, **kwargs):
+        self.fetched.append(url)
+        return AsyncCrawlResponse(
+            html=f"<html><body><p>Content of {url} with a few words</p></body></html>",
+            response_headers={},
+            status_code=200,
+        )
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    manager = AsyncDatabaseManager(db_directory=str(tmp_path))
+    monkeypatch.setattr(async_webcrawler, "async_db_manager", manager)
+
+    calls = []
+    original = manager.aget_cached_urls
+
+    async def counting_get(urls, config_hash=None):
+        calls.append(list(urls))
+        return await original(urls, config_hash=config_hash)
+
+    monkeypatch.setattr(manager, "aget_cached_urls", counting_get)
+    manager.bulk_calls = calls
+    return manager
+
+
+@pytest.mark.asyncio
+async def test_cached_urls_skip_dispatcher(db):
+    strategy = CountingStrategy()
+    crawler = AsyncWebCrawler(crawler_strategy=strategy, verbose=False)
+    config = CrawlerRunConfig(cache_mode=CacheMode.ENABLED)
+
+    cached_urls = [f"https://example.com/cached/{i}" for i in range(5)]
+    for url in cached_urls:
+        await crawler.arun(url, config=config)
+    strategy.fetched.clear()
+
+    new_urls = [f"https://example.com/new/{i}" for i in range(3)]
+    results = await crawler.arun_many(
+        cached_urls + new_urls, config=config, dispatcher=SemaphoreDispatcher()
+    )
+
+    assert sorted(strategy.fetched) == sorted(new_urls)
+    assert len(db.bulk_calls) == 1
+    assert all(r.success for r in results)
+    assert {r.url for r in results} == set(cached_urls + new_urls)
+
+    # Misses were written to the cache by the dispatched crawls
+    assert len(await db.aget_cached_urls(new_urls)) == len(new_urls)
+
+
+@pytest.mark.asyncio
+async def test_stream_yields_cache_hits_first(db):
+    strategy = CountingStrategy()
+    crawler = AsyncWebCrawler(crawler_strategy=strategy, verbose=False)
+    config = CrawlerRunConfig(cache_mode=CacheMode.ENABLED)
+
+    cached_url = "https://example.com/cached"
+    await crawler.arun(cached_url, config=config)
+    strategy.fetched.clear()
+
+    streamed = []
+    async for result in await crawler.arun_many(
+        ["https://example.com/new", cached_url],
+        config=config.clone(stream=True),
+        dispatcher=MemoryAdaptiveDispatcher(memory_threshold_percent=100.0),
+    ):
+        streamed.append(result.url)
+
+    assert streamed == [cached_url, "https://example.com/new"]
+    assert strategy.fetched == ["https://example.com/new"]
+
+
+class RecordingDispatcher(SemaphoreDispatcher):
+    """Records the URLs and cache mode of every dispatched batch"""
+
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    async def run_urls(self, crawler, urls, config):
+        self.batches.append((list(urls), config.cache_mode))
+        return await super().run_urls(crawler, urls, config)
+
+
+@pytest.mark.asyncio
+async def test_missing_variants_are_dispatched(db):
+    strategy = CountingStrategy()
+    crawler = AsyncWebCrawler(crawler_strategy=strategy, verbose=False)
+    urls = [f"https://example.com/page/{i}" for i in range(3)]
+    for url in urls:
+        await crawler.arun(url, config=CrawlerRunConfig(cache_mode=CacheMode.ENABLED))
+    strategy.fetched.clear()
+
+    # Another processing config: pages are reprocessed by the dispatcher, not fetched
+    dispatcher = RecordingDispatcher()
+    config = CrawlerRunConfig(cache_mode=CacheMode.ENABLED, css_selector="p")
+    results = await crawler.arun_many(
+        urls + ["https://example.com/new"], config=config, dispatcher=dispatcher
+    )
+
+    assert strategy.fetched == ["https://example.com/new"]
+    assert dispatcher.batches == [
+        (urls, CacheMode.ENABLED),
+        (["https://example.com/new"], CacheMode.WRITE_ONLY),
+    ]
+    assert all(r.success and r.cleaned_html for r in results)
+
+
+@pytest.mark.asyncio
+async def test_bypass_mode_does_not_prefetch(db):
+    strategy = CountingStrategy()
+    crawler = AsyncWebCrawler(crawler_strategy=strategy, verbose=False)
+    urls = ["https://example.com/a", "https://example.com/b"]
+
+    await crawler.arun_many(
+        urls,
+        config=CrawlerRunConfig(cache_mode=CacheMode.BYPASS),
+        dispatcher=SemaphoreDispatcher(),
+    )
+    assert db.bulk_calls == []
+    assert sorted(strategy.fetched) == urls
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
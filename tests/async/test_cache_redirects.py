@@ -0,0 +1,111 @@
+import os
+import sys
+import pytest
+
+# Add the parent directory to the Python path
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+
+import crawl4ai.async_webcrawler as async_webcrawler
+from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, CacheMode, SemaphoreDispatcher
+from crawl4ai.async_crawler_strategy import AsyncCrawlerStrategy
+from crawl4ai.async_database import AsyncDatabaseManager
+from crawl4ai.models import AsyncCrawlResponse
+
+SOURCE = "http://example.com/docs"
+HOP = "https://example.com/docs"
+FINAL = "https://example.com/en/docs/"
+
+
+class RedirectingStrategy(AsyncCrawlerStrategy):
+    """Redirects SOURCE to FINAL through HOP, like a browser following Location headers"""
+
+    def __init__(self):
+        self.logger = None
+        self.fetched = []
+        self.gone = False
+
+    async def crawl(self, url, **kwargs):
+        self.fetched.append(url)
+        if self.gone:
+            return AsyncCrawlResponse(html="", response_headers={}, status_code=404)
+        chain = [SOURCE, HOP, FINAL] if url == SOURCE else None
+        return AsyncCrawlResponse(
+            html="<html><body><p>Documentation with a few words</p></body></html>",
+            response_headers={},
+            status_code=200,
+            redirected_url=FINAL if url in (SOURCE, HOP) else url,
+            redirect_chain=chain,
+        )
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    manager = AsyncDatabaseManager(db_directory=str(tmp_path))
+    monkeypatch.setattr(async_webcrawler, "async_db_manager", manager)
+    return manager
+
+
+@pytest.mark.asyncio
+async def test_source_and_final_share_cache_entry(db):
+    strategy = RedirectingStrategy()
+    crawler = AsyncWebCrawler(crawler_strategy=strategy, verbose=False)
+    config = CrawlerRunConfig(cache_mode=CacheMode.ENABLED)
+
+    first = await crawler.arun(SOURCE, config=config)
+    assert first.url == SOURCE
+    assert first.redirected_url == FINAL
+    assert await db.aget_redirects([SOURCE, HOP, FINAL]) == {SOURCE: FINAL, HOP: FINAL}
+    assert await db.aget_redirect_chain(SOURCE) == [SOURCE, HOP, FINAL]
+    assert await db.aget_cached_url(SOURCE) is None
+    assert (await db.aget_cached_url(FINAL)).url == FINAL
+
+    for url in (SOURCE, HOP, FINAL):
+        result = await crawler.arun(url, config=config)
+        assert result.success
+        assert result.url == url
+        assert result.redirected_url == FINAL
+    results = await crawler.arun_many(
+        [SOURCE, HOP], config=config, dispatcher=SemaphoreDispatcher()
+    )
+    assert {r.url for r in results} == {SOURCE, HOP}
+    assert strategy.fetched == [SOURCE]
+
+
+@pytest.mark.asyncio
+async def test_known_redirect_skips_the_hops(db):
+    strategy = RedirectingStrategy()
+    crawler = AsyncWebCrawler(crawler_strategy=strategy, verbose=False)
+    config = CrawlerRunConfig(cache_mode=CacheMode.ENABLED)
+
+    await crawler.arun(SOURCE, config=config)
+    await db.adelete_url(FINAL)
+    result = await crawler.arun(SOURCE, config=config)
+    assert result.success
+    assert strategy.fetched == [SOURCE, FINAL]
+
+    # A failing final URL drops the redirect, so the source is requested next time
+    await db.adelete_url(FINAL)
+    strategy.gone = True
+    await crawler.arun(SOURCE, config=config)
+    assert await db.aget_redirect(SOURCE) is None
+
+
+@pytest.mark.asyncio
+async def test_arun_many_misses_follow_known_redirects(db):
+    strategy = RedirectingStrategy()
+    crawler = AsyncWebCrawler(crawler_strategy=strategy, verbose=False)
+    config = CrawlerRunConfig(cache_mode=CacheMode.ENABLED)
+
+    await crawler.arun(SOURCE, config=config)
+    await db.adelete_url(FINAL)
+    results = await crawler.arun_many(
+        [SOURCE], config=config, dispatcher=SemaphoreDispatcher()
+    )
+    assert results[0].success and results[0].url == SOURCE
+    assert strategy.fetched == [SOURCE, FINAL]
+    assert await db.aget_cached_url(FINAL)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,152 @@
+import os
+import sys
+import pytest
+
+# Add the parent directory to the Python path
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+
+import crawl4ai.async_webcrawler as async_webcrawler
+from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, CacheMode
+from crawl4ai.async_crawler_strategy import AsyncCrawlerStrategy
+from crawl4ai.async_database import AsyncDatabaseManager
+from crawl4ai.models import AsyncCrawlResponse
+
+PAGE = """
+<html><body>
+    <div class="intro"><p>Introduction paragraph with enough words to be kept around.</p></div>
+    <div class="main"><p>Main paragraph with enough words to be kept around as well.</p></div>
+</body></html>
+"""
+
+URLS = [
+    "https://example.com/blog/a",
+    "https://example.com/blog/b",
+    "https://example.com/shop/c",
+]
+
+
+class CountingStrategy(AsyncCrawlerStrategy):
+    """Serves a fixed page and counts how often it was fetched"""
+
+    def __init__(self):
+        self.logger = None
+        self.fetches = 0
+
+    async def crawl(self, url, **kwargs):
+        self.fetches += 1
+        return AsyncCrawlResponse(html=PAGE, response_headers={}, status_code=200)
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    manager = AsyncDatabaseManager(db_directory=str(tmp_path))
+    monkeypatch.setattr(async_webcrawler, "async_db_manager", manager)
+    return manager
+
+
+async def populate(crawler):
+    config = CrawlerRunConfig(css_selector=".intro", cache_mode=CacheMode.ENABLED)
+    for url in URLS:
+        await crawler.arun(url, config=config)
+
+
+@pytest.mark.asyncio
+async def test_reprocess_in_worker_processes(db):
+    strategy = CountingStrategy()
+    crawler = AsyncWebCrawler(crawler_strategy=strategy, verbose=False)
+    await populate(crawler)
+
+    main = CrawlerRunConfig(css_selector=".main", cache_mode=CacheMode.ENABLED)
+    stats = await crawler.areprocess_cache(
+        "https://example.com/blog/*", config=main, max_workers=2
+    )
+    assert stats["processed"] == 2 and stats["failed"] == 0
+    assert not crawler.ready
+    assert strategy.fetches == 3
+
+    async def no_processing(*args, **kwargs):
+        raise AssertionError("variant should come from the cache")
+
+    crawler.aprocess_html = no_processing
+    result = await crawler.arun(URLS[0], config=main)
+    assert "Main" in result.markdown and "Introduction" not in result.markdown
+    assert strategy.fetches == 3
+
+
+@pytest.mark.asyncio
+async def test_interrupted_job_resumes(db):
+    crawler = AsyncWebCrawler(crawler_strategy=CountingStrategy(), verbose=False)
+    await populate(crawler)
+    main = CrawlerRunConfig(css_selector=".main")
+
+    def interrupt(stats):
+        raise RuntimeError("interrupted")
+
+    with pytest.raises(RuntimeError):
+        await crawler.areprocess_cache(
+            config=main, max_workers=0, batch_size=1, progress_callback=interrupt
+        )
+
+    seen = []
+    stats = await crawler.areprocess_cache(
+        config=main, max_workers=0, batch_size=1, progress_callback=seen.append
+    )
+    # The first batch was stored before the interruption and is not processed again
+    assert [s["processed"] for s in seen] == [2, 3]
+    assert await db.aget_reprocess_progress(stats["job_id"]) is None
+
+
+@pytest.mark.asyncio
+async def test_callable_filters_resume_only_with_a_job_id(db):
+    crawler = AsyncWebCrawler(crawler_strategy=CountingStrategy(), verbose=False)
+    await populate(crawler)
+    main = CrawlerRunConfig(css_selector=".main")
+
+    def interrupt(stats):
+        raise RuntimeError("interrupted")
+
+    # Lambdas share a name, progress of the first must not skip pages of the second
+    with pytest.raises(RuntimeError):
+        await crawler.areprocess_cache(
+            lambda url: "blog" in url,
+            config=main,
+            max_workers=0,
+            batch_size=1,
+            progress_callback=interrupt,
+        )
+    seen = []
+    stats = await crawler.areprocess_cache(
+        lambda url: True,
+        config=main,
+        max_workers=0,
+        batch_size=1,
+        progress_callback=seen.append,
+    )
+    assert stats["job_id"] is None
+    assert [s["processed"] for s in seen] == [1, 2, 3]
+
+    with pytest.raises(RuntimeError):
+        await crawler.areprocess_cache(
+            lambda url: True,
+            config=main,
+            max_workers=0,
+            batch_size=1,
+            job_id="all",
+            progress_callback=interrupt,
+        )
+    seen = []
+    await crawler.areprocess_cache(
+        lambda url: True,
+        config=main,
+        max_workers=0,
+        batch_size=1,
+        job_id="all",
+        progress_callback=seen.append,
+    )
+    assert [s["processed"] for s in seen] == [2, 3]
+    assert await db.aget_reprocess_progress("all") is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
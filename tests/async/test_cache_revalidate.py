@@ -0,0 +1,131 @@
+import os
+import sys
+import asyncio
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+# Add the parent directory to the Python path
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+
+import crawl4ai.async_webcrawler as async_webcrawler
+from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, CacheMode
+from crawl4ai.async_crawler_strategy import AsyncCrawlerStrategy
+from crawl4ai.async_database import AsyncDatabaseManager
+from crawl4ai.models import AsyncCrawlResponse
+
+PAGE = "<html><body><p>Static page with enough words to be kept around.</p></body></html>"
+
+
+class CountingStrategy(AsyncCrawlerStrategy):
+    """Serves the page together with the server's current validators"""
+
+    def __init__(self, server_state):
+        self.logger = None
+        self.server_state = server_state
+        self.fetches = 0
+
+    async def crawl(self, url, **kwargs):
+        self.fetches += 1
+        return AsyncCrawlResponse(
+            html=PAGE,
+            response_headers={"ETag": self.server_state["etag"]},
+            status_code=200,
+        )
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    manager = AsyncDatabaseManager(db_directory=str(tmp_path))
+    monkeypatch.setattr(async_webcrawler, "async_db_manager", manager)
+    return manager
+
+
+@pytest_asyncio.fixture
+async def server():
+    state = {"etag": '"v1"', "requests": []}
+
+    async def handler(request):
+        state["requests"].append(dict(request.headers))
+        if request.headers.get("If-None-Match") == state["etag"]:
+            return web.Response(status=304, headers={"ETag": state["etag"]})
+        return web.Response(text=PAGE, headers={"ETag": state["etag"]})
+
+    app = web.Application()
+    app.router.add_get("/page", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    state["url"] = f"http://127.0.0.1:{port}/page"
+    yield state
+    await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_not_modified_serves_cached_entry(db, server):
+    strategy = CountingStrategy(server)
+    crawler = AsyncWebCrawler(crawler_strategy=strategy, verbose=False)
+    config = CrawlerRunConfig(cache_mode=CacheMode.REVALIDATE, cache_ttl=0.05)
+
+    first = await crawler.arun(server["url"], config=config)
+    assert strategy.fetches == 1
+
+    # Still fresh: served without contacting the server
+    await crawler.arun(server["url"], config=config)
+    assert server["requests"] == []
+
+    await asyncio.sleep(0.1)
+    assert not await db.ais_fresh(server["url"])
+
+    second = await crawler.arun(server["url"], config=config)
+    assert strategy.fetches == 1
+    assert server["requests"][-1]["If-None-Match"] == '"v1"'
+    assert second.markdown == first.markdown
+    assert await db.ais_fresh(server["url"])
+    await crawler.close()
+
+
+@pytest.mark.asyncio
+async def test_changed_page_is_refetched(db, server):
+    strategy = CountingStrategy(server)
+    crawler = AsyncWebCrawler(crawler_strategy=strategy, verbose=False)
+    config = CrawlerRunConfig(cache_mode=CacheMode.REVALIDATE, cache_ttl=0.05)
+
+    await crawler.arun(server["url"], config=config)
+    server["etag"] = '"v2"'
+    await asyncio.sleep(0.1)
+    assert not await db.ais_fresh(server["url"])
+
+    await crawler.arun(server["url"], config=config)
+    assert strategy.fetches == 2
+    assert len(server["requests"]) == 1
+
+    cached = await db.aget_cached_url(server["url"], include_expired=True)
+    assert cached.response_headers["ETag"] == '"v2"'
+    await crawler.close()
+
+
+@pytest.mark.asyncio
+async def test_entries_without_ttl_are_fresh(db, server):
+    strategy = CountingStrategy(server)
+    crawler = AsyncWebCrawler(crawler_strategy=strategy, verbose=False)
+    config = CrawlerRunConfig(cache_mode=CacheMode.REVALIDATE)
+
+    await crawler.arun(server["url"], config=config)
+    # cache_ttl=None never expires, so the entry is served without a request
+    assert await db.ais_fresh(server["url"])
+    for _ in range(3):
+        assert (await crawler.arun(server["url"], config=config)).success
+    assert strategy.fetches == 1
+    assert server["requests"] == []
+    await crawler.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
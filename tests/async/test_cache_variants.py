@@ -0,0 +1,145 @@
+import os
+import sys
+import pytest
+
+# Add the parent directory to the Python path
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+
+import crawl4ai.async_webcrawler as async_webcrawler
+from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, CacheMode
+from crawl4ai.async_crawler_strategy import AsyncCrawlerStrategy
+from crawl4ai.async_database import AsyncDatabaseManager
+from crawl4ai.models import AsyncCrawlResponse
+
+PAGE = """
+<html><body>
+    <div class="intro"><p>Introduction paragraph with enough words to be kept around.</p></div>
+    <div class="main"><p>Main paragraph with enough words to be kept around as well.</p></div>
+</body></html>
+"""
+
+
+class CountingStrategy(AsyncCrawlerStrategy):
+    """Serves a fixed page and counts how often it was fetched"""
+
+    def __init__(self, html=PAGE):
+        self.logger = None
+        self.html = html
+        self.fetches = 0
+
+    async def crawl(self, url, **kwargs):
+        self.fetches += 1
+        return AsyncCrawlResponse(
+            html=self.html, response_headers={}, status_code=200
+        )
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    manager = AsyncDatabaseManager(db_directory=str(tmp_path))
+    monkeypatch.setattr(async_webcrawler, "async_db_manager", manager)
+    return manager
+
+
+@pytest.mark.asyncio
+async def test_processing_config_change_reuses_fetch(db):
+    strategy = CountingStrategy()
+    crawler = AsyncWebCrawler(crawler_strategy=strategy, verbose=False)
+    url = "https://example.com/variants"
+
+    intro = CrawlerRunConfig(css_selector=".intro", cache_mode=CacheMode.ENABLED)
+    main = CrawlerRunConfig(css_selector=".main", cache_mode=CacheMode.ENABLED)
+
+    first = await crawler.arun(url, config=intro)
+    assert "Introduction" in first.markdown and "Main" not in first.markdown
+    assert strategy.fetches == 1
+
+    # Different processing config: cached html is reprocessed, not refetched
+    second = await crawler.arun(url, config=main)
+    assert "Main" in second.markdown and "Introduction" not in second.markdown
+    assert strategy.fetches == 1
+
+    # Both variants are now served straight from the cache
+    again = await crawler.arun(url, config=intro)
+    assert again.markdown == first.markdown
+    assert strategy.fetches == 1
+
+
+@pytest.mark.asyncio
+async def test_variants_dropped_when_page_changes(db):
+    strategy = CountingStrategy()
+    crawler = AsyncWebCrawler(crawler_strategy=strategy, verbose=False)
+    url = "https://example.com/changes"
+    intro = CrawlerRunConfig(css_selector=".intro")
+    main = CrawlerRunConfig(css_selector=".main")
+
+    await crawler.arun(url, config=intro)
+    await crawler.arun(url, config=main)
+
+    strategy.html = PAGE.replace("Main paragraph", "Updated paragraph")
+    await crawler.arun(url, config=main.clone(cache_mode=CacheMode.WRITE_ONLY))
+
+    cached = await db.aget_cached_url(url, config_hash=intro.processing_hash())
+    assert "Updated paragraph" in cached.html
+    assert cached.cleaned_html is None
+
+    cached = await db.aget_cached_url(url, config_hash=main.processing_hash())
+    assert "Updated paragraph" in cached.markdown
+
+
+@pytest.mark.asyncio
+async def test_unchanged_content_skips_processing(db, monkeypatch):
+    strategy = CountingStrategy(
+        html=PAGE.replace("<body>", '<body><input name="csrf_token" value="t1">')
+    )
+    crawler = AsyncWebCrawler(crawler_strategy=strategy, verbose=False)
+    url = "https://example.com/unchanged"
+    config = CrawlerRunConfig(
+        cache_mode=CacheMode.WRITE_ONLY,
+        reuse_unchanged_content=True,
+        normalize_volatile_content=True,
+    )
+
+    processed = []
+    original = crawler.aprocess_html
+
+    async def counting_process(*args, **kwargs):
+        processed.append(kwargs["url"])
+        return await original(*args, **kwargs)
+
+    monkeypatch.setattr(crawler, "aprocess_html", counting_process)
+
+    first = await crawler.arun(url, config=config)
+    second = await crawler.arun(url, config=config)
+    assert strategy.fetches == 2
+    assert len(processed) == 1
+    assert second.markdown == first.markdown
+
+    # Only the CSRF token changed
+    strategy.html = strategy.html.replace('value="t1"', 'value="t2"')
+    third = await crawler.arun(url, config=config)
+    assert len(processed) == 1
+    assert 'value="t2"' in third.html
+
+    # Without normalization the token change forces processing
+    await crawler.arun(url, config=config.clone(normalize_volatile_content=False))
+    assert len(processed) == 1
+    strategy.html = strategy.html.replace('value="t2"', 'value="t3"')
+    await crawler.arun(url, config=config.clone(normalize_volatile_content=False))
+    assert len(processed) == 2
+
+
+def test_processing_hash_ignores_non_processing_params():
+    base = CrawlerRunConfig()
+    assert base.processing_hash() == CrawlerRunConfig(page_timeout=5).processing_hash()
+    assert base.processing_hash() == CrawlerRunConfig(
+        cache_mode=CacheMode.BYPASS
+    ).processing_hash()
+    assert base.processing_hash() != CrawlerRunConfig(
+        word_count_threshold=50
+    ).processing_hash()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
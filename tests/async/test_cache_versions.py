@@ -0,0 +1,90 @@
+import os
+import sys
+import asyncio
+import pytest
+
+# Add the parent directory to the Python path
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+
+from crawl4ai.async_database import AsyncDatabaseManager
+from crawl4ai.models import CrawlResult, MarkdownGenerationResult
+from crawl4ai.utils import generate_content_hash
+
+URL = "https://example.com/page"
+
+
+def make_page(version):
+    lines = [f"<p>Paragraph {i} stays the same</p>" for i in range(200)]
+    lines[version % 200] = f"<p>Paragraph edited in version {version}</p>"
+    return "\n".join(lines)
+
+
+def make_result(html):
+    markdown = MarkdownGenerationResult(
+        raw_markdown=html.replace("<p>", "").replace("</p>", ""),
+        markdown_with_citations="",
+        references_markdown="",
+    )
+    return CrawlResult(url=URL, html=html, success=True, markdown_v2=markdown)
+
+
+@pytest.fixture
+def db(tmp_path):
+    return AsyncDatabaseManager(db_directory=str(tmp_path), keyframe_interval=4)
+
+
+@pytest.mark.asyncio
+async def test_versions_round_trip(db):
+    pages = [make_page(v) for v in range(1, 11)]
+    for html in pages:
+        await db.acache_url(make_result(html), keep_version=True)
+    # Unchanged html does not add a version
+    await db.acache_url(make_result(pages[-1]), keep_version=True)
+
+    versions = await db.alist_versions(URL)
+    assert [v["version"] for v in versions] == list(range(1, 11))
+    assert [v["keyframe"] for v in versions] == [i % 4 == 0 for i in range(10)]
+    assert all(v["delta_size"] < len(pages[0]) // 10 for v in versions if not v["keyframe"])
+
+    for n, html in enumerate(pages, start=1):
+        version = await db.aget_version(URL, n)
+        assert version["html"] == html
+        assert version["markdown"] == make_result(html).markdown_v2.raw_markdown
+    assert (await db.aget_version(URL))["html"] == pages[-1]
+    assert await db.aget_version(URL, 11) is None
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writers_keep_every_version(db):
+    pages = [make_page(v) for v in range(1, 9)]
+    added = await asyncio.gather(*(db.aadd_version(make_result(html)) for html in pages))
+
+    # Every page got its own version, each delta against its actual predecessor
+    assert sorted(added) == list(range(1, 9))
+    versions = await db.alist_versions(URL)
+    assert [v["version"] for v in versions] == list(range(1, 9))
+    stored = {v["version"]: v["html_hash"] for v in versions}
+    for html, version in zip(pages, added):
+        assert (await db.aget_version(URL, version))["html"] == html
+        assert stored[version] == generate_content_hash(html)
+
+
+@pytest.mark.asyncio
+async def test_diff_between_versions(db):
+    for v in (1, 2):
+        await db.acache_url(make_result(make_page(v)), keep_version=True)
+    await db.acache_url(make_result(make_page(3)))
+
+    diff = await db.adiff(URL, 1, 2)
+    assert "-<p>Paragraph edited in version 1</p>" in diff
+    assert "+<p>Paragraph edited in version 2</p>" in diff
+    assert len(await db.alist_versions(URL)) == 2
+
+    # Keyframes stay referenced when the cache entry moves on
+    await db.agc_content(grace_period=0)
+    assert (await db.aget_version(URL, 1))["html"] == make_page(1)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
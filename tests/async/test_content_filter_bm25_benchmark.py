@@ -0,0 +1,166 @@
+import os
+import sys
+import time
+import random
+import pytest
+import numpy as np
+from bs4 import BeautifulSoup
+from rank_bm25 import BM25Okapi
+
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+__location__ = os.path.realpath(os.path.join(os.getcwd(), os.path.dirname(__file__)))
+
+from crawl4ai.content_filter_strategy import BM25ContentFilter, _bm25_scores
+from crawl4ai.content_scraping_strategy import LXMLWebScrapingStrategy
+from crawl4ai.utils import clean_tokens
+
+# Wall-clock comparisons are noisy on shared machines, so they only run on request
+benchmark = pytest.mark.skipif(
+    not os.environ.get("CRAWL4AI_BENCHMARK"),
+    reason="set CRAWL4AI_BENCHMARK=1 to compare timings",
+)
+
+
+class BeautifulSoupBM25Filter(BM25ContentFilter):
+    """The BeautifulSoup and rank_bm25 implementation the lxml filter replaced"""
+
+    def filter_content(self, html, min_word_threshold=None):
+        if not html or not isinstance(html, str):
+            return []
+        soup = BeautifulSoup(html, "lxml")
+        if not soup.body:
+            soup = BeautifulSoup(f"<body>{html}</body>", "lxml")
+        body = soup.find("body")
+        query = self.extract_page_query(soup, body)
+        if not query:
+            return []
+        candidates = self.extract_text_chunks(body, min_word_threshold)
+        if not candidates:
+            return []
+        tokenized_corpus = [
+            clean_tokens([self.stemmer.stemWord(word) for word in chunk.lower().split()])
+            for _, chunk, _, _ in candidates
+        ]
+        tokenized_query = clean_tokens(
+            [self.stemmer.stemWord(word) for word in query.lower().split()]
+        )
+        scores = BM25Okapi(tokenized_corpus).get_scores(tokenized_query)
+        return [
+            self.clean_element(tag)
+            for score, (_, _, _, tag) in zip(scores, candidates)
+            if score * self.priority_tags.get(tag.name, 1.0) >= self.bm25_threshold
+        ]
+
+
+@pytest.fixture(scope="module")
+def wiki_html():
+    with open(os.path.join(__location__, "sample_wikipedia.html"), encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.fixture(scope="module")
+def cleaned_wiki_html(wiki_html):
+    # What the filter receives from the crawler
+    return LXMLWebScrapingStrategy().scrap(
+        "https://en.wikipedia.org/wiki/Test", wiki_html
+    ).cleaned_html
+
+
+@pytest.mark.parametrize(
+    "options, min_word_threshold",
+    [
+        ({}, None),
+        ({"user_query": "history of the language and its syntax"}, None),
+        ({"user_query": "history of the language and its syntax"}, 5),
+        ({"bm25_threshold": 0.2}, None),
+        ({"user_query": "released version", "language": "english"}, 3),
+    ],
+)
+def test_parity_on_cleaned_page(cleaned_wiki_html, options, min_word_threshold):
+    expected = BeautifulSoupBM25Filter(**options).filter_content(
+        cleaned_wiki_html, min_word_threshold
+    )
+    assert expected
+    output = BM25ContentFilter(**options).filter_content(
+        cleaned_wiki_html, min_word_threshold
+    )
+    assert output == expected
+
+
+def test_parity_on_raw_edge_cases():
+    html = """<html><head><title> Parsing   guide </title>
+        <meta name="description" content=""></head>
+        <body><h1>Parsing <em>HTML</em> quickly</h1><!--parsing notes-->
+        <div class="x"><a href="/p" rel="nofollow  noopener">Parsing</a> links
+        <input disabled><aside>parsing aside</aside> tail text about parsing</div>
+        <pre>  parsing   in pre  </pre><p></p><span>inline parsing</span>
+        <p>A paragraph on html parsing &amp; markup with a few more words.</p>
+        <div><!----></div>trailing parsing text</body></html>"""
+    for options in ({}, {"user_query": "parsing html"}, {"bm25_threshold": 0.1}):
+        expected = BeautifulSoupBM25Filter(**options).filter_content(html)
+        assert expected
+        assert BM25ContentFilter(**options).filter_content(html) == expected
+
+    fragment = "<p>parsing a fragment without body about parsing</p><p>more</p>"
+    options = {"user_query": "parsing", "bm25_threshold": 0.1}
+    assert BM25ContentFilter(**options).filter_content(
+        fragment
+    ) == BeautifulSoupBM25Filter(**options).filter_content(fragment)
+
+
+def test_scores_match_rank_bm25():
+    rng = random.Random(7)
+    for _ in range(20):
+        corpus = [
+            [rng.randrange(40) for _ in range(rng.randrange(0, 30))]
+            for _ in range(rng.randrange(1, 60))
+        ]
+        if not any(corpus):
+            continue
+        query = [rng.randrange(50) for _ in range(rng.randrange(0, 6))]
+        expected = BM25Okapi(corpus).get_scores(query)
+        assert np.allclose(_bm25_scores(corpus, query), expected)
+
+
+def thousands_of_chunks() -> str:
+    rng = random.Random(11)
+    words = [f"w{i}ord" for i in range(3000)]
+    paragraphs = "".join(
+        f"<p>{' '.join(rng.choice(words) for _ in range(rng.randrange(5, 60)))}</p>"
+        for _ in range(4000)
+    )
+    return f"<html><body><h1>{' '.join(words[:8])}</h1>{paragraphs}</body></html>"
+
+
+def test_parity_on_thousands_of_chunks():
+    html = thousands_of_chunks()
+    expected = BeautifulSoupBM25Filter(bm25_threshold=2.0).filter_content(html)
+    assert expected
+    assert BM25ContentFilter(bm25_threshold=2.0).filter_content(html) == expected
+
+
+@benchmark
+def test_benchmark_thousands_of_chunks():
+    html = thousands_of_chunks()
+    timings = {}
+    outputs = {}
+    for name, bm25 in (
+        ("beautifulsoup", BeautifulSoupBM25Filter(bm25_threshold=2.0)),
+        ("lxml", BM25ContentFilter(bm25_threshold=2.0)),
+    ):
+        start = time.perf_counter()
+        outputs[name] = bm25.filter_content(html)
+        timings[name] = time.perf_counter() - start
+
+    print(
+        f"\nBM25 over 4000 chunks: BeautifulSoup {timings['beautifulsoup']:.3f}s, "
+        f"lxml {timings['lxml']:.3f}s ({timings['beautifulsoup'] / timings['lxml']:.1f}x)"
+    )
+    assert outputs["lxml"] == outputs["beautifulsoup"]
+    assert outputs["lxml"]
+    assert timings["lxml"] < timings["beautifulsoup"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,152 @@
+import os
+import sys
+import time
+import pytest
+from bs4 import BeautifulSoup, Comment
+
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+__location__ = os.path.realpath(os.path.join(os.getcwd(), os.path.dirname(__file__)))
+
+from crawl4ai.content_filter_strategy import PruningContentFilter
+from crawl4ai.content_scraping_strategy import LXMLWebScrapingStrategy
+
+# Wall-clock comparisons are noisy on shared machines, so they only run on request
+benchmark = pytest.mark.skipif(
+    not os.environ.get("CRAWL4AI_BENCHMARK"),
+    reason="set CRAWL4AI_BENCHMARK=1 to compare timings",
+)
+
+
+class BeautifulSoupPruningFilter(PruningContentFilter):
+    """The recursive BeautifulSoup implementation the lxml filter replaced"""
+
+    def filter_content(self, html, min_word_threshold=None):
+        if not html or not isinstance(html, str):
+            return []
+        soup = BeautifulSoup(html, "lxml")
+        if not soup.body:
+            soup = BeautifulSoup(f"<body>{html}</body>", "lxml")
+        for element in soup(string=lambda text: isinstance(text, Comment)):
+            element.extract()
+        for tag in self.excluded_tags:
+            for element in soup.find_all(tag):
+                element.decompose()
+        body = soup.find("body")
+        self._prune_soup(body)
+        return [
+            str(element)
+            for element in body.children
+            if hasattr(element, "name")
+            and element.name
+            and len(element.get_text(strip=True)) > 0
+        ]
+
+    def _prune_soup(self, node):
+        if not node or node.name is None:
+            return
+        text = node.get_text(strip=True)
+        text_len = len(text)
+        tag_len = len(node.encode_contents().decode("utf-8"))
+        link_text_len = sum(
+            len(s.strip())
+            for s in (a.string for a in node.find_all("a", recursive=False))
+            if s
+        )
+        metrics = {
+            "node": node,
+            "tag_name": node.name,
+            "text_len": text_len,
+            "tag_len": tag_len,
+            "link_text_len": link_text_len,
+            "word_count": text.count(" ") + 1,
+        }
+        score = self._compute_composite_score(metrics, text_len, tag_len, link_text_len)
+        if self.threshold_type == "fixed":
+            should_remove = score < self.threshold
+        else:
+            threshold = self.threshold
+            if self.tag_importance.get(node.name, 0.7) > 1:
+                threshold *= 0.8
+            if (text_len / tag_len if tag_len > 0 else 0) > 0.4:
+                threshold *= 0.9
+            if (link_text_len / text_len if text_len > 0 else 1) > 0.6:
+                threshold *= 1.2
+            should_remove = score < threshold
+        if should_remove:
+            node.decompose()
+        else:
+            for child in [child for child in node.children if hasattr(child, "name")]:
+                self._prune_soup(child)
+
+    def _compute_class_id_weight(self, node):
+        score = 0
+        if "class" in node.attrs and self.negative_patterns.match(" ".join(node["class"])):
+            score -= 0.5
+        if "id" in node.attrs and self.negative_patterns.match(node["id"]):
+            score -= 0.5
+        return score
+
+
+@pytest.fixture(scope="module")
+def wiki_html():
+    with open(os.path.join(__location__, "sample_wikipedia.html"), encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.fixture(scope="module")
+def cleaned_wiki_html(wiki_html):
+    # What the filter receives from the crawler
+    return LXMLWebScrapingStrategy().scrap(
+        "https://en.wikipedia.org/wiki/Test", wiki_html
+    ).cleaned_html
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {},
+        {"threshold_type": "dynamic"},
+        {"min_word_threshold": 5},
+        {"threshold": 0.3},
+        {"threshold_type": "dynamic", "threshold": 0.6, "min_word_threshold": 3},
+    ],
+)
+def test_parity_on_cleaned_page(cleaned_wiki_html, options):
+    expected = BeautifulSoupPruningFilter(**options).filter_content(cleaned_wiki_html)
+    assert PruningContentFilter(**options).filter_content(cleaned_wiki_html) == expected
+
+
+def test_parity_on_raw_edge_cases():
+    html = """<body><div class=" main  story" id="x">A &amp; B &lt;tag&gt; &nbsp;<br>
+        <img src=a.png alt='say "hi"'><template>hidden <b>text</b></template>
+        <p>Paragraph text with enough words to stay around.</p>
+        <a href="#">split<!-- c -->link</a> <a><span>single link</span></a>
+        <ruby>漢<rt>kan</rt></ruby><!-- comment --> tail
+        <pre>  keep   spaces  </pre></div><nav>menu</nav> after<p title="a'b&quot;c">q</p></body>"""
+    for options in ({}, {"threshold_type": "dynamic"}, {"threshold": 0.2}):
+        expected = BeautifulSoupPruningFilter(**options).filter_content(html)
+        assert PruningContentFilter(**options).filter_content(html) == expected
+
+
+@benchmark
+def test_benchmark_wikipedia(wiki_html, cleaned_wiki_html):
+    timings = {}
+    for name, pruning in (
+        ("beautifulsoup", BeautifulSoupPruningFilter()),
+        ("lxml", PruningContentFilter()),
+    ):
+        start = time.perf_counter()
+        output = pruning.filter_content(wiki_html)
+        timings[name] = time.perf_counter() - start
+        assert output
+
+    print(
+        f"\nPruning sample_wikipedia.html: BeautifulSoup {timings['beautifulsoup']:.3f}s, "
+        f"lxml {timings['lxml']:.3f}s ({timings['beautifulsoup'] / timings['lxml']:.1f}x)"
+    )
+    assert timings["lxml"] < timings["beautifulsoup"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
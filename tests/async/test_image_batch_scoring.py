@@ -0,0 +1,119 @@
+import os
+import sys
+import time
+import pytest
+from bs4 import BeautifulSoup
+from lxml import html as lhtml
+
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+__location__ = os.path.realpath(os.path.join(os.getcwd(), os.path.dirname(__file__)))
+
+from crawl4ai.content_scraping_strategy import (
+    LXMLWebScrapingStrategy,
+    WebScrapingStrategy,
+)
+
+URL = "https://shop.example.com/"
+WORDS = "is a lovely thing you can buy today at a discount price for everyone"
+
+# Wall-clock comparisons are noisy on shared machines, so they only run on request
+benchmark = pytest.mark.skipif(
+    not os.environ.get("CRAWL4AI_BENCHMARK"),
+    reason="set CRAWL4AI_BENCHMARK=1 to compare timings",
+)
+
+
+def product_grid(products: int) -> str:
+    cards = "".join(
+        f'\n<div class="card">\n<picture>'
+        f'<source srcset="/p/{i}.webp 1x, /p/{i}@2x.webp 2x" type="image/webp">'
+        f'<img src="/p/{i}.jpg" srcset="/p/{i}-300.jpg 300w, /p/{i}-600.jpg 600w" '
+        f'alt="Product {i}" width="300" height="300"></picture>'
+        f"<p>Product {i} {WORDS}</p>"
+        f'<span class="rating"><img src="/star.png" alt="star" width="200">'
+        f'<img src="/star.png" alt="star" width="200"></span>'
+        f'<img src="data:image/gif;base64,R0lGOD" data-src="https://cdn.example.com/{i}.png" '
+        f'alt="Lazy {i}" width="400" height="400"><button><img src="/cart.png" alt="Add"></button></div>'
+        for i in range(products)
+    )
+    return f"<html><body>\n<main>{cards}\n</main>\n</body></html>"
+
+
+def tree_of(strategy, html):
+    if isinstance(strategy, LXMLWebScrapingStrategy):
+        return lhtml.document_fromstring(html).xpath("//img")
+    return BeautifulSoup(html, "lxml").find_all("img")
+
+
+@pytest.mark.parametrize("strategy", [WebScrapingStrategy(), LXMLWebScrapingStrategy()])
+def test_batch_matches_single_image_scoring(strategy):
+    with open(os.path.join(__location__, "sample_wikipedia.html"), encoding="utf-8") as f:
+        images = tree_of(strategy, f.read())
+    kwargs = {"image_score_threshold": 2}
+
+    one_by_one = [
+        variant
+        for index, img in enumerate(images)
+        for variant in strategy.process_image(img, URL, index, len(images), **kwargs)
+        or []
+    ]
+    batch = strategy.process_images(enumerate(images), URL, **kwargs)
+    assert batch == one_by_one
+    assert len(batch) > 20
+    for index, img in enumerate(images):
+        description = strategy.find_closest_parent_with_useful_text(img, **kwargs)
+        assert all(
+            variant["desc"] == description
+            for variant in batch
+            if variant["group_id"] == index
+        )
+
+
+@pytest.mark.parametrize("strategy", [WebScrapingStrategy(), LXMLWebScrapingStrategy()])
+def test_duplicates_are_scored_once_and_srcset_is_optional(strategy):
+    images = strategy.scrap(URL, product_grid(3)).media.images
+    sources = [image.src for image in images]
+
+    assert sources.count("/star.png") == 1
+    assert "/cart.png" not in sources
+    assert "https://cdn.example.com/2.png" in sources
+    assert {"/p/0.jpg", "/p/0-300.jpg", "/p/0-600.jpg"} <= set(sources)
+    product = next(image for image in images if image.src == "/p/1-300.jpg")
+    assert product.width == 300 and product.format == "jpg"
+
+    images = strategy.scrap(
+        URL, product_grid(3), expand_image_srcset=False
+    ).media.images
+    assert [image.src for image in images if image.alt == "Product 0"] == ["/p/0.jpg"]
+
+
+@benchmark
+def test_benchmark_product_grid():
+    html = product_grid(1500)
+    strategy = LXMLWebScrapingStrategy()
+    images = lhtml.document_fromstring(html).xpath("//img")
+    kwargs = {"image_score_threshold": 2}
+
+    single = batched = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        one_by_one = [
+            strategy.process_image(img, URL, index, len(images), **kwargs)
+            for index, img in enumerate(images)
+        ]
+        single = min(single, time.perf_counter() - start)
+        start = time.perf_counter()
+        batch = strategy.process_images(enumerate(images), URL, **kwargs)
+        batched = min(batched, time.perf_counter() - start)
+
+    print(
+        f"\nScoring {len(images)} images: one by one {single:.3f}s, "
+        f"batch {batched:.3f}s ({single / batched:.1f}x)"
+    )
+    assert len(batch) < sum(len(variants or []) for variants in one_by_one)
+    assert batched < single
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
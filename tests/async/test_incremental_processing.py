@@ -0,0 +1,138 @@
+import os
+import sys
+import tracemalloc
+import pytest
+
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+
+from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, LXMLWebScrapingStrategy
+from crawl4ai.incremental_processing import IncrementalPageProcessor, truncate_html
+from crawl4ai.markdown_generation_strategy import LXMLMarkdownGenerator
+
+URL = "https://example.com/report"
+
+
+def large_page(rows: int) -> str:
+    """A page dominated by one giant table, like a data dump"""
+    words = "measured in the field and checked twice " * 4
+    body = "".join(
+        f'<tr><td><a href="/item/{i}" class="x">Item {i}</a></td>'
+        f"<td>{i * 7 % 1000}</td><td><b>note</b> for row {i}: {words}</td></tr>"
+        for i in range(rows)
+    )
+    return (
+        "<html><head><title>Report</title><meta name='description' content='Rows'>"
+        "<style>td { color: red }</style></head><body>"
+        f"<h1>Report</h1><p>Intro with a <a href='https://other.org/'>link</a>.</p>"
+        f"<script>var x = 1;</script><table>{body}</table>"
+        "<ul><li>First</li><li>Second <img src='/chart.png' alt='Chart'></li></ul>"
+        "</body></html>"
+    )
+
+
+def test_truncate_html_cuts_after_a_complete_tag():
+    html = "<p>one</p><p>two</p>"
+    assert truncate_html(html, None) == (html, None)
+    assert truncate_html(html, 100) == (html, None)
+    cut, truncation = truncate_html(html, 12)
+    assert cut == "<p>one</p>"
+    assert truncation == {"max_length": 12, "processed_length": 10, "total_length": 20}
+
+
+def test_sections_do_not_change_the_output():
+    html = large_page(2000)
+    options = LXMLMarkdownGenerator().converter_options()
+    whole_scraped, whole_markdown = IncrementalPageProcessor(
+        chunk_size=len(html), section_size=len(html)
+    ).process(URL, html, markdown_options=options)
+    scraped, markdown = IncrementalPageProcessor(
+        chunk_size=1024, section_size=4096
+    ).process(URL, html, markdown_options=options)
+
+    assert markdown == whole_markdown
+    assert scraped == whole_scraped
+    assert "| 7| **note** for row 1: measured" in markdown.raw_markdown
+    assert "var x" not in markdown.raw_markdown
+    assert scraped["metadata"]["title"] == "Report"
+    assert len(scraped["links"]["internal"]) == 2000
+    assert 'class="x"' not in scraped["cleaned_html"]
+
+    # The whole page processed in one piece is what the full pipeline produces
+    cleaned_html = LXMLWebScrapingStrategy().scrap(URL, html).cleaned_html
+    expected = LXMLMarkdownGenerator().generate_markdown(cleaned_html, base_url=URL)
+    assert whole_markdown.references_markdown == expected.references_markdown
+
+
+def test_sinks_bound_memory(tmp_path):
+    html = large_page(5000)
+
+    tracemalloc.start()
+    cleaned_html = LXMLWebScrapingStrategy().scrap(URL, html).cleaned_html
+    markdown = LXMLMarkdownGenerator().generate_markdown(cleaned_html, base_url=URL)
+    full_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    scraped, streamed = IncrementalPageProcessor(section_size=64 * 1024).process(
+        URL,
+        html,
+        markdown_options=LXMLMarkdownGenerator().converter_options(),
+        cleaned_html_sink=str(tmp_path / "page.html"),
+        markdown_sink=str(tmp_path / "page.md"),
+        exclude_external_links=True,
+    )
+    incremental_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    print(
+        f"\nPeak Python memory for {len(html) / 1e6:.1f} MB of HTML: full "
+        f"{full_peak / 1e6:.1f} MB, incremental {incremental_peak / 1e6:.1f} MB"
+    )
+    assert scraped["cleaned_html"] == "" and streamed.raw_markdown == ""
+    written = (tmp_path / "page.md").read_text(encoding="utf-8")
+    assert written.startswith("# Report")
+    assert len(written) > len(markdown.raw_markdown) * 0.9
+    assert "<table>" in (tmp_path / "page.html").read_text(encoding="utf-8")
+    assert incremental_peak < full_peak / 3
+
+
+@pytest.mark.asyncio
+async def test_crawler_processes_large_pages_incrementally(tmp_path):
+    html = large_page(3000)
+    crawler = AsyncWebCrawler(verbose=False)
+
+    async def process(**options):
+        return await crawler.aprocess_html(
+            url=URL,
+            html=html,
+            extracted_content=None,
+            config=CrawlerRunConfig(**options),
+            screenshot=None,
+            pdf_data=None,
+            verbose=False,
+        )
+
+    full = await process()
+    incremental = await process(incremental_threshold=100_000)
+    assert incremental.markdown_v2.references_markdown == (
+        full.markdown_v2.references_markdown
+    )
+    assert "Item 2999" in incremental.markdown
+    assert incremental.metadata["title"] == "Report"
+
+    sink = tmp_path / "page.md"
+    capped = await process(
+        incremental_threshold=100_000, max_html_length=200_000, markdown_sink=str(sink)
+    )
+    assert capped.markdown is None and capped.markdown_v2 is None
+    assert capped.html == html
+    truncation = capped.metadata["truncation"]
+    assert truncation["max_length"] == 200_000
+    assert truncation["total_length"] == len(html)
+    assert "Item 100" in sink.read_text(encoding="utf-8")
+    assert "Item 2999" not in sink.read_text(encoding="utf-8")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,206 @@
+import os
+import sys
+import time
+import pytest
+
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+
+from crawl4ai import JsonXPathExtractionStrategy, ParsedDocument
+
+URL = "https://shop.example/item"
+
+# Wall-clock comparisons are noisy on shared machines, so they only run on request
+benchmark = pytest.mark.skipif(
+    not os.environ.get("CRAWL4AI_BENCHMARK"),
+    reason="set CRAWL4AI_BENCHMARK=1 to compare timings",
+)
+
+
+def product_page(page: int) -> str:
+    """Pages of one template, as crawled from a shop"""
+    specs = "".join(
+        f"<tr><th>Spec {s}</th><td>{page * s}</td></tr>" for s in range(page % 4 + 2)
+    )
+    reviews = "".join(
+        f'<div class="review"><b class="author">User {r}</b>'
+        f'<span class="stars">{(page + r) % 5 + 1}</span>'
+        f"<p>Great <i>item</i> {page}-{r}</p></div>"
+        for r in range(page % 5)
+    )
+    related = "".join(
+        f'<li><a href="/item/{page + r}">Related {r}</a></li>' for r in range(6)
+    )
+    return (
+        f"<!DOCTYPE html><html><head><title>Item {page}</title></head><body>"
+        f'<nav><a href="/">Home</a> / <a href="/c/{page % 7}">Category {page % 7}</a></nav>'
+        f'<div class="product" id="p{page}"><h1 class="title"> Item {page} </h1>'
+        f'<div class="price">Now <span>${page * 2 + 0.5:.2f}</span></div>'
+        f'<div class="seller"><span>Shop {page % 3}</span></div><empty class="badge"></empty>'
+        f'<table class="specs">{specs}</table><ul class="related">{related}</ul>'
+        f'<a class="manual" href="/manuals/{page}.pdf">Manual</a>{reviews}</div>'
+        f"</body></html>"
+    )
+
+
+SCHEMA = {
+    "name": "Product",
+    "baseSelector": "//div[@class='product']",
+    "baseFields": [{"name": "id", "type": "attribute", "attribute": "id"}],
+    "fields": [
+        {"name": "title", "selector": ".//h1", "type": "text", "transform": "strip"},
+        {"name": "upper", "selector": "h1", "type": "text", "transform": "uppercase"},
+        {
+            "name": "price",
+            "selector": "div[@class='price']",
+            "type": "regex",
+            "pattern": r"\$(\d+\.\d+)",
+        },
+        {"name": "price_html", "selector": "./div[@class='price']/span", "type": "html"},
+        {"name": "category", "selector": "//nav/a[2]", "type": "text"},
+        {"name": "broken", "selector": "div.price", "type": "text", "default": "n/a"},
+        {"name": "missing", "selector": "//aside", "type": "text", "default": "none"},
+        {
+            "name": "seller",
+            "selector": "div[@class='seller']",
+            "type": "nested",
+            "fields": [{"name": "name", "selector": "span", "type": "text"}],
+        },
+        {
+            # Interpreted as not found, lxml elements without children are false
+            "name": "badge",
+            "selector": "empty",
+            "type": "nested",
+            "fields": [{"name": "class", "type": "attribute", "attribute": "class"}],
+        },
+        {
+            "name": "specs",
+            "selector": "table//tr",
+            "type": "nested_list",
+            "fields": [
+                {"name": "name", "selector": "th", "type": "text"},
+                {"name": "value", "selector": "td", "type": "text"},
+            ],
+        },
+        {
+            "name": "related",
+            "selector": "ul > li",
+            "type": "list",
+            "fields": [{"name": "href", "selector": "a", "type": "attribute", "attribute": "href"}],
+        },
+        {
+            "name": "reviews",
+            "selector": "div[@class='review']",
+            "type": "nested_list",
+            "fields": [
+                {"name": "author", "selector": "b", "type": "text"},
+                {"name": "stars", "selector": "span", "type": "text"},
+                {"name": "comment", "selector": "p", "type": "text"},
+            ],
+        },
+        {"name": "label", "type": "computed", "expression": "title + ' / ' + price"},
+        {"name": "count", "type": "computed", "function": lambda item: len(item)},
+    ],
+}
+
+
+class Interpreted(JsonXPathExtractionStrategy):
+    # Overriding an element accessor disables the plan
+    def _get_elements(self, element, selector):
+        return super()._get_elements(element, selector)
+
+
+def interpreted(strategy, html, **kwargs):
+    return Interpreted(strategy.schema).extract(URL, html, **kwargs)
+
+
+def test_plan_matches_interpreted_xpath():
+    strategy = JsonXPathExtractionStrategy(SCHEMA)
+    assert strategy.plan is not None
+
+    for page in range(12):
+        html = product_page(page)
+        planned = strategy.extract(URL, html)
+        assert planned == interpreted(strategy, html)
+        document = ParsedDocument(html)
+        assert strategy.run_document(URL, document) == planned
+
+    product = planned[0]
+    assert product["title"] == "Item 11" and product["price"] == "22.50"
+    assert product["price_html"] == "<span>$22.50</span>"
+    assert product["seller"] == {"name": "Shop 2"} and product["badge"] == {}
+    assert product["broken"] == "n/a" and product["missing"] == "none"
+    assert product["related"][0] == {"href": "/item/11"}
+    assert product["reviews"][0]["comment"] == "Great item 11-0"
+
+    # Fragments are rooted at the fragment, like html.fromstring()
+    fragment = '<div class="product" id="p1"><h1>Item</h1></div>'
+    assert strategy.extract(URL, fragment) == interpreted(strategy, fragment)
+
+
+def test_plans_are_cached_per_schema():
+    plan = JsonXPathExtractionStrategy(SCHEMA).plan
+    assert JsonXPathExtractionStrategy(dict(SCHEMA)).plan is plan
+    assert JsonXPathExtractionStrategy(SCHEMA, verbose=True).plan is not plan
+
+    # Prefixes of the schema and EXSLT functions are bound in compiled expressions
+    schema = {
+        "baseSelector": "//shop:item",
+        "namespaces": {"shop": "urn:shop"},
+        "fields": [{"name": "name", "selector": "shop:name", "type": "text"}],
+    }
+    strategy = JsonXPathExtractionStrategy(schema)
+    assert strategy.plan is not None
+    assert strategy.extract(URL, product_page(1)) == []
+    schema = {
+        "baseSelector": "//a[re:test(@href, '\\.pdf$')]",
+        "fields": [{"name": "manual", "type": "attribute", "attribute": "href"}],
+    }
+    assert JsonXPathExtractionStrategy(schema).extract(URL, product_page(3)) == [
+        {"manual": "/manuals/3.pdf"}
+    ]
+
+    # An invalid base selector raises as before
+    strategy = JsonXPathExtractionStrategy(dict(SCHEMA, baseSelector="//div["))
+    assert strategy.plan is None
+    with pytest.raises(Exception):
+        strategy.extract(URL, product_page(1))
+
+
+def test_plan_matches_on_many_documents():
+    documents = [ParsedDocument(product_page(page)) for page in range(60)]
+    expected = [Interpreted(SCHEMA).run_document(URL, document) for document in documents]
+    strategy = JsonXPathExtractionStrategy(SCHEMA)
+    assert [strategy.run_document(URL, document) for document in documents] == expected
+
+
+@benchmark
+def test_benchmark_repeated_template():
+    documents = [ParsedDocument(product_page(page)) for page in range(300)]
+    for document in documents:
+        document.tree  # Parsing is shared with the other strategies, not measured
+
+    start = time.perf_counter()
+    expected = [
+        Interpreted(SCHEMA).run_document(URL, document) for document in documents
+    ]
+    interpreted_time = time.perf_counter() - start
+    start = time.perf_counter()
+    planned = [
+        JsonXPathExtractionStrategy(SCHEMA).run_document(URL, document)
+        for document in documents
+    ]
+    planned_time = time.perf_counter() - start
+
+    pages = len(documents)
+    print(
+        f"\nJsonXPath per page over {pages} pages: interpreted "
+        f"{interpreted_time / pages * 1000:.2f} ms, compiled plan "
+        f"{planned_time / pages * 1000:.2f} ms ({interpreted_time / planned_time:.1f}x)"
+    )
+    assert planned == expected
+    assert planned_time < interpreted_time
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
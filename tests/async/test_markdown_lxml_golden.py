@@ -0,0 +1,113 @@
+import os
+import sys
+import time
+import pytest
+
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+__location__ = os.path.realpath(os.path.join(os.getcwd(), os.path.dirname(__file__)))
+
+from crawl4ai.content_filter_strategy import PruningContentFilter
+from crawl4ai.content_scraping_strategy import LXMLWebScrapingStrategy
+from crawl4ai.markdown_generation_strategy import (
+    DefaultMarkdownGenerator,
+    LXMLMarkdownGenerator,
+)
+from crawl4ai.parsed_document import ParsedDocument
+
+BASE_URL = "https://example.com/docs/page"
+
+GOLDEN_PAGES = {
+    "headings": """<body><h1>Title</h1><h2>Sub <em>title</em></h2><h3><a href="/x">Linked</a> heading</h3>
+        <h6>Deep</h6><p>Text after</p></body>""",
+    "lists": """<body><ul><li>One</li><li>Two<ul><li>Nested <b>bold</b></li><li>Again</li></ul></li></ul>
+        <ol start="3"><li>Three</li><li>Four<ol><li>Inner</li></ol></li></ol><p>after</p></body>""",
+    "table": """<body><table><tr><th>Name</th><th>Price</th></tr><tr><td>Lamp</td><td>10</td></tr>
+        <tr><td><a href="desk">Desk</a></td><td>99</td></tr></table></body>""",
+    "code": """<body><p>Use <code>pip install</code> now.</p><pre>def f():
+    return  1 &lt; 2
+</pre><pre><code>nested   code</code></pre><p>x</p></body>""",
+    "quotes": """<body><blockquote><p>Quoted <i>text</i></p><blockquote>Inner</blockquote></blockquote>
+        <p><q>short</q> and <abbr title="HyperText">HTML</abbr> <del>gone</del></p></body>""",
+    "links": """<body><p><a href="/a" title="First link">A</a>, <a href="/a">A again</a>,
+        <a href="https://other.org/b">B</a>, <a href="#top">top</a>, <a href="mailto:x@y.z">mail</a>,
+        <a href="/a" title="First link">A titled again</a> and <a>no href</a>.</p>
+        <p><a href="https://other.org/b">https://other.org/b</a></p></body>""",
+    "images": """<body><p><img src="/i.png" alt="An image"> and <img src="b.jpg" title="T"></p>
+        <p>Logo: <a href="/home"><img src="/logo.png" alt="logo"></a></p></body>""",
+    "inline": """<body><p>A &amp; B &lt;c&gt; <strong>strong</strong> <em>em</em> <u>u</u><br>line
+        <sup>1</sup><sub>2</sub> *stars* _under_ 1. not a list</p><hr><p>  spaced   out  </p>
+        <dl><dt>Term</dt><dd>Definition</dd></dl><div>div <span>span</span></div></body>""",
+}
+
+
+def convert(generator, html, **kwargs):
+    return generator.generate_markdown(html, base_url=BASE_URL, **kwargs)
+
+
+@pytest.fixture(scope="module")
+def cleaned_wiki_html():
+    with open(os.path.join(__location__, "sample_wikipedia.html"), encoding="utf-8") as f:
+        html = f.read()
+    return LXMLWebScrapingStrategy().scrap(
+        "https://en.wikipedia.org/wiki/Test", html
+    ).cleaned_html
+
+
+@pytest.mark.parametrize("name", sorted(GOLDEN_PAGES))
+@pytest.mark.parametrize(
+    "options",
+    [None, {"ignore_links": True}, {"ignore_images": True, "protect_links": True}],
+)
+def test_golden_pages_match_html2text(name, options):
+    html = GOLDEN_PAGES[name]
+    expected = convert(DefaultMarkdownGenerator(options=options), html)
+    output = convert(LXMLMarkdownGenerator(options=options), html)
+    assert output.raw_markdown == expected.raw_markdown
+    if name != "images":
+        # convert_links_to_citations splits the image inside the logo link
+        assert output.markdown_with_citations == expected.markdown_with_citations
+        assert output.references_markdown == expected.references_markdown
+
+
+def test_fit_markdown_and_fallback(cleaned_wiki_html):
+    content_filter = PruningContentFilter()
+    expected = convert(
+        DefaultMarkdownGenerator(content_filter=content_filter), cleaned_wiki_html
+    )
+    output = convert(
+        LXMLMarkdownGenerator(content_filter=content_filter), cleaned_wiki_html
+    )
+    assert output.fit_markdown == expected.fit_markdown
+    assert output.fit_html == expected.fit_html
+
+    # body_width is not implemented by the converter and goes through html2text
+    options = {"body_width": 40}
+    assert convert(LXMLMarkdownGenerator(options=options), cleaned_wiki_html) == convert(
+        DefaultMarkdownGenerator(options=options), cleaned_wiki_html
+    )
+
+
+def test_benchmark_wikipedia(cleaned_wiki_html):
+    document = ParsedDocument(cleaned_wiki_html)
+    document.tree
+    timings = {}
+    outputs = {}
+    for name, generator, kwargs in (
+        ("html2text", DefaultMarkdownGenerator(), {}),
+        ("lxml", LXMLMarkdownGenerator(), {"document": document}),
+    ):
+        start = time.perf_counter()
+        outputs[name] = convert(generator, cleaned_wiki_html, **kwargs)
+        timings[name] = time.perf_counter() - start
+
+    print(
+        f"\nMarkdown of sample_wikipedia.html: html2text {timings['html2text']:.3f}s, "
+        f"lxml {timings['lxml']:.3f}s ({timings['html2text'] / timings['lxml']:.1f}x)"
+    )
+    assert outputs["lxml"].raw_markdown == outputs["html2text"].raw_markdown
+    assert timings["lxml"] < timings["html2text"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
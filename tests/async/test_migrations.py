@@ -0,0 +1,80 @@
+import os
+import sys
+import sqlite3
+import pytest
+
+# Add the parent directory to the Python path
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+
+from crawl4ai.migrations import DatabaseMigration
+
+
+@pytest.fixture
+def legacy_db(tmp_path):
+    """A cache database from before file-based storage, content stored inline"""
+    db_path = str(tmp_path / "crawl4ai.db")
+    with sqlite3.connect(db_path) as db:
+        db.execute(
+            "CREATE TABLE crawled_data (url TEXT PRIMARY KEY, html TEXT, cleaned_html TEXT, "
+            "markdown TEXT, extracted_content TEXT, screenshot TEXT)"
+        )
+        db.executemany(
+            "INSERT INTO crawled_data VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (f"https://example.com/{i}", f"<p>page {i}</p>", "", f"page {i}", "", "")
+                for i in range(5)
+            ],
+        )
+    return db_path
+
+
+def stored_html(db_path):
+    with sqlite3.connect(db_path) as db:
+        return [row[0] for row in db.execute("SELECT html FROM crawled_data ORDER BY rowid")]
+
+
+@pytest.mark.asyncio
+async def test_dry_run_estimates_without_writing(legacy_db):
+    stats = await DatabaseMigration(legacy_db).migrate_database(dry_run=True)
+    assert stats["scanned"] == 5
+    assert stats["migrated_rows"] == 5
+    assert stats["migrated_fields"] == 10
+    assert stats["content_bytes"] == stats["unique_bytes"] > 0
+    assert stored_html(legacy_db)[0] == "<p>page 0</p>"
+
+
+@pytest.mark.asyncio
+async def test_interrupted_migration_resumes(legacy_db, monkeypatch):
+    migration = DatabaseMigration(legacy_db, batch_size=2)
+    write_content = migration._write_content
+    writes = []
+
+    def failing_write(content, content_type):
+        writes.append(content)
+        if len(writes) > 4:
+            raise OSError("disk full")
+        return write_content(content, content_type)
+
+    monkeypatch.setattr(migration, "_write_content", failing_write)
+    with pytest.raises(OSError):
+        await migration.migrate_database()
+
+    # The first batch was committed, the rest is still inline
+    html = stored_html(legacy_db)
+    assert html[:2] == [migration._generate_content_hash(f"<p>page {i}</p>") for i in range(2)]
+    assert html[2] == "<p>page 2</p>"
+
+    stats = await DatabaseMigration(legacy_db, batch_size=2).migrate_database()
+    assert stats["scanned"] == 3 and stats["migrated_rows"] == 3
+    for i, content_hash in enumerate(stored_html(legacy_db)):
+        with open(os.path.join(migration.content_paths["html"], content_hash)) as f:
+            assert f.read() == f"<p>page {i}</p>"
+
+    # Already migrated values are recognized, so a full rescan migrates nothing
+    stats = await DatabaseMigration(legacy_db).migrate_database(resume=False)
+    assert stats["scanned"] == 5 and stats["migrated_rows"] == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,111 @@
+import os
+import sys
+import json
+import pytest
+from lxml import html as lhtml
+
+# Add the parent directory to the Python path
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+
+from crawl4ai import (
+    AsyncWebCrawler,
+    CrawlerRunConfig,
+    JsonXPathExtractionStrategy,
+    LXMLWebScrapingStrategy,
+    BM25ContentFilter,
+    ParsedDocument,
+)
+
+PAGE = """<!DOCTYPE html>
+<html><head><title>Products</title></head><body>
+    <div class="product"><h2>Lamp</h2><span class="price">10</span></div>
+    <div class="product"><h2>Desk</h2><span class="price">99</span></div>
+    <p>A catalogue of products with enough words in it to keep the paragraph.</p>
+</body></html>
+"""
+
+SCHEMA = {
+    "name": "Products",
+    "baseSelector": "//div[@class='product']",
+    "fields": [
+        {"name": "name", "selector": ".//h2", "type": "text"},
+        {"name": "price", "selector": ".//span[@class='price']", "type": "text"},
+    ],
+}
+
+
+def test_tree_is_parsed_once_and_copies_are_private():
+    document = ParsedDocument(PAGE)
+    assert not document.is_parsed
+    assert document.tree is document.tree
+    assert document.body.tag == "body"
+
+    copy = document.mutable_tree()
+    copy.find("body").clear()
+    assert len(document.body.xpath(".//div")) == 2
+
+    assert ParsedDocument("").body.tag == "body"
+
+
+def test_well_nested_documents():
+    assert ParsedDocument(PAGE).is_well_nested
+    # Tags in scripts and comments are text, self-closing tags are closed
+    page = PAGE.replace(
+        "<body>",
+        "<body><script>w('</div>')</script><!-- </p> --><svg><path d='M0'/></svg>",
+    )
+    assert ParsedDocument(page).is_well_nested
+    # libxml2 closes the <p> before the <div> and the first <li> at the second
+    for markup in ("<p><div>x</div></p>", "<ul><li>a<li>b</ul>"):
+        assert not ParsedDocument(PAGE.replace("<h2>Lamp</h2>", markup)).is_well_nested
+
+
+def test_stages_accept_the_shared_document():
+    document = ParsedDocument(PAGE)
+    strategy = JsonXPathExtractionStrategy(SCHEMA)
+    assert strategy.run_document("https://example.com", document) == strategy.run(
+        "https://example.com", [PAGE]
+    )
+
+    bm25 = BM25ContentFilter(user_query="lamp desk products")
+    assert bm25.filter_document(document) == bm25.filter_content(PAGE)
+
+
+@pytest.mark.asyncio
+async def test_page_is_parsed_once_per_pipeline(monkeypatch):
+    parses = []
+    original = lhtml.document_fromstring
+
+    def counting_parse(html, *args, **kwargs):
+        parses.append(len(html))
+        return original(html, *args, **kwargs)
+
+    monkeypatch.setattr(lhtml, "document_fromstring", counting_parse)
+
+    config = CrawlerRunConfig(
+        scraping_strategy=LXMLWebScrapingStrategy(),
+        extraction_strategy=JsonXPathExtractionStrategy(SCHEMA, input_format="html"),
+    )
+    crawler = AsyncWebCrawler(verbose=False)
+    result = await crawler.aprocess_html(
+        url="https://example.com",
+        html=PAGE,
+        extracted_content=None,
+        config=config,
+        screenshot=None,
+        pdf_data=None,
+        verbose=False,
+    )
+
+    assert json.loads(result.extracted_content) == [
+        {"name": "Lamp", "price": "10"},
+        {"name": "Desk", "price": "99"},
+    ]
+    assert "Lamp" in result.markdown
+    # Scraping works on a copy of the tree the extraction reads
+    assert parses == [len(PAGE)]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
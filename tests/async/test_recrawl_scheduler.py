@@ -0,0 +1,72 @@
+import os
+import sys
+import math
+import random
+import pytest
+
+# Add the parent directory to the Python path
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+
+from crawl4ai import RecrawlScheduler
+from crawl4ai.async_database import AsyncDatabaseManager
+from crawl4ai.models import CrawlResult, MarkdownGenerationResult
+
+DAY = 86400
+
+
+@pytest.fixture
+def db(tmp_path):
+    return AsyncDatabaseManager(db_directory=str(tmp_path))
+
+
+async def simulate(db, rates, days, seed=42):
+    """Check every URL daily while its content changes as a Poisson process"""
+    rng = random.Random(seed)
+    versions = dict.fromkeys(rates, 0)
+    for day in range(days + 1):
+        for url, rate in rates.items():
+            if day:
+                versions[url] += rng.random() < 1 - math.exp(-rate)
+            await db.arecord_check(url, f"{url}#{versions[url]}", checked_at=day * DAY)
+
+
+@pytest.mark.asyncio
+async def test_frequently_changing_urls_first(db):
+    hot = {f"https://example.com/news/{i}": 2.0 for i in range(10)}
+    cold = {f"https://example.com/about/{i}": 1 / 60 for i in range(30)}
+    await simulate(db, {**hot, **cold}, days=30)
+
+    history = await db.aget_change_history(list(hot) + list(cold))
+    assert min(history[url]["change_rate"] for url in hot) > max(
+        history[url]["change_rate"] for url in cold
+    )
+
+    scheduler = RecrawlScheduler(db_manager=db)
+    new_url = "https://example.com/never-seen"
+    selected = await scheduler.aschedule(
+        budget=11, urls=list(cold) + list(hot) + [new_url], now=31 * DAY
+    )
+    assert selected[0] == new_url
+    assert set(selected[1:]) == set(hot)
+
+
+@pytest.mark.asyncio
+async def test_cached_crawls_record_changes(db):
+    url = "https://example.com/page"
+    for html in ("<p>v1</p>", "<p>v1</p>", "<p>v2</p>"):
+        markdown = MarkdownGenerationResult(
+            raw_markdown=html, markdown_with_citations=html, references_markdown=""
+        )
+        await db.acache_url(
+            CrawlResult(url=url, html=html, success=True, markdown_v2=markdown)
+        )
+
+    entry = (await db.aget_change_history([url]))[url]
+    assert entry["checks"] == 2
+    assert entry["changes"] == 1
+    assert entry["last_changed"] == entry["last_checked"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,110 @@
+import os
+import sys
+import asyncio
+import time
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from urllib.parse import urlparse
+
+# Add the parent directory to the Python path
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+
+from crawl4ai import RateLimiter
+from crawl4ai.utils import RobotsParser
+
+ROBOTS = """User-agent: *
+Disallow: /private/
+Crawl-delay: 2
+"""
+
+
+@pytest_asyncio.fixture
+async def server():
+    state = {"fetches": 0, "status": 200}
+
+    async def robots_txt(request):
+        state["fetches"] += 1
+        await asyncio.sleep(0.05)
+        return web.Response(text=ROBOTS, status=state["status"])
+
+    app = web.Application()
+    app.router.add_get("/robots.txt", robots_txt)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    state["base"] = f"http://127.0.0.1:{port}"
+    yield state
+    await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_checks_share_one_fetch(server, tmp_path):
+    parser = RobotsParser(cache_dir=str(tmp_path))
+    base = server["base"]
+    urls = [f"{base}/public/{i}" for i in range(20)] + [f"{base}/private/secret"]
+
+    results = await asyncio.gather(*(parser.can_fetch(url, "bot") for url in urls))
+    assert results == [True] * 20 + [False]
+    assert server["fetches"] == 1
+    assert await parser.get_crawl_delay(f"{base}/page", "bot") == 2.0
+
+    # A new parser reads the rules from the disk cache instead of fetching them
+    other = RobotsParser(cache_dir=str(tmp_path))
+    assert not await other.can_fetch(f"{base}/private/secret", "bot")
+    assert server["fetches"] == 1
+
+    await parser.close()
+    await other.close()
+
+
+@pytest.mark.asyncio
+async def test_unreachable_robots_allows_access(tmp_path):
+    parser = RobotsParser(cache_dir=str(tmp_path))
+    assert await parser.can_fetch("http://127.0.0.1:9/page", "bot")
+    assert await parser.get_crawl_delay("http://127.0.0.1:9/page") is None
+    await parser.close()
+
+
+@pytest.mark.asyncio
+async def test_transient_errors_are_cached_briefly(server, tmp_path):
+    parser = RobotsParser(cache_dir=str(tmp_path))
+    parser.ERROR_TTL = 0.1
+    base = server["base"]
+
+    for status in (503, 429):
+        server["status"] = status
+        parser.clear_cache()
+        assert await parser.can_fetch(f"{base}/private/secret", "bot")
+        # Allowed for ERROR_TTL only, not for the week long cache TTL
+        assert parser._parsers[urlparse(base).netloc][1] < time.time() + 1
+
+    # Once the server recovers, the rules are fetched again
+    server["status"] = 200
+    await asyncio.sleep(0.15)
+    assert not await parser.can_fetch(f"{base}/private/secret", "bot")
+
+    # A missing robots.txt allows everything for the full cache TTL
+    server["status"] = 404
+    parser.clear_cache()
+    assert await parser.can_fetch(f"{base}/private/secret", "bot")
+    fetches = server["fetches"]
+    await asyncio.sleep(0.15)
+    assert await parser.can_fetch(f"{base}/private/secret", "bot")
+    assert server["fetches"] == fetches
+    await parser.close()
+
+
+def test_crawl_delay_sets_minimum_delay():
+    limiter = RateLimiter(base_delay=(0.1, 0.2), max_delay=5)
+    limiter.set_crawl_delay("https://example.com/a", 2.0)
+    assert limiter.domains["example.com"].crawl_delay == 2.0
+    limiter.set_crawl_delay("https://slow.example.com/a", 600)
+    assert limiter.domains["slow.example.com"].crawl_delay == 5
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,125 @@
+import os
+import sys
+import time
+import pytest
+from lxml import html as lhtml
+
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+__location__ = os.path.realpath(os.path.join(os.getcwd(), os.path.dirname(__file__)))
+
+from crawl4ai.content_scraping_strategy import (
+    LXMLWebScrapingStrategy,
+    WebScrapingStrategy,
+)
+from crawl4ai.public_suffix import PublicSuffixTrie
+from crawl4ai.utils import (
+    URLNormalizer,
+    get_base_domain,
+    is_external_url,
+    normalize_url,
+)
+
+WIKI_URL = "https://en.wikipedia.org/wiki/Test"
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("https://www.example.com/a", "example.com"),
+        ("https://news.bbc.co.uk:8080/x", "bbc.co.uk"),
+        ("https://user:pw@shop.example.com.au/", "example.com.au"),
+        ("https://docs.python.org.uk/", "python.org.uk"),
+        ("https://unclecode.github.io/crawl4ai/", "unclecode.github.io"),
+        ("https://a.b.kobe.jp/", "a.b.kobe.jp"),  # *.kobe.jp
+        ("https://x.city.kobe.jp/", "city.kobe.jp"),  # !city.kobe.jp
+        ("https://xn--85x722f.xn--55qx5d.cn/", "xn--85x722f.xn--55qx5d.cn"),  # 公司.cn
+        ("http://127.0.0.1:8000/", "127.0.0.1"),
+        ("http://localhost:11235/crawl", "localhost"),
+        ("/relative/path", ""),
+        ("mailto:someone@example.com", ""),
+    ],
+)
+def test_get_base_domain_uses_public_suffix_list(url, expected):
+    assert get_base_domain(url) == expected
+
+
+def test_public_suffix_rules():
+    trie = PublicSuffixTrie(["com", "*.ck", "!www.ck", "bücher.example"])
+    assert trie.public_suffix("a.b.ck") == "b.ck"
+    assert trie.registrable_domain("a.b.ck") == "a.b.ck"
+    assert trie.registrable_domain("a.www.ck") == "www.ck"
+    assert trie.registrable_domain("shop.xn--bcher-kva.example") == "shop.xn--bcher-kva.example"
+    assert trie.registrable_domain("Shop.Example.COM.") == "example.com"
+    # The implicit rule "*" applies to unknown suffixes
+    assert trie.registrable_domain("a.b.unknown") == "b.unknown"
+
+
+def test_is_external_url_matches_on_label_boundaries():
+    assert not is_external_url("https://example.com/a", "example.com")
+    assert not is_external_url("https://blog.example.com:8443/a", "www.example.com")
+    assert is_external_url("https://notexample.com/a", "example.com")
+    assert is_external_url("https://example.com.evil.org/a", "example.com")
+    assert is_external_url("mailto:a@example.com", "example.com")
+    assert not is_external_url("/a/b", "example.com")
+
+
+def test_normalizer_memoizes_and_matches_normalize_url():
+    with open(os.path.join(__location__, "sample_wikipedia.html"), encoding="utf-8") as f:
+        hrefs = lhtml.fromstring(f.read()).xpath("//a/@href")
+    assert len(hrefs) > len(set(hrefs))
+
+    normalizer = URLNormalizer(WIKI_URL)
+    start = time.perf_counter()
+    for href in hrefs:
+        url = normalizer.normalize(href)
+        normalizer.is_external(url)
+        normalizer.base_domain_of(url)
+    memoized = time.perf_counter() - start
+    start = time.perf_counter()
+    for href in hrefs:
+        url = normalize_url(href, WIKI_URL)
+        is_external_url(url, get_base_domain(WIKI_URL))
+        get_base_domain(url)
+    uncached = time.perf_counter() - start
+    print(
+        f"\nClassifying {len(hrefs)} links: memoized {memoized * 1000:.1f} ms, "
+        f"per call {uncached * 1000:.1f} ms"
+    )
+
+    assert normalizer.normalize.cache_info().misses == len(set(hrefs))
+    assert [normalizer.normalize(href) for href in hrefs] == [
+        normalize_url(href, WIKI_URL) for href in hrefs
+    ]
+    assert normalizer.base_domain == "wikipedia.org"
+    assert not normalizer.is_external("https://de.wikipedia.org/wiki/Test")
+
+    with pytest.raises(ValueError):
+        URLNormalizer("not a url").normalize("/a")
+
+
+@pytest.mark.parametrize("strategy", [WebScrapingStrategy, LXMLWebScrapingStrategy])
+def test_scrapers_classify_links_by_registrable_domain(strategy):
+    html = """<html><body><p>
+        <a href="/home">Home</a>
+        <a href="https://shop.example.co.uk/cart">Shop</a>
+        <a href="https://other.co.uk/">Other</a>
+        <a href="https://notexample.co.uk/">Lookalike</a>
+        <a href="//cdn.example.co.uk/file">CDN</a>
+        </p></body></html>"""
+    result = strategy().scrap("https://www.example.co.uk/page", html)
+    internal = {link.href for link in result.links.internal}
+    external = {link.href: link.base_domain for link in result.links.external}
+    assert internal == {
+        "https://www.example.co.uk/home",
+        "https://shop.example.co.uk/cart",
+        "https://cdn.example.co.uk/file",
+    }
+    assert external == {
+        "https://other.co.uk/": "other.co.uk",
+        "https://notexample.co.uk/": "notexample.co.uk",
+    }
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,113 @@
+import os
+import sys
+import json
+import base64
+import pytest
+
+# Add the parent directory to the Python path
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+
+from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, CacheMode
+from crawl4ai.async_crawler_strategy import ReplayCrawlerStrategy
+from crawl4ai.warc import WARCWriter, iter_warc_records
+
+URL = "https://example.com/article"
+RAW_HTML = "<html><body><div id='app'></div></body></html>"
+RENDERED_HTML = "<html><body><div id='app'><p>Rendered article text with enough words.</p></div></body></html>"
+
+
+def write_archive(path):
+    with WARCWriter(path) as writer:
+        writer.write_response(
+            "https://example.com/old",
+            301,
+            {"Location": "/article"},
+            b"",
+            reason="Moved Permanently",
+        )
+        record_id = writer.write_response(
+            URL,
+            200,
+            {"Content-Type": "text/html; charset=utf-8", "Content-Encoding": "gzip"},
+            RAW_HTML.encode("utf-8"),
+            request_headers={"User-Agent": "test"},
+        )
+        writer.write_rendered(URL, RENDERED_HTML, refers_to=record_id)
+
+
+@pytest.mark.parametrize("filename", ["crawl.warc", "crawl.warc.gz"])
+def test_warc_records_round_trip(tmp_path, filename):
+    path = str(tmp_path / filename)
+    write_archive(path)
+
+    records = list(iter_warc_records(path))
+    assert [r.type for r in records] == [
+        "warcinfo",
+        "response",
+        "response",
+        "request",
+        "conversion",
+    ]
+    status, headers, body = records[2].parse_http_response()
+    assert status == 200
+    assert body == RAW_HTML.encode("utf-8")
+    # The stored body is decoded, so its encoding header is dropped
+    assert "Content-Encoding" not in headers
+    assert records[4].headers["WARC-Refers-To"] == records[2].headers["WARC-Record-ID"]
+
+
+@pytest.mark.asyncio
+async def test_replay_serves_rendered_dom_offline(tmp_path):
+    path = str(tmp_path / "crawl.warc.gz")
+    write_archive(path)
+
+    strategy = ReplayCrawlerStrategy(path)
+    config = CrawlerRunConfig(cache_mode=CacheMode.BYPASS)
+    async with AsyncWebCrawler(crawler_strategy=strategy, verbose=False) as crawler:
+        result = await crawler.arun("https://example.com/old", config=config)
+        assert result.success
+        assert result.redirected_url == URL
+        assert "Rendered article text" in result.markdown
+
+        missing = await crawler.arun("https://example.com/missing", config=config)
+        assert not missing.success
+        assert "not found in archive" in missing.error_message
+
+
+@pytest.mark.asyncio
+async def test_replay_from_har(tmp_path):
+    path = tmp_path / "crawl.har"
+    path.write_text(
+        json.dumps(
+            {
+                "log": {
+                    "entries": [
+                        {
+                            "request": {"url": URL},
+                            "response": {
+                                "status": 200,
+                                "headers": [
+                                    {"name": "Content-Type", "value": "text/html"}
+                                ],
+                                "content": {
+                                    "text": base64.b64encode(
+                                        RENDERED_HTML.encode()
+                                    ).decode(),
+                                    "encoding": "base64",
+                                },
+                            },
+                        }
+                    ]
+                }
+            }
+        )
+    )
+
+    response = await ReplayCrawlerStrategy(str(path)).crawl(URL + "/")
+    assert response.status_code == 200
+    assert response.html == RENDERED_HTML
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
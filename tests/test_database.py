@@ -0,0 +1,48 @@
+import os
+import sys
+import sqlite3
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crawl4ai import database
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "crawl4ai.db")
+    monkeypatch.setattr(database, "DB_PATH", path)
+    database.init_db()
+    yield path
+    database.close_connections()
+
+
+def cache(i):
+    database.cache_url(f"https://example.com/{i}", f"<p>{i}</p>", "", f"{i}", "", True)
+
+
+def test_connection_reused_with_wal(db_path):
+    conn = database.get_connection()
+    assert database.get_connection() is conn
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+
+
+def test_batched_writes_from_thread_pool(db_path, monkeypatch):
+    monkeypatch.setattr(database, "SYNC_CACHE_WRITE_BATCH_SIZE", 8)
+    with database.batched_writes():
+        cache("first")
+        # Buffered rows are already visible to readers
+        assert database.get_cached_url("https://example.com/first")[1] == "<p>first</p>"
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(cache, range(20)))
+
+    assert database.get_total_count() == 21
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT html FROM crawled_data WHERE url = ?", ("https://example.com/7",)).fetchone() == ("<p>7</p>",)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])